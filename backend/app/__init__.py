@@ -39,94 +39,22 @@ def setup_app_environment():
     logger.info(f"Python path updated with app paths")
     return app_dir
 
-def initialize_search_system():
-    """Initialize the search system with existing products."""
+def initialize_search_system(app=None):
+    """Load the search model and index, building the index from active products if it is empty."""
     try:
-        from routes.search.embedding_service import get_embedding_service
-        from routes.search.search_service import get_search_service
-        from app.models.models import Product
-        from app.configuration.extensions import db
-        from app import create_app
-        
-        logger.info("Initializing search system with existing products...")
-        
-        # Create app context for database operations
-        app = create_app()
+        from app.routes.search.embedding_service import warm_search
+        if app is None:
+            from app import create_app
+            app = create_app()
         with app.app_context():
-            # Get embedding service
-            embedding_service = get_embedding_service()
-            if not embedding_service or not embedding_service.is_available():
-                logger.warning("Embedding service not available, skipping product indexing")
-                return False
-            
-            # Check if index is empty
-            stats = embedding_service.get_index_stats()
-            if stats.get('total_products', 0) > 0:
-                logger.info(f"Search index already contains {stats['total_products']} products")
-                return True
-            
-            # Get all active products
-            products = Product.query.filter_by(is_active=True).all()
-            if not products:
-                logger.warning("No active products found in database")
-                return False
-            
-            logger.info(f"Found {len(products)} active products, building search index...")
-            
-            # Convert products to dictionaries
-            product_dicts = []
-            for product in products:
-                try:
-                    product_dict = product.to_dict()
-                    # Add related data
-                    if product.category:
-                        product_dict['category'] = product.category.to_dict()
-                    if product.brand:
-                        product_dict['brand'] = product.brand.to_dict()
-                    product_dicts.append(product_dict)
-                except Exception as e:
-                    logger.error(f"Error processing product {product.id}: {str(e)}")
-                    continue
-            
-            # Build the index
-            success = embedding_service.rebuild_index(product_dicts)
-            if success:
-                final_stats = embedding_service.get_index_stats()
-                logger.info(f"✅ Search index built successfully with {final_stats.get('total_products', 0)} products")
-                return True
-            else:
-                logger.error("❌ Failed to build search index")
-                return False
-                
+            return warm_search(app)
     except Exception as e:
         logger.error(f"Error initializing search system: {str(e)}")
         return False
 
-def check_and_setup_search_index():
-    """Check if search index needs to be set up and do it if necessary."""
-    try:
-        # Import after environment setup
-        from routes.search.embedding_service import get_embedding_service
-        
-        embedding_service = get_embedding_service()
-        if not embedding_service or not embedding_service.is_available():
-            logger.warning("Search system not available - missing dependencies or configuration")
-            return False
-        
-        # Check index stats
-        stats = embedding_service.get_index_stats()
-        total_products = stats.get('total_products', 0)
-        
-        if total_products == 0:
-            logger.info("Search index is empty, attempting to populate...")
-            return initialize_search_system()
-        else:
-            logger.info(f"Search index contains {total_products} products")
-            return True
-            
-    except Exception as e:
-        logger.error(f"Error checking search index: {str(e)}")
-        return False
+def check_and_setup_search_index(app=None):
+    """Synchronous variant of the background search warm-up, for scripts."""
+    return initialize_search_system(app)
 
 # Setup environment when module is imported
 setup_app_environment()
@@ -134,13 +62,13 @@ setup_app_environment()
 # Import extensions and config
 try:
     from .configuration.extensions import db, ma, mail, cache, limiter
-    from .configuration.config import config
+    from .configuration.config import config as config_by_name
     from .websocket import socketio
 except ImportError:
     # Fallback imports for different directory structures
     try:
         from configuration.extensions import db, ma, mail, cache, limiter
-        from configuration.config import config
+        from configuration.config import config as config_by_name
         from websocket import socketio
     except ImportError:
         # Last resort - create minimal extensions
@@ -168,7 +96,7 @@ except ImportError:
             JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)
             CORS_ORIGINS = ['http://localhost:3000']
         
-        config = {'default': Config}
+        config_by_name = {'default': Config}
 
 def create_app(config_name=None, enable_socketio=True):
     """
@@ -184,8 +112,11 @@ def create_app(config_name=None, enable_socketio=True):
     if config_name is None:
         config_name = os.environ.get('FLASK_CONFIG', 'default')
     
+    from .services.startup import Startup
+    startup = Startup()
+
     app = Flask(__name__)
-    app.config.from_object(config[config_name])
+    app.config.from_object(config_by_name[config_name])
     
     # Set secret key for SocketIO
     app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev-secret-key')
@@ -202,13 +133,15 @@ def create_app(config_name=None, enable_socketio=True):
     mail.init_app(app)
     cache.init_app(app)
     limiter.init_app(app)
+    startup.mark('extensions')
     
     if enable_socketio:
         try:
             # Get CORS origins from config
             cors_origins = app.config.get('CORS_ORIGINS', ['http://localhost:3000', 'http://127.0.0.1:3000'])
             
-            # Initialize SocketIO with the app
+            # Initialize SocketIO with the app; the message queue carries emits to every worker
+            from .services.realtime import realtime_message_queue
             socketio.init_app(
                 app,
                 cors_allowed_origins=cors_origins,
@@ -217,7 +150,8 @@ def create_app(config_name=None, enable_socketio=True):
                 engineio_logger=False,  # Reduce log noise
                 ping_timeout=60,
                 ping_interval=25,
-                manage_session=False  # Let Flask handle sessions
+                manage_session=False,  # Let Flask handle sessions
+                message_queue=realtime_message_queue(app.config)
             )
             
             # Attach socketio to app for easy access
@@ -376,35 +310,8 @@ def create_app(config_name=None, enable_socketio=True):
     def serve_product_image(filename):
         return send_from_directory(product_images_dir, filename)
     
-    # Guest cart helper function
-    def get_or_create_guest_cart():
-        try:
-            from .models.models import Cart
-        except ImportError:
-            try:
-                from models.models import Cart
-            except ImportError:
-                class Cart:
-                    def __init__(self, guest_id=None):
-                        self.guest_id = guest_id
-                        self.is_active = True
-                return Cart(guest_id=str(uuid.uuid4()))
-        
-        guest_cart_id = request.cookies.get('guest_cart_id')
-        if guest_cart_id:
-            cart = Cart.query.filter_by(guest_id=guest_cart_id, is_active=True).first()
-            if cart:
-                return cart
-        
-        guest_id = str(uuid.uuid4())
-        cart = Cart(guest_id=guest_id, is_active=True)
-        try:
-            db.session.add(cart)
-            db.session.commit()
-        except Exception as e:
-            app.logger.error(f"Error creating guest cart: {str(e)}")
-        
-        return cart
+    # Guest carts stay virtual (no row) until their first item is added
+    from .services.guest_carts import get_guest_cart
     
     # JWT Optional decorator
     def jwt_optional(fn):
@@ -418,89 +325,39 @@ def create_app(config_name=None, enable_socketio=True):
                     g.is_authenticated = True
                 else:
                     g.is_authenticated = False
-                    g.guest_cart = get_or_create_guest_cart()
+                    g.guest_cart = get_guest_cart()
             except Exception as e:
                 app.logger.error(f"JWT error: {str(e)}")
                 g.is_authenticated = False
-                g.guest_cart = get_or_create_guest_cart()
+                g.guest_cart = get_guest_cart()
             
             return fn(*args, **kwargs)
         return wrapper
     
     app.jwt_optional = jwt_optional
     
-    # Import search services and routes from the search package
-    search_service = None
-    embedding_service = None
-    user_search_routes = None
-    admin_search_routes = None
-    
+    # Search blueprints and services. Constructing the services is cheap: the
+    # embedding model and FAISS index are loaded by the 'search' warm-up below
     try:
-        # Import from routes.search package (as specified)
-        from .routes.search import user_search_routes, admin_search_routes, SearchService, EmbeddingService
-        search_service = SearchService
-        embedding_service = EmbeddingService
-        app.logger.info("✅ Successfully imported all search components from .routes.search")
-    except ImportError as e1:
-        try:
-            # Fallback: Import from routes.search package (relative to app)
-            from routes.search import user_search_routes, admin_search_routes, SearchService, EmbeddingService
-            search_service = SearchService
-            embedding_service = EmbeddingService
-            app.logger.info("✅ Successfully imported all search components from routes.search")
-        except ImportError as e2:
-            try:
-                # Another fallback: Import from app.routes.search
-                from app.routes.search import user_search_routes, admin_search_routes, SearchService, EmbeddingService
-                search_service = SearchService
-                embedding_service = EmbeddingService
-                app.logger.info("✅ Successfully imported all search components from app.routes.search")
-            except ImportError as e3:
-                # Create fallback blueprints if imports fail
-                from flask import Blueprint
-                
-                user_search_routes = Blueprint('user_search_routes', __name__)
-                admin_search_routes = Blueprint('admin_search_routes', __name__)
-                
-                @user_search_routes.route('/health', methods=['GET'])
-                def user_search_health():
-                    return jsonify({"status": "ok", "message": "Fallback user search routes active"}), 200
-                
-                @admin_search_routes.route('/health', methods=['GET'])
-                def admin_search_health():
-                    return jsonify({"status": "ok", "message": "Fallback admin search routes active"}), 200
-                
-                # Create fallback service classes
-                class SearchService:
-                    def __init__(self):
-                        pass
-                    
-                    def search(self, query):
-                        return {"message": "Search service not available"}
-                
-                class EmbeddingService:
-                    def __init__(self):
-                        pass
-                    
-                    def generate_embedding(self, text):
-                        return {"message": "Embedding service not available"}
-                
-                search_service = SearchService
-                embedding_service = EmbeddingService
-                app.logger.error(f"❌ All search import attempts failed: {e1}, {e2}, {e3}")
-                app.logger.warning("⚠️ Using fallback search components")
-    
-    # Initialize search services with app context
-    try:
-        if search_service and embedding_service:
-            with app.app_context():
-                app.search_service = search_service()
-                app.embedding_service = embedding_service()
-                app.logger.info("✅ Search services initialized successfully")
+        from .routes.search import user_search_routes, admin_search_routes, get_search_service, get_embedding_service
+        app.search_service = get_search_service()
+        app.embedding_service = get_embedding_service()
+        app.logger.info("✅ Search services initialized successfully")
     except Exception as e:
-        app.logger.error(f"❌ Failed to initialize search services: {str(e)}")
+        from flask import Blueprint
+        app.logger.error(f"❌ Search components unavailable, using fallbacks: {str(e)}")
+        
+        user_search_routes = Blueprint('user_search_routes', __name__)
+        admin_search_routes = Blueprint('admin_search_routes', __name__)
+        
+        @user_search_routes.route('/health', methods=['GET'])
+        def user_search_health():
+            return jsonify({"status": "ok", "message": "Fallback user search routes active"}), 200
+        
+        @admin_search_routes.route('/health', methods=['GET'])
+        def admin_search_health():
+            return jsonify({"status": "ok", "message": "Fallback admin search routes active"}), 200
         
-        # Create minimal fallback services
         class FallbackSearchService:
             def search(self, query):
                 return []
@@ -800,8 +657,11 @@ def create_app(config_name=None, enable_socketio=True):
         ],
     }
     
-    # Try importing each blueprint with enhanced error handling
+    # Try importing each blueprint with enhanced error handling. The canonical
+    # app.* path goes first: a failed or duplicate import under another package
+    # name re-executes the module, which is most of the cost of this loop
     for blueprint_name, import_attempts in blueprint_imports.items():
+        import_attempts = sorted(import_attempts, key=lambda attempt: not attempt[0].startswith('app.'))
         for module_path, attr_name in import_attempts:
             # Skip empty module paths
             if not module_path or not module_path.strip():
@@ -1162,41 +1022,46 @@ def create_app(config_name=None, enable_socketio=True):
         
     except Exception as e:
         app.logger.error(f"Error registering blueprints: {str(e)}")
+    startup.mark('blueprints')
     
-    # Create database tables and initialize admin auth tables
-    try:
-        with app.app_context():
-            db.create_all()
+    # Create database tables and initialize admin auth tables. This checks every
+    # table (three times over) on each start; set DB_CREATE_ALL_ON_START=false
+    # where migrations manage the schema
+    if app.config.get('DB_CREATE_ALL_ON_START', True):
+        try:
+            with app.app_context():
+                db.create_all()
             
-            # Initialize admin authentication tables
-            try:
-                from .routes.admin.admin_auth import init_admin_auth_tables
-                init_admin_auth_tables()
-                app.logger.info("Admin authentication tables initialized successfully")
-            except ImportError:
+                # Initialize admin authentication tables
                 try:
-                    from routes.admin.admin_auth import init_admin_auth_tables
+                    from .routes.admin.admin_auth import init_admin_auth_tables
                     init_admin_auth_tables()
                     app.logger.info("Admin authentication tables initialized successfully")
                 except ImportError:
-                    app.logger.warning("Admin authentication tables initialization skipped - module not found")
+                    try:
+                        from routes.admin.admin_auth import init_admin_auth_tables
+                        init_admin_auth_tables()
+                        app.logger.info("Admin authentication tables initialized successfully")
+                    except ImportError:
+                        app.logger.warning("Admin authentication tables initialization skipped - module not found")
             
-            # Initialize admin email tables
-            try:
-                from .routes.admin.admin_email_routes import init_admin_email_tables
-                init_admin_email_tables()
-                app.logger.info("Admin email tables initialized successfully")
-            except ImportError:
+                # Initialize admin email tables
                 try:
-                    from routes.admin.admin_email_routes import init_admin_email_tables
+                    from .routes.admin.admin_email_routes import init_admin_email_tables
                     init_admin_email_tables()
                     app.logger.info("Admin email tables initialized successfully")
                 except ImportError:
-                    app.logger.warning("Admin email tables initialization skipped - module not found")
+                    try:
+                        from routes.admin.admin_email_routes import init_admin_email_tables
+                        init_admin_email_tables()
+                        app.logger.info("Admin email tables initialized successfully")
+                    except ImportError:
+                        app.logger.warning("Admin email tables initialization skipped - module not found")
 
-            app.logger.info("Database tables created successfully")
-    except Exception as e:
-        app.logger.error(f"Error creating database tables: {str(e)}")
+                app.logger.info("Database tables created successfully")
+        except Exception as e:
+            app.logger.error(f"Error creating database tables: {str(e)}")
+    startup.mark('database')
     
     # Set up order completion hooks with clean error handling
     try:
@@ -1250,6 +1115,155 @@ def create_app(config_name=None, enable_socketio=True):
                 "message": "Please check order completion handler configuration"
             }), 500
     
+    # Shared rate-limit profiles for payments, auth and search, plus the local pre-check
+    try:
+        from .configuration.rate_limiting import init_rate_limiting
+        init_rate_limiting(app, limiter)
+    except Exception as e:
+        app.logger.error(f"Error initializing rate limiting: {str(e)}")
+
+    # Admin audit events, bulk-written off the request path
+    try:
+        from .services.audit_log import init_audit_log
+        init_audit_log(app)
+        app.logger.info("Admin audit log writer initialized successfully")
+    except Exception as e:
+        app.logger.error(f"Error initializing admin audit log: {str(e)}")
+
+    # Realtime emits and socket presence shared across workers
+    try:
+        from .services.realtime import init_realtime
+        realtime = init_realtime(app, socketio if enable_socketio else None)
+        app.logger.info(f"Realtime layer initialized ({realtime.presence.name} presence)")
+    except Exception as e:
+        app.logger.error(f"Error initializing realtime layer: {str(e)}")
+
+    # Keep the hot-SKU availability cache in step with committed inventory writes
+    try:
+        from .services.inventory_cache import init_inventory_cache
+        init_inventory_cache(app)
+        app.logger.info("Inventory availability cache initialized successfully")
+    except Exception as e:
+        app.logger.error(f"Error initializing inventory availability cache: {str(e)}")
+
+    # Pooled outbound HTTP client shared by payment, email and webhook integrations
+    try:
+        from .services.http_client import init_http_client
+        init_http_client(app)
+        app.logger.info("Outbound HTTP client initialized successfully")
+    except Exception as e:
+        app.logger.error(f"Error initializing outbound HTTP client: {str(e)}")
+
+    # Provider OAuth tokens shared across workers
+    try:
+        from .services.token_cache import init_token_cache
+        init_token_cache(app)
+        app.logger.info("Shared OAuth token cache initialized successfully")
+    except Exception as e:
+        app.logger.error(f"Error initializing shared OAuth token cache: {str(e)}")
+
+    # Guest cart purge command
+    try:
+        from .services.guest_carts import init_guest_carts
+        init_guest_carts(app)
+    except Exception as e:
+        app.logger.error(f"Error initializing guest cart commands: {str(e)}")
+
+    # Export retention command
+    try:
+        from .services.exports import init_exports
+        init_exports(app)
+    except Exception as e:
+        app.logger.error(f"Error initializing export commands: {str(e)}")
+
+    # Opt-in per-request latency, SQL and profiling instrumentation with /metrics
+    try:
+        from .services.instrumentation import init_instrumentation
+        if init_instrumentation(app) is not None:
+            app.logger.info("Request instrumentation enabled")
+    except Exception as e:
+        app.logger.error(f"Error initializing request instrumentation: {str(e)}")
+
+    # Checkout counters for the OLTP and analytics connection pools
+    try:
+        from .configuration.database import instrument_pools
+        instrument_pools(app, db)
+    except Exception as e:
+        app.logger.error(f"Error instrumenting database pools: {str(e)}")
+
+    # Per-worker cache of revoked JWTs for the token_in_blocklist_loader
+    try:
+        from .services.revocation_cache import init_revocation_cache
+        init_revocation_cache(app)
+        app.logger.info("Token revocation cache initialized successfully")
+    except Exception as e:
+        app.logger.error(f"Error initializing token revocation cache: {str(e)}")
+
+    # Request-scoped principal for auth decorators, backed by a short-TTL cache
+    try:
+        from .services.principal_cache import init_principal_cache
+        init_principal_cache(app)
+        app.logger.info("Principal cache initialized successfully")
+    except Exception as e:
+        app.logger.error(f"Error initializing principal cache: {str(e)}")
+
+    # Background job broker and handlers for emails and webhooks
+    try:
+        from .services.jobs import init_jobs
+        init_jobs(app)
+        app.logger.info("Background jobs initialized successfully")
+    except Exception as e:
+        app.logger.error(f"Error initializing background jobs: {str(e)}")
+
+    # Provider status polling for pending M-PESA and Pesapal payments
+    try:
+        from .services.payment_reconciliation import init_payment_reconciliation
+        init_payment_reconciliation(app)
+        app.logger.info("Payment reconciliation initialized successfully")
+    except Exception as e:
+        app.logger.error(f"Error initializing payment reconciliation: {str(e)}")
+
+    # Rolled-up admin dashboard metrics, kept in step with order and user changes
+    try:
+        from .services.dashboard_metrics import init_dashboard_metrics
+        init_dashboard_metrics(app)
+        app.logger.info("Dashboard metrics initialized successfully")
+    except Exception as e:
+        app.logger.error(f"Error initializing dashboard metrics: {str(e)}")
+
+    # Compile transactional email templates once instead of on the first send
+    try:
+        from .services.email_templates import precompile
+        precompile()
+    except Exception as e:
+        app.logger.error(f"Error compiling email templates: {str(e)}")
+    startup.mark('services')
+
+    # Heavy subsystems are warmed off the critical path (see services/startup.py)
+    try:
+        from .services.startup import init_startup
+        init_startup(app, startup)
+        from .routes.search.embedding_service import warm_search
+        startup.register('search', warm_search)
+    except Exception as e:
+        app.logger.error(f"Error registering startup warm-ups: {str(e)}")
+
+    def database_pool_stats():
+        try:
+            from .configuration.database import pool_stats
+            return pool_stats(db)
+        except Exception as e:
+            app.logger.error(f"Could not read database pool stats: {str(e)}")
+            return {}
+
+    def realtime_stats():
+        try:
+            from .services.realtime import get_realtime
+            return get_realtime(app).stats()
+        except Exception as e:
+            app.logger.error(f"Could not read realtime presence: {str(e)}")
+            return {}
+
     # Dashboard health check endpoint
     @app.route('/api/admin/dashboard/health', methods=['GET', 'OPTIONS'])
     def dashboard_health_check():
@@ -1266,6 +1280,7 @@ def create_app(config_name=None, enable_socketio=True):
                     "/api/admin/dashboard/health"
                 ],
                 "database": "connected" if db else "disconnected",
+                "database_pools": database_pool_stats(),
                 "data_source": "database_only"
             }), 200
         except Exception as e:
@@ -1288,6 +1303,9 @@ def create_app(config_name=None, enable_socketio=True):
             "dashboard_system": "active",
             "order_system": "active",
             "product_system": "active",
+            "database_pools": database_pool_stats(),
+            "startup": startup.report(),
+            "realtime": realtime_stats(),
             "payment_system": {
                 "payment_routes": "active" if 'payment_routes' in imported_blueprints else "inactive",
                 "mpesa": "active" if 'mpesa_routes' in imported_blueprints else "inactive",
@@ -1340,38 +1358,30 @@ def create_app(config_name=None, enable_socketio=True):
     def before_request():
         app.logger.debug(f"Processing request: {request.method} {request.path}")
     
-    app.logger.info(f"Application created successfully with config: {config_name}")
+    startup.mark('handlers')
+    app.logger.info(f"Application created successfully with config: {config_name} "
+                    f"in {startup.complete()}s {startup.phases}")
+    try:
+        from .services.startup import serves_requests
+        if not serves_requests():
+            app.config['STARTUP_WARMUP'] = 'off'
+    except Exception as e:
+        app.logger.error(f"Error checking the startup warm-up mode: {str(e)}")
+    if app.config.get('STARTUP_WARMUP', 'background') == 'background':
+        startup.warm(app)
     return app
 
 # Initialize Flask app factory
 def create_app_with_search():
-    """Create Flask app and initialize search system."""
-    try:
-        from app import create_app
-        
-        # Create the Flask app
-        app = create_app()
-        
-        # Setup search index in app context
-        with app.app_context():
-            search_ready = check_and_setup_search_index()
-            if search_ready:
-                logger.info("✅ Search system ready")
-            else:
-                logger.warning("⚠️ Search system not fully ready - will use fallback search")
-        
-        return app
-        
-    except Exception as e:
-        logger.error(f"Error creating app with search: {str(e)}")
-        
-        # Fallback to basic app creation
-        try:
-            from app import create_app
-            return create_app()
-        except Exception as fallback_error:
-            logger.error(f"Fallback app creation also failed: {str(fallback_error)}")
-            raise
+    """Create Flask app and start warming the search system in the background."""
+    from app import create_app
+    
+    app = create_app()
+    # create_app already warms in 'background' mode; otherwise start it here
+    startup = app.extensions.get('startup')
+    if startup is not None and app.config.get('STARTUP_WARMUP') != 'off':
+        startup.warm(app, 'search')
+    return app
 
 # Export the app factory
 __all__ = ['create_app_with_search', 'setup_app_environment', 'initialize_search_system']
@@ -0,0 +1,277 @@
+"""
+Database engine configuration for Mizizzi E-commerce platform.
+
+Requests run against two connection pools:
+
+    default     OLTP traffic (catalogue, cart, checkout, auth) with a short
+                statement timeout so a runaway query fails fast
+    analytics   dashboard, exports and search model training, with its own
+                small pool and a long statement timeout
+
+Both point at the primary database unless ANALYTICS_DATABASE_URL is set (it
+must be writable: dashboard rollups are written from analytics requests).
+Because the pools are separate, a slow admin report can exhaust only the
+analytics pool and never takes connections away from checkout.
+
+Code opts into a pool with ``use_workload('analytics')`` (a context manager
+and decorator), ``workload_blueprint(bp, 'analytics')`` for a whole
+blueprint, or ``query.execution_options(db_workload='analytics')`` for a
+query that is iterated later, e.g. by a streaming response. Everything else
+uses the default pool. When the analytics bind is not configured (tests,
+SQLite) the default engine is used.
+
+Read replicas (binds ``replica_1``, ``replica_2``, ... from
+REPLICA_DATABASE_URLS) serve reads that are marked replica-safe with
+``use_replica()``, ``replica_blueprint(bp)`` or
+``query.execution_options(db_replica=True)``. A marked read still goes to the
+primary when:
+
+    - it is not a plain SELECT, or is a SELECT ... FOR UPDATE
+    - the session has pending changes or has already written (flushed or
+      run DML), so a request reads its own writes for the rest of its life
+    - no replica is within REPLICA_MAX_LAG_SECONDS of the primary, or none
+      answers the lag check; replicas are checked at most every
+      REPLICA_LAG_CHECK_SECONDS and used round-robin
+
+The fallback is the engine the workload would otherwise use, so a replica-safe
+export falls back to the analytics pool rather than the OLTP one.
+"""
+import contextvars
+import itertools
+import logging
+import time
+from contextlib import contextmanager
+
+from flask import current_app
+from flask_sqlalchemy.session import Session as FlaskSession
+from sqlalchemy import event, text
+
+logger = logging.getLogger(__name__)
+
+ANALYTICS = 'analytics'
+WORKLOAD_OPTION = 'db_workload'
+REPLICA_PREFIX = 'replica_'
+REPLICA_OPTION = 'db_replica'
+WROTE_KEY = 'db_wrote'
+
+_workload = contextvars.ContextVar('db_workload', default=None)
+_replica = contextvars.ContextVar('db_replica', default=False)
+
+def replica_key(index):
+    return f"{REPLICA_PREFIX}{index}"
+
+def engine_options(uri, pool_size=5, max_overflow=10, pool_timeout=10, pool_recycle=1800,
+                   statement_timeout_ms=None, application_name=None):
+    """
+    SQLAlchemy engine options for ``uri``.
+
+    Pool sizing and server-side statement timeouts only apply to server
+    databases; SQLite gets pre-ping only.
+    """
+    if not uri or uri.startswith('sqlite'):
+        return {}
+
+    options = {
+        'pool_size': pool_size,
+        'max_overflow': max_overflow,
+        'pool_timeout': pool_timeout,
+        'pool_recycle': pool_recycle,
+        'pool_pre_ping': True,
+    }
+    if uri.startswith('postgres'):
+        server_options = []
+        if statement_timeout_ms:
+            server_options.append(f"-c statement_timeout={int(statement_timeout_ms)}")
+        connect_args = {'connect_timeout': 10}
+        if server_options:
+            connect_args['options'] = ' '.join(server_options)
+        if application_name:
+            connect_args['application_name'] = application_name
+        options['connect_args'] = connect_args
+    return options
+
+# --------------------------------------------------------------------------
+# Workload routing
+# --------------------------------------------------------------------------
+def current_workload():
+    return _workload.get()
+
+@contextmanager
+def use_workload(name):
+    """Run the enclosed queries (or decorated function) on the ``name`` pool."""
+    token = _workload.set(name)
+    try:
+        yield
+    finally:
+        _workload.reset(token)
+
+def workload_blueprint(blueprint, name):
+    """Route every request of ``blueprint`` to the ``name`` pool."""
+    @blueprint.before_request
+    def _enter_workload():
+        _workload.set(name)
+
+    @blueprint.teardown_request
+    def _leave_workload(exc=None):
+        _workload.set(None)
+
+    return blueprint
+
+@contextmanager
+def use_replica():
+    """Allow the enclosed reads (or decorated function) to be served by a replica."""
+    token = _replica.set(True)
+    try:
+        yield
+    finally:
+        _replica.reset(token)
+
+def replica_blueprint(blueprint):
+    """Allow every read of ``blueprint`` to be served by a replica."""
+    @blueprint.before_request
+    def _enter_replica():
+        _replica.set(True)
+
+    @blueprint.teardown_request
+    def _leave_replica(exc=None):
+        _replica.set(False)
+
+    return blueprint
+
+def _statement_option(clause, name):
+    get_options = getattr(clause, 'get_execution_options', None)
+    if get_options is None:
+        return None
+    try:
+        return get_options().get(name)
+    except Exception:
+        return None
+
+def _statement_workload(clause):
+    return _statement_option(clause, WORKLOAD_OPTION)
+
+class WorkloadSession(FlaskSession):
+    """Flask-SQLAlchemy session that picks a replica or the engine of the current workload when one is bound."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            if getattr(clause, 'is_dml', False):
+                self.info[WROTE_KEY] = True
+            elif self._replica_safe(clause):
+                engine = _replicas.pick(self._db)
+                if engine is not None:
+                    return engine
+            workload = _statement_workload(clause) or _workload.get()
+            if workload is not None:
+                engine = self._db.engines.get(workload)
+                if engine is not None:
+                    return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _replica_safe(self, clause):
+        if not (_replica.get() or _statement_option(clause, REPLICA_OPTION)):
+            return False
+        if not getattr(clause, 'is_select', False) or getattr(clause, '_for_update_arg', None) is not None:
+            return False
+        if self.info.get(WROTE_KEY):
+            return False
+        return not (self.new or self.deleted or self.identity_map.check_modified())
+
+@event.listens_for(WorkloadSession, 'after_flush')
+def _mark_written(session, flush_context):
+    session.info[WROTE_KEY] = True
+
+# --------------------------------------------------------------------------
+# Replica selection
+# --------------------------------------------------------------------------
+# 0 when the standby has replayed everything it received (an idle primary
+# would otherwise look like growing lag), else seconds since the last replay
+_PG_LAG_SQL = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() "
+    "OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+class ReplicaSet:
+    """Round-robin over the replica binds that passed their last lag check."""
+
+    def __init__(self):
+        self._turn = itertools.count()
+        self._lag = {}
+
+    def pick(self, db):
+        keys = [key for key in db.engines if key and key.startswith(REPLICA_PREFIX)]
+        if not keys:
+            return None
+        config = current_app.config
+        max_lag = config.get('REPLICA_MAX_LAG_SECONDS', 10)
+        interval = config.get('REPLICA_LAG_CHECK_SECONDS', 5)
+        start = next(self._turn)
+        for offset in range(len(keys)):
+            key = keys[(start + offset) % len(keys)]
+            engine = db.engines[key]
+            lag = self.lag(key, engine, interval)
+            if lag is not None and lag <= max_lag:
+                return engine
+        return None
+
+    def lag(self, key, engine, interval):
+        """Replication lag of ``engine`` in seconds, or None when it cannot be reached."""
+        now = time.monotonic()
+        checked = self._lag.get(key)
+        if checked is not None and now - checked[0] < interval:
+            return checked[1]
+        lag = None
+        try:
+            with engine.connect() as connection:
+                lag = float(connection.execute(_PG_LAG_SQL).scalar() or 0) \
+                    if engine.dialect.name == 'postgresql' else 0.0
+        except Exception as e:
+            logger.warning(f"Replica {key} lag check failed: {str(e)}")
+        self._lag[key] = (now, lag)
+        return lag
+
+    def status(self):
+        return {key: lag for key, (_, lag) in self._lag.items()}
+
+_replicas = ReplicaSet()
+
+# --------------------------------------------------------------------------
+# Pool metrics
+# --------------------------------------------------------------------------
+_pool_counters = {}
+
+def _count_checkout(name):
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        _pool_counters.setdefault(name, {'checkouts': 0})['checkouts'] += 1
+    return on_checkout
+
+def instrument_pools(app, db):
+    """Count checkouts on every configured engine (once per engine)."""
+    with app.app_context():
+        for key, engine in db.engines.items():
+            name = key or 'default'
+            if not getattr(engine.pool, '_mizizzi_instrumented', False):
+                event.listen(engine.pool, 'checkout', _count_checkout(name))
+                engine.pool._mizizzi_instrumented = True
+
+def pool_stats(db):
+    """Per-bind pool usage: size, connections in use and idle, overflow, checkouts and replica lag."""
+    stats = {}
+    for key, engine in db.engines.items():
+        name = key or 'default'
+        pool = engine.pool
+        entry = {'pool': type(pool).__name__}
+        for field, method in (('size', 'size'), ('checked_out', 'checkedout'),
+                              ('checked_in', 'checkedin'), ('overflow', 'overflow')):
+            func = getattr(pool, method, None)
+            if callable(func):
+                try:
+                    entry[field] = func()
+                except Exception:
+                    pass
+        entry['checkouts'] = _pool_counters.get(name, {}).get('checkouts', 0)
+        if name.startswith(REPLICA_PREFIX):
+            entry['lag_seconds'] = _replicas.status().get(name)
+        stats[name] = entry
+    return stats
@@ -10,22 +10,25 @@ from flask_caching import Cache
 from flask_cors import CORS
 from flask_migrate import Migrate
 from flask_limiter import Limiter
-from flask_limiter.util import get_remote_address
 from flask import request
 import logging
 
+from .database import WorkloadSession
+from .rate_limiting import client_address
+
 # Setup logger
 logger = logging.getLogger(__name__)
 
 # Initialize extensions
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': WorkloadSession})
 ma = Marshmallow()
 jwt = JWTManager()
 mail = Mail()
 cache = Cache()
 cors = CORS()
 migrate = Migrate()
-limiter = Limiter(key_func=get_remote_address)
+# Storage, strategy and limits come from the app's RATELIMIT_* settings
+limiter = Limiter(key_func=client_address)
 
 def init_extensions(app):
     """Initialize all Flask extensions."""
@@ -85,12 +88,7 @@ def init_extensions(app):
     # Migrations
     migrate.init_app(app, db)
 
-    # Rate limiting
-    limiter_config = {
-        'default_limits': app.config.get('RATE_LIMIT_DEFAULT', ["200 per day", "50 per hour"]),
-        'storage_uri': app.config.get('RATE_LIMIT_STORAGE_URL', None),
-        'strategy': app.config.get('RATE_LIMIT_STRATEGY', 'fixed-window')
-    }
+    # Rate limiting (RATELIMIT_STORAGE_URI, RATELIMIT_STRATEGY, ... in the app config)
     limiter.init_app(app)
 
     logger.info("All extensions initialized successfully")
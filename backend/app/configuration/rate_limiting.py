@@ -0,0 +1,229 @@
+"""
+Rate limiting for Mizizzi E-commerce platform.
+
+Counters live in RATELIMIT_STORAGE_URI, which defaults to Redis whenever
+REDIS_URL is set, so every gunicorn worker and host shares one budget per
+client. Without Redis they fall back to per-process memory (``memory://``),
+which is only right for a single process. If Redis becomes unreachable the
+limiter keeps enforcing limits from process memory rather than failing
+requests.
+
+The default strategy is ``moving-window``. It keeps one timestamp per hit
+and checks the last window's worth of them, so a client cannot double its
+budget across a window boundary the way it can with fixed windows. On Redis
+each check is a single scripted round trip per limit. The timestamps cost
+memory proportional to the limit, which is small for the profiles below.
+
+Per-blueprint profiles (RATE_LIMIT_PROFILES) cover payments, auth and
+search. See ``BLUEPRINT_PROFILES`` for the blueprints and endpoints each one
+applies to. Provider callbacks and health checks are never limited.
+
+Hot path:
+
+- Preflights, health checks and /metrics skip the limiter entirely.
+- Rate-limit headers stay off (RATELIMIT_HEADERS_ENABLED), because they cost
+  an extra storage read per request.
+- A client this worker has just refused is refused again locally, with no
+  storage round trip, until its window resets (at most
+  RATE_LIMIT_LOCAL_BLOCK_SECONDS). Floods from one abuser do not become
+  Redis load. The local check only runs while something is blocked.
+"""
+import logging
+import threading
+import time
+import weakref
+
+from flask import current_app, jsonify, request
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LOCAL_BLOCK_SECONDS = 10
+MAX_LOCAL_BLOCKS = 10000
+
+# Requests that never count against any limit
+EXEMPT_ENDPOINTS = frozenset([
+    'static',
+    'health_check',
+    'metrics',
+    'mpesa_routes.mpesa_callback',
+    'mpesa_routes.health_check',
+    'pesapal_routes.pesapal_callback',
+    'pesapal_routes.health_check',
+])
+
+# profile -> (blueprints, endpoints limited within them or None for all, key function name)
+BLUEPRINT_PROFILES = {
+    'payments': (('payment_routes', 'mpesa_routes', 'pesapal_routes'), None, 'user_or_address'),
+    'auth': (('validation_routes',), frozenset([
+        'validation_routes.login',
+        'validation_routes.google_login',
+        'validation_routes.register',
+        'validation_routes.verify_code',
+        'validation_routes.resend_verification',
+        'validation_routes.forgot_password',
+        'validation_routes.reset_password',
+    ]), 'client_address'),
+    'search': (('user_search_routes',), None, 'client_address'),
+}
+
+def client_address():
+    """
+    The client's IP address.
+
+    Behind RATE_LIMIT_TRUSTED_PROXIES proxies (load balancer, Fly edge) the
+    address is taken from X-Forwarded-For, counting that many hops from the
+    right; otherwise every client would share the proxy's budget.
+    """
+    hops = current_app.config.get('RATE_LIMIT_TRUSTED_PROXIES', 0)
+    if hops:
+        forwarded = [part.strip() for part in request.headers.get('X-Forwarded-For', '').split(',') if part.strip()]
+        if len(forwarded) >= hops:
+            return forwarded[-hops]
+    return request.remote_addr or '127.0.0.1'
+
+def user_or_address():
+    """``user:<id>`` for a request with a valid access token, else the client address."""
+    if request.headers.get('Authorization'):
+        try:
+            from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+            verify_jwt_in_request(optional=True)
+            identity = get_jwt_identity()
+            if identity:
+                return f"user:{identity}"
+        except Exception:
+            pass  # invalid or expired token: limit by address; the view rejects the token itself
+    return client_address()
+
+KEY_FUNCTIONS = {
+    'client_address': client_address,
+    'user_or_address': user_or_address,
+}
+
+def is_exempt():
+    """Requests the limiter should not even look at."""
+    return request.method == 'OPTIONS' or request.endpoint in EXEMPT_ENDPOINTS
+
+# --------------------------------------------------------------------------
+# Local block list
+# --------------------------------------------------------------------------
+class LocalBlocks:
+    """Clients this worker refused recently, keyed by (identity, endpoint)."""
+
+    def __init__(self, max_entries=MAX_LOCAL_BLOCKS):
+        self.max_entries = max_entries
+        self._blocked = {}
+        self._lock = threading.Lock()
+
+    def __bool__(self):
+        return bool(self._blocked)
+
+    def block(self, key, seconds):
+        until = time.monotonic() + seconds
+        with self._lock:
+            if len(self._blocked) >= self.max_entries:
+                self._prune()
+            if len(self._blocked) < self.max_entries:
+                self._blocked[key] = until
+
+    def remaining(self, key):
+        """Seconds ``key`` stays blocked, or 0."""
+        until = self._blocked.get(key)
+        if until is None:
+            return 0
+        left = until - time.monotonic()
+        if left <= 0:
+            with self._lock:
+                if self._blocked.get(key) == until:
+                    del self._blocked[key]
+            return 0
+        return left
+
+    def _prune(self):
+        now = time.monotonic()
+        for key in [key for key, until in self._blocked.items() if until <= now]:
+            del self._blocked[key]
+
+    def clear(self):
+        with self._lock:
+            self._blocked.clear()
+
+def _block_key():
+    return (user_or_address(), request.endpoint)
+
+def _check_local_block(blocks):
+    if not blocks or is_exempt():
+        return None
+    remaining = blocks.remaining(_block_key())
+    if not remaining:
+        return None
+    response = jsonify({"error": "Rate limit exceeded", "message": "Too many requests, retry later"})
+    response.status_code = 429
+    response.headers['Retry-After'] = str(int(remaining) + 1)
+    return response
+
+def _remember_block(limiter, blocks, max_seconds, response):
+    if response.status_code != 429 or is_exempt():
+        return response
+    try:
+        # Only refusals by the limiter itself, not 429s produced by views
+        current = limiter.current_limit
+        if current is None or not current.breached:
+            return response
+        seconds = min(max_seconds, max(current.reset_at - time.time(), 0))
+    except Exception:
+        return response
+    if seconds > 0:
+        blocks.block(_block_key(), seconds)
+    return response
+
+# --------------------------------------------------------------------------
+# Setup
+# --------------------------------------------------------------------------
+# Per limiter: the (blueprint, profile, limit) already attached, and whether is_exempt is installed
+_applied_profiles = weakref.WeakKeyDictionary()
+
+def apply_profiles(app, limiter, profiles):
+    """
+    Attach each configured profile's limit to its registered blueprints.
+
+    The limiter keeps blueprint limits for the life of the process, so a
+    profile is only attached once per (blueprint, limit).
+    """
+    applied = _applied_profiles.setdefault(limiter, set())
+    for profile, limit in (profiles or {}).items():
+        if not limit or profile not in BLUEPRINT_PROFILES:
+            continue
+        blueprint_names, endpoints, key_name = BLUEPRINT_PROFILES[profile]
+
+        def exempt_when(endpoints=endpoints):
+            return endpoints is not None and request.endpoint not in endpoints
+
+        for blueprint_name in blueprint_names:
+            blueprint = app.blueprints.get(blueprint_name)
+            marker = (blueprint_name, profile, limit)
+            if blueprint is None or marker in applied:
+                continue
+            limiter.limit(limit, key_func=KEY_FUNCTIONS[key_name], exempt_when=exempt_when)(blueprint)
+            applied.add(marker)
+
+def init_rate_limiting(app, limiter):
+    """
+    Attach the blueprint profiles and the cheap pre-checks to an initialized
+    limiter; call after the blueprints are registered.
+    """
+    if limiter not in _applied_profiles:
+        limiter.request_filter(is_exempt)
+
+    apply_profiles(app, limiter, app.config.get('RATE_LIMIT_PROFILES'))
+
+    blocks = LocalBlocks()
+    max_seconds = app.config.get('RATE_LIMIT_LOCAL_BLOCK_SECONDS', DEFAULT_LOCAL_BLOCK_SECONDS)
+    if max_seconds > 0:
+        # Ahead of the limiter's own before_request hook, so refused clients never reach storage
+        app.before_request_funcs.setdefault(None, []).insert(0, lambda: _check_local_block(blocks))
+        app.after_request(lambda response: _remember_block(limiter, blocks, max_seconds, response))
+
+    app.extensions['rate_limit_blocks'] = blocks
+    logger.info(f"Rate limiting on {app.config.get('RATELIMIT_STORAGE_URI', 'memory://').split('@')[-1]} "
+                f"({app.config.get('RATELIMIT_STRATEGY', 'fixed-window')})")
+    return blocks
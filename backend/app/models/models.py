@@ -4,7 +4,7 @@ Updated Model Classes for Mizizzi E-Commerce Backend with Guest Cart Support and
 from ..configuration.extensions import db
 from werkzeug.security import generate_password_hash, check_password_hash
 from sqlalchemy.sql import func
-from sqlalchemy import Enum as SQLEnum, Text, LargeBinary
+from sqlalchemy import Enum as SQLEnum, Text, LargeBinary, literal_column
 import enum
 from datetime import datetime, timezone, UTC
 import datetime as dt  # Import datetime module as dt to avoid confusion
@@ -58,7 +58,7 @@ class TokenBlacklist(db.Model):
     jti = db.Column(db.String(36), nullable=False, unique=True, index=True)
     token_type = db.Column(db.String(10), nullable=False)  # 'access' or 'refresh'
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    revoked_at = db.Column(db.DateTime, default=lambda: datetime.now(UTC))
+    revoked_at = db.Column(db.DateTime, default=lambda: datetime.now(UTC), index=True)
     expires_at = db.Column(db.DateTime, nullable=False)
     reason = db.Column(db.String(100))  # 'logout', 'password_change', 'security'
 
@@ -70,7 +70,8 @@ class AdminActivityLog(db.Model):
     __tablename__ = 'admin_activity_logs'
 
     id = db.Column(db.Integer, primary_key=True)
-    admin_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    # NULL for events without a known admin, e.g. a login for an unknown account
+    admin_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
     action = db.Column(db.String(100), nullable=False)
     details = db.Column(db.Text)
     ip_address = db.Column(db.String(45))  # IPv6 support
@@ -83,6 +84,11 @@ class AdminActivityLog(db.Model):
     # Relationship
     admin = db.relationship('User', backref=db.backref('activity_logs', lazy=True))
 
+    # Backs /activity-logs filtered by admin, newest first
+    __table_args__ = (
+        db.Index('ix_admin_activity_logs_admin_id_created_at', 'admin_id', 'created_at'),
+    )
+
     def __repr__(self):
         return f'<AdminActivityLog {self.admin_id}: {self.action}>'
 
@@ -152,8 +158,8 @@ class User(db.Model):
     address = db.Column(db.JSON)
     avatar_url = db.Column(db.String(255))
     is_active = db.Column(db.Boolean, default=True)
-    created_at = db.Column(db.DateTime, default=func.now())
-    last_login = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime, default=func.now(), index=True)
+    last_login = db.Column(db.DateTime, index=True)
 
     # Add verification fields
     email_verified = db.Column(db.Boolean, default=False)
@@ -352,7 +358,7 @@ class Cart(db.Model):
     notes = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=func.now())
     updated_at = db.Column(db.DateTime, default=func.now(), onupdate=func.now())
-    last_activity = db.Column(db.DateTime, default=func.now(), onupdate=func.now())
+    last_activity = db.Column(db.DateTime, default=func.now(), onupdate=func.now(), index=True)
     expires_at = db.Column(db.DateTime, nullable=True)  # Add this line for cart expiration
 
     # Relationships
@@ -493,37 +499,28 @@ class Cart(db.Model):
         user_cart = Cart.query.filter_by(user_id=user_id, is_active=True).first()
 
         if not user_cart:
-            # Create new cart for user
+            # Create new cart for user; flushed only, the whole merge commits once
             user_cart = Cart(user_id=user_id, is_active=True)
             db.session.add(user_cart)
-            db.session.commit()
-
-        # Get all items from guest cart
-        guest_items = CartItem.query.filter_by(cart_id=self.id).all()
-
-        # Transfer items to user cart
-        for guest_item in guest_items:
-            # Check if item already exists in user cart
-            existing_item = CartItem.query.filter_by(
-                cart_id=user_cart.id,
-                product_id=guest_item.product_id,
-                variant_id=guest_item.variant_id
-            ).first()
-
-            if existing_item:
-                # Update quantity
-                existing_item.quantity += guest_item.quantity
-            else:
-                # Create new cart item
-                new_item = CartItem(
-                    cart_id=user_cart.id,
-                    user_id=user_id,
-                    product_id=guest_item.product_id,
-                    variant_id=guest_item.variant_id,
-                    quantity=guest_item.quantity,
-                    price=guest_item.price
-                )
-                db.session.add(new_item)
+            db.session.flush()
+
+        # Collapse guest lines per product/variant so the upsert touches each target row once
+        guest_lines = db.session.query(
+            CartItem.product_id,
+            CartItem.variant_id,
+            func.sum(CartItem.quantity),
+            func.max(CartItem.price)
+        ).filter(
+            CartItem.cart_id == self.id
+        ).group_by(CartItem.product_id, CartItem.variant_id).all()
+
+        # Transfer items to user cart in a single INSERT ... ON CONFLICT DO UPDATE
+        upsert_cart_items(user_cart.id, user_id, [{
+            'product_id': product_id,
+            'variant_id': variant_id,
+            'quantity': int(quantity),
+            'price': price
+        } for product_id, variant_id, quantity, price in guest_lines])
 
         # Transfer other cart properties
         if self.coupon_code and not user_cart.coupon_code:
@@ -533,7 +530,7 @@ class Cart(db.Model):
             user_cart.shipping_method_id = self.shipping_method_id
 
         if self.payment_method_id and not user_cart.payment_method_id:
-            user_cart.payment_method_id = self.shipping_method_id
+            user_cart.payment_method_id = self.payment_method_id
 
         if self.notes and not user_cart.notes:
             user_cart.notes = self.notes
@@ -585,6 +582,58 @@ class CartItem(db.Model):
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
 
+# One row per product/variant in a cart; NULL variants are folded to 0 so they conflict too
+cart_item_line_index = db.Index(
+    'uq_cart_items_cart_product_variant',
+    CartItem.cart_id,
+    CartItem.product_id,
+    func.coalesce(CartItem.variant_id, literal_column('0')),
+    unique=True
+)
+
+def upsert_cart_items(cart_id, user_id, lines):
+    """
+    Add quantities to a cart with one INSERT ... ON CONFLICT DO UPDATE.
+
+    Each line is a dict with product_id, variant_id, quantity and price. Lines
+    already in the cart get their quantity increased, new lines are inserted.
+    Does not commit. Falls back to per-line upserts on dialects without
+    ON CONFLICT support.
+    """
+    if not lines:
+        return
+
+    values = [dict(line, cart_id=cart_id, user_id=user_id) for line in lines]
+    dialect = db.session.get_bind().dialect.name
+
+    if dialect in ('postgresql', 'sqlite'):
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+
+        stmt = dialect_insert(CartItem).values(values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[CartItem.cart_id, CartItem.product_id, func.coalesce(CartItem.variant_id, literal_column('0'))],
+            set_={
+                'quantity': CartItem.quantity + stmt.excluded.quantity,
+                'updated_at': func.now()
+            }
+        )
+        db.session.execute(stmt)
+        return
+
+    for value in values:
+        existing_item = CartItem.query.filter_by(
+            cart_id=cart_id,
+            product_id=value['product_id'],
+            variant_id=value['variant_id']
+        ).first()
+        if existing_item:
+            existing_item.quantity += value['quantity']
+        else:
+            db.session.add(CartItem(**value))
+
 # ----------------------
 # Category Model
 # ----------------------
@@ -1037,6 +1086,9 @@ class Brand(db.Model):
 # ----------------------
 # Order Model (Enhanced with archive support)
 # ----------------------
+# Source of order numbers on databases with sequences (see services/order_numbers.py)
+order_number_seq = db.Sequence('order_number_seq', metadata=db.metadata)
+
 class Order(db.Model):
     __tablename__ = 'orders'
 
@@ -1058,7 +1110,7 @@ class Order(db.Model):
     is_archived = db.Column(db.Boolean, default=False)
     archived_at = db.Column(db.DateTime, nullable=True)
 
-    created_at = db.Column(db.DateTime, default=func.now())
+    created_at = db.Column(db.DateTime, default=func.now(), index=True)
     updated_at = db.Column(db.DateTime, default=func.now(), onupdate=func.now())
 
     items = db.relationship('OrderItem', backref='order', lazy=True, cascade="all, delete-orphan")
@@ -1705,12 +1757,21 @@ class MpesaTransaction(db.Model):
     callback_response = db.Column(db.JSON)  # Add this field
     transaction_date = db.Column(db.DateTime)  # Add this field
     callback_received_at = db.Column(db.DateTime)  # Add this field
+    # Provider status polling by the reconciliation worker
+    last_status_check = db.Column(db.DateTime)
+    next_status_check_at = db.Column(db.DateTime)
+    status_check_count = db.Column(db.Integer, default=0)
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
     updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
 
     # Relationship
     user = db.relationship('User', backref=db.backref('mpesa_transactions', lazy=True))
 
+    __table_args__ = (
+        db.Index('idx_mpesa_status_next_check', 'status', 'next_status_check_at'),
+        db.Index('idx_mpesa_status_created_at', 'status', 'created_at'),
+    )
+
     def __repr__(self):
         return f'<MpesaTransaction {self.id}: {self.transaction_type} ({self.status})>'
 
@@ -1782,6 +1843,8 @@ class PesapalTransaction(db.Model):
     expires_at = db.Column(db.DateTime)
     cancelled_at = db.Column(db.DateTime)
     last_status_check = db.Column(db.DateTime)
+    next_status_check_at = db.Column(db.DateTime)
+    status_check_count = db.Column(db.Integer, default=0)
 
     # Security and reliability
     idempotency_key = db.Column(db.String(64), unique=True)
@@ -1805,6 +1868,8 @@ class PesapalTransaction(db.Model):
         db.Index('idx_pesapal_merchant_ref', 'merchant_reference'),
         db.Index('idx_pesapal_created_at', 'created_at'),
         db.Index('idx_pesapal_email', 'email'),
+        db.Index('idx_pesapal_status_next_check', 'status', 'next_status_check_at'),
+        db.Index('idx_pesapal_status_created_at', 'status', 'created_at'),
     )
 
     def __repr__(self):
@@ -1835,3 +1900,138 @@ class PesapalTransaction(db.Model):
             'error_message': self.error_message
         }
 
+
+# ----------------------
+# Background Job Model (database broker for services/jobs.py)
+# ----------------------
+class BackgroundJob(db.Model):
+    """Queued side effect (email, webhook, notification) executed by the job worker."""
+    __tablename__ = 'background_jobs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    payload = db.Column(db.JSON, nullable=False, default=dict)
+    idempotency_key = db.Column(db.String(200), unique=True, nullable=True)
+    status = db.Column(db.String(20), nullable=False, default='pending')  # pending, running, succeeded, dead
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=5)
+    run_at = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(UTC).replace(tzinfo=None))
+    locked_at = db.Column(db.DateTime, nullable=True)
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=func.now())
+    updated_at = db.Column(db.DateTime, default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        db.Index('ix_background_jobs_status_run_at', 'status', 'run_at'),
+    )
+
+    def __repr__(self):
+        return f'<BackgroundJob {self.id}: {self.name} ({self.status})>'
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'payload': self.payload,
+            'idempotency_key': self.idempotency_key,
+            'status': self.status,
+            'attempts': self.attempts,
+            'max_attempts': self.max_attempts,
+            'run_at': self.run_at.isoformat() if self.run_at else None,
+            'last_error': self.last_error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+class OAuthToken(db.Model):
+    """Provider access token shared by every worker, with a lease so only one refreshes it."""
+    __tablename__ = 'oauth_tokens'
+
+    name = db.Column(db.String(100), primary_key=True)
+    token = db.Column(db.Text, nullable=True)
+    expires_at = db.Column(db.DateTime, nullable=True)
+    lease_owner = db.Column(db.String(200), nullable=True)
+    lease_expires_at = db.Column(db.DateTime, nullable=True)
+    updated_at = db.Column(db.DateTime, default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f'<OAuthToken {self.name}>'
+
+class PaymentCallback(db.Model):
+    """Provider callback persisted on receipt and applied once by the job worker."""
+    __tablename__ = 'payment_callbacks'
+
+    id = db.Column(db.Integer, primary_key=True)
+    provider = db.Column(db.String(20), nullable=False)  # mpesa, pesapal
+    reference = db.Column(db.String(100), nullable=False)  # CheckoutRequestID / OrderTrackingId
+    transaction_id = db.Column(db.String(36), nullable=True)
+    payload = db.Column(db.JSON, nullable=False, default=dict)
+    status = db.Column(db.String(20), nullable=False, default='received')  # received, processed
+    deliveries = db.Column(db.Integer, nullable=False, default=1)
+    result = db.Column(db.String(20))  # transaction status after processing
+    received_at = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(UTC).replace(tzinfo=None))
+    processed_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        db.UniqueConstraint('provider', 'reference', name='uq_payment_callbacks_provider_reference'),
+    )
+
+    def __repr__(self):
+        return f'<PaymentCallback {self.provider}:{self.reference} ({self.status})>'
+
+class PaymentDailyStat(db.Model):
+    """Per-day payment aggregates for closed days, used by the payment statistics endpoints."""
+    __tablename__ = 'payment_daily_stats'
+
+    id = db.Column(db.Integer, primary_key=True)
+    provider = db.Column(db.String(20), nullable=False)  # mpesa, pesapal
+    day = db.Column(db.Date, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='')  # '' marks a day without transactions
+    payment_method = db.Column(db.String(50), nullable=False, default='')
+    card_type = db.Column(db.String(50), nullable=False, default='')
+    currency = db.Column(db.String(3), nullable=False, default='')
+    transaction_count = db.Column(db.Integer, nullable=False, default=0)
+    total_amount = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        db.UniqueConstraint('provider', 'day', 'status', 'payment_method', 'card_type', 'currency',
+                            name='uq_payment_daily_stats_dimensions'),
+        db.Index('idx_payment_daily_stats_provider_day', 'provider', 'day'),
+    )
+
+    def __repr__(self):
+        return f'<PaymentDailyStat {self.provider} {self.day} {self.status}: {self.transaction_count}>'
+
+class DashboardMetric(db.Model):
+    """Rolled-up dashboard totals for one hour or day bucket, see app.services.dashboard_metrics."""
+    __tablename__ = 'dashboard_metrics'
+
+    id = db.Column(db.Integer, primary_key=True)
+    granularity = db.Column(db.String(10), nullable=False)  # hour, day
+    bucket_start = db.Column(db.DateTime, nullable=False)
+    metric = db.Column(db.String(30), nullable=False)  # orders, payments, users, category_sales, _bucket
+    dimension = db.Column(db.String(100), nullable=False, default='')
+    count = db.Column(db.Integer, nullable=False, default=0)
+    amount = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        db.UniqueConstraint('granularity', 'bucket_start', 'metric', 'dimension',
+                            name='uq_dashboard_metrics_bucket_metric'),
+        db.Index('idx_dashboard_metrics_granularity_bucket', 'granularity', 'bucket_start'),
+    )
+
+    def __repr__(self):
+        return f'<DashboardMetric {self.granularity} {self.bucket_start} {self.metric}:{self.dimension}>'
+
+class DashboardMetricChange(db.Model):
+    """Append-only log of rolled-up hours whose source rows changed; the buckets are rebuilt on read."""
+    __tablename__ = 'dashboard_metric_changes'
+
+    id = db.Column(db.Integer, primary_key=True)
+    bucket_start = db.Column(db.DateTime, nullable=False)  # start of the affected hour
+    recorded_at = db.Column(db.DateTime, default=func.now())
+
+    def __repr__(self):
+        return f'<DashboardMetricChange {self.bucket_start}>'
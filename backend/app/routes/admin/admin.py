@@ -36,6 +36,11 @@ try:
         PaymentMethod, ShippingZone, Promotion
     )
     from app.configuration.extensions import db, cache
+    from app.utils.auth_utils import current_principal
+    from app.services.exports import (
+        ExportSpec, export_file_path, export_options, export_response, exporter, is_expired,
+        iter_query, read_manifest, render_csv, start_export, wants_stream
+    )
     from app.schemas.schemas import (
         user_schema, users_schema, category_schema, categories_schema,
         product_schema, products_schema, brand_schema, brands_schema,
@@ -88,35 +93,28 @@ def admin_required(f):
                 }), 401
 
             if User and hasattr(User, 'query'):
-                user = User.query.get(current_user_id)
-                if not user:
+                # Resolved once per request, usually from the principal cache
+                principal = current_principal()
+                if not principal:
                     return jsonify({
                         'error': 'User not found',
                         'code': 'USER_NOT_FOUND'
                     }), 404
 
-                if hasattr(user, 'is_active') and not user.is_active:
+                if not principal.is_active:
                     return jsonify({"error": "Account is deactivated"}), 401
 
-                if hasattr(user, 'role'):
-                    is_admin = False
-                    if hasattr(user.role, 'value'):
-                        is_admin = user.role.value.lower() == 'admin'
-                    elif isinstance(user.role, str):
-                        is_admin = user.role.lower() == 'admin'
-                    else:
-                        is_admin = str(user.role).lower() == 'admin'
-
-                    if not is_admin:
-                        return jsonify({
-                            'error': 'Admin access required',
-                            'code': 'ADMIN_REQUIRED'
-                        }), 403
-                else:
+                if not principal.role:
                     return jsonify({
                         'error': 'User role not defined',
                         'code': 'ROLE_NOT_DEFINED'
                     }), 500
+
+                if not principal.is_admin:
+                    return jsonify({
+                        'error': 'Admin access required',
+                        'code': 'ADMIN_REQUIRED'
+                    }), 403
             else:
                 return jsonify({
                     'error': 'User model not available',
@@ -1239,60 +1237,94 @@ def newsletter_operations(newsletter_id):
         current_app.logger.error(f"Error in newsletter operation {newsletter_id}: {str(e)}")
         return jsonify({"error": "Failed to perform newsletter operation", "details": str(e)}), 500
 
+NEWSLETTER_EXPORT_COLUMNS = [
+    ('Email', 'email'), ('Name', 'name'), ('Status', 'status'), ('Subscribed On', 'subscribed_on')
+]
+
+@exporter('newsletters')
+def newsletters_export_spec(params):
+    """Newsletter subscribers by email; ``is_active`` filters on the subscription flag."""
+    query = db.session.query(Newsletter.email, Newsletter.name, Newsletter.is_subscribed, Newsletter.created_at)
+    if params.get('is_active') is not None:
+        query = query.filter(Newsletter.is_subscribed == (params['is_active'].lower() == 'true'))
+
+    def rows():
+        for email, name, is_subscribed, created_at in iter_query(query.order_by(Newsletter.email)):
+            yield {
+                'email': email,
+                'name': name or '',
+                'status': 'Active' if is_subscribed else 'Inactive',
+                'subscribed_on': created_at.strftime('%Y-%m-%d %H:%M:%S') if created_at else ''
+            }
+
+    return ExportSpec(NEWSLETTER_EXPORT_COLUMNS, rows(), f"newsletter_subscribers_{datetime.utcnow().strftime('%Y%m%d')}")
+
 @admin_routes.route('/newsletters/export', methods=['GET', 'OPTIONS'])
 @cross_origin()
 @admin_required
 def export_newsletters():
-    """Export newsletter subscribers to CSV."""
+    """
+    Export newsletter subscribers.
+
+    Returns the CSV inside JSON by default. ``stream=true``, ``format=ndjson``
+    or ``gzip=true`` stream a download instead, and ``async=true`` queues an
+    export job.
+    """
     if request.method == 'OPTIONS':
         return handle_options('GET, OPTIONS')
 
     try:
-        # Get filter parameters
-        is_active = request.args.get('is_active')
+        export_format, compress, run_async = export_options(request.args)
+        if export_format is None:
+            return jsonify({"error": "Unsupported format. Use 'csv' or 'ndjson'"}), 400
 
-        # Build query
-        query = Newsletter.query
+        params = {'is_active': request.args.get('is_active')}
 
-        # Apply filters
-        if is_active is not None:
-            is_active_bool = is_active.lower() == 'true'
-            query = query.filter_by(is_active=is_active_bool)
-
-        # Order by email
-        query = query.order_by(Newsletter.email)
+        if run_async:
+            manifest = start_export('newsletters', params, export_format, compress, requested_by=get_jwt_identity())
+            db.session.commit()
+            return jsonify({
+                "message": "Export queued",
+                "export": manifest,
+                "status_url": f"/api/admin/exports/{manifest['id']}"
+            }), 202
 
-        # Get all subscribers
-        subscribers = query.all()
+        spec = newsletters_export_spec(params)
+        if wants_stream(request.args, export_format, compress):
+            return export_response(spec, export_format, compress)
 
-        # Create CSV in memory
-        output = io.StringIO()
-        writer = csv.writer(output)
+        csv_data, count = render_csv(spec)
+        return jsonify({
+            "message": f"Exported {count} newsletter subscribers",
+            "csv_data": csv_data,
+            "filename": f"{spec.filename}.csv"
+        }), 200
 
-        # Write header
-        writer.writerow(['Email', 'Name', 'Status', 'Subscribed On'])
+    except Exception as e:
+        current_app.logger.error(f"Error exporting newsletter subscribers: {str(e)}")
+        return jsonify({"error": "Failed to export newsletter subscribers", "details": str(e)}), 500
 
-        # Write data
-        for subscriber in subscribers:
-            writer.writerow([
-                subscriber.email,
-                subscriber.name or '',
-                'Active' if subscriber.is_active else 'Inactive',
-                subscriber.created_at.strftime('%Y-%m-%d %H:%M:%S')
-            ])
+@admin_routes.route('/exports/<export_id>', methods=['GET', 'OPTIONS'])
+@cross_origin()
+@admin_required
+def export_status(export_id):
+    """Status of a queued export, or the file itself once it is ready and ``download=true``."""
+    if request.method == 'OPTIONS':
+        return handle_options('GET, OPTIONS')
 
-        # Create response
-        response = jsonify({
-            "message": f"Exported {len(subscribers)} newsletter subscribers",
-            "csv_data": output.getvalue(),
-            "filename": f"newsletter_subscribers_{datetime.utcnow().strftime('%Y%m%d')}.csv"
-        })
+    manifest = read_manifest(export_id)
+    if manifest is None:
+        return jsonify({"error": "Export not found"}), 404
+    if is_expired(manifest):
+        return jsonify({"error": "Export has expired"}), 410
 
-        return response, 200
+    if manifest.get('status') == 'ready' and request.args.get('download', 'false').lower() == 'true':
+        path = export_file_path(manifest)
+        if not os.path.exists(path):
+            return jsonify({"error": "Export file is no longer available"}), 410
+        return send_file(path, as_attachment=True, download_name=manifest['filename'])
 
-    except Exception as e:
-        current_app.logger.error(f"Error exporting newsletter subscribers: {str(e)}")
-        return jsonify({"error": "Failed to export newsletter subscribers", "details": str(e)}), 500
+    return jsonify({"export": manifest}), 200
 
 
 
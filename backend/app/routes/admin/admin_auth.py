@@ -29,7 +29,6 @@ from flask_jwt_extended import (
     jwt_required, get_jwt_identity, get_jwt,
     set_access_cookies, set_refresh_cookies
 )
-from flask_limiter.util import get_remote_address
 
 # Security & Validation
 from werkzeug.security import generate_password_hash, check_password_hash
@@ -38,13 +37,16 @@ from sqlalchemy.exc import IntegrityError
 
 # Database & ORM
 from sqlalchemy import or_, desc, func
+from sqlalchemy.orm import joinedload
 from ...configuration.extensions import db, ma, mail, cache, cors, limiter
+from ...configuration.rate_limiting import client_address, user_or_address
+from ...services.audit_log import record_admin_activity
 
 # JWT
 import jwt
 
 # HTTP Requests
-import requests
+from ...services.http_client import http_client
 
 # Models
 from ...models.models import (
@@ -69,6 +71,10 @@ from ...schemas.schemas import (
 # Validations & Decorators
 from ...validations.validation import admin_required
 
+# Services
+from ...services.revocation_cache import is_revoked, remember_revoked
+from ...utils.auth_utils import current_principal, current_user
+
 # Setup logger
 logger = logging.getLogger(__name__)
 
@@ -113,7 +119,7 @@ def send_admin_email(to, subject, template):
         }
 
         logger.info(f"Sending admin email via Brevo API to {to}")
-        response = requests.post(url, json=payload, headers=headers)
+        response = http_client.post('brevo', url, json=payload, headers=headers)
 
         if response.status_code >= 200 and response.status_code < 300:
             logger.info(f"Admin email sent via Brevo API. Status: {response.status_code}")
@@ -148,7 +154,8 @@ def send_sms_otp(phone_number, otp_code):
             'Body': message
         }
 
-        response = requests.post(
+        response = http_client.post(
+            'sms',
             url,
             data=data,
             auth=(account_sid, auth_token)
@@ -228,37 +235,15 @@ def get_csrf_token(encoded_token=None):
         return str(uuid.uuid4()).replace('-', '') + str(uuid.uuid4()).replace('-', '')
 
 def log_admin_activity(admin_id, action, details=None, status_code=200):
-    """Log admin activities to database for security auditing."""
-    try:
-        activity_log = AdminActivityLog(
-            admin_id=admin_id,
-            action=action,
-            details=details,
-            ip_address=request.remote_addr,
-            user_agent=request.headers.get('User-Agent'),
-            endpoint=request.endpoint,
-            method=request.method,
-            status_code=status_code
-        )
-
-        db.session.add(activity_log)
-        db.session.commit()
-
-        # Also log to file for immediate access
-        log_entry = {
-            'admin_id': admin_id,
-            'action': action,
-            'details': details,
-            'ip_address': request.remote_addr,
-            'user_agent': request.headers.get('User-Agent'),
-            'endpoint': request.endpoint,
-            'method': request.method,
-            'status_code': status_code,
-            'timestamp': datetime.utcnow().isoformat()
-        }
-
-        logger.info(f"ADMIN_ACTIVITY: {json.dumps(log_entry)}")
+    """
+    Queue an admin activity event for the security audit trail.
 
+    Events are written in batches by a background writer on its own
+    connection (services/audit_log.py), so this never commits the request's
+    session and is safe to call on failure paths.
+    """
+    try:
+        record_admin_activity(admin_id, action, details, status_code)
     except Exception as e:
         logger.error(f"Error logging admin activity: {str(e)}")
 
@@ -275,6 +260,7 @@ def blacklist_token(jti, token_type, user_id, expires_at, reason='logout'):
 
         db.session.add(blacklisted_token)
         db.session.commit()
+        remember_revoked(jti, expires_at)
 
         logger.info(f"Token {jti} blacklisted for user {user_id}, reason: {reason}")
         return True
@@ -284,8 +270,11 @@ def blacklist_token(jti, token_type, user_id, expires_at, reason='logout'):
         return False
 
 def is_token_blacklisted(jti):
-    """Check if token is blacklisted."""
+    """Check if token is blacklisted, from the worker's revocation cache when it is loaded."""
     try:
+        revoked = is_revoked(jti)
+        if revoked is not None:
+            return revoked
         blacklisted = TokenBlacklist.query.filter_by(jti=jti).first()
         return blacklisted is not None
     except Exception as e:
@@ -327,19 +316,19 @@ def enhanced_admin_required(f):
                 log_admin_activity(current_user_id, 'BLACKLISTED_TOKEN_ATTEMPT', f'Attempted to use blacklisted token: {jti}', 401)
                 return jsonify({"error": "Token has been revoked"}), 401
 
-            # Check if user exists and is admin
-            user = db.session.get(User, current_user_id)
+            # Check if user exists and is admin; the principal usually comes from cache
+            principal = current_principal()
 
-            if not user:
+            if not principal:
                 log_admin_activity(current_user_id, 'UNAUTHORIZED_ACCESS_ATTEMPT', 'User not found', 404)
                 return jsonify({"error": "User not found"}), 404
 
-            if not user.is_active:
+            if not principal.is_active:
                 log_admin_activity(current_user_id, 'UNAUTHORIZED_ACCESS_ATTEMPT', 'Inactive user', 403)
                 return jsonify({"error": "Account is deactivated"}), 403
 
-            if user.role != UserRole.ADMIN:
-                log_admin_activity(current_user_id, 'UNAUTHORIZED_ACCESS_ATTEMPT', f'Non-admin user with role: {user.role}', 403)
+            if not principal.is_admin:
+                log_admin_activity(current_user_id, 'UNAUTHORIZED_ACCESS_ATTEMPT', f'Non-admin user with role: {principal.role}', 403)
                 return jsonify({"error": "Admin access required"}), 403
 
             # Check if role in JWT matches database role
@@ -347,8 +336,10 @@ def enhanced_admin_required(f):
                 log_admin_activity(current_user_id, 'UNAUTHORIZED_ACCESS_ATTEMPT', 'JWT role mismatch', 403)
                 return jsonify({"error": "Invalid admin token"}), 403
 
-            # Store admin user in g for use in the route
-            g.current_admin = user
+            # Store admin user in g for use in the route (loaded once per request)
+            g.current_admin = current_user()
+            if g.current_admin is None:
+                return jsonify({"error": "User not found"}), 404
 
             return f(*args, **kwargs)
 
@@ -396,12 +387,15 @@ def mfa_required(f):
 # ----------------------
 
 def get_admin_rate_limit_key():
-    """Generate rate limit key based on IP and user ID if available."""
-    try:
-        user_id = get_jwt_identity() if request.headers.get('Authorization') else None
-        return f"{request.remote_addr}:{user_id}" if user_id else request.remote_addr
-    except:
-        return request.remote_addr
+    """
+    Rate limit key: the admin's user ID when the request carries a valid token,
+    else the client address.
+
+    Limits are checked before the view's @jwt_required runs, so the token is
+    verified here rather than read with get_jwt_identity alone (which always
+    failed at this point and fell back to the proxy's address).
+    """
+    return user_or_address()
 
 # ----------------------
 # Admin Authentication Routes
@@ -427,7 +421,7 @@ def get_admin_csrf():
 
 @admin_auth_routes.route('/login', methods=['POST', 'OPTIONS'])
 @cross_origin()
-@limiter.limit("5 per minute", key_func=get_remote_address)  # Rate limiting
+@limiter.limit("5 per minute", key_func=client_address)  # Rate limiting
 def admin_login():
     """Secure admin login route - only allows users with admin role."""
     if request.method == 'OPTIONS':
@@ -931,7 +925,7 @@ def admin_logout():
         return jsonify({'error': 'An error occurred during admin logout'}), 500
 
 @admin_auth_routes.route('/forgot-password', methods=['POST'])
-@limiter.limit("3 per hour", key_func=get_remote_address)  # Rate limiting
+@limiter.limit("3 per hour", key_func=client_address)  # Rate limiting
 def admin_forgot_password():
     """Admin password reset request."""
     try:
@@ -1039,7 +1033,7 @@ def admin_forgot_password():
         return jsonify({'error': 'An error occurred during password reset request'}), 500
 
 @admin_auth_routes.route('/reset-password', methods=['POST'])
-@limiter.limit("3 per hour", key_func=get_remote_address)  # Rate limiting
+@limiter.limit("3 per hour", key_func=client_address)  # Rate limiting
 def admin_reset_password():
     """Admin password reset with enhanced validation."""
     try:
@@ -1842,8 +1836,8 @@ def get_activity_logs():
         start_date = request.args.get('start_date', None)
         end_date = request.args.get('end_date', None)
 
-        # Build query
-        query = AdminActivityLog.query
+        # Build query; admins are loaded with the page rather than one query per row
+        query = AdminActivityLog.query.options(joinedload(AdminActivityLog.admin))
 
         # Apply filters
         if admin_id_filter:
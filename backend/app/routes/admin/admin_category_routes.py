@@ -18,6 +18,7 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 # Database & ORM
 from sqlalchemy import or_, desc, func, and_, text
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import aliased
 
 # Extensions
 from ...configuration.extensions import db, ma
@@ -31,6 +32,11 @@ from ...schemas.schemas import category_schema, categories_schema
 # Validations & Decorators
 from ...validations.validation import admin_required
 
+# Services
+from ...services.exports import (
+    ExportSpec, export_options, export_response, exporter, iter_query, render_csv, start_export, wants_stream
+)
+
 # Setup logger
 logger = logging.getLogger(__name__)
 
@@ -656,60 +662,81 @@ def reorder_categories():
             "details": str(e) if current_app.debug else "Internal server error"
         }), 500
 
+CATEGORY_EXPORT_COLUMNS = [
+    ('ID', 'id'), ('Name', 'name'), ('Slug', 'slug'), ('Description', 'description'),
+    ('Parent ID', 'parent_id'), ('Parent Name', 'parent_name'), ('Is Featured', 'is_featured'),
+    ('Products Count', 'products_count'), ('Created At', 'created_at'), ('Updated At', 'updated_at')
+]
+
+@exporter('categories')
+def categories_export_spec(params):
+    """All categories with their parent name and product count, by name."""
+    parent = aliased(Category)
+    products_count = db.session.query(func.count(Product.id)).filter(
+        Product.category_id == Category.id
+    ).correlate(Category).scalar_subquery()
+
+    # Columns rather than entities: Category eagerly joins its subcategories
+    query = db.session.query(
+        Category.id, Category.name, Category.slug, Category.description, Category.parent_id,
+        parent.name, Category.is_featured, products_count, Category.created_at, Category.updated_at
+    ).outerjoin(parent, parent.id == Category.parent_id).order_by(Category.name)
+
+    def rows():
+        for row in iter_query(query):
+            yield {
+                'id': row[0],
+                'name': row[1],
+                'slug': row[2],
+                'description': row[3] or "",
+                'parent_id': row[4] or "",
+                'parent_name': row[5] or "",
+                'is_featured': row[6],
+                'products_count': row[7] or 0,
+                'created_at': row[8].strftime('%Y-%m-%d %H:%M:%S') if row[8] else "",
+                'updated_at': row[9].strftime('%Y-%m-%d %H:%M:%S') if row[9] else ""
+            }
+
+    return ExportSpec(CATEGORY_EXPORT_COLUMNS, rows(), f"categories_export_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}")
+
 @admin_category_routes.route('/export', methods=['GET', 'OPTIONS'])
 @cross_origin()
 @jwt_required()
 @admin_required
 def export_categories():
-    """Export categories to CSV (Admin only)."""
+    """
+    Export categories (Admin only).
+
+    Returns the CSV inside JSON by default. ``stream=true``, ``format=ndjson``
+    or ``gzip=true`` stream a download instead, and ``async=true`` queues an
+    export job.
+    """
     if request.method == 'OPTIONS':
         return handle_options_request()
 
     try:
-        import csv
-        import io
-
-        categories = Category.query.order_by(Category.name).all()
-
-        # Create CSV in memory
-        output = io.StringIO()
-        writer = csv.writer(output)
-
-        # Write header
-        writer.writerow([
-            'ID', 'Name', 'Slug', 'Description', 'Parent ID', 'Parent Name',
-            'Is Featured', 'Products Count', 'Created At', 'Updated At'
-        ])
-
-        # Write data
-        for category in categories:
-            parent_name = ""
-            if category.parent_id:
-                parent = Category.query.get(category.parent_id)
-                parent_name = parent.name if parent else ""
-
-            products_count = Product.query.filter_by(category_id=category.id).count()
-
-            writer.writerow([
-                category.id,
-                category.name,
-                category.slug,
-                category.description or "",
-                category.parent_id or "",
-                parent_name,
-                category.is_featured,
-                products_count,
-                category.created_at.strftime('%Y-%m-%d %H:%M:%S') if category.created_at else "",
-                category.updated_at.strftime('%Y-%m-%d %H:%M:%S') if category.updated_at else ""
-            ])
-
-        csv_data = output.getvalue()
-        output.close()
+        export_format, compress, run_async = export_options(request.args)
+        if export_format is None:
+            return jsonify({"error": "Unsupported format. Use 'csv' or 'ndjson'"}), 400
+
+        if run_async:
+            manifest = start_export('categories', {}, export_format, compress, requested_by=get_jwt_identity())
+            db.session.commit()
+            return jsonify({
+                "message": "Export queued",
+                "export": manifest,
+                "status_url": f"/api/admin/exports/{manifest['id']}"
+            }), 202
+
+        spec = categories_export_spec({})
+        if wants_stream(request.args, export_format, compress):
+            return export_response(spec, export_format, compress)
 
+        csv_data, count = render_csv(spec)
         return jsonify({
-            "message": f"Exported {len(categories)} categories",
+            "message": f"Exported {count} categories",
             "csv_data": csv_data,
-            "filename": f"categories_export_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.csv"
+            "filename": f"{spec.filename}.csv"
         }), 200
 
     except Exception as e:
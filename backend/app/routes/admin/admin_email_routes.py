@@ -6,7 +6,7 @@ Provides API endpoints for sending emails to users from the admin panel.
 from flask import Blueprint, request, jsonify, current_app
 from app.validations.validation import admin_required
 from app.models.models import User, db
-import requests
+from app.services.http_client import http_client
 from datetime import datetime
 import logging
 
@@ -56,7 +56,7 @@ def send_email_brevo(to, subject, html_content):
         }
 
         logger.info(f"Sending email via Brevo API to {to}")
-        response = requests.post(url, json=payload, headers=headers)
+        response = http_client.post('brevo', url, json=payload, headers=headers)
 
         if response.status_code >= 200 and response.status_code < 300:
             logger.info(f"Email sent via Brevo API. Status: {response.status_code}")
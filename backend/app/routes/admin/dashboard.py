@@ -5,14 +5,19 @@ Provides comprehensive dashboard analytics and metrics with real database data.
 
 from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity # type: ignore
-from sqlalchemy import func, desc, and_, or_, text, case, extract, distinct
+from sqlalchemy import func, desc, and_, or_, text, case, extract, distinct, literal
 from datetime import datetime, timedelta
 from flask_cors import cross_origin # type: ignore
 import logging
 import json
 
-# Create dashboard blueprint
+# Create dashboard blueprint; its queries run on the analytics pool
 dashboard_routes = Blueprint('dashboard_routes', __name__)
+try:
+    from ...configuration.database import ANALYTICS, workload_blueprint
+    workload_blueprint(dashboard_routes, ANALYTICS)
+except ImportError:
+    pass
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -26,7 +31,9 @@ try:
         ProductVariant, ProductImage, Address, ShippingMethod,
         PaymentMethod, Promotion, PaymentTransaction
     )
-    from ...configuration.extensions import db
+    from ...configuration.extensions import db, cache
+    from ...services.dashboard_metrics import period_totals, daily_totals, metric_sum
+    from ...utils.auth_utils import current_principal
     print("✅ Dashboard routes: Successfully imported models")
 except ImportError as e:
     print(f"❌ Dashboard routes: Failed to import models: {str(e)}")
@@ -39,7 +46,9 @@ except ImportError as e:
             ProductVariant, ProductImage, Address, ShippingMethod,
             PaymentMethod, Promotion, PaymentTransaction
         )
-        from configuration.extensions import db
+        from configuration.extensions import db, cache
+        from services.dashboard_metrics import period_totals, daily_totals, metric_sum
+        from utils.auth_utils import current_principal
         print("✅ Dashboard routes: Successfully imported models (alternative path)")
     except ImportError as e2:
         print(f"❌ Dashboard routes: Failed to import models (alternative path): {str(e2)}")
@@ -47,7 +56,7 @@ except ImportError as e:
         User = Product = Order = Category = Brand = Review = None
         Newsletter = Cart = WishlistItem = Coupon = Payment = Inventory = None
         OrderStatus = PaymentStatus = UserRole = None
-        db = None
+        db = cache = None
 
 def admin_required(f):
     """Decorator to ensure only admin users can access dashboard routes."""
@@ -65,36 +74,28 @@ def admin_required(f):
                 }), 401
 
             if User and hasattr(User, 'query'):
-                user = User.query.get(current_user_id)
-                if not user:
+                # Resolved once per request, usually from the principal cache
+                principal = current_principal()
+                if not principal:
                     return jsonify({
                         'error': 'User not found',
                         'code': 'USER_NOT_FOUND'
                     }), 404
 
-                if hasattr(user, 'is_active') and not user.is_active:
+                if not principal.is_active:
                     return jsonify({"error": "Account is deactivated"}), 401
 
-                # Check if user is admin
-                is_admin = False
-                if hasattr(user, 'role'):
-                    if hasattr(user.role, 'value'):
-                        is_admin = user.role.value.lower() == 'admin'
-                    elif isinstance(user.role, str):
-                        is_admin = user.role.lower() == 'admin'
-                    else:
-                        is_admin = str(user.role).lower() == 'admin'
-
-                    if not is_admin:
-                        return jsonify({
-                            'error': 'Admin access required',
-                            'code': 'ADMIN_REQUIRED'
-                        }), 403
-                else:
+                if not principal.role:
                     return jsonify({
                         'error': 'User role not defined',
                         'code': 'ROLE_NOT_DEFINED'
                     }), 500
+
+                if not principal.is_admin:
+                    return jsonify({
+                        'error': 'Admin access required',
+                        'code': 'ADMIN_REQUIRED'
+                    }), 403
             else:
                 return jsonify({
                     'error': 'User model not available',
@@ -171,6 +172,43 @@ def get_date_range_from_params():
 
     return start_date, end_date
 
+CUSTOMER_SEGMENTS_CACHE_KEY = 'admin_dashboard:customer_segments'
+CUSTOMER_SEGMENTS_CACHE_SECONDS = 300
+
+def customer_segments():
+    """Customers grouped by lifetime order count, with their share and revenue."""
+    per_user = db.session.query(
+        User.id.label('user_id'),
+        func.count(Order.id).label('orders'),
+        func.coalesce(func.sum(Order.total_amount), 0).label('spent')
+    ).outerjoin(
+        Order, Order.user_id == User.id
+    ).group_by(User.id).subquery()
+
+    segment = case(
+        (per_user.c.orders >= 10, 'Premium'),
+        (per_user.c.orders >= 5, 'Regular'),
+        (per_user.c.orders >= 1, 'New'),
+        else_='Inactive'
+    ).label('segment')
+    rows = db.session.query(
+        segment,
+        func.count(per_user.c.user_id).label('customer_count'),
+        func.sum(per_user.c.spent).label('total_revenue')
+    ).group_by(segment).all()
+
+    total_customers = sum(row.customer_count for row in rows)
+    segments = []
+    for segment_name, count, revenue in rows:
+        percentage = (count / total_customers * 100) if total_customers > 0 else 0
+        segments.append({
+            'segment': segment_name,
+            'count': count,
+            'percentage': round(percentage, 1),
+            'revenue': float(revenue or 0)
+        })
+    return segments
+
 # ----------------------
 # Dashboard Main Route
 # ----------------------
@@ -217,100 +255,85 @@ def dashboard_overview():
         # ----------------------
         # Basic Counts
         # ----------------------
+        now = datetime.utcnow()
+        today_start = datetime.combine(now.date(), datetime.min.time())
+
         if db and User:
             try:
-                # User counts
-                dashboard_data['counts']['users'] = safe_query_count(lambda: User.query.count())
-                dashboard_data['counts']['verified_customers'] = safe_query_count(
-                    lambda: User.query.filter_by(email_verified=True).count()
-                )
-                dashboard_data['counts']['unverified_customers'] = safe_query_count(
-                    lambda: User.query.filter_by(email_verified=False).count()
-                )
-                dashboard_data['counts']['premium_customers'] = safe_query_count(
-                    lambda: User.query.filter_by(role=UserRole.USER).count() if UserRole else 0
-                )
-
-                # Active sessions (users who logged in today)
-                today = datetime.utcnow().date()
-                dashboard_data['counts']['active_sessions'] = safe_query_count(
-                    lambda: User.query.filter(func.date(User.last_login) == today).count()
-                )
+                # User counts in a single pass over users
+                users, verified, unverified, customers, active_sessions = db.session.query(
+                    func.count(User.id),
+                    func.count(case((User.email_verified == True, 1))),
+                    func.count(case((User.email_verified == False, 1))),
+                    func.count(case((User.role == UserRole.USER, 1))) if UserRole else literal(0),
+                    # Active sessions (users who logged in today); a range keeps the last_login index usable
+                    func.count(case((User.last_login >= today_start, 1)))
+                ).one()
+                dashboard_data['counts']['users'] = users
+                dashboard_data['counts']['verified_customers'] = verified
+                dashboard_data['counts']['unverified_customers'] = unverified
+                dashboard_data['counts']['premium_customers'] = customers
+                dashboard_data['counts']['active_sessions'] = active_sessions
 
             except Exception as e:
+                db.session.rollback()
                 logger.warning(f"Error getting user counts: {str(e)}")
 
         if db and Product:
             try:
-                # Product counts
-                dashboard_data['counts']['products'] = safe_query_count(lambda: Product.query.count())
-                dashboard_data['counts']['featured_products'] = safe_query_count(
-                    lambda: Product.query.filter_by(is_featured=True).count()
-                )
-                dashboard_data['counts']['new_products'] = safe_query_count(
-                    lambda: Product.query.filter_by(is_new=True).count()
-                )
-                dashboard_data['counts']['sale_products'] = safe_query_count(
-                    lambda: Product.query.filter_by(is_sale=True).count()
-                )
-                dashboard_data['counts']['flash_sale_products'] = safe_query_count(
-                    lambda: Product.query.filter_by(is_flash_sale=True).count()
-                )
-                dashboard_data['counts']['luxury_products'] = safe_query_count(
-                    lambda: Product.query.filter_by(is_luxury_deal=True).count()
-                )
+                # Product counts in a single pass over products
+                (dashboard_data['counts']['products'],
+                 dashboard_data['counts']['featured_products'],
+                 dashboard_data['counts']['new_products'],
+                 dashboard_data['counts']['sale_products'],
+                 dashboard_data['counts']['flash_sale_products'],
+                 dashboard_data['counts']['luxury_products']) = db.session.query(
+                    func.count(Product.id),
+                    func.count(case((Product.is_featured == True, 1))),
+                    func.count(case((Product.is_new == True, 1))),
+                    func.count(case((Product.is_sale == True, 1))),
+                    func.count(case((Product.is_flash_sale == True, 1))),
+                    func.count(case((Product.is_luxury_deal == True, 1)))
+                ).one()
 
                 # Stock counts
                 if Inventory:
-                    dashboard_data['counts']['low_stock_products'] = safe_query_count(
-                        lambda: db.session.query(Inventory).filter(
-                            Inventory.stock_level <= Inventory.low_stock_threshold
-                        ).count()
-                    )
-                    dashboard_data['counts']['out_of_stock_products'] = safe_query_count(
-                        lambda: db.session.query(Inventory).filter(
-                            Inventory.stock_level <= 0
-                        ).count()
-                    )
+                    low_stock, out_of_stock = db.session.query(
+                        func.count(case((Inventory.stock_level <= Inventory.low_stock_threshold, 1))),
+                        func.count(case((Inventory.stock_level <= 0, 1)))
+                    ).one()
                 else:
                     # Fallback to product stock if Inventory model not available
-                    dashboard_data['counts']['low_stock_products'] = safe_query_count(
-                        lambda: Product.query.filter(Product.stock <= 10).count()
-                    )
-                    dashboard_data['counts']['out_of_stock_products'] = safe_query_count(
-                        lambda: Product.query.filter(Product.stock <= 0).count()
-                    )
+                    low_stock, out_of_stock = db.session.query(
+                        func.count(case((Product.stock <= 10, 1))),
+                        func.count(case((Product.stock <= 0, 1)))
+                    ).one()
+                dashboard_data['counts']['low_stock_products'] = low_stock
+                dashboard_data['counts']['out_of_stock_products'] = out_of_stock
 
             except Exception as e:
+                db.session.rollback()
                 logger.warning(f"Error getting product counts: {str(e)}")
 
-        if db and Order:
+        # Order, payment, revenue and category totals come from the dashboard_metrics
+        # rollups (a handful of rows per period) plus a live read of the current hour
+        periods = None
+        if db and Order and OrderStatus:
             try:
-                # Order counts
-                dashboard_data['counts']['orders'] = safe_query_count(lambda: Order.query.count())
-
-                if OrderStatus:
-                    dashboard_data['counts']['pending_orders'] = safe_query_count(
-                        lambda: Order.query.filter_by(status=OrderStatus.PENDING).count()
-                    )
-                    dashboard_data['counts']['processing_orders'] = safe_query_count(
-                        lambda: Order.query.filter_by(status=OrderStatus.PROCESSING).count()
-                    )
-                    dashboard_data['counts']['shipped_orders'] = safe_query_count(
-                        lambda: Order.query.filter_by(status=OrderStatus.SHIPPED).count()
-                    )
-                    dashboard_data['counts']['delivered_orders'] = safe_query_count(
-                        lambda: Order.query.filter_by(status=OrderStatus.DELIVERED).count()
-                    )
-                    dashboard_data['counts']['cancelled_orders'] = safe_query_count(
-                        lambda: Order.query.filter_by(status=OrderStatus.CANCELLED).count()
-                    )
-                    dashboard_data['counts']['returned_orders'] = safe_query_count(
-                        lambda: Order.query.filter_by(status=OrderStatus.REFUNDED).count()
-                    )
-
+                periods = period_totals(now)
             except Exception as e:
-                logger.warning(f"Error getting order counts: {str(e)}")
+                db.session.rollback()
+                logger.warning(f"Error reading dashboard metrics: {str(e)}")
+
+        if periods:
+            order_counts = {status: count for status, (count, _) in periods['all'].get('orders', {}).items()}
+            dashboard_data['counts']['orders'] = sum(order_counts.values())
+            dashboard_data['counts']['pending_orders'] = order_counts.get(OrderStatus.PENDING.value, 0)
+            dashboard_data['counts']['processing_orders'] = order_counts.get(OrderStatus.PROCESSING.value, 0)
+            dashboard_data['counts']['shipped_orders'] = order_counts.get(OrderStatus.SHIPPED.value, 0)
+            dashboard_data['counts']['delivered_orders'] = order_counts.get(OrderStatus.DELIVERED.value, 0)
+            dashboard_data['counts']['cancelled_orders'] = order_counts.get(OrderStatus.CANCELLED.value, 0)
+            dashboard_data['counts']['returned_orders'] = order_counts.get(OrderStatus.REFUNDED.value, 0)
 
         if db and Category:
             try:
@@ -345,92 +368,25 @@ def dashboard_overview():
         # ----------------------
         # Sales Data
         # ----------------------
-        if db and Order:
+        if periods:
             try:
-                today = datetime.utcnow().date()
-                yesterday = today - timedelta(days=1)
-                start_of_week = today - timedelta(days=today.weekday())
-                start_of_month = datetime(today.year, today.month, 1).date()
-                start_of_year = datetime(today.year, 1, 1).date()
-                last_30_days = today - timedelta(days=30)
-
-                # Today's sales
-                dashboard_data['sales']['today'] = safe_query_scalar(
-                    lambda: db.session.query(func.sum(Order.total_amount)).filter(
-                        and_(
-                            func.date(Order.created_at) == today,
-                            Order.status != OrderStatus.CANCELLED if OrderStatus else True
-                        )
-                    ).scalar()
-                )
-
-                # Yesterday's sales
-                dashboard_data['sales']['yesterday'] = safe_query_scalar(
-                    lambda: db.session.query(func.sum(Order.total_amount)).filter(
-                        and_(
-                            func.date(Order.created_at) == yesterday,
-                            Order.status != OrderStatus.CANCELLED if OrderStatus else True
-                        )
-                    ).scalar()
-                )
-
-                # Weekly sales
-                dashboard_data['sales']['weekly'] = safe_query_scalar(
-                    lambda: db.session.query(func.sum(Order.total_amount)).filter(
-                        and_(
-                            Order.created_at >= start_of_week,
-                            Order.status != OrderStatus.CANCELLED if OrderStatus else True
-                        )
-                    ).scalar()
-                )
-
-                # Monthly sales
-                dashboard_data['sales']['monthly'] = safe_query_scalar(
-                    lambda: db.session.query(func.sum(Order.total_amount)).filter(
-                        and_(
-                            Order.created_at >= start_of_month,
-                            Order.status != OrderStatus.CANCELLED if OrderStatus else True
-                        )
-                    ).scalar()
-                )
-
-                # Yearly sales
-                dashboard_data['sales']['yearly'] = safe_query_scalar(
-                    lambda: db.session.query(func.sum(Order.total_amount)).filter(
-                        and_(
-                            Order.created_at >= start_of_year,
-                            Order.status != OrderStatus.CANCELLED if OrderStatus else True
-                        )
-                    ).scalar()
-                )
-
-                # Total revenue
-                dashboard_data['sales']['total_revenue'] = safe_query_scalar(
-                    lambda: db.session.query(func.sum(Order.total_amount)).filter(
-                        Order.status != OrderStatus.CANCELLED if OrderStatus else True
-                    ).scalar()
-                )
+                cancelled = (OrderStatus.CANCELLED.value,)
+                for key, period in (('today', 'today'), ('yesterday', 'yesterday'), ('weekly', 'week'),
+                                    ('monthly', 'month'), ('yearly', 'year'), ('total_revenue', 'all')):
+                    dashboard_data['sales'][key] = metric_sum(periods[period], 'orders', exclude=cancelled)[1]
 
+                all_time = periods['all']
                 # Pending amount (orders not yet paid)
                 if PaymentStatus:
-                    dashboard_data['sales']['pending_amount'] = safe_query_scalar(
-                        lambda: db.session.query(func.sum(Order.total_amount)).filter(
-                            Order.payment_status == PaymentStatus.PENDING
-                        ).scalar()
-                    )
+                    dashboard_data['sales']['pending_amount'] = all_time.get('payments', {}).get(
+                        PaymentStatus.PENDING.value, [0, 0.0])[1]
 
                 # Refunded amount
-                if OrderStatus:
-                    dashboard_data['sales']['refunded_amount'] = safe_query_scalar(
-                        lambda: db.session.query(func.sum(Order.total_amount)).filter(
-                            Order.status == OrderStatus.REFUNDED
-                        ).scalar()
-                    )
+                dashboard_data['sales']['refunded_amount'] = all_time.get('orders', {}).get(
+                    OrderStatus.REFUNDED.value, [0, 0.0])[1]
 
                 # Calculate additional metrics
-                total_orders = safe_query_count(
-                    lambda: Order.query.filter(Order.status != OrderStatus.CANCELLED if OrderStatus else True).count()
-                )
+                total_orders = metric_sum(all_time, 'orders', exclude=cancelled)[0]
 
                 if total_orders > 0:
                     dashboard_data['sales']['average_order_value'] = round(
@@ -445,7 +401,7 @@ def dashboard_overview():
                 # Cart abandonment rate (if you have cart data)
                 if Cart:
                     total_carts = safe_query_count(lambda: Cart.query.count())
-                    completed_orders = safe_query_count(lambda: Order.query.count())
+                    completed_orders = dashboard_data['counts']['orders']
                     if total_carts > 0:
                         dashboard_data['sales']['cart_abandonment_rate'] = round(
                             ((total_carts - completed_orders) / total_carts) * 100, 1
@@ -456,71 +412,53 @@ def dashboard_overview():
                     dashboard_data['sales']['cart_abandonment_rate'] = 0
 
                 # Return rate
-                returned_orders = safe_query_count(
-                    lambda: Order.query.filter_by(status=OrderStatus.REFUNDED).count() if OrderStatus else 0
-                )
+                returned_orders = dashboard_data['counts']['returned_orders']
                 if total_orders > 0:
                     dashboard_data['sales']['return_rate'] = round((returned_orders / total_orders) * 100, 1)
                 else:
                     dashboard_data['sales']['return_rate'] = 0
 
                 # Customer lifetime value (simplified calculation)
-                if User:
-                    total_customers = safe_query_count(lambda: User.query.count())
-                    if total_customers > 0:
-                        dashboard_data['sales']['customer_lifetime_value'] = round(
-                            dashboard_data['sales']['total_revenue'] / total_customers, 2
-                        )
-                    else:
-                        dashboard_data['sales']['customer_lifetime_value'] = 0
+                total_customers = metric_sum(all_time, 'users')[0]
+                if total_customers > 0:
+                    dashboard_data['sales']['customer_lifetime_value'] = round(
+                        dashboard_data['sales']['total_revenue'] / total_customers, 2
+                    )
+                else:
+                    dashboard_data['sales']['customer_lifetime_value'] = 0
 
             except Exception as e:
                 logger.warning(f"Error calculating sales data: {str(e)}")
 
-        # ----------------------
-        # Order Status Distribution
-        # ----------------------
-        if db and Order and OrderStatus:
-            try:
-                order_statuses = db.session.query(
-                    Order.status,
-                    func.count(Order.id).label('count')
-                ).group_by(Order.status).all()
-
-                for status, count in order_statuses:
-                    status_name = status.value if hasattr(status, 'value') else str(status)
-                    dashboard_data['order_status'][status_name.lower()] = count
-
-            except Exception as e:
-                logger.warning(f"Error getting order status distribution: {str(e)}")
-
-        # ----------------------
-        # Payment Status Distribution
-        # ----------------------
-        if db and Order and PaymentStatus:
-            try:
-                payment_statuses = db.session.query(
-                    Order.payment_status,
-                    func.count(Order.id).label('count')
-                ).group_by(Order.payment_status).all()
-
-                for status, count in payment_statuses:
-                    status_name = status.value if hasattr(status, 'value') else str(status)
-                    dashboard_data['payment_status'][status_name.lower()] = count
-
-            except Exception as e:
-                logger.warning(f"Error getting payment status distribution: {str(e)}")
+            # ----------------------
+            # Order and Payment Status Distribution
+            # ----------------------
+            dashboard_data['order_status'] = {
+                status: count for status, (count, _) in periods['all'].get('orders', {}).items()
+            }
+            dashboard_data['payment_status'] = {
+                status: count for status, (count, _) in periods['all'].get('payments', {}).items()
+            }
 
         # ----------------------
         # Recent Orders
         # ----------------------
         if db and Order and User:
             try:
-                recent_orders = db.session.query(Order, User).join(
+                columns = [Order, User]
+                if OrderItem:
+                    # Item count as a correlated subquery instead of one query per order
+                    columns.append(
+                        db.session.query(func.count(OrderItem.id))
+                        .filter(OrderItem.order_id == Order.id)
+                        .correlate(Order).scalar_subquery()
+                    )
+                recent_orders = db.session.query(*columns).join(
                     User, User.id == Order.user_id
                 ).order_by(desc(Order.created_at)).limit(10).all()
 
-                for order, user in recent_orders:
+                for row in recent_orders:
+                    order, user = row[0], row[1]
                     order_data = {
                         'id': str(order.id),
                         'order_number': getattr(order, 'order_number', f"ORD-{order.id}"),
@@ -535,16 +473,14 @@ def dashboard_overview():
                         'shipping_method': getattr(order, 'shipping_method', 'Standard')
                     }
 
-                    # Get order items count
+                    # Order items count
                     if OrderItem:
-                        items_count = safe_query_count(
-                            lambda: OrderItem.query.filter_by(order_id=order.id).count()
-                        )
-                        order_data['items'] = [{'quantity': items_count}]
+                        order_data['items'] = [{'quantity': row[2] or 0}]
 
                     dashboard_data['recent_orders'].append(order_data)
 
             except Exception as e:
+                db.session.rollback()
                 logger.warning(f"Error getting recent orders: {str(e)}")
 
         # ----------------------
@@ -554,6 +490,18 @@ def dashboard_overview():
             try:
                 recent_users = User.query.order_by(desc(User.created_at)).limit(10).all()
 
+                # Order count and total spent for all ten users in one grouped query
+                spending = {}
+                if Order and recent_users:
+                    spending = {
+                        user_id: (count, float(total or 0))
+                        for user_id, count, total in db.session.query(
+                            Order.user_id, func.count(Order.id), func.sum(Order.total_amount)
+                        ).filter(
+                            Order.user_id.in_([user.id for user in recent_users])
+                        ).group_by(Order.user_id)
+                    }
+
                 for user in recent_users:
                     user_data = {
                         'id': user.id,
@@ -566,20 +514,13 @@ def dashboard_overview():
                         'location': 'Unknown'  # You may want to add location tracking
                     }
 
-                    # Get user's order count and total spent
                     if Order:
-                        orders_count = safe_query_count(
-                            lambda: Order.query.filter_by(user_id=user.id).count()
-                        )
-                        total_spent = safe_query_scalar(
-                            lambda: db.session.query(func.sum(Order.total_amount)).filter_by(user_id=user.id).scalar()
-                        )
-                        user_data['orders_count'] = orders_count
-                        user_data['total_spent'] = total_spent
+                        user_data['orders_count'], user_data['total_spent'] = spending.get(user.id, (0, 0.0))
 
                     dashboard_data['recent_users'].append(user_data)
 
             except Exception as e:
+                db.session.rollback()
                 logger.warning(f"Error getting recent users: {str(e)}")
 
         # ----------------------
@@ -634,25 +575,16 @@ def dashboard_overview():
         # ----------------------
         # Sales by Category
         # ----------------------
-        if db and Category and Product and Order and OrderItem:
+        if periods:
             try:
-                sales_by_category = db.session.query(
-                    Category.name,
-                    func.sum(OrderItem.total).label('total_sales'),
-                    func.count(OrderItem.id).label('order_count')
-                ).join(
-                    Product, Product.category_id == Category.id
-                ).join(
-                    OrderItem, OrderItem.product_id == Product.id
-                ).join(
-                    Order, Order.id == OrderItem.order_id
-                ).filter(
-                    Order.status != OrderStatus.CANCELLED if OrderStatus else True
-                ).group_by(Category.name).order_by(desc('total_sales')).limit(10).all()
+                category_sales = sorted(
+                    periods['all'].get('category_sales', {}).items(),
+                    key=lambda item: item[1][1], reverse=True
+                )[:10]
 
-                total_sales = sum(item.total_sales for item in sales_by_category)
+                total_sales = sum(sales for _, (_, sales) in category_sales)
 
-                for category_name, sales, orders in sales_by_category:
+                for category_name, (orders, sales) in category_sales:
                     percentage = (sales / total_sales * 100) if total_sales > 0 else 0
                     dashboard_data['sales_by_category'].append({
                         'category': category_name,
@@ -704,32 +636,15 @@ def dashboard_overview():
         # ----------------------
         if db and User and Order:
             try:
-                # Simple segmentation based on order count and total spent
-                customer_segments = db.session.query(
-                    case(
-                        (func.count(Order.id) >= 10, 'Premium'),
-                        (func.count(Order.id) >= 5, 'Regular'),
-                        (func.count(Order.id) >= 1, 'New'),
-                        else_='Inactive'
-                    ).label('segment'),
-                    func.count(User.id).label('customer_count'),
-                    func.sum(Order.total_amount).label('total_revenue')
-                ).outerjoin(
-                    Order, Order.user_id == User.id
-                ).group_by('segment').all()
-
-                total_customers = sum(segment.customer_count for segment in customer_segments)
-
-                for segment_name, count, revenue in customer_segments:
-                    percentage = (count / total_customers * 100) if total_customers > 0 else 0
-                    dashboard_data['customer_segments'].append({
-                        'segment': segment_name,
-                        'count': count,
-                        'percentage': round(percentage, 1),
-                        'revenue': float(revenue or 0)
-                    })
+                dashboard_data['customer_segments'] = cache.get(CUSTOMER_SEGMENTS_CACHE_KEY)
+                if dashboard_data['customer_segments'] is None:
+                    dashboard_data['customer_segments'] = customer_segments()
+                    cache.set(CUSTOMER_SEGMENTS_CACHE_KEY, dashboard_data['customer_segments'],
+                              timeout=CUSTOMER_SEGMENTS_CACHE_SECONDS)
 
             except Exception as e:
+                db.session.rollback()
+                dashboard_data['customer_segments'] = []
                 logger.warning(f"Error getting customer segments: {str(e)}")
 
         # ----------------------
@@ -867,38 +782,21 @@ def sales_chart():
 
         if Order and db:
             try:
-                # Get daily sales for the specified period
-                sales_data = db.session.query(
-                    func.date(Order.created_at).label('date'),
-                    func.sum(Order.total_amount).label('total_sales'),
-                    func.count(Order.id).label('order_count')
-                ).filter(
-                    and_(
-                        Order.created_at >= start_date,
-                        Order.created_at <= end_date,
-                        Order.status != OrderStatus.CANCELLED if OrderStatus else True
-                    )
-                ).group_by(func.date(Order.created_at)).order_by('date').all()
-
-                # Create a dictionary for easy lookup
-                sales_dict = {item.date: item for item in sales_data}
+                # Daily sales for the period from the dashboard_metrics day rollups
+                sales_dict = daily_totals('orders', start_date, end_date)
+                cancelled = (OrderStatus.CANCELLED.value,) if OrderStatus else ()
 
                 # Fill in all dates in the range
                 current_date = start_date
                 while current_date <= end_date:
-                    if current_date in sales_dict:
-                        item = sales_dict[current_date]
-                        chart_data.append({
-                            'date': current_date.isoformat(),
-                            'sales': float(item.total_sales),
-                            'orders': item.order_count
-                        })
-                    else:
-                        chart_data.append({
-                            'date': current_date.isoformat(),
-                            'sales': 0,
-                            'orders': 0
-                        })
+                    order_count, total_sales = metric_sum(
+                        {'orders': sales_dict.get(current_date, {})}, 'orders', exclude=cancelled
+                    )
+                    chart_data.append({
+                        'date': current_date.isoformat(),
+                        'sales': float(total_sales),
+                        'orders': order_count
+                    })
                     current_date += timedelta(days=1)
 
             except Exception as query_error:
@@ -117,8 +117,13 @@ except ImportError:
 # Setup logger
 logger = logging.getLogger(__name__)
 
-# Create blueprint
+# Create blueprint; reads may be served by a replica
 user_brand_routes = Blueprint('user_brand_routes', __name__)
+try:
+    from ...configuration.database import replica_blueprint
+    replica_blueprint(user_brand_routes)
+except ImportError:
+    pass
 
 # Helper Functions
 def get_pagination_params():
@@ -25,6 +25,7 @@ from ...schemas.cart_schema import (
     cart_schema, cart_items_schema, cart_item_schema, coupon_schema
 )
 from ...websocket import broadcast_to_user, broadcast_to_admins
+from ...services.guest_carts import get_guest_cart, materialize_guest_cart
 from app.routes.inventory.user_inventory_routes import get_inventory_lock
 from ...validations.cart_validation import validate_cart_item_stock, validate_cart_items
 
@@ -251,26 +252,18 @@ def add_to_cart():
             current_user_id = get_jwt_identity()
             guest_id = None
 
-            if not current_user_id:
-                # For guest users, get or create guest ID from cookies
-                guest_id = request.cookies.get('guest_id')
-                if not guest_id:
-                    guest_id = str(uuid.uuid4())
-
             # Find active cart
             cart = None
             if current_user_id:
                 cart = Cart.query.filter_by(user_id=current_user_id, is_active=True).first()
-            elif guest_id:
-                cart = Cart.query.filter_by(guest_id=guest_id, is_active=True).first()
+            else:
+                # Guest carts are virtual until this first write; materialize it now
+                cart = materialize_guest_cart(get_guest_cart())
+                guest_id = cart.guest_id
 
             # Create cart if it doesn't exist
             if not cart:
-                cart = Cart(
-                    user_id=current_user_id,
-                    guest_id=guest_id if not current_user_id else None,
-                    is_active=True
-                )
+                cart = Cart(user_id=current_user_id, is_active=True)
                 db.session.add(cart)
                 db.session.flush()  # Get cart ID without committing
 
@@ -652,6 +645,231 @@ def remove_from_cart_legacy(item_id):
     """
     return remove_item(item_id)
 
+@cart_routes.route('/items:batch', methods=['PATCH'])
+@jwt_required()
+def batch_update_items():
+    """
+    Apply several cart line changes in one request.
+
+    Request Body:
+        operations: List of operations, applied in order:
+            {"op": "add", "product_id": 1, "variant_id": null, "quantity": 2}
+            {"op": "update", "item_id": 5, "quantity": 3}   (quantity 0 removes)
+            {"op": "remove", "item_id": 5}
+
+    All operations are validated before anything is written and are committed
+    together; if any of them fails no change is applied.
+
+    Returns:
+        JSON with updated cart and items
+    """
+    user_id = get_jwt_identity()
+
+    if not request.is_json:
+        return jsonify({
+            'success': False,
+            'error': 'Content-Type must be application/json'
+        }), 400
+
+    try:
+        data = request.get_json()
+    except Exception as e:
+        logger.error(f"JSON parsing error: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': 'Invalid JSON format'
+        }), 400
+
+    operations = (data or {}).get('operations')
+    if not isinstance(operations, list) or not operations:
+        return jsonify({
+            'success': False,
+            'error': 'A non-empty list of operations is required'
+        }), 400
+
+    max_operations = current_app.config.get('CART_BATCH_MAX_OPERATIONS', 100)
+    if len(operations) > max_operations:
+        return jsonify({
+            'success': False,
+            'error': f'At most {max_operations} operations are allowed per request'
+        }), 400
+
+    # Parse every operation before touching the database
+    parsed = []
+    errors = []
+    for index, operation in enumerate(operations):
+        if not isinstance(operation, dict):
+            errors.append({'index': index, 'code': 'invalid_operation', 'message': 'Operation must be an object'})
+            continue
+
+        op = operation.get('op')
+        try:
+            if op == 'add':
+                quantity = int(operation.get('quantity', 1))
+                if quantity <= 0:
+                    raise ValueError('Quantity must be positive')
+                variant_id = operation.get('variant_id')
+                parsed.append({
+                    'op': op,
+                    'product_id': int(operation['product_id']),
+                    'variant_id': int(variant_id) if variant_id is not None else None,
+                    'quantity': quantity
+                })
+            elif op == 'update':
+                parsed.append({
+                    'op': op,
+                    'item_id': int(operation['item_id']),
+                    'quantity': int(operation['quantity'])
+                })
+            elif op == 'remove':
+                parsed.append({'op': op, 'item_id': int(operation['item_id'])})
+            else:
+                errors.append({'index': index, 'code': 'invalid_operation',
+                               'message': 'op must be one of: add, update, remove'})
+        except KeyError as e:
+            errors.append({'index': index, 'code': 'missing_field', 'message': f'{e.args[0]} is required'})
+        except (ValueError, TypeError) as e:
+            errors.append({'index': index, 'code': 'invalid_value', 'message': str(e)})
+
+    if errors:
+        return jsonify({
+            'success': False,
+            'error': 'Invalid operations',
+            'errors': errors
+        }), 400
+
+    try:
+        cart = Cart.query.filter_by(user_id=user_id, is_active=True).first()
+        if not cart:
+            if any(operation['op'] != 'add' for operation in parsed):
+                return jsonify({
+                    'success': False,
+                    'error': 'Cart not found'
+                }), 404
+            cart = Cart(user_id=user_id, is_active=True)
+            db.session.add(cart)
+            db.session.flush()
+
+        # Load the cart once and fold all operations into the final quantity per line
+        existing_items = CartItem.query.filter_by(cart_id=cart.id, user_id=user_id).all()
+        items_by_id = {item.id: item for item in existing_items}
+        items_by_key = {(item.product_id, item.variant_id): item for item in existing_items}
+        quantities = {key: item.quantity for key, item in items_by_key.items()}
+
+        for index, operation in enumerate(parsed):
+            if operation['op'] == 'add':
+                key = (operation['product_id'], operation['variant_id'])
+                quantities[key] = quantities.get(key, 0) + operation['quantity']
+                continue
+
+            item = items_by_id.get(operation['item_id'])
+            if not item:
+                errors.append({'index': index, 'code': 'not_found', 'item_id': operation['item_id'],
+                               'message': 'Cart item not found'})
+                continue
+
+            key = (item.product_id, item.variant_id)
+            quantities[key] = max(operation['quantity'], 0) if operation['op'] == 'update' else 0
+
+        # Look up every product and variant being added in one query each
+        new_keys = [key for key in quantities if key not in items_by_key and quantities[key] > 0]
+        product_ids = {product_id for product_id, _ in new_keys}
+        variant_ids = {variant_id for _, variant_id in new_keys if variant_id}
+        products = {product.id: product for product in
+                    Product.query.filter(Product.id.in_(product_ids)).all()} if product_ids else {}
+        variants = {variant.id: variant for variant in
+                    ProductVariant.query.filter(ProductVariant.id.in_(variant_ids)).all()} if variant_ids else {}
+
+        for product_id, variant_id in new_keys:
+            product = products.get(product_id)
+            if not product or not product.is_active:
+                errors.append({'code': 'product_not_found', 'product_id': product_id,
+                               'message': 'Product not found'})
+            elif variant_id and (variant_id not in variants or variants[variant_id].product_id != product_id):
+                errors.append({'code': 'invalid_variant', 'product_id': product_id, 'variant_id': variant_id,
+                               'message': 'Invalid variant'})
+
+        # Validate stock once per line whose quantity grows
+        for (product_id, variant_id), quantity in quantities.items():
+            current = items_by_key.get((product_id, variant_id))
+            if quantity <= 0 or (current and quantity <= current.quantity):
+                continue
+            valid, available, error_message = validate_cart_item_stock(product_id, variant_id, quantity)
+            if not valid:
+                errors.append({
+                    'message': error_message,
+                    'code': 'insufficient_stock',
+                    'product_id': product_id,
+                    'variant_id': variant_id,
+                    'available_stock': available,
+                    'requested_quantity': quantity
+                })
+
+        if errors:
+            db.session.rollback()
+            return jsonify({
+                'success': False,
+                'error': 'Cart batch validation failed',
+                'errors': errors
+            }), 400
+
+        # Apply the final state; the unit of work batches the statements on commit
+        now = datetime.now()
+        for key, quantity in quantities.items():
+            item = items_by_key.get(key)
+            if item:
+                if quantity <= 0:
+                    db.session.delete(item)
+                elif quantity != item.quantity:
+                    item.quantity = quantity
+                    item.updated_at = now
+            elif quantity > 0:
+                product_id, variant_id = key
+                product = products[product_id]
+                db.session.add(CartItem(
+                    cart_id=cart.id,
+                    user_id=user_id,
+                    product_id=product_id,
+                    variant_id=variant_id,
+                    quantity=quantity,
+                    price=variants[variant_id].price if variant_id else (product.sale_price or product.price)
+                ))
+
+        db.session.flush()
+        cart.update_totals()
+        cart.last_activity = now
+        db.session.commit()
+
+        cart_items = CartItem.query.filter_by(cart_id=cart.id).all()
+        cart_data = cart_schema.dump(cart)
+        items_data = cart_items_schema.dump(cart_items)
+
+        # Notify via WebSocket
+        try:
+            if hasattr(request, 'namespace'):
+                broadcast_to_user(user_id, 'cart_updated', {
+                    'cart': cart_data,
+                    'items': items_data
+                })
+        except Exception as e:
+            logger.error(f"WebSocket notification error: {str(e)}")
+
+        return jsonify({
+            'success': True,
+            'message': f'{len(parsed)} cart operations applied',
+            'cart': cart_data,
+            'items': items_data
+        })
+
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error applying cart batch: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': 'Failed to update cart',
+            'details': str(e)
+        }), 500
+
 # ----------------------
 # Coupon Operations
 # ----------------------
@@ -20,6 +20,7 @@ from sqlalchemy import or_, desc, func, and_, text
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 
 # Extensions
+from ...configuration.database import replica_blueprint
 from ...configuration.extensions import db, ma
 
 # Models
@@ -31,8 +32,8 @@ from ...schemas.schemas import category_schema, categories_schema
 # Setup logger
 logger = logging.getLogger(__name__)
 
-# Create blueprint
-categories_routes = Blueprint('categories_routes', __name__)
+# Create blueprint; reads may be served by a replica
+categories_routes = replica_blueprint(Blueprint('categories_routes', __name__))
 
 # Constants
 DEFAULT_PER_PAGE = 12
@@ -9,8 +9,6 @@ import logging
 import uuid
 from datetime import datetime
 import json
-import random
-import string
 
 # Import models
 from ...models.models import (
@@ -27,10 +25,8 @@ logger = logging.getLogger(__name__)
 
 def generate_order_number():
     """Generate a unique order number"""
-    prefix = "MZ"
-    timestamp = datetime.now().strftime("%y%m%d")
-    random_chars = ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
-    return f"{prefix}{timestamp}{random_chars}"
+    from ...services.order_numbers import next_order_number
+    return next_order_number()
 
 @checkout_routes.route('/validate-cart', methods=['POST'])
 @jwt_required()
@@ -1425,6 +1425,7 @@ def admin_health_check():
     try:
         from app.models.models import Inventory
         from app.configuration.extensions import db
+        from app.services.inventory_cache import availability_cache
 
         # Check database connectivity
         db.session.execute(text('SELECT 1'))
@@ -1441,6 +1442,7 @@ def admin_health_check():
                 "total_inventory_items": total_inventory_items,
                 "active_items": active_items
             },
+            "availability_cache": availability_cache.stats(),
             "endpoints": [
                 "/api/inventory/admin/",
                 "/api/inventory/admin/<id>",
@@ -116,6 +116,7 @@ def check_availability(product_id):
     try:
         from app.models.models import Inventory, Product, ProductVariant
         from app.configuration.extensions import db
+        from app.services.inventory_cache import get_availability
 
         variant_id = request.args.get('variant_id', type=int)
         requested_quantity = request.args.get('quantity', 1, type=int)
@@ -123,13 +124,10 @@ def check_availability(product_id):
         if requested_quantity <= 0:
             return jsonify({"error": "Quantity must be positive"}), 400
 
-        # Find inventory item
-        inventory = Inventory.query.filter_by(
-            product_id=product_id,
-            variant_id=variant_id
-        ).first()
+        # Find inventory availability (served from the hot-SKU cache)
+        availability = get_availability(product_id, variant_id)
 
-        if not inventory:
+        if not availability:
             # If no inventory record exists, create one from product data
             product = db.session.get(Product, product_id)
             if not product:
@@ -153,9 +151,10 @@ def check_availability(product_id):
             )
             db.session.add(inventory)
             db.session.commit()
+            availability = get_availability(product_id, variant_id)
 
         # Calculate availability
-        available_quantity = max(0, inventory.stock_level - inventory.reserved_quantity)
+        available_quantity = availability['available_quantity']
         is_available = available_quantity >= requested_quantity
         can_fulfill = is_available
 
@@ -168,11 +167,11 @@ def check_availability(product_id):
             "available": available_quantity > 0,
             "is_available": is_available,
             "can_fulfill": can_fulfill,
-            "status": inventory.status,
-            "stock_level": inventory.stock_level,
-            "reserved_quantity": inventory.reserved_quantity,
-            "is_low_stock": inventory.is_low_stock(),
-            "last_updated": inventory.last_updated.isoformat() if inventory.last_updated else None
+            "status": availability['status'],
+            "stock_level": availability['stock_level'],
+            "reserved_quantity": availability['reserved_quantity'],
+            "is_low_stock": availability['is_low_stock'],
+            "last_updated": availability['last_updated']
         }), 200
 
     except Exception as e:
@@ -188,18 +187,16 @@ def get_product_inventory(product_id):
     try:
         from app.models.models import Inventory, Product, ProductVariant
         from app.configuration.extensions import db
+        from app.services.inventory_cache import get_availability
 
         # Check if variant_id is provided
         variant_id = request.args.get('variant_id', type=int)
 
         if variant_id:
-            # Get inventory for specific product variant
-            inventory = Inventory.query.filter_by(
-                product_id=product_id,
-                variant_id=variant_id
-            ).first()
+            # Get inventory for specific product variant (served from the hot-SKU cache)
+            availability = get_availability(product_id, variant_id)
 
-            if not inventory:
+            if not availability:
                 # Create inventory from product/variant data
                 product = db.session.get(Product, product_id)
                 if not product:
@@ -221,27 +218,25 @@ def get_product_inventory(product_id):
                 )
                 db.session.add(inventory)
                 db.session.commit()
-
-            # Calculate available quantity
-            available_quantity = max(0, inventory.stock_level - inventory.reserved_quantity)
+                availability = get_availability(product_id, variant_id)
 
             # Prepare response
             response = {
-                'id': inventory.id,
-                'product_id': inventory.product_id,
-                'variant_id': inventory.variant_id,
-                'stock_level': inventory.stock_level,
-                'reserved_quantity': inventory.reserved_quantity,
-                'available_quantity': available_quantity,
-                'reorder_level': inventory.reorder_level,
-                'low_stock_threshold': inventory.low_stock_threshold,
-                'sku': inventory.sku,
-                'location': inventory.location,
-                'status': inventory.status,
-                'is_in_stock': available_quantity > 0,
-                'is_low_stock': 0 < available_quantity <= inventory.low_stock_threshold,
-                'last_updated': inventory.last_updated.isoformat() if inventory.last_updated else None,
-                'created_at': inventory.created_at.isoformat() if inventory.created_at else None
+                'id': availability['id'],
+                'product_id': availability['product_id'],
+                'variant_id': availability['variant_id'],
+                'stock_level': availability['stock_level'],
+                'reserved_quantity': availability['reserved_quantity'],
+                'available_quantity': availability['available_quantity'],
+                'reorder_level': availability['reorder_level'],
+                'low_stock_threshold': availability['low_stock_threshold'],
+                'sku': availability['sku'],
+                'location': availability['location'],
+                'status': availability['status'],
+                'is_in_stock': availability['is_in_stock'],
+                'is_low_stock': availability['is_low_stock'],
+                'last_updated': availability['last_updated'],
+                'created_at': availability['created_at']
             }
 
             return jsonify(response), 200
@@ -611,6 +606,7 @@ def validate_cart_items():
     try:
         from app.models.models import Inventory, Product, ProductVariant, Cart, CartItem
         from app.configuration.extensions import db
+        from app.services.inventory_cache import get_availability
 
         # Handle case where no JSON data is provided
         if not request.is_json:
@@ -689,11 +685,8 @@ def validate_cart_items():
             variant_id = item.get('variant_id')
             quantity = item['quantity']
 
-            # Find inventory item
-            inventory = Inventory.query.filter_by(
-                product_id=product_id,
-                variant_id=variant_id
-            ).first()
+            # Find inventory availability (served from the hot-SKU cache)
+            inventory = get_availability(product_id, variant_id)
 
             if not inventory:
                 # If no inventory record exists, check the product's stock
@@ -762,7 +755,7 @@ def validate_cart_items():
 
             else:
                 # Calculate available quantity
-                available_quantity = max(0, inventory.stock_level - inventory.reserved_quantity)
+                available_quantity = inventory['available_quantity']
 
                 if available_quantity <= 0:
                     errors.append({
@@ -785,7 +778,7 @@ def validate_cart_items():
                     continue
 
                 # Add warning if stock is low
-                if available_quantity <= inventory.low_stock_threshold:
+                if available_quantity <= inventory['low_stock_threshold']:
                     warnings.append({
                         "product_id": product_id,
                         "variant_id": variant_id,
@@ -800,7 +793,7 @@ def validate_cart_items():
                     "requested_quantity": quantity,
                     "available_quantity": available_quantity,
                     "can_fulfill": True,
-                    "status": inventory.status
+                    "status": inventory['status']
                 })
 
         return jsonify({
@@ -953,6 +946,7 @@ def batch_check_availability():
     try:
         from app.models.models import Inventory, Product, ProductVariant
         from app.configuration.extensions import db
+        from app.services.inventory_cache import get_availability, snapshot_inventory
 
         # Handle JSON parsing errors
         try:
@@ -982,13 +976,10 @@ def batch_check_availability():
             requested_quantity = item.get('quantity', 1)
 
             try:
-                # Find inventory item
-                inventory = Inventory.query.filter_by(
-                    product_id=product_id,
-                    variant_id=variant_id
-                ).first()
+                # Find inventory availability (served from the hot-SKU cache)
+                availability = get_availability(product_id, variant_id)
 
-                if not inventory:
+                if not availability:
                     # Create from product data
                     product = db.session.get(Product, product_id)
                     if not product:
@@ -1023,9 +1014,10 @@ def batch_check_availability():
                         status='active' if available > 0 else 'out_of_stock'
                     )
                     db.session.add(inventory)
+                    availability = snapshot_inventory(inventory)
 
                 # Calculate availability
-                available_quantity = max(0, inventory.stock_level - inventory.reserved_quantity)
+                available_quantity = availability['available_quantity']
                 is_available = available_quantity >= requested_quantity
 
                 results.append({
@@ -1036,8 +1028,8 @@ def batch_check_availability():
                     "available": available_quantity > 0,
                     "is_available": is_available,
                     "can_fulfill": is_available,
-                    "status": inventory.status,
-                    "is_low_stock": inventory.is_low_stock()
+                    "status": availability['status'],
+                    "is_low_stock": availability['is_low_stock']
                 })
 
             except Exception as e:
@@ -24,7 +24,7 @@ from flask_jwt_extended import (
 )
 
 # Database & ORM
-from sqlalchemy import or_, desc, func, and_, extract
+from sqlalchemy import or_, desc, func, and_, extract, case, update
 from ...configuration.extensions import db, ma, mail, cache, cors
 
 # Models
@@ -51,18 +51,23 @@ from ...validations.validation import (
 )
 
 # HTTP Requests
-import requests
 
 # Flask Mail
 from flask_mail import Message
 
 from ...websocket import broadcast_to_user, broadcast_to_admins
+from ...services.audit_log import record_admin_activity
 
 # Import shared email functions
 from .order_email_templates import (
    send_order_confirmation_email,
    send_order_status_update_email
 )
+from app.services.jobs import job, enqueue
+from app.services.dashboard_metrics import record_order_changes
+from app.services.exports import ExportSpec, export_options, export_response, exporter, iter_query, start_export
+from app.services.http_client import http_client
+from .order_completion_handler import apply_stock_deltas, load_order_item_quantities, lock_product_stock
 
 # Setup logger
 logger = logging.getLogger(__name__)
@@ -174,67 +179,89 @@ def require_super_admin():
    return decorator
 
 def log_admin_activity(admin_id, action, details=None):
-   """Log admin activity for audit trail."""
+   """Queue an admin activity event for the audit trail (written off the request's session)."""
    try:
-       activity_log = AdminActivityLog(
-           admin_id=admin_id,
-           action=action,
-           details=details or '',
-           ip_address=request.remote_addr,
-           user_agent=request.headers.get('User-Agent', ''),
-           endpoint=request.endpoint,
-           method=request.method,
-           status_code=200
-       )
-       db.session.add(activity_log)
-
-       # Always flush to make the log visible in the current transaction
-       db.session.flush()
-
-       # Only commit in non-testing environments to allow pytest fixtures to manage transactions
-       if not current_app.testing:
-           db.session.commit()
+       record_admin_activity(admin_id, action, details or '', 200)
    except Exception as e:
        logger.error(f"Failed to log admin activity: {str(e)}")
 
 def send_webhook_notification(event_type, order_id, data):
-    """Send webhook notification for order events."""
+    """Queue a webhook notification for an order event."""
     try:
-        webhook_url = current_app.config.get('WEBHOOK_URL')
-        if webhook_url:
-            payload = {
-                'event': event_type,
-                'data': data,
-                'order_id': order_id,
-                'timestamp': datetime.now(UTC).isoformat()
-            }
-            
-            headers = {
-                "Content-Type": "application/json",
-                "User-Agent": "MIZIZZI-Webhook/1.0"
-            }
-            
-            try:
-                import requests
-                response = requests.post(webhook_url, json=payload, headers=headers, timeout=10)
-                
-                if response.status_code == 200:
-                    logger.info(f"Webhook notification sent successfully: {event_type} for order {order_id}")
-                    return True
-                else:
-                    logger.warning(f"Webhook notification failed with status {response.status_code}: {event_type} for order {order_id}")
-                    return False
-            except Exception as req_error:
-                logger.error(f"Failed to send webhook request: {str(req_error)}")
-                return False
-        else:
+        if not current_app.config.get('WEBHOOK_URL'):
             # Webhooks are optional, so only log at debug level
             logger.debug("WEBHOOK_URL not configured. Skipping webhook notification.")
+            return False
+
+        enqueue('webhook.order_event', {
+            'event_type': event_type,
+            'order_id': order_id,
+            'data': data,
+            'timestamp': datetime.now(UTC).isoformat()
+        })
+        return True
+    except Exception as e:
+        logger.error(f"Failed to queue webhook: {str(e)}")
         return False
+
+@job('webhook.order_event')
+def deliver_webhook_notification(event_type, order_id, data, timestamp=None):
+    """Deliver an order webhook; a non-200 response is retried by the job worker."""
+    webhook_url = current_app.config.get('WEBHOOK_URL')
+    if not webhook_url:
+        logger.debug("WEBHOOK_URL not configured. Dropping webhook notification.")
+        return True
+
+    payload = {
+        'event': event_type,
+        'data': data,
+        'order_id': order_id,
+        'timestamp': timestamp or datetime.now(UTC).isoformat()
+    }
+
+    headers = {
+        "Content-Type": "application/json",
+        "User-Agent": "MIZIZZI-Webhook/1.0"
+    }
+
+    response = http_client.post('webhook', webhook_url, json=payload, headers=headers)
+
+    if response.status_code == 200:
+        logger.info(f"Webhook notification sent successfully: {event_type} for order {order_id}")
+        return True
+
+    logger.warning(f"Webhook notification failed with status {response.status_code}: {event_type} for order {order_id}")
+    return False
+
+def send_webhook_batch(event_type, events):
+    """Queue one job that fans ``events`` ({'order_id', 'data'} dicts) out into per-order webhooks."""
+    try:
+        if not events or not current_app.config.get('WEBHOOK_URL'):
+            logger.debug("No events or WEBHOOK_URL not configured. Skipping webhook batch.")
+            return False
+
+        enqueue('webhook.order_event_batch', {
+            'event_type': event_type,
+            'events': events,
+            'timestamp': datetime.now(UTC).isoformat()
+        })
+        return True
     except Exception as e:
-        logger.error(f"Failed to send webhook: {str(e)}")
+        logger.error(f"Failed to queue webhook batch: {str(e)}")
         return False
 
+@job('webhook.order_event_batch')
+def fan_out_webhook_batch(event_type, events, timestamp=None):
+    """Split a webhook batch into one retryable delivery job per order."""
+    for event in events:
+        enqueue('webhook.order_event', {
+            'event_type': event_type,
+            'order_id': event['order_id'],
+            'data': event.get('data') or {},
+            'timestamp': timestamp
+        })
+    return True
+
 def validate_status_transition(current_status, new_status):
    """Validate if status transition is allowed."""
    try:
@@ -948,15 +975,15 @@ def reopen_order(order_id):
        else:
            order.notes = reopen_note
 
-       db.session.commit()
-
-       # Send webhook notification
+       # Queued in the same transaction as the reopen
        send_webhook_notification('order.reopened', order_id, {
            'old_status': old_status.value,
            'new_status': new_status_enum.value,
            'reason': reopen_reason
        })
 
+       db.session.commit()
+
        # Log admin activity
        log_admin_activity(
            current_user_id,
@@ -1254,6 +1281,27 @@ def update_order_status(order_id):
            inventory_message = "Warning: Inventory handler not available"
            logger.warning("Order completion handler not found")
 
+       # Email and webhook jobs commit together with the status change
+       try:
+           customer = db.session.get(User, order.user_id)
+           if customer and customer.email:
+               customer_name = getattr(customer, 'name', 'Valued Customer') or 'Valued Customer'
+               enqueue('email.order_status_update', {
+                   'order_id': order.id,
+                   'to_email': customer.email,
+                   'customer_name': customer_name
+               })
+               logger.info(f"Status update email queued for order {order.id}")
+       except Exception as email_error:
+           logger.error(f"Failed to send status update email: {str(email_error)}")
+
+       # Send webhook notification
+       send_webhook_notification('order.status_updated', order_id, {
+           'old_status': old_status.value,
+           'new_status': new_status.value,
+           'tracking_number': order.tracking_number
+       })
+
        db.session.commit()
 
        try:
@@ -1284,27 +1332,6 @@ def update_order_status(order_id):
            # Don't fail the request if WebSocket fails
            logger.error(f"WebSocket notification error for order {order_id}: {str(ws_error)}")
 
-       # Send status update email
-       try:
-           customer = db.session.get(User, order.user_id)
-           if customer and customer.email:
-               customer_name = getattr(customer, 'name', 'Valued Customer') or 'Valued Customer'
-               send_order_status_update_email(
-                   order_id=order.id,
-                   to_email=customer.email,
-                   customer_name=customer_name
-               )
-               logger.info(f"Status update email sent for order {order.id}")
-       except Exception as email_error:
-           logger.error(f"Failed to send status update email: {str(email_error)}")
-
-       # Send webhook notification
-       send_webhook_notification('order.status_updated', order_id, {
-           'old_status': old_status.value,
-           'new_status': new_status.value,
-           'tracking_number': order.tracking_number
-       })
-
        # Log admin activity
        log_admin_activity(
            current_user_id,
@@ -1395,15 +1422,15 @@ def cancel_order(order_id):
        except ImportError:
            inventory_message = "Warning: Inventory handler not available"
 
-       db.session.commit()
-
-       # Send webhook notification
+       # Queued in the same transaction as the order change
        send_webhook_notification('order.cancelled', order_id, {
            'old_status': old_status.value,
            'reason': cancellation_reason,
            'refund_amount': refund_amount
        })
 
+       db.session.commit()
+
        # Log admin activity
        log_admin_activity(
            current_user_id,
@@ -1503,9 +1530,7 @@ def refund_order(order_id):
        )
        db.session.add(refund_payment)
 
-       db.session.commit()
-
-       # Send webhook notification
+       # Queued in the same transaction as the order change
        send_webhook_notification('order.refunded', order_id, {
            'refund_amount': refund_amount,
            'reason': refund_reason,
@@ -1513,6 +1538,8 @@ def refund_order(order_id):
            'transaction_id': refund_payment.transaction_id
        })
 
+       db.session.commit()
+
        # Log admin activity
        log_admin_activity(
            current_user_id,
@@ -1607,12 +1634,129 @@ def add_order_note(order_id):
        logger.error(f"Add order note error: {str(e)}", exc_info=True)
        return jsonify({"error": "Failed to add note", "details": str(e)}), 500
 
+BULK_CANCELLABLE_STATUSES = [OrderStatus.PENDING, OrderStatus.CONFIRMED, OrderStatus.PROCESSING]
+
+def bulk_stock_direction(old_status, new_status):
+   """-1 to reduce stock, 1 to restore it, 0 for none; mirrors update_order_status."""
+   if new_status in [OrderStatus.PROCESSING, OrderStatus.SHIPPED] and old_status == OrderStatus.PENDING:
+       return -1
+   if new_status == OrderStatus.CANCELLED and old_status in [OrderStatus.PROCESSING, OrderStatus.SHIPPED]:
+       return 1
+   return 0
+
+def plan_bulk_order_update(action, data, order_ids, current_status):
+   """
+   Validate a bulk action against the orders' current statuses without touching the database.
+
+   Returns the per-order errors, the accepted orders with their result entries,
+   the column values to set on all of them, the note to append, the webhook
+   event, and which accepted orders move stock in which direction.
+   """
+   plan = {'errors': [], 'accepted': {}, 'values': {}, 'note': None, 'webhook_event': None,
+           'stock_direction': 0, 'stock_orders': []}
+   errors, accepted = plan['errors'], plan['accepted']
+
+   new_status = None
+   if action == 'update_status' and 'status' in data:
+       try:
+           new_status = OrderStatus(data['status'])
+       except ValueError:
+           new_status = None
+
+   reason = data.get('reason')
+   if action == 'update_status':
+       plan['values'] = {'status': new_status}
+       plan['webhook_event'] = 'order.bulk_status_updated'
+   elif action == 'add_tracking':
+       plan['values'] = {'tracking_number': data.get('tracking_number')}
+   elif action == 'add_notes':
+       plan['note'] = data.get('notes')
+   elif action == 'bulk_cancel':
+       reason = reason or 'Bulk cancellation by admin'
+       plan['values'] = {'status': OrderStatus.CANCELLED}
+       plan['note'] = f"Order cancelled. Reason: {reason}"
+       plan['webhook_event'] = 'order.bulk_cancelled'
+   elif action == 'bulk_archive':
+       reason = reason or 'Bulk archive by admin'
+       plan['values'] = {'is_archived': True}
+       plan['note'] = f"Order archived. Reason: {reason}"
+
+   for order_id in order_ids:
+       old_status = current_status.get(order_id)
+       if old_status is None:
+           errors.append(f"Order {order_id} not found")
+           continue
+
+       if action == 'update_status':
+           if 'status' not in data:
+               errors.append(f"Status required for order {order_id}")
+               continue
+           if new_status is None:
+               errors.append(f"Invalid status for order {order_id}")
+               continue
+           if not validate_status_transition(old_status, new_status):
+               errors.append(f"Invalid status transition for order {order_id}: {old_status.value} -> {new_status.value}")
+               continue
+           accepted[order_id] = {
+               'old_status': old_status.value,
+               'new_status': new_status.value,
+               'webhook': {'old_status': old_status.value, 'new_status': new_status.value}
+           }
+           direction = bulk_stock_direction(old_status, new_status)
+
+       elif action == 'add_tracking':
+           if 'tracking_number' not in data:
+               errors.append(f"Tracking number required for order {order_id}")
+               continue
+           accepted[order_id] = {'tracking_number': data['tracking_number']}
+           direction = 0
+
+       elif action == 'add_notes':
+           if 'notes' not in data:
+               errors.append(f"Notes required for order {order_id}")
+               continue
+           accepted[order_id] = {'note_added': True}
+           direction = 0
+
+       elif action == 'bulk_cancel':
+           if old_status not in BULK_CANCELLABLE_STATUSES:
+               errors.append(f"Order {order_id} cannot be cancelled (status: {old_status.value})")
+               continue
+           accepted[order_id] = {
+               'old_status': old_status.value,
+               'new_status': 'cancelled',
+               'reason': reason,
+               'webhook': {'old_status': old_status.value, 'reason': reason}
+           }
+           direction = bulk_stock_direction(old_status, OrderStatus.CANCELLED)
+
+       elif action == 'bulk_archive':
+           accepted[order_id] = {'archived': True, 'reason': reason}
+           direction = 0
+
+       else:
+           errors.append(f"Unknown action: {action}")
+           continue
+
+       # One batch only ever reduces (pending -> processing) or restores (-> cancelled) stock
+       if direction:
+           plan['stock_direction'] = direction
+           plan['stock_orders'].append(order_id)
+
+   return plan
+
 @admin_order_routes.route('/orders/bulk-update', methods=['POST', 'OPTIONS']) # Changed route path
 @cross_origin()
 @jwt_required()
 @require_admin()
 def bulk_update_orders():
-   """Enhanced bulk update multiple orders (Admin only)."""
+   """
+   Bulk update multiple orders (Admin only).
+
+   The target orders are read once, validated in memory, and updated with
+   one statement per action; stock moves, webhooks and customer emails for
+   the whole batch are applied or queued in the same transaction.
+   """
    if request.method == 'OPTIONS':
        response = jsonify({'status': 'ok'})
        response.headers.add('Access-Control-Allow-Methods', 'POST, OPTIONS')
@@ -1632,163 +1776,85 @@ def bulk_update_orders():
        if not isinstance(order_ids, list) or not order_ids:
            return jsonify({"error": "order_ids must be a non-empty list"}), 400
 
-       results = []
-       errors = []
-       updated_count = 0
-
-       for order_id in order_ids:
+       # Unique ids in request order; anything that is not an integer cannot match an order
+       target_ids = []
+       for raw_id in order_ids:
            try:
-               order = db.session.get(Order, order_id)
-               if not order:
-                   errors.append(f"Order {order_id} not found")
+               target_ids.append(int(raw_id))
+           except (TypeError, ValueError):
+               target_ids.append(raw_id)
+       target_ids = list(dict.fromkeys(target_ids))
+
+       # One locked read of every target order; all validation below happens in memory
+       int_ids = [order_id for order_id in target_ids if isinstance(order_id, int)]
+       current_status = dict(
+           db.session.query(Order.id, Order.status).filter(Order.id.in_(int_ids)).order_by(Order.id).with_for_update()
+       ) if int_ids else {}
+
+       plan = plan_bulk_order_update(action, data, target_ids, current_status)
+       errors = plan['errors']
+       accepted = plan['accepted']
+
+       # Stock moves for the accepted transitions, checked against one locked read of the products
+       if plan['stock_direction']:
+           quantities = load_order_item_quantities(plan['stock_orders'])
+           stock = lock_product_stock({product_id for items in quantities.values() for product_id in items})
+           stock_deltas = {}
+           for order_id in plan['stock_orders']:
+               # Products that no longer exist are skipped, as handle_order_completion does
+               delta = {product_id: plan['stock_direction'] * quantity
+                        for product_id, quantity in quantities.get(order_id, {}).items() if product_id in stock}
+               short = [product_id for product_id, change in delta.items()
+                        if stock[product_id] + stock_deltas.get(product_id, 0) + change < 0]
+               if short:
+                   errors.append(f"Insufficient stock for order {order_id} (products: {', '.join(map(str, short))})")
+                   accepted.pop(order_id, None)
                    continue
+               for product_id, change in delta.items():
+                   stock_deltas[product_id] = stock_deltas.get(product_id, 0) + change
+               accepted[order_id]['inventory_updated'] = True
+           apply_stock_deltas(stock_deltas)
+
+       if accepted:
+           now = datetime.now(UTC)
+           values = dict(plan['values'], updated_at=now)
+           if plan['note']:
+               admin_user = db.session.get(User, current_user_id)
+               admin_name = admin_user.name if admin_user else f"Admin {current_user_id}"
+               note = f"[{now.strftime('%Y-%m-%d %H:%M:%S')}] {admin_name} (Bulk): {plan['note']}"
+               values['notes'] = case((Order.notes.is_(None), note), (Order.notes == '', note),
+                                      else_=Order.notes + '\n' + note)
+           if action == 'bulk_archive':
+               values['archived_at'] = now
+
+           db.session.execute(
+               update(Order).where(Order.id.in_(list(accepted))).values(**values)
+               .execution_options(synchronize_session=False)
+           )
+           if 'status' in values:
+               record_order_changes(accepted)
 
-               if action == 'update_status':
-                   if 'status' not in data:
-                       errors.append(f"Status required for order {order_id}")
-                       continue
-
-                   try:
-                       new_status = OrderStatus(data['status'])
-                       old_status = order.status
-
-                       # Validate transition
-                       if not validate_status_transition(old_status, new_status):
-                           errors.append(f"Invalid status transition for order {order_id}: {old_status.value} -> {new_status.value}")
-                           continue
-                       # Validate transition
-                       if not validate_status_transition(old_status, new_status):
-                           errors.append(f"Invalid status transition for order {order_id}: {old_status.value} -> {new_status.value}")
-                           continue
-
-                       order.status = new_status
-                       order.updated_at = datetime.now(UTC)
-
-                       # Send webhook notification
-                       send_webhook_notification('order.bulk_status_updated', order_id, {
-                           'old_status': old_status.value,
-                           'new_status': new_status.value
-                       })
-
-                       results.append({
-                           'order_id': order_id,
-                           'old_status': old_status.value,
-                           'new_status': new_status.value,
-                           'success': True
-                       })
-                       updated_count += 1
-                   except ValueError:
-                       errors.append(f"Invalid status for order {order_id}")
-
-               elif action == 'add_tracking':
-                   if 'tracking_number' not in data:
-                       errors.append(f"Tracking number required for order {order_id}")
-                       continue
-
-                   order.tracking_number = data['tracking_number']
-                   order.updated_at = datetime.now(UTC)
-                   results.append({
-                       'order_id': order_id,
-                       'tracking_number': data['tracking_number'],
-                       'success': True
-                   })
-                   updated_count += 1
-
-               elif action == 'add_notes':
-                   if 'notes' not in data:
-                       errors.append(f"Notes required for order {order_id}")
-                       continue
-
-                   timestamp = datetime.now(UTC).strftime('%Y-%m-%d %H:%M:%S')
-                   admin_user = db.session.get(User, current_user_id)
-                   admin_name = admin_user.name if admin_user else f"Admin {current_user_id}"
-
-                   new_note = f"[{timestamp}] {admin_name} (Bulk): {data['notes']}"
-
-                   if order.notes:
-                       order.notes += f"\n{new_note}"
-                   else:
-                       order.notes = new_note
-
-                   order.updated_at = datetime.now(UTC)
-                   results.append({
-                       'order_id': order_id,
-                       'note_added': True,
-                       'success': True
-                   })
-                   updated_count += 1
-
-               elif action == 'bulk_cancel':
-                   if order.status not in [OrderStatus.PENDING, OrderStatus.CONFIRMED, OrderStatus.PROCESSING]:
-                       errors.append(f"Order {order_id} cannot be cancelled (status: {order.status.value})")
-                       continue
-
-                   reason = data.get('reason', 'Bulk cancellation by admin')
-                   old_status = order.status
-                   order.status = OrderStatus.CANCELLED
-                   order.updated_at = datetime.now(UTC)
-
-                   # Add cancellation note
-                   timestamp = datetime.now(UTC).strftime('%Y-%m-%d %H:%M:%S')
-                   admin_user = db.session.get(User, current_user_id)
-                   admin_name = admin_user.name if admin_user else f"Admin {current_user_id}"
-
-                   cancellation_note = f"[{timestamp}] {admin_name} (Bulk): Order cancelled. Reason: {reason}"
-
-                   if order.notes:
-                       order.notes += f"\n{cancellation_note}"
-                   else:
-                       order.notes = cancellation_note
-
-                   # Send webhook notification
-                   send_webhook_notification('order.bulk_cancelled', order_id, {
-                       'old_status': old_status.value,
-                       'reason': reason
-                   })
-
-                   results.append({
-                       'order_id': order_id,
-                       'old_status': old_status.value,
-                       'new_status': 'cancelled',
-                       'reason': reason,
-                       'success': True
-                   })
-                   updated_count += 1
-
-               elif action == 'bulk_archive':
-                   reason = data.get('reason', 'Bulk archive by admin')
-                   order.is_archived = True
-                   order.archived_at = datetime.now(UTC)
-                   order.updated_at = datetime.now(UTC)
-
-                   # Add archive note
-                   timestamp = datetime.now(UTC).strftime('%Y-%m-%d %H:%M:%S')
-                   admin_user = db.session.get(User, current_user_id)
-                   admin_name = admin_user.name if admin_user else f"Admin {current_user_id}"
-
-                   archive_note = f"[{timestamp}] {admin_name} (Bulk): Order archived. Reason: {reason}"
-
-                   if order.notes:
-                       order.notes += f"\n{archive_note}"
-                   else:
-                       order.notes = archive_note
-
-                   results.append({
-                       'order_id': order_id,
-                       'archived': True,
-                       'reason': reason,
-                       'success': True
-                   })
-                   updated_count += 1
-
-               else:
-                   errors.append(f"Unknown action: {action}")
+           # Webhooks and customer emails are each queued as one batch job in the same transaction
+           if plan['webhook_event']:
+               send_webhook_batch(plan['webhook_event'], [
+                   {'order_id': order_id, 'data': result.get('webhook', {})} for order_id, result in accepted.items()
+               ])
 
-           except Exception as e:
-               errors.append(f"Error processing order {order_id}: {str(e)}")
+           if action == 'update_status' and data.get('notify_customers', True):
+               try:
+                   enqueue('email.order_status_batch', {'order_ids': list(accepted)})
+               except Exception as email_error:
+                   logger.error(f"Failed to queue bulk status update emails: {str(email_error)}")
 
-       if updated_count > 0:
            db.session.commit()
+       else:
+           db.session.rollback()
+
+       results = []
+       for order_id, result in accepted.items():
+           result.pop('webhook', None)
+           results.append(dict(result, order_id=order_id, success=True))
+       updated_count = len(results)
 
        # Log admin activity
        log_admin_activity(
@@ -1953,12 +2019,85 @@ def get_comprehensive_order_stats():
        logger.error(f"Get comprehensive order stats error: {str(e)}", exc_info=True)
        return jsonify({"error": "Failed to retrieve order statistics", "details": str(e)}), 500
 
+ORDER_EXPORT_COLUMNS = [
+   ('Order ID', 'id'), ('Order Number', 'order_number'), ('User Email', 'user_email'),
+   ('User Name', 'user_name'), ('Status', 'status'), ('Payment Status', 'payment_status'),
+   ('Total Amount', 'total_amount'), ('Subtotal', 'subtotal'), ('Tax Amount', 'tax_amount'),
+   ('Shipping Cost', 'shipping_cost'), ('Payment Method', 'payment_method'),
+   ('Shipping Method', 'shipping_method'), ('Tracking Number', 'tracking_number'),
+   ('Created At', 'created_at'), ('Updated At', 'updated_at'), ('Items Count', 'items_count'),
+   ('Notes', 'notes'), ('Is Archived', 'is_archived')
+]
+
+@exporter('orders')
+def orders_export_spec(params):
+   """Orders matching the export filters, one row per order with the customer joined in."""
+   items_count = db.session.query(func.count(OrderItem.id)).filter(
+       OrderItem.order_id == Order.id
+   ).correlate(Order).scalar_subquery()
+
+   query = db.session.query(
+       Order.id, Order.order_number, User.email, User.name, Order.status, Order.payment_status,
+       Order.total_amount, Order.subtotal, Order.tax_amount, Order.shipping_cost, Order.payment_method,
+       Order.shipping_method, Order.tracking_number, Order.created_at, Order.updated_at,
+       items_count, Order.notes, Order.is_archived
+   ).outerjoin(User, User.id == Order.user_id)
+
+   if not params.get('include_archived'):
+       query = query.filter(or_(Order.is_archived.is_(None), Order.is_archived == False))
+
+   if params.get('status'):
+       try:
+           query = query.filter(Order.status == OrderStatus(params['status']))
+       except ValueError:
+           pass
+
+   if params.get('date_from'):
+       try:
+           query = query.filter(Order.created_at >= datetime.fromisoformat(params['date_from'].replace('Z', '+00:00')))
+       except ValueError:
+           pass
+
+   if params.get('date_to'):
+       try:
+           query = query.filter(Order.created_at <= datetime.fromisoformat(params['date_to'].replace('Z', '+00:00')))
+       except ValueError:
+           pass
+
+   if params.get('payment_method'):
+       query = query.filter(Order.payment_method == params['payment_method'])
+
+   def rows():
+       for row in iter_query(query.order_by(Order.created_at.desc())):
+           yield {
+               'id': row[0],
+               'order_number': row[1],
+               'user_email': row[2] or '',
+               'user_name': row[3] or '',
+               'status': row[4].value if row[4] else '',
+               'payment_status': row[5].value if row[5] else '',
+               'total_amount': row[6],
+               'subtotal': row[7] or 0,
+               'tax_amount': row[8] or 0,
+               'shipping_cost': row[9] or 0,
+               'payment_method': row[10] or '',
+               'shipping_method': row[11] or '',
+               'tracking_number': row[12] or '',
+               'created_at': row[13].isoformat() if row[13] else '',
+               'updated_at': row[14].isoformat() if row[14] else '',
+               'items_count': row[15] or 0,
+               'notes': (row[16] or '').replace('\n', ' | '),  # Replace newlines for CSV
+               'is_archived': bool(row[17])
+           }
+
+   return ExportSpec(ORDER_EXPORT_COLUMNS, rows(), f"orders_export_{datetime.now(UTC).strftime('%Y%m%d_%H%M%S')}")
+
 @admin_order_routes.route('/orders/export', methods=['GET', 'OPTIONS']) # Changed route path
 @cross_origin()
 @jwt_required()
 @require_admin()
 def export_orders():
-   """Export orders to CSV with enhanced filtering (Admin only)."""
+   """Export orders as a streamed CSV or NDJSON download, or as a queued export job (Admin only)."""
    if request.method == 'OPTIONS':
        response = jsonify({'status': 'ok'})
        response.headers.add('Access-Control-Allow-Methods', 'GET, OPTIONS')
@@ -1973,97 +2112,38 @@ def export_orders():
        date_from = request.args.get('date_from')
        date_to = request.args.get('date_to')
        payment_method = request.args.get('payment_method')
-       format_type = request.args.get('format', 'csv').lower()
        include_archived = request.args.get('include_archived', 'false').lower() == 'true'
 
-       # Build query
-       query = Order.query
-
-       # Filter archived orders
-       if not include_archived:
-           query = query.filter(or_(Order.is_archived.is_(None), Order.is_archived == False))
-
-       if status:
-           try:
-               order_status = OrderStatus(status)
-               query = query.filter(Order.status == order_status)
-           except ValueError:
-               pass
-
-       if date_from:
-           try:
-               date_from_obj = datetime.fromisoformat(date_from.replace('Z', '+00:00'))
-               query = query.filter(Order.created_at >= date_from_obj)
-           except ValueError:
-               pass
-
-       if date_to:
-           try:
-               date_to_obj = datetime.fromisoformat(date_to.replace('Z', '+00:00'))
-               query = query.filter(Order.created_at <= date_to_obj)
-           except ValueError:
-               pass
-
-       if payment_method:
-           query = query.filter(Order.payment_method == payment_method)
-
-       orders = query.order_by(Order.created_at.desc()).all()
-
-       if format_type == 'csv':
-           # Create CSV
-           output = io.StringIO()
-           writer = csv.writer(output)
-
-           # Enhanced header
-           writer.writerow([
-               'Order ID', 'Order Number', 'User Email', 'User Name', 'Status',
-               'Payment Status', 'Total Amount', 'Subtotal', 'Tax Amount', 'Shipping Cost',
-               'Payment Method', 'Shipping Method', 'Tracking Number',
-               'Created At', 'Updated At', 'Items Count', 'Notes', 'Is Archived'
-           ])
-
-           # Write data
-           for order in orders:
-               user = db.session.get(User, order.user_id)
-               writer.writerow([
-                   order.id,
-                   order.order_number,
-                   user.email if user else '',
-                   getattr(user, 'name', '') if user else '',
-                   order.status.value,
-                   order.payment_status.value if order.payment_status else '',
-                   order.total_amount,
-                   getattr(order, 'subtotal', 0) or 0,
-                   getattr(order, 'tax_amount', 0) or 0,
-                   order.shipping_cost or 0,
-                   order.payment_method or '',
-                   order.shipping_method or '',
-                   order.tracking_number or '',
-                   order.created_at.isoformat(),
-                   order.updated_at.isoformat(),
-                   len(order.items),
-                   (order.notes or '').replace('\n', ' | '),  # Replace newlines for CSV
-                   getattr(order, 'is_archived', False)
-               ])
-
-           output.seek(0)
+       export_format, compress, run_async = export_options(request.args)
+       if export_format is None:
+           return jsonify({"error": "Unsupported format. Use 'csv' or 'ndjson'"}), 400
 
-           # Create response
-           response = make_response(output.getvalue())
-           response.headers['Content-Type'] = 'text/csv; charset=utf-8'
-           response.headers['Content-Disposition'] = f'attachment; filename=orders_export_{datetime.now(UTC).strftime("%Y%m%d_%H%M%S")}.csv'
+       params = {
+           'status': status,
+           'date_from': date_from,
+           'date_to': date_to,
+           'payment_method': payment_method,
+           'include_archived': include_archived
+       }
 
-           # Log admin activity
-           log_admin_activity(
-               current_user_id,
-               'EXPORT_ORDERS',
-               f'Exported {len(orders)} orders to CSV with filters: status={status}, payment_method={payment_method}'
-           )
+       # Log admin activity
+       log_admin_activity(
+           current_user_id,
+           'EXPORT_ORDERS',
+           f'Exported orders to {export_format.upper()} with filters: status={status}, payment_method={payment_method}'
+       )
 
-           return response
+       if run_async:
+           manifest = start_export('orders', params, export_format, compress, requested_by=current_user_id)
+           db.session.commit()
+           return jsonify({
+               "message": "Export queued",
+               "export": manifest,
+               "status_url": f"/api/admin/exports/{manifest['id']}"
+           }), 202
 
-       else:
-           return jsonify({"error": "Unsupported format. Use 'csv'"}), 400
+       # Rows are read from a server-side cursor while the file is being sent
+       return export_response(orders_export_spec(params), export_format, compress)
 
    except Exception as e:
        logger.error(f"Export orders error: {str(e)}", exc_info=True)
@@ -2104,26 +2184,22 @@ def resend_order_confirmation(order_id):
            except:
                pass
 
-       # Send the confirmation email
-       email_sent = send_order_confirmation_email(
-           order_id=order.id,
-           to_email=user.email,
-           customer_name=customer_name
-       )
+       # Queue the confirmation email; delivery and retries happen in the job worker
+       enqueue('email.order_confirmation', {
+           'order_id': order.id,
+           'to_email': user.email,
+           'customer_name': customer_name
+       }, commit=True)
 
-       if email_sent:
-           # Log admin activity
-           log_admin_activity(
-               current_user_id,
-               'RESEND_ORDER_CONFIRMATION',
-               f'Resent order confirmation email for order_id:{order_id} to {user.email}'
-           )
+       # Log admin activity
+       log_admin_activity(
+           current_user_id,
+           'RESEND_ORDER_CONFIRMATION',
+           f'Resent order confirmation email for order_id:{order_id} to {user.email}'
+       )
 
-           logger.info(f"Order confirmation email resent for order {order.id} to {user.email}")
-           return jsonify({"message": "Order confirmation email sent successfully"}), 200
-       else:
-           logger.error(f"Failed to resend order confirmation email for order {order.id}")
-           return jsonify({"error": "Failed to send email"}), 500
+       logger.info(f"Order confirmation email queued for order {order.id} to {user.email}")
+       return jsonify({"message": "Order confirmation email queued for delivery"}), 202
 
    except Exception as e:
        logger.error(f"Resend order confirmation error: {str(e)}", exc_info=True)
@@ -496,10 +496,69 @@ def restore_inventory_for_cancelled_order(order_id):
             pass
         return False
 
+def load_order_item_quantities(order_ids):
+    """
+    Quantity per product for each of ``order_ids``, read with one grouped query.
+
+    Returns {order_id: {product_id: quantity}}.
+    """
+    from sqlalchemy import func
+    from ...models.models import OrderItem
+    from ...configuration.extensions import db
+
+    quantities = {}
+    if not order_ids:
+        return quantities
+    rows = db.session.query(
+        OrderItem.order_id, OrderItem.product_id, func.sum(OrderItem.quantity)
+    ).filter(OrderItem.order_id.in_(order_ids)).group_by(OrderItem.order_id, OrderItem.product_id)
+    for order_id, product_id, quantity in rows:
+        quantities.setdefault(order_id, {})[product_id] = int(quantity or 0)
+    return quantities
+
+def lock_product_stock(product_ids):
+    """{product_id: stock_quantity} for ``product_ids``, row-locked until the caller commits."""
+    from ...models.models import Product
+    from ...configuration.extensions import db
+
+    if not product_ids:
+        return {}
+    # Lock in id order so concurrent bulk updates cannot deadlock each other
+    rows = db.session.query(Product.id, Product.stock_quantity).filter(
+        Product.id.in_(product_ids)
+    ).order_by(Product.id).with_for_update()
+    return {product_id: stock or 0 for product_id, stock in rows}
+
+def apply_stock_deltas(deltas):
+    """
+    Add {product_id: delta} to Product.stock_quantity with one executemany UPDATE.
+
+    The caller validates the deltas and commits. Returns the number of products changed.
+    """
+    from sqlalchemy import bindparam, update
+    from ...models.models import Product
+    from ...configuration.extensions import db
+
+    params = [{'b_id': product_id, 'b_delta': delta} for product_id, delta in deltas.items() if delta]
+    if not params:
+        return 0
+    table = Product.__table__
+    db.session.execute(
+        update(table).where(table.c.id == bindparam('b_id')).values(
+            stock_quantity=table.c.stock_quantity + bindparam('b_delta')
+        ),
+        params
+    )
+    logger.info(f"Applied bulk stock changes to {len(params)} products")
+    return len(params)
+
 # Export the main functions
 __all__ = [
     'handle_order_completion',
     'manual_inventory_sync',
     'setup_order_completion_hooks',
-    'restore_inventory_for_cancelled_order'
+    'restore_inventory_for_cancelled_order',
+    'load_order_item_quantities',
+    'lock_product_stock',
+    'apply_stock_deltas'
 ]
@@ -5,7 +5,7 @@ Handles all order-related operations including creation, tracking, and managemen
 
 from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from sqlalchemy import and_, or_, desc, asc, func, extract
+from sqlalchemy import and_, or_, desc, asc, func, extract, case, insert, update
 from sqlalchemy.exc import SQLAlchemyError
 from datetime import datetime, timedelta
 import uuid
@@ -13,6 +13,7 @@ import json
 import logging
 
 from app.configuration.extensions import db
+from app.utils.auth_utils import current_user
 from app.models.models import (
     User, Order, OrderItem, Product, CartItem,
     Address, Coupon, CouponType, OrderStatus, PaymentStatus,
@@ -26,24 +27,14 @@ logger = logging.getLogger(__name__)
 
 
 def get_current_user():
-    """Get current authenticated user."""
-    user_id = get_jwt_identity()
-    return User.query.get(user_id)
+    """Get current authenticated user (loaded once per request)."""
+    return current_user()
 
 
 def generate_order_number():
-    """Generate unique order number using Jumia-style algorithm."""
-    import random
-    import time
-    
-    # Use current timestamp as seed for better uniqueness
-    random.seed(int(time.time() * 1000000) % 1000000)
-    
-    # Generate 9-digit number starting with 3 (like Jumia pattern)
-    first_digit = 3
-    remaining_digits = ''.join([str(random.randint(0, 9)) for _ in range(8)])
-    
-    return f"{first_digit}{remaining_digits}"
+    """Generate a unique 9-digit order number (Jumia-style "3xxxxxxxx")."""
+    from app.services.order_numbers import next_order_number
+    return next_order_number()
 
 
 def calculate_estimated_delivery(shipping_method=None):
@@ -96,18 +87,77 @@ def validate_coupon(coupon_code, order_total):
     return min(discount, order_total), None
 
 
-def update_inventory_on_order(order_items):
-    """Update inventory when order is created."""
+class InsufficientStockError(Exception):
+    """Raised when a conditional stock reservation does not cover every order line."""
+
+
+def lock_order_lines(lines, lock=True):
+    """
+    Load and row-lock the products and inventory rows for a set of order lines.
+
+    Rows are locked in ascending ID order so that concurrent checkouts touching
+    overlapping SKUs always acquire locks in the same order and cannot deadlock.
+    With ``lock=False`` the same rows are read without locks, for validating a
+    basket before the reservation. Returns (products_by_id, inventory_by_key)
+    where the inventory key is (product_id, variant_id).
+    """
+    product_ids = sorted({line['product_id'] for line in lines})
+    products = Product.query.filter(Product.id.in_(product_ids)).order_by(Product.id)
+    products = (products.with_for_update() if lock else products).all()
+
+    keys = {(line['product_id'], line.get('variant_id')) for line in lines}
+    conditions = [
+        and_(Inventory.product_id == product_id,
+             Inventory.variant_id.is_(None) if variant_id is None else Inventory.variant_id == variant_id)
+        for product_id, variant_id in keys
+    ]
+    inventory_rows = []
+    if conditions:
+        inventory_query = Inventory.query.filter(or_(*conditions)).order_by(Inventory.id)
+        inventory_rows = (inventory_query.with_for_update() if lock else inventory_query).all()
+
+    return (
+        {product.id: product for product in products},
+        {(row.product_id, row.variant_id): row for row in inventory_rows}
+    )
+
+
+def update_inventory_on_order(order_items, inventory_by_key):
+    """
+    Reserve stock for all order lines with one conditional bulk UPDATE.
+
+    Does not commit; the caller owns the transaction. Lines without an
+    inventory record are not tracked and are skipped. Raises
+    InsufficientStockError if any guarded row no longer has enough stock, or
+    if a non-positive quantity would release stock instead of reserving it.
+    """
+    quantities = {}
     for item in order_items:
-        inventory = Inventory.query.filter_by(
-            product_id=item['product_id'],
-            variant_id=item.get('variant_id')
-        ).first()
-        
-        if inventory:
-            inventory.reserve_stock(item['quantity'])
-    
-    db.session.commit()
+        inventory = inventory_by_key.get((item['product_id'], item.get('variant_id')))
+        if inventory is not None:
+            quantities[inventory.id] = quantities.get(inventory.id, 0) + item['quantity']
+
+    if not quantities:
+        return []
+
+    requested = case(quantities, value=Inventory.id)
+    new_available = Inventory.stock_level - Inventory.reserved_quantity - requested
+    result = db.session.execute(
+        update(Inventory)
+        .where(Inventory.id.in_(list(quantities)))
+        .where(requested > 0)
+        .where(Inventory.stock_level - Inventory.reserved_quantity >= requested)
+        .values(
+            reserved_quantity=Inventory.reserved_quantity + requested,
+            status=case((new_available <= 0, 'out_of_stock'), else_='active'),
+            last_updated=func.now()
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != len(quantities):
+        raise InsufficientStockError('Stock changed while placing the order')
+
+    return [key for key, row in inventory_by_key.items() if row.id in quantities]
 
 
 def restore_inventory_on_cancel(order):
@@ -129,14 +179,14 @@ def restore_inventory_on_cancel(order):
 def get_user_orders():
     """Get user's orders with filtering and pagination."""
     try:
-        logger.info("[v0] get_user_orders function called")
-        logger.info(f"[v0] Request args: {dict(request.args)}")
+        logger.debug("[v0] get_user_orders function called")
+        logger.debug(f"[v0] Request args: {dict(request.args)}")
         
-        logger.info("[v0] Starting get_user_orders request")
+        logger.debug("[v0] Starting get_user_orders request")
         
         try:
             user = get_current_user()
-            logger.info(f"[v0] get_current_user() completed, user: {user.id if user else 'None'}")
+            logger.debug(f"[v0] get_current_user() completed, user: {user.id if user else 'None'}")
         except Exception as e:
             logger.error(f"[v0] Error in get_current_user(): {str(e)}")
             return jsonify({
@@ -151,7 +201,7 @@ def get_user_orders():
                 'error': 'User not found'
             }), 404
         
-        logger.info(f"[v0] Found user {user.id} for orders request")
+        logger.debug(f"[v0] Found user {user.id} for orders request")
         
         # Get query parameters
         page = request.args.get('page', 1, type=int)
@@ -164,12 +214,12 @@ def get_user_orders():
         sort_order = request.args.get('sort_order', 'desc')
         include_items = request.args.get('include_items', 'false').lower() == 'true'
         
-        logger.info(f"[v0] Query params - page: {page}, per_page: {per_page}, status: {status}")
+        logger.debug(f"[v0] Query params - page: {page}, per_page: {per_page}, status: {status}")
         
         try:
             # Build query
             query = Order.query.filter_by(user_id=user.id)
-            logger.info(f"[v0] Base query created for user {user.id}")
+            logger.debug(f"[v0] Base query created for user {user.id}")
         except Exception as e:
             logger.error(f"[v0] Error building base query: {str(e)}")
             return jsonify({
@@ -205,7 +255,7 @@ def get_user_orders():
                     }), 400
                 
                 query = query.filter(Order.status == status_enum)
-                logger.info(f"[v0] Applied status filter: {status_lower} -> {status_enum}")
+                logger.debug(f"[v0] Applied status filter: {status_lower} -> {status_enum}")
                 
             except Exception as e:
                 logger.error(f"[v0] Status filter error: {str(e)}")
@@ -218,7 +268,7 @@ def get_user_orders():
             try:
                 start_dt = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
                 query = query.filter(Order.created_at >= start_dt)
-                logger.info(f"[v0] Applied start_date filter: {start_date}")
+                logger.debug(f"[v0] Applied start_date filter: {start_date}")
             except ValueError as e:
                 logger.error(f"[v0] Start date parsing error: {str(e)}")
                 return jsonify({
@@ -230,7 +280,7 @@ def get_user_orders():
             try:
                 end_dt = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
                 query = query.filter(Order.created_at <= end_dt)
-                logger.info(f"[v0] Applied end_date filter: {end_date}")
+                logger.debug(f"[v0] Applied end_date filter: {end_date}")
             except ValueError as e:
                 logger.error(f"[v0] End date parsing error: {str(e)}")
                 return jsonify({
@@ -246,7 +296,7 @@ def get_user_orders():
                         Order.notes.ilike(f'%{search}%')
                     )
                 )
-                logger.info(f"[v0] Applied search filter: {search}")
+                logger.debug(f"[v0] Applied search filter: {search}")
             except Exception as e:
                 logger.error(f"[v0] Search filter error: {str(e)}")
                 return jsonify({
@@ -270,7 +320,7 @@ def get_user_orders():
             else:
                 query = query.order_by(desc(sort_column))
             
-            logger.info(f"[v0] Applied sorting: {sort_by} {sort_order}")
+            logger.debug(f"[v0] Applied sorting: {sort_by} {sort_order}")
         except Exception as e:
             logger.error(f"[v0] Sorting error: {str(e)}")
             return jsonify({
@@ -280,7 +330,7 @@ def get_user_orders():
         
         try:
             # Execute pagination
-            logger.info(f"[v0] Executing paginated query...")
+            logger.debug(f"[v0] Executing paginated query...")
             
             try:
                 pagination = query.paginate(
@@ -302,8 +352,8 @@ def get_user_orders():
                     raise enum_error
             
             orders = pagination.items
-            logger.info(f"[v0] Found {len(orders)} orders for user {user.id}")
-            logger.info(f"[v0] Pagination - Total: {pagination.total}, Pages: {pagination.pages}")
+            logger.debug(f"[v0] Found {len(orders)} orders for user {user.id}")
+            logger.debug(f"[v0] Pagination - Total: {pagination.total}, Pages: {pagination.pages}")
         except Exception as e:
             logger.error(f"[v0] Pagination error: {str(e)}")
             return jsonify({
@@ -491,7 +541,7 @@ def get_user_orders():
                 except Exception as fallback_error:
                     logger.error(f"[v0] Even fallback order processing failed: {str(fallback_error)}")
         
-        logger.info(f"[v0] Successfully processed {len(orders_data)} orders")
+        logger.debug(f"[v0] Successfully processed {len(orders_data)} orders")
         
         return jsonify({
             'success': True,
@@ -561,6 +611,15 @@ def get_user_order(order_id):
         }), 500
 
 
+def reject_order(message, status_code=400):
+    """End the checkout transaction (and any row locks it holds) and return an error."""
+    db.session.rollback()
+    return jsonify({
+        'success': False,
+        'error': message
+    }), status_code
+
+
 @order_routes.route('', methods=['POST'])
 @jwt_required()
 def create_order():
@@ -577,7 +636,7 @@ def create_order():
         # Handle JSON parsing errors
         try:
             data = request.get_json()
-            logger.info(f"[v0] Order creation request data: {json.dumps(data, indent=2) if data else 'None'}")
+            logger.debug(f"[v0] Order creation request data: {json.dumps(data, indent=2) if data else 'None'}")
         except Exception as e:
             logger.error(f"[v0] JSON parsing error: {str(e)}")
             return jsonify({
@@ -605,131 +664,128 @@ def create_order():
                 'error': f'Missing required fields: {", ".join(missing_fields)}'
             }), 400
         
-        logger.info(f"[v0] Creating order for user {user.id} with payment method: {data.get('payment_method')}")
-        
+        logger.debug(f"[v0] Creating order for user {user.id} with payment method: {data.get('payment_method')}")
+
+        # Cheap request validation first, before any row is read or locked
+        payment_method = str(data['payment_method']).lower().strip()
+        valid_payment_methods = ['pesapal', 'cash_on_delivery', 'cod', 'mpesa']
+        if payment_method not in valid_payment_methods:
+            logger.error(f"[v0] Invalid payment method: {payment_method}")
+            return jsonify({
+                'success': False,
+                'error': f'Invalid payment method. Must be one of: {", ".join(valid_payment_methods)}'
+            }), 400
+
+        # Normalize payment method
+        if payment_method in ['cod', 'cash_on_delivery']:
+            payment_method = 'cash_on_delivery'
+        order_status = OrderStatus.PENDING
+        payment_status = PaymentStatus.PENDING
+
+        # Validate shipping address
+        shipping_address = data.get('shipping_address')
+        if not shipping_address:
+            logger.error("[v0] Shipping address is required but not provided")
+            return jsonify({
+                'success': False,
+                'error': 'Shipping address is required'
+            }), 400
+
+        if isinstance(shipping_address, dict):
+            required_address_fields = ['first_name', 'last_name', 'address_line1', 'city', 'phone']
+            missing_address_fields = [field for field in required_address_fields if not shipping_address.get(field)]
+            if missing_address_fields:
+                logger.error(f"[v0] Missing address fields: {missing_address_fields}")
+                return jsonify({
+                    'success': False,
+                    'error': f'Missing required address fields: {", ".join(missing_address_fields)}'
+                }), 400
+
         cart_items = CartItem.query.filter_by(user_id=user.id).all()
         request_items = data.get('items', [])
-        
-        logger.info(f"[v0] Found {len(cart_items)} cart items and {len(request_items)} request items")
-        
+
+        logger.debug(f"[v0] Found {len(cart_items)} cart items and {len(request_items)} request items")
+
         # If no cart items but items provided in request, use request items
         if not cart_items and request_items:
-            logger.info("[v0] Processing items from request payload")
-            # Process items from request payload
-            order_items = []
-            subtotal = 0.0
-            
+            logger.debug("[v0] Processing items from request payload")
+            lines = []
             for i, item_data in enumerate(request_items):
-                logger.info(f"[v0] Processing item {i}: {item_data}")
-                
                 if 'product_id' not in item_data:
                     logger.error(f"[v0] Missing product_id in item {i}")
-                    return jsonify({
-                        'success': False,
-                        'error': f'Missing product_id in item {i}'
-                    }), 400
-                
-                product = Product.query.get(item_data['product_id'])
-                if not product:
-                    logger.error(f"[v0] Product {item_data['product_id']} not found")
-                    return jsonify({
-                        'success': False,
-                        'error': f'Product {item_data["product_id"]} not found'
-                    }), 404
-                
-                if not product.is_active:
-                    logger.error(f"[v0] Product {product.name} is not active")
-                    return jsonify({
-                        'success': False,
-                        'error': f'Product {product.name} is not available'
-                    }), 400
-                
-                quantity = item_data.get('quantity', 1)
-                price = float(item_data.get('price', product.sale_price or product.price))
-                
-                logger.info(f"[v0] Item details - Product: {product.name}, Quantity: {quantity}, Price: {price}")
-                
-                # Check inventory
-                inventory = Inventory.query.filter_by(
-                    product_id=product.id,
-                    variant_id=item_data.get('variant_id')
-                ).first()
-                
-                if inventory and inventory.available_quantity < quantity:
-                    logger.error(f"[v0] Insufficient stock for {product.name}. Available: {inventory.available_quantity}, Requested: {quantity}")
-                    return jsonify({
-                        'success': False,
-                        'error': f'Insufficient stock for {product.name}. Available: {inventory.available_quantity}'
-                    }), 400
-                
-                item_total = price * quantity
-                subtotal += item_total
-                
-                order_items.append({
-                    'product_id': product.id,
-                    'variant_id': item_data.get('variant_id'),
-                    'quantity': quantity,
-                    'price': price,
-                    'total': item_total
-                })
-        
+                    return reject_order(f'Missing product_id in item {i}')
+
+                # IDs and quantities may arrive as strings ("5"); rows are keyed by int
+                try:
+                    variant_id = item_data.get('variant_id')
+                    lines.append({
+                        'product_id': int(item_data['product_id']),
+                        'variant_id': int(variant_id) if variant_id not in (None, '') else None,
+                        'quantity': int(item_data.get('quantity', 1)),
+                        'price': item_data['price'] if 'price' in item_data else None
+                    })
+                except (TypeError, ValueError):
+                    logger.error(f"[v0] Invalid product_id, variant_id or quantity in item {i}")
+                    return reject_order(f'Invalid product_id, variant_id or quantity in item {i}')
+
+                if lines[-1]['quantity'] < 1:
+                    logger.error(f"[v0] Invalid quantity {lines[-1]['quantity']} in item {i}")
+                    return reject_order(f'Quantity must be at least 1 in item {i}')
         elif cart_items:
-            logger.info("[v0] Processing items from user cart")
-            # Process items from cart (existing logic)
-            subtotal = 0.0
-            order_items = []
-            
-            for cart_item in cart_items:
-                product = Product.query.get(cart_item.product_id)
-                if not product:
-                    logger.error(f"[v0] Cart product {cart_item.product_id} not found")
-                    return jsonify({
-                        'success': False,
-                        'error': f'Product {cart_item.product_id} not found'
-                    }), 404
-                
-                if not product.is_active:
-                    logger.error(f"[v0] Cart product {product.name} is not active")
-                    return jsonify({
-                        'success': False,
-                        'error': f'Product {product.name} is not available'
-                    }), 400
-                
-                quantity = cart_item.quantity
-                price = float(product.sale_price or product.price)
-                
-                # Check inventory
-                inventory = Inventory.query.filter_by(
-                    product_id=product.id,
-                    variant_id=cart_item.variant_id
-                ).first()
-                
-                if inventory and inventory.available_quantity < quantity:
-                    logger.error(f"[v0] Insufficient cart stock for {product.name}. Available: {inventory.available_quantity}, Requested: {quantity}")
-                    return jsonify({
-                        'success': False,
-                        'error': f'Insufficient stock for {product.name}. Available: {inventory.available_quantity}'
-                    }), 400
-                
-                item_total = price * quantity
-                subtotal += item_total
-                
-                order_items.append({
-                    'product_id': product.id,
-                    'variant_id': cart_item.variant_id,
-                    'quantity': quantity,
-                    'price': price,
-                    'total': item_total
-                })
+            logger.debug("[v0] Processing items from user cart")
+            lines = [{
+                'product_id': cart_item.product_id,
+                'variant_id': cart_item.variant_id,
+                'quantity': cart_item.quantity,
+                'price': None
+            } for cart_item in cart_items]
         else:
             logger.error("[v0] No cart items and no request items provided")
-            return jsonify({
-                'success': False,
-                'error': 'Cart is empty and no items provided'
-            }), 400
-        
-        logger.info(f"[v0] Order items processed successfully. Subtotal: {subtotal}")
-        
+            return reject_order('Cart is empty and no items provided')
+
+        # Validate the basket against unlocked reads; rows are only locked right
+        # before the reservation, once everything else has been checked.
+        products_by_id, inventory_by_key = lock_order_lines(lines, lock=False)
+
+        subtotal = 0.0
+        order_items = []
+        requested_by_key = {}
+
+        for line in lines:
+            product = products_by_id.get(line['product_id'])
+            if not product:
+                logger.error(f"[v0] Product {line['product_id']} not found")
+                return reject_order(f'Product {line["product_id"]} not found', 404)
+
+            if not product.is_active:
+                logger.error(f"[v0] Product {product.name} is not active")
+                return reject_order(f'Product {product.name} is not available')
+
+            quantity = line['quantity']
+            price = float(line['price'] if line['price'] is not None else (product.sale_price or product.price))
+
+            # Check inventory against everything this basket asks of the row
+            key = (product.id, line['variant_id'])
+            requested_by_key[key] = requested_by_key.get(key, 0) + quantity
+            inventory = inventory_by_key.get(key)
+
+            if inventory and inventory.available_quantity < requested_by_key[key]:
+                logger.error(f"[v0] Insufficient stock for {product.name}. Available: {inventory.available_quantity}, Requested: {requested_by_key[key]}")
+                return reject_order(f'Insufficient stock for {product.name}. Available: {inventory.available_quantity}')
+
+            item_total = price * quantity
+            subtotal += item_total
+
+            order_items.append({
+                'product_id': product.id,
+                'variant_id': line['variant_id'],
+                'quantity': quantity,
+                'price': price,
+                'total': item_total
+            })
+
+        logger.debug(f"[v0] Order items processed successfully. Subtotal: {subtotal}")
+
         # Apply coupon if provided
         coupon_code = data.get('coupon_code')
         discount = 0.0
@@ -737,11 +793,8 @@ def create_order():
             discount, coupon_error = validate_coupon(coupon_code, subtotal)
             if coupon_error:
                 logger.error(f"[v0] Coupon validation error: {coupon_error}")
-                return jsonify({
-                    'success': False,
-                    'error': coupon_error
-                }), 400
-        
+                return reject_order(coupon_error)
+
         cart_totals = data.get('cart_totals')
         if cart_totals and isinstance(cart_totals, dict):
             try:
@@ -750,85 +803,30 @@ def create_order():
                 shipping_cost = float(cart_totals.get('shipping', 0.0))
                 tax = float(cart_totals.get('tax', 0.0))
                 total_amount = float(cart_totals.get('total', subtotal + shipping_cost + tax - discount))
-                
-                logger.info(f"[v0] Using frontend cart totals - Subtotal: {subtotal}, Tax: {tax}, Shipping: {shipping_cost}, Total: {total_amount}")
+
+                logger.debug(f"[v0] Using frontend cart totals - Subtotal: {subtotal}, Tax: {tax}, Shipping: {shipping_cost}, Total: {total_amount}")
             except (ValueError, TypeError) as e:
                 logger.error(f"[v0] Error parsing cart_totals: {str(e)}")
-                return jsonify({
-                    'success': False,
-                    'error': 'Invalid cart totals format'
-                }), 400
+                return reject_order('Invalid cart totals format')
         else:
             # Fallback to backend calculation if no cart totals provided
             try:
                 shipping_cost = float(data.get('shipping_cost', 0.0))
                 tax = float(data.get('tax', 0.0))
                 total_amount = subtotal + shipping_cost + tax - discount
-                
-                logger.info(f"[v0] Using backend calculated totals - Subtotal: {subtotal}, Tax: {tax}, Shipping: {shipping_cost}, Total: {total_amount}")
+
+                logger.debug(f"[v0] Using backend calculated totals - Subtotal: {subtotal}, Tax: {tax}, Shipping: {shipping_cost}, Total: {total_amount}")
             except (ValueError, TypeError) as e:
                 logger.error(f"[v0] Error calculating totals: {str(e)}")
-                return jsonify({
-                    'success': False,
-                    'error': 'Invalid numeric values in order data'
-                }), 400
+                return reject_order('Invalid numeric values in order data')
 
-        # Validate shipping address
-        shipping_address = data.get('shipping_address')
-        if not shipping_address:
-            logger.error("[v0] Shipping address is required but not provided")
-            return jsonify({
-                'success': False,
-                'error': 'Shipping address is required'
-            }), 400
-        
-        if isinstance(shipping_address, dict):
-            required_address_fields = ['first_name', 'last_name', 'address_line1', 'city', 'phone']
-            missing_address_fields = [field for field in required_address_fields if not shipping_address.get(field)]
-            if missing_address_fields:
-                logger.error(f"[v0] Missing address fields: {missing_address_fields}")
-                return jsonify({
-                    'success': False,
-                    'error': f'Missing required address fields: {", ".join(missing_address_fields)}'
-                }), 400
-        
-        logger.info(f"[v0] Shipping address validated: {type(shipping_address)}")
-        
         order_number = generate_order_number()
-        logger.info(f"[v0] Generated order number: {order_number}")
-        
-        try:
-            payment_method = data['payment_method'].lower().strip()
-            
-            # Validate payment method
-            valid_payment_methods = ['pesapal', 'cash_on_delivery', 'cod', 'mpesa']
-            if payment_method not in valid_payment_methods:
-                logger.error(f"[v0] Invalid payment method: {payment_method}")
-                return jsonify({
-                    'success': False,
-                    'error': f'Invalid payment method. Must be one of: {", ".join(valid_payment_methods)}'
-                }), 400
-            
-            # Normalize payment method
-            if payment_method in ['cod', 'cash_on_delivery']:
-                payment_method = 'cash_on_delivery'
-            
-            if payment_method == 'cash_on_delivery':
-                order_status = OrderStatus.PENDING
-                payment_status = PaymentStatus.PENDING
-            else:
-                order_status = OrderStatus.PENDING
-                payment_status = PaymentStatus.PENDING
-                
-            logger.info(f"[v0] Set order status: {order_status}, payment status: {payment_status}")
-                
-        except (ValueError, AttributeError, KeyError) as e:
-            logger.error(f"[v0] Error setting order status enums: {str(e)}")
-            return jsonify({
-                'success': False,
-                'error': 'Invalid payment method or order status configuration'
-            }), 400
-        
+        logger.debug(f"[v0] Generated order number: {order_number}")
+
+        # Lock every inventory row the order touches, in ID order, for the rest of
+        # this transaction; the guarded reservation below re-checks the stock.
+        _, inventory_by_key = lock_order_lines(lines)
+
         try:
             # Create order - let database auto-generate integer ID
             order = Order(
@@ -847,12 +845,12 @@ def create_order():
                 notes=data.get('notes', '')
             )
 
-            logger.info(f"[v0] Created order object with total_amount: {total_amount}, subtotal: {subtotal}, tax: {tax}, shipping: {shipping_cost}")
+            logger.debug(f"[v0] Created order object with total_amount: {total_amount}, subtotal: {subtotal}, tax: {tax}, shipping: {shipping_cost}")
 
             db.session.add(order)
             db.session.flush()  # Flush to get the order ID before creating items
             
-            logger.info(f"[v0] Order flushed to database with ID: {order.id}")
+            logger.debug(f"[v0] Order flushed to database with ID: {order.id}")
             
         except Exception as e:
             logger.error(f"[v0] Error creating order object: {str(e)}")
@@ -862,60 +860,37 @@ def create_order():
                 'error': 'Failed to create order in database'
             }), 500
         
-        # Create order items
+        # Create order items, reserve stock and update the coupon and cart in the
+        # same transaction so a failure at any point leaves nothing behind.
         try:
-            for i, item_data in enumerate(order_items):
-                order_item = OrderItem(
-                    order_id=order.id,
-                    product_id=item_data['product_id'],
-                    variant_id=item_data['variant_id'],
-                    quantity=item_data['quantity'],
-                    price=item_data['price'],
-                    total=item_data['total']
+            db.session.execute(
+                insert(OrderItem),
+                [dict(item_data, order_id=order.id) for item_data in order_items]
+            )
+            logger.debug(f"[v0] Inserted {len(order_items)} order items")
+
+            reserved_keys = update_inventory_on_order(order_items, inventory_by_key)
+
+            if coupon_code and discount > 0:
+                Coupon.query.filter_by(code=coupon_code).update(
+                    {Coupon.used_count: func.coalesce(Coupon.used_count, 0) + 1},
+                    synchronize_session=False
                 )
-                db.session.add(order_item)
-                logger.info(f"[v0] Added order item {i}: Product {item_data['product_id']}, Quantity {item_data['quantity']}")
-        except Exception as e:
-            logger.error(f"[v0] Error creating order items: {str(e)}")
+
+            # Clear user's cart if specified and we used cart items
+            if data.get('clear_cart', True) and cart_items:
+                CartItem.query.filter_by(user_id=user.id).delete(synchronize_session=False)
+
+            # DO NOT send confirmation email here - it will be sent from Pesapal callback after payment is confirmed
+            db.session.commit()
+            logger.debug(f"[v0] Order {order_number} committed to database successfully")
+        except InsufficientStockError as e:
             db.session.rollback()
+            logger.error(f"[v0] Stock reservation failed for order {order_number}: {str(e)}")
             return jsonify({
                 'success': False,
-                'error': 'Failed to create order items'
-            }), 500
-        
-        # Update coupon usage
-        if coupon_code and discount > 0:
-            try:
-                coupon = Coupon.query.filter_by(code=coupon_code).first()
-                if coupon:
-                    coupon.used_count += 1
-                    logger.info(f"[v0] Updated coupon usage for {coupon_code}")
-            except Exception as e:
-                logger.warning(f"[v0] Could not update coupon usage: {str(e)}")
-        
-        try:
-            # Update inventory
-            update_inventory_on_order(order_items)
-            logger.info("[v0] Inventory updated successfully")
-        except Exception as e:
-            logger.warning(f"[v0] Could not update inventory: {str(e)}")
-            # Continue without inventory update - don't fail the order
-        
-        # Clear user's cart if specified and we used cart items
-        if data.get('clear_cart', True) and cart_items:
-            try:
-                CartItem.query.filter_by(user_id=user.id).delete()
-                logger.info("[v0] User cart cleared")
-            except Exception as e:
-                logger.warning(f"[v0] Could not clear cart: {str(e)}")
-                # Continue without clearing cart - don't fail the order
-        
-        # DO NOT send confirmation email here - it will be sent from Pesapal callback after payment is confirmed
-        logger.info(f"[v0] Order {order_number} created successfully. Email will be sent after payment confirmation.")
-        
-        try:
-            db.session.commit()
-            logger.info(f"[v0] Order {order_number} committed to database successfully")
+                'error': 'Insufficient stock for one or more items'
+            }), 400
         except Exception as e:
             logger.error(f"[v0] Database commit failed: {str(e)}")
             db.session.rollback()
@@ -923,7 +898,14 @@ def create_order():
                 'success': False,
                 'error': 'Failed to save order to database'
             }), 500
-        
+
+        # The bulk stock UPDATE bypasses the ORM, so refresh the availability cache explicitly
+        try:
+            from app.services.inventory_cache import refresh_availability
+            refresh_availability(reserved_keys)
+        except Exception as e:
+            logger.warning(f"[v0] Could not refresh availability cache: {str(e)}")
+
         try:
             order_data = order.to_dict()
             order_data['items'] = [item.to_dict() for item in order.items]
@@ -219,6 +219,10 @@ def initiate_payment():
                 transaction.status = 'pending'
                 transaction.updated_at = datetime.now(timezone.utc)
 
+                # The reconciliation worker polls M-PESA until the callback or a query settles it
+                from app.services.payment_reconciliation import schedule_status_check
+                schedule_status_check(transaction)
+
                 db.session.commit()
 
                 logger.info(f"STK Push initiated successfully for user {user_id}, order {order_id}")
@@ -275,7 +279,7 @@ def initiate_payment():
 @jwt_required()
 @cross_origin()
 def check_payment_status(transaction_id):
-    """Check M-PESA payment status"""
+    """Check M-PESA payment status (local read; updates are also pushed as 'payment_status')"""
     try:
         user_id = get_jwt_identity()
 
@@ -288,53 +292,8 @@ def check_payment_status(transaction_id):
         if not transaction:
             return jsonify({"error": "Transaction not found"}), 404
 
-        # If transaction is still pending and has checkout_request_id, query M-PESA
-        if transaction.status == 'pending' and transaction.checkout_request_id and mpesa_client:
-            try:
-                status_response = mpesa_client.query_stk_status(transaction.checkout_request_id)
-
-                if status_response.get('ResponseCode') == '0':
-                    result_code = status_response.get('ResultCode')
-
-                    if result_code == '0':
-                        # Payment successful
-                        transaction.status = 'completed'
-                        transaction.result_code = str(result_code)
-                        transaction.result_desc = status_response.get('ResultDesc')
-                        transaction.mpesa_receipt_number = status_response.get('MpesaReceiptNumber')
-                        transaction.transaction_date = datetime.now(timezone.utc)
-                        transaction.callback_received_at = datetime.now(timezone.utc)
-                        transaction.updated_at = datetime.now(timezone.utc)
-
-                        # Update order status
-                        order = Order.query.get(transaction.order_id)
-                        if order:
-                            if hasattr(order, 'payment_status'):
-                                order.payment_status = 'paid'  # Changed from PaymentStatus.PAID
-                            if hasattr(order, 'status'):
-                                order.status = 'confirmed'  # Changed from OrderStatus.CONFIRMED
-
-                        db.session.commit()
-
-                    elif result_code in ['1032', '1037']:
-                        # Payment cancelled by user
-                        transaction.status = 'cancelled'
-                        transaction.result_code = str(result_code)
-                        transaction.result_desc = status_response.get('ResultDesc')
-                        transaction.updated_at = datetime.now(timezone.utc)
-                        db.session.commit()
-
-                    else:
-                        # Payment failed
-                        transaction.status = 'failed'
-                        transaction.result_code = str(result_code)
-                        transaction.result_desc = status_response.get('ResultDesc')
-                        transaction.updated_at = datetime.now(timezone.utc)
-                        db.session.commit()
-
-            except Exception as e:
-                logger.error(f"Error querying STK status: {str(e)}")
-
+        # Pending payments are settled by the callback or the reconciliation worker
+        # (app.services.payment_reconciliation); this endpoint only reads local state.
         return jsonify({
             "transaction_id": transaction.id,
             "status": transaction.status,
@@ -435,54 +394,10 @@ def mpesa_callback():
             logger.info(f"Callback received for already processed transaction {transaction.id} (status: {transaction.status})")
             return jsonify({"ResultCode": 0, "ResultDesc": "Success"}), 200
 
-        # Update transaction
-        transaction.result_code = str(result_code)
-        transaction.result_desc = result_desc
-        transaction.callback_response = str(callback_data)
-        transaction.callback_received_at = datetime.now(timezone.utc)
-        transaction.updated_at = datetime.now(timezone.utc)
-
-        if result_code == 0:
-            # Payment successful
-            transaction.status = 'completed'
-            transaction.transaction_date = datetime.now(timezone.utc)
-
-            # Extract M-PESA receipt number from callback items with proper error handling
-            try:
-                callback_metadata = stk_callback.get('CallbackMetadata', {})
-                items = callback_metadata.get('Item', [])
-
-                # Ensure items is a list
-                if isinstance(items, list):
-                    for item in items:
-                        if isinstance(item, dict) and item.get('Name') == 'MpesaReceiptNumber':
-                            transaction.mpesa_receipt_number = item.get('Value')
-                            break
-            except Exception as metadata_error:
-                logger.warning(f"Error parsing callback metadata: {str(metadata_error)}")
-
-            # Update order status
-            try:
-                order = Order.query.get(transaction.order_id)
-                if order:
-                    if hasattr(order, 'payment_status'):
-                        order.payment_status = 'paid'  # Changed from PaymentStatus.PAID
-                    if hasattr(order, 'status'):
-                        order.status = 'confirmed'  # Changed from OrderStatus.CONFIRMED
-            except Exception as order_error:
-                logger.warning(f"Error updating order status: {str(order_error)}")
-
-            logger.info(f"Payment completed for transaction {transaction.id}")
-
-        elif result_code in [1032, 1037]:
-            # Payment cancelled
-            transaction.status = 'cancelled'
-            logger.info(f"Payment cancelled for transaction {transaction.id}")
-
-        else:
-            # Payment failed
-            transaction.status = 'failed'
-            logger.info(f"Payment failed for transaction {transaction.id}: {result_desc}")
+        # Persist and acknowledge; the job worker applies it once (app.services.payment_callbacks)
+        from app.services.payment_callbacks import record_callback
+        record_callback('mpesa', checkout_request_id, callback_data, transaction_id=transaction.id)
+        logger.info(f"M-PESA callback queued for transaction {transaction.id} (ResultCode {result_code}: {result_desc})")
 
         db.session.commit()
 
@@ -578,43 +493,24 @@ def admin_get_transactions():
 def admin_get_stats():
     """Get M-PESA payment statistics (Admin only)"""
     try:
-        from sqlalchemy import func, and_
+        from app.services.payment_stats import payment_stats
 
         # Get date range
         days = request.args.get('days', 30, type=int)
         start_date = datetime.now(timezone.utc) - timedelta(days=days)
 
-        # Total transactions
-        total_transactions = MpesaTransaction.query.count()
-
-        # Recent transactions
-        recent_transactions = MpesaTransaction.query.filter(
-            MpesaTransaction.created_at >= start_date
-        ).count()
-
-        # Transaction status counts
-        status_counts = db.session.query(
-            MpesaTransaction.status,
-            func.count(MpesaTransaction.id)
-        ).group_by(MpesaTransaction.status).all()
-
-        # Total amount processed
-        total_amount = db.session.query(
-            func.sum(MpesaTransaction.amount)
-        ).filter(MpesaTransaction.status == 'completed').scalar() or 0
-
-        # Recent amount processed
-        recent_amount = db.session.query(
-            func.sum(MpesaTransaction.amount)
-        ).filter(
-            and_(
-                MpesaTransaction.status == 'completed',
-                MpesaTransaction.created_at >= start_date
-            )
-        ).scalar() or 0
+        # Aggregated in the database (daily rollups for closed days)
+        overall = payment_stats('mpesa')
+        recent = payment_stats('mpesa', start_date)
+
+        total_transactions = overall['total_transactions']
+        recent_transactions = recent['total_transactions']
+        status_counts = [(status, entry['count']) for status, entry in overall['by_status'].items()]
+        total_amount = overall['by_status'].get('completed', {}).get('amount', 0)
+        recent_amount = recent['by_status'].get('completed', {}).get('amount', 0)
 
         # Success rate
-        completed_count = MpesaTransaction.query.filter_by(status='completed').count()
+        completed_count = overall['by_status'].get('completed', {}).get('count', 0)
         success_rate = (completed_count / total_transactions * 100) if total_transactions > 0 else 0
 
         return jsonify({
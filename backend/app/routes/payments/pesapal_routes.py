@@ -427,7 +427,11 @@ def initiate_card_payment():
                 transaction.payment_url = payment_response.get('redirect_url')
                 transaction.status = 'pending'
                 transaction.pesapal_response = json.dumps(payment_response)
-                
+
+                # The reconciliation worker polls Pesapal until the IPN or a query settles it
+                from app.services.payment_reconciliation import schedule_status_check
+                schedule_status_check(transaction)
+
                 db.session.commit()
 
                 logger.info(f"Card payment initiated successfully for transaction {transaction.id}")
@@ -484,8 +488,9 @@ def initiate_card_payment():
 def check_card_payment_status(transaction_id):
     """
     Check Pesapal card payment status.
-    
-    
+
+    Reads the local transaction only; the reconciliation worker queries Pesapal.
+
     Returns:
     {
         "status": "success",
@@ -562,18 +567,6 @@ def check_card_payment_status(transaction_id):
 
         logger.info(f"[v0] Transaction found - Status: {transaction.status}, Order: {transaction.order_id}")
 
-        # Check if transaction is expired
-        current_time = datetime.now(timezone.utc)
-        expires_at = transaction.expires_at
-        if expires_at and expires_at.tzinfo is None:
-            expires_at = expires_at.replace(tzinfo=timezone.utc)
-        
-        if (expires_at and current_time > expires_at and transaction.status == 'pending'):
-            transaction.status = 'expired'
-            transaction.error_message = 'Transaction expired'
-            db.session.commit()
-            logger.info(f"[v0] Transaction {transaction.id} marked as expired")
-
         # If transaction is in final state, return current status
         if transaction.status in ['completed', 'failed', 'cancelled', 'expired']:
             logger.info(f"[v0] Transaction in final state: {transaction.status}")
@@ -599,74 +592,9 @@ def check_card_payment_status(transaction_id):
                 'transaction_data': transaction_data
             }, get_payment_status_message(transaction.status))
 
-        # Query Pesapal for current status
-        logger.info(f"[v0] Querying Pesapal for current status of tracking ID: {transaction.pesapal_tracking_id}")
-        if hasattr(transaction, 'pesapal_tracking_id') and transaction.pesapal_tracking_id:
-            try:
-                status_response = get_transaction_status(transaction.pesapal_tracking_id)
-                
-                if status_response and status_response.get('status') == 'success':
-                    payment_status = status_response.get('payment_status_description', '').upper()
-                    status_code = status_response.get('status_code')
-                    
-                    logger.info(f"[v0] Pesapal status response - payment_status_description: {payment_status}, status_code: {status_code}")
-                    
-                    if payment_status in ['COMPLETED', 'COMPLETE', 'SUCCESS'] or status_code == 1:
-                        # Card payment successful
-                        transaction.status = 'completed'
-                        transaction.payment_method = status_response.get('payment_method', 'CARD')
-                        transaction.pesapal_receipt_number = status_response.get('confirmation_code')
-                        transaction.transaction_date = datetime.now(timezone.utc)
-                        
-                        # Extract card details if available
-                        payment_account = status_response.get('payment_account', '')
-                        if payment_account and '*' in payment_account:
-                            # Extract last 4 digits and card type
-                            if payment_account.startswith('****'):
-                                transaction.last_four_digits = payment_account[-4:]
-                            # Card type detection (basic)
-                            if 'visa' in payment_account.lower():
-                                transaction.card_type = 'VISA'
-                            elif 'master' in payment_account.lower():
-                                transaction.card_type = 'MASTERCARD'
-
-                        # Update order status
-                        if transaction.order_id:
-                            order = Order.query.filter_by(order_number=transaction.order_id).first()
-                            if order:
-                                if hasattr(order, 'payment_status'):
-                                    order.payment_status = 'paid'
-                                if hasattr(order, 'status') and order.status == 'pending':
-                                    order.status = 'confirmed'
-                                if hasattr(order, 'updated_at'):
-                                    order.updated_at = datetime.now(timezone.utc)
-
-                        logger.info(f"[v0] ✅ Card payment completed for transaction {transaction.id}")
-
-                    elif payment_status in ['FAILED', 'FAIL', 'ERROR'] or status_code == 0:
-                        transaction.status = 'failed'
-                        transaction.error_message = status_response.get('error_message', 'Card payment failed')
-                        logger.info(f"[v0] ❌ Card payment failed for transaction {transaction.id}")
-
-                    elif payment_status in ['CANCELLED', 'CANCELED', 'CANCEL']:
-                        transaction.status = 'cancelled'
-                        logger.info(f"[v0] ❌ Card payment cancelled for transaction {transaction.id}")
-                    
-                    elif payment_status in ['PENDING', 'PROCESSING', 'INVALID'] or status_code == 2:
-                        # Keep transaction as pending - INVALID often means transaction is too new
-                        if transaction.status != 'pending':
-                            transaction.status = 'pending'
-                        logger.info(f"[v0] ⏳ Card payment still pending for transaction {transaction.id} (status: {payment_status}, code: {status_code})")
-
-                    # Store status response
-                    transaction.status_response = json.dumps(status_response)
-                    transaction.last_status_check = datetime.now(timezone.utc)
-                    db.session.commit()
-
-            except Exception as e:
-                logger.error(f"[v0] Error querying Pesapal status for transaction {transaction.id}: {str(e)}")
-                # Continue with current transaction status
-
+        # Pending payments are settled by the IPN or the reconciliation worker
+        # (app.services.payment_reconciliation), which also pushes 'payment_status'
+        # to the user's SocketIO room; this endpoint only reads local state.
         transaction_data = {
             'id': transaction.id,
             'order_id': transaction.order_id,
@@ -751,85 +679,36 @@ def pesapal_callback():
             logger.warning(f"Transaction not found for callback: tracking_id={order_tracking_id}, reference={merchant_reference}")
             return create_error_response('Transaction not found', 404, 'TRANSACTION_NOT_FOUND')
 
-        # Process callback
-        try:
-            callback_result = process_card_payment_callback(callback_data, transaction)
-            
-            if callback_result['status'] == 'success':
-                payment_status = callback_result.get('payment_status', 'pending')
-                
-                if payment_status == 'completed':
-                    # Update order status for completed payments
-                    if transaction.order_id:
-                        order = db.session.get(Order, transaction.order_id)
-                        if order:
-                            if hasattr(order, 'payment_status'):
-                                order.payment_status = 'paid'
-                            if hasattr(order, 'status') and order.status == 'pending':
-                                order.status = 'confirmed'
-                            if hasattr(order, 'updated_at'):
-                                order.updated_at = datetime.now(timezone.utc)
-                    
-                    try:
-                        # Get user for email
-                        user = db.session.get(User, transaction.user_id)
-                        if user and user.email and transaction.order_id:
-                            # Import email function
-                            try:
-                                from app.routes.order.order_email_templates import send_order_confirmation_email
-                            except ImportError:
-                                try:
-                                    from backend.app.routes.order.order_email_templates import send_order_confirmation_email
-                                except ImportError:
-                                    from routes.order.order_email_templates import send_order_confirmation_email
-                            
-                            customer_name = user.name or "Valued Customer"
-                            logger.info(f"[v0] 💳 Payment confirmed! Sending order confirmation email to {user.email}")
-                            logger.info(f"[v0] Order ID: {transaction.order_id}, Customer: {customer_name}")
-                            
-                            email_sent = send_order_confirmation_email(
-                                order_id=transaction.order_id,
-                                to_email=user.email,
-                                customer_name=customer_name
-                            )
-                            
-                            if email_sent:
-                                logger.info(f"[v0] ✅ Order confirmation email sent successfully after payment confirmation")
-                            else:
-                                logger.error(f"[v0] ❌ Failed to send order confirmation email after payment")
-                        else:
-                            logger.warning(f"[v0] Cannot send email - User: {user is not None}, Email: {user.email if user else 'N/A'}, Order: {transaction.order_id}")
-                    except Exception as email_error:
-                        logger.error(f"[v0] Exception sending confirmation email after payment: {str(email_error)}", exc_info=True)
-                        # Don't fail the callback if email fails
-                    
-                    logger.info(f"Card payment callback processed successfully for transaction {transaction.id}")
-                
-                elif payment_status == 'failed':
-                    logger.info(f"Card payment failed callback processed for transaction {transaction.id}")
-                
-                elif payment_status == 'cancelled':
-                    logger.info(f"Card payment cancelled callback processed for transaction {transaction.id}")
-
-            # Store callback data and timestamp
-            transaction.callback_response = json.dumps(callback_data)
-            transaction.callback_received_at = datetime.now(timezone.utc)
-            db.session.commit()
-
-            return create_success_response({
-                'transaction_id': transaction.id,
-                'payment_status': callback_result.get('payment_status', 'pending')
-            }, 'Callback processed successfully')
-
-        except Exception as e:
-            logger.error(f"Error processing callback for transaction {transaction.id}: {str(e)}")
-            db.session.rollback()
+        # The inbox is keyed on the OrderTrackingId, the only identifier Pesapal's
+        # status query accepts
+        tracking_id = order_tracking_id or transaction.pesapal_tracking_id
+        if not tracking_id:
+            logger.warning(f"Pesapal callback for transaction {transaction.id} has no tracking ID")
             return create_error_response(
-                'Callback processing failed',
-                500, 'CALLBACK_PROCESSING_FAILED'
+                'Invalid callback data: missing tracking ID',
+                400, 'MISSING_TRACKING_ID'
             )
+        if not transaction.pesapal_tracking_id:
+            # Without it the reconciler cannot query this payment either
+            transaction.pesapal_tracking_id = tracking_id
+
+        # Persist and acknowledge; the job worker queries Pesapal and applies it once
+        # (app.services.payment_callbacks)
+        from app.services.payment_callbacks import record_callback
+        record_callback('pesapal', tracking_id, callback_data, transaction_id=transaction.id)
+        db.session.commit()
+
+        logger.info(f"Card payment callback queued for transaction {transaction.id}")
+        return create_success_response({
+            'transaction_id': transaction.id,
+            'payment_status': transaction.status,
+            'orderNotificationType': callback_data.get('OrderNotificationType'),
+            'orderTrackingId': order_tracking_id,
+            'orderMerchantReference': merchant_reference
+        }, 'Callback received')
 
     except Exception as e:
+        db.session.rollback()
         logger.error(f"Unexpected error processing Pesapal callback: {str(e)}")
         return create_error_response(
             'Callback processing failed',
@@ -1142,40 +1021,41 @@ def get_card_payment_stats():
         to_date = request.args.get('to_date')
         group_by = request.args.get('group_by', 'day')
 
-        # Build base query
-        query = PesapalTransaction.query
+        from app.services.payment_stats import payment_stats
+
         from_date_obj = None
         to_date_obj = None
-        
+        end_date_obj = None
+
         if from_date:
             try:
                 from_date_obj = datetime.fromisoformat(from_date.replace('Z', '+00:00'))
-                query = query.filter(PesapalTransaction.created_at >= from_date_obj)
             except ValueError:
                 return create_error_response('Invalid from_date format', 400, 'INVALID_DATE_FORMAT')
-        
+
         if to_date:
             try:
                 to_date_obj = datetime.fromisoformat(to_date.replace('Z', '+00:00'))
-                query = query.filter(PesapalTransaction.created_at <= to_date_obj)
             except ValueError:
                 return create_error_response('Invalid to_date format', 400, 'INVALID_DATE_FORMAT')
+            # A bare date includes that whole day
+            end_date_obj = to_date_obj + timedelta(days=1) if len(to_date) == 10 else to_date_obj + timedelta(microseconds=1)
 
-        # Get basic statistics
-        total_transactions = query.count()
-        completed_transactions_count = query.filter_by(status='completed').count()
-        failed_transactions_count = query.filter_by(status='failed').count()
-        pending_transactions_count = query.filter_by(status='pending').count()
-        cancelled_transactions_count = query.filter_by(status='cancelled').count()
-
-        # Calculate amounts
-        completed_query = query.filter_by(status='completed')
-        completed_list = completed_query.all()
-        total_amount = sum(float(t.amount) for t in completed_list)
-        
-        failed_query = query.filter_by(status='failed')
-        failed_list = failed_query.all()
-        failed_amount = sum(float(t.amount) for t in failed_list)
+        # Counts and sums are aggregated in the database (daily rollups for closed days)
+        stats = payment_stats('pesapal', from_date_obj, end_date_obj)
+        by_status = stats['by_status']
+
+        def status_count(status):
+            return by_status.get(status, {}).get('count', 0)
+
+        total_transactions = stats['total_transactions']
+        completed_transactions_count = status_count('completed')
+        failed_transactions_count = status_count('failed')
+        pending_transactions_count = status_count('pending')
+        cancelled_transactions_count = status_count('cancelled')
+
+        total_amount = by_status.get('completed', {}).get('amount', 0.0)
+        failed_amount = by_status.get('failed', {}).get('amount', 0.0)
 
         # Success rate
         success_rate = (completed_transactions_count / total_transactions * 100) if total_transactions > 0 else 0
@@ -1183,104 +1063,32 @@ def get_card_payment_stats():
         # Average transaction amount
         avg_transaction_amount = total_amount / completed_transactions_count if completed_transactions_count > 0 else 0
 
-        # Payment methods breakdown
-        payment_methods_query = db.session.query(
-            PesapalTransaction.payment_method,
-            func.count(PesapalTransaction.id).label('count'),
-            func.sum(PesapalTransaction.amount).label('total_amount')
-        ).filter_by(status='completed')
-        if from_date_obj:
-            payment_methods_query = payment_methods_query.filter(PesapalTransaction.created_at >= from_date_obj)
-        if to_date_obj:
-            payment_methods_query = payment_methods_query.filter(PesapalTransaction.created_at <= to_date_obj)
-        payment_methods_query = payment_methods_query.group_by(PesapalTransaction.payment_method).all()
-
-        payment_methods_stats = {}
-        for method, count, amount in payment_methods_query:
-            if method:
-                payment_methods_stats[method] = {
-                    'count': count,
-                    'total_amount': float(amount or 0)
-                }
-
-        # Card types breakdown
-        card_types_query = db.session.query(
-            PesapalTransaction.card_type,
-            func.count(PesapalTransaction.id).label('count')
-        ).filter_by(status='completed')
-        if from_date_obj:
-            card_types_query = card_types_query.filter(PesapalTransaction.created_at >= from_date_obj)
-        if to_date_obj:
-            card_types_query = card_types_query.filter(PesapalTransaction.created_at <= to_date_obj)
-        card_types_query = card_types_query.group_by(PesapalTransaction.card_type).all()
-
-        card_types_stats = {}
-        for card_type, count in card_types_query:
-            if card_type:
-                card_types_stats[card_type] = count
-
-        # Currency breakdown
-        currency_query = db.session.query(
-            PesapalTransaction.currency,
-            func.count(PesapalTransaction.id).label('count'),
-            func.sum(PesapalTransaction.amount).label('total_amount')
-        ).filter_by(status='completed')
-        if from_date_obj:
-            currency_query = currency_query.filter(PesapalTransaction.created_at >= from_date_obj)
-        if to_date_obj:
-            currency_query = currency_query.filter(PesapalTransaction.created_at <= to_date_obj)
-        currency_query = currency_query.group_by(PesapalTransaction.currency).all()
-
-        currency_stats = {}
-        for currency, count, amount in currency_query:
-            currency_stats[currency] = {
-                'count': count,
-                'total_amount': float(amount or 0)
-            }
+        payment_methods_stats = stats['payment_methods']
+        card_types_stats = stats['card_types']
+        currency_stats = stats['currencies']
 
-        # Time-based trends (simplified)
+        # Daily trends
         trends = []
         if group_by in ['day', 'week', 'month']:
-            # This would require more complex SQL for proper grouping
-            # For now, return basic daily stats for the last 7 days
-            
-            # Define the date range for trends
-            trend_start_date = from_date_obj if from_date_obj else datetime.now(timezone.utc) - timedelta(days=6)
-            trend_end_date = to_date_obj if to_date_obj else datetime.now(timezone.utc)
-            
-            # Ensure the trend range is reasonable if no dates are provided
-            if not from_date and not to_date:
-                trend_start_date = datetime.now(timezone.utc) - timedelta(days=6)
-                trend_end_date = datetime.now(timezone.utc)
-            elif from_date and not to_date:
-                trend_end_date = datetime.now(timezone.utc)
-            elif not from_date and to_date:
-                trend_start_date = trend_end_date - timedelta(days=6) # Default to 7 days if only end date is given
-            
-            # Adjust to start of day for accurate filtering
+            now = datetime.now(timezone.utc)
+            trend_start_date = from_date_obj if from_date_obj else now - timedelta(days=6)
+            trend_end_date = to_date_obj if to_date_obj else now
+            if not from_date and to_date:
+                trend_start_date = trend_end_date - timedelta(days=6)  # Default to 7 days if only end date is given
+
             trend_start_date = trend_start_date.replace(hour=0, minute=0, second=0, microsecond=0)
-            trend_end_date = trend_end_date.replace(hour=23, minute=59, second=59, microsecond=999999) # End of the day
+            trend_end_date = trend_end_date.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+
+            daily = payment_stats('pesapal', trend_start_date, trend_end_date)['daily']
 
             current_trend_date = trend_start_date
-            while current_trend_date <= trend_end_date:
-                day_start = current_trend_date
-                day_end = current_trend_date + timedelta(days=1)
-                
-                day_query = PesapalTransaction.query.filter(
-                    and_(
-                        PesapalTransaction.created_at >= day_start,
-                        PesapalTransaction.created_at < day_end
-                    )
-                )
-                
-                day_transactions = day_query.count()
-                day_completed = day_query.filter_by(status='completed').count()
-                
+            while current_trend_date < trend_end_date:
+                day = daily.get(current_trend_date.date(), {'total': 0, 'completed': 0})
                 trends.append({
-                    'date': day_start.strftime('%Y-%m-%d'), # Format as YYYY-MM-DD
-                    'total_transactions': day_transactions,
-                    'completed_transactions': day_completed,
-                    'success_rate': (day_completed / day_transactions * 100) if day_transactions > 0 else 0
+                    'date': current_trend_date.strftime('%Y-%m-%d'),
+                    'total_transactions': day['total'],
+                    'completed_transactions': day['completed'],
+                    'success_rate': (day['completed'] / day['total'] * 100) if day['total'] > 0 else 0
                 })
                 current_trend_date += timedelta(days=1)
 
@@ -18,7 +18,7 @@ from app.models.models import (
 from app.validations.validation import admin_required, validate_product_creation, validate_product_update
 
 try:
-    from backend.websocket import broadcast_to_all
+    from app.websocket import broadcast_to_all
 except ImportError:
     # Fallback if websocket module is not available
     def broadcast_to_all(event, data):
@@ -9,14 +9,16 @@ from sqlalchemy.exc import SQLAlchemyError
 from datetime import datetime
 import re
 
+from app.configuration.database import replica_blueprint
 from app.configuration.extensions import db
+from app.utils.auth_utils import current_principal
 from app.models.models import (
     Product, ProductVariant, ProductImage, Category, Brand,
     User, UserRole
 )
 
-# Create blueprint for user-facing product routes
-products_routes = Blueprint('products_routes', __name__, url_prefix='/api/products')
+# Create blueprint for user-facing product routes; reads may be served by a replica
+products_routes = replica_blueprint(Blueprint('products_routes', __name__, url_prefix='/api/products'))
 
 # ----------------------
 # Helper Functions
@@ -175,16 +177,11 @@ def serialize_image(image):
     }
 
 def is_admin_user():
-    """Check if the current user is an admin."""
+    """Check if the current user is an admin (resolved once per request)."""
     try:
         verify_jwt_in_request(optional=True)
-        current_user_id = get_jwt_identity()
-        
-        if not current_user_id:
-            return False
-            
-        user = db.session.get(User, current_user_id)
-        return user and user.role == UserRole.ADMIN
+        principal = current_principal()
+        return bool(principal and principal.is_admin)
     except Exception:
         return False
 
@@ -399,8 +399,12 @@ def create_review(product_id):
         if not product:
             return jsonify({"error": "Product not found"}), 404
 
-        # Check if this is a verified purchase
-        is_verified_purchase = check_verified_purchase(user_id, product_id)
+        # Check if this is a verified purchase; a failed check must not block the review
+        try:
+            is_verified_purchase = check_verified_purchase(user_id, product_id)
+        except Exception as e:
+            logger.error(f"Error checking verified purchase: {str(e)}")
+            is_verified_purchase = False
 
         # Create new review
         new_review = Review(
@@ -36,10 +36,19 @@ except ImportError:
             Category = None
             Brand = None
 
+# Index rebuilds read the whole catalogue; run them on the analytics pool
+try:
+    from app.configuration.database import ANALYTICS, use_workload
+except ImportError:
+    ANALYTICS = 'analytics'
+
+    def use_workload(name):
+        return lambda f: f
+
 # Import search services with fallbacks
 try:
     from .search_service import get_search_service
-    from .embedding_service import get_embedding_service
+    from .embedding_service import get_embedding_service, product_documents
     SEARCH_SERVICES_AVAILABLE = True
 except ImportError:
     logger.warning("Search services not available")
@@ -51,6 +60,9 @@ except ImportError:
     def get_embedding_service():
         return None
 
+    def product_documents(products):
+        return []
+
 # Create blueprint
 admin_search_routes = Blueprint('admin_search_routes', __name__)
 
@@ -121,6 +133,15 @@ def admin_search_health():
             logger.error(f"Embedding service check failed: {embed_exc}")
             embedding_available = False
 
+        # The model loads in the background after startup; report that as warming
+        embedding_status = getattr(embedding_service, 'status', None)
+        if not embedding_available and embedding_status in ('not_loaded', 'loading'):
+            return jsonify({
+                'status': 'warming',
+                'database': db_status,
+                'embedding_service': embedding_status
+            }), 503
+
         if not embedding_available:
             logger.error("Embedding service unavailable")
             return jsonify({
@@ -423,7 +444,9 @@ def test_similarity():
                 'message': 'Cannot perform similarity test without embedding service'
             }), 500
 
-        # Check if embedding service is available
+        # Admin tools may wait for the model instead of failing while it warms up
+        if hasattr(embedding_service, 'ensure_loaded'):
+            embedding_service.ensure_loaded()
         if not hasattr(embedding_service, 'is_available') or not embedding_service.is_available():
             return jsonify({
                 'error': 'Embedding service unavailable',
@@ -538,6 +561,7 @@ def test_similarity():
 @cross_origin()
 @jwt_required()
 @admin_required
+@use_workload(ANALYTICS)
 def rebuild_search_index():
     """Rebuild the search index with all active products."""
     if request.method == 'OPTIONS':
@@ -550,8 +574,10 @@ def rebuild_search_index():
         if not Product or not db:
             return jsonify({'error': 'Database not available'}), 500
 
-        # Get embedding service
+        # Get embedding service, loading the model now if it is still warming up
         embedding_service = get_embedding_service()
+        if embedding_service and hasattr(embedding_service, 'ensure_loaded'):
+            embedding_service.ensure_loaded()
         if not embedding_service or not hasattr(embedding_service, 'is_available') or not embedding_service.is_available():
             return jsonify({'error': 'Embedding service not available'}), 500
 
@@ -561,19 +587,7 @@ def rebuild_search_index():
             return jsonify({'error': 'No products found'}), 400
 
         # Convert to dictionaries
-        product_dicts = []
-        for product in products:
-            try:
-                product_dict = product.to_dict()
-                # Add category and brand info
-                if product.category:
-                    product_dict['category'] = product.category.to_dict()
-                if product.brand:
-                    product_dict['brand'] = product.brand.to_dict()
-                product_dicts.append(product_dict)
-            except Exception as e:
-                logger.error(f"Error converting product {product.id} to dict: {str(e)}")
-                continue
+        product_dicts = product_documents(products)
 
         # Rebuild index
         start_time = time.time()
@@ -1,35 +1,55 @@
 """
 Embedding Service for AI-powered semantic search using sentence-transformers.
 Handles product embedding generation and FAISS index management.
+
+faiss and sentence-transformers (which pulls in torch) are imported, and the
+model and index loaded, on the first ``ensure_loaded()`` rather than at
+import time, so importing the search blueprints stays cheap. create_app
+registers ``warm_search`` to do this off the request path.
+
+Every gunicorn worker loads the same index files, so creating and building
+them is serialized across processes with ``index_file_lock``: the first
+process builds an empty index, the others wait for it and load the result.
 """
 
 import os
 import json
 import pickle
 import logging
+import threading
+import importlib.util
 import numpy as np
+from contextlib import contextmanager
 from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 
+try:
+    import fcntl
+except ImportError:  # Windows development machines: no cross-process lock
+    fcntl = None
+
 # Setup logger
 logger = logging.getLogger(__name__)
 
-# Try importing optional dependencies with fallbacks
-try:
-    import faiss
-    FAISS_AVAILABLE = True
-except ImportError:
+# Optional dependencies are only located here; _import_backends imports them
+FAISS_AVAILABLE = importlib.util.find_spec('faiss') is not None
+if not FAISS_AVAILABLE:
     logger.warning("FAISS not available. Install with: pip install faiss-cpu")
-    FAISS_AVAILABLE = False
-    faiss = None
+faiss = None
 
-try:
-    from sentence_transformers import SentenceTransformer
-    SENTENCE_TRANSFORMERS_AVAILABLE = True
-except ImportError:
+SENTENCE_TRANSFORMERS_AVAILABLE = importlib.util.find_spec('sentence_transformers') is not None
+if not SENTENCE_TRANSFORMERS_AVAILABLE:
     logger.warning("sentence-transformers not available. Install with: pip install sentence-transformers")
-    SENTENCE_TRANSFORMERS_AVAILABLE = False
-    SentenceTransformer = None
+SentenceTransformer = None
+
+def _import_backends():
+    global faiss, SentenceTransformer
+    if faiss is None:
+        import faiss as faiss_module
+        faiss = faiss_module
+    if SentenceTransformer is None:
+        from sentence_transformers import SentenceTransformer as model_class
+        SentenceTransformer = model_class
 
 # Database imports with fallbacks
 try:
@@ -67,6 +87,8 @@ class EmbeddingService:
         self.embedding_dim = 384  # Default for all-MiniLM-L6-v2
         self.index_path = os.path.join(os.getcwd(), 'data', 'faiss_index.bin')
         self.metadata_path = os.path.join(os.getcwd(), 'data', 'index_metadata.json')
+        self.loaded = False
+        self._load_lock = threading.Lock()
 
         # Check if required dependencies are available
         if not FAISS_AVAILABLE or not SENTENCE_TRANSFORMERS_AVAILABLE:
@@ -76,16 +98,28 @@ class EmbeddingService:
 
         self.available = True
 
-        # Ensure data directory exists
-        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+    def ensure_loaded(self) -> bool:
+        """Import the backends and load the model and index once; blocks until done."""
+        if self.loaded or not self.available:
+            return self.is_available()
 
-        # Initialize model and index
-        try:
-            self._load_model()
-            self._load_or_create_index()
-        except Exception as e:
-            logger.error(f"Failed to initialize EmbeddingService: {str(e)}")
-            self.available = False
+        with self._load_lock:
+            if self.loaded:
+                return self.is_available()
+            try:
+                _import_backends()
+
+                # Ensure data directory exists
+                os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+
+                self._load_model()
+                with self.index_file_lock():
+                    self._load_or_create_index()
+            except Exception as e:
+                logger.error(f"Failed to initialize EmbeddingService: {str(e)}")
+                self.available = False
+            self.loaded = True
+        return self.is_available()
 
     def _load_model(self):
         """Load the sentence transformer model."""
@@ -146,6 +180,19 @@ class EmbeddingService:
             logger.error(f"Failed to load sentence transformer model: {str(e)}")
             raise
 
+    @contextmanager
+    def index_file_lock(self):
+        """Hold an exclusive lock on the index files, shared by every process on this host."""
+        if fcntl is None:
+            yield
+            return
+        with open(f"{self.index_path}.lock", 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
     def _load_or_create_index(self):
         """Load existing FAISS index or create a new one."""
         try:
@@ -530,9 +577,17 @@ class EmbeddingService:
             return False
 
     def is_available(self) -> bool:
-        """Check if the embedding service is available and properly initialized."""
+        """Check if the embedding service is available and properly initialized (never loads it)."""
         return getattr(self, 'available', False) and self.model is not None
 
+    @property
+    def status(self) -> str:
+        if self.is_available():
+            return 'ready'
+        if not getattr(self, 'available', False):
+            return 'unavailable'
+        return 'loading' if self._load_lock.locked() else 'not_loaded'
+
 
 # Global embedding service instance
 embedding_service = None
@@ -543,3 +598,42 @@ def get_embedding_service() -> EmbeddingService:
     if embedding_service is None:
         embedding_service = EmbeddingService()
     return embedding_service
+
+
+def product_documents(products) -> List[Dict[str, Any]]:
+    """Product dicts with their category and brand, as the index expects them."""
+    product_dicts = []
+    for product in products:
+        try:
+            product_dict = product.to_dict()
+            if product.category:
+                product_dict['category'] = product.category.to_dict()
+            if product.brand:
+                product_dict['brand'] = product.brand.to_dict()
+            product_dicts.append(product_dict)
+        except Exception as e:
+            logger.error(f"Error converting product {product.id} to dict: {str(e)}")
+    return product_dicts
+
+def warm_search(app) -> bool:
+    """
+    Startup loader for semantic search: load the model and index, and build the
+    index from active products when it is empty and SEARCH_BUILD_INDEX_ON_START is on.
+    """
+    service = get_embedding_service()
+    if not service.ensure_loaded():
+        return False
+
+    if app.config.get('SEARCH_BUILD_INDEX_ON_START', True) and not service.product_ids and Product is not None:
+        # One process builds; the others wait here and then load what it wrote
+        with service.index_file_lock():
+            service._load_or_create_index()
+            if service.product_ids:
+                return True
+            from app.configuration.database import ANALYTICS, use_workload
+            with use_workload(ANALYTICS):
+                products = Product.query.filter_by(is_active=True).all()
+                if products:
+                    logger.info(f"Search index is empty, indexing {len(products)} active products")
+                    return service.rebuild_index(product_documents(products))
+    return True
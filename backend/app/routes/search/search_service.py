@@ -48,16 +48,27 @@ except ImportError:
         return None
 
 
+def _request_warmup():
+    """Start loading the embedding model in the background when it is still pending."""
+    try:
+        from flask import current_app
+        from app.services.startup import get_startup
+        startup = get_startup()
+        if startup is not None and current_app.config.get('STARTUP_WARMUP') != 'off':
+            startup.warm(current_app._get_current_object(), 'search')
+    except Exception as e:
+        logger.debug(f"Could not request search warm-up: {str(e)}")
+
+
 class SearchService:
     """Service that combines semantic and keyword search for optimal results."""
 
     def __init__(self):
+        # The embedding model loads in the background; semantic search checks
+        # availability per call and uses keyword search until it is ready
         if EMBEDDING_SERVICE_AVAILABLE:
             try:
                 self.embedding_service = get_embedding_service()
-                if self.embedding_service and not self.embedding_service.is_available():
-                    logger.warning("Embedding service not properly initialized")
-                    self.embedding_service = None
             except Exception as e:
                 logger.error(f"Failed to initialize embedding service: {str(e)}")
                 self.embedding_service = None
@@ -288,7 +299,8 @@ class SearchService:
         Returns:
             List of product dictionaries with similarity scores
         """
-        if not self.embedding_service:
+        if not self.embedding_service or not self.embedding_service.is_available():
+            _request_warmup()
             logger.warning("Embedding service not available, falling back to keyword search")
             return self.keyword_search(query)[:k]
 
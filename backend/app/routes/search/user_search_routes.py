@@ -12,8 +12,13 @@ from flask_jwt_extended import jwt_required, get_jwt_identity, jwt_required
 # Setup logger
 logger = logging.getLogger(__name__)
 
-# Create blueprint
+# Create blueprint; result hydration may read from a replica
 user_search_routes = Blueprint('user_search_routes', __name__, url_prefix='/api/search')
+try:
+    from app.configuration.database import replica_blueprint
+    replica_blueprint(user_search_routes)
+except ImportError:
+    pass
 
 try:
     from app.configuration.extensions import db
@@ -86,6 +91,8 @@ def search_health():
         if embedding_service:
             if hasattr(embedding_service, 'is_available') and embedding_service.is_available():
                 embedding_status = "available"
+            elif getattr(embedding_service, 'status', None) in ('not_loaded', 'loading'):
+                embedding_status = "warming"
             else:
                 embedding_status = "initialized_but_not_ready"
 
@@ -40,7 +40,7 @@ from google.oauth2 import id_token
 from google.auth.transport import requests as google_requests
 
 # HTTP Requests
-import requests
+from ...services.http_client import http_client
 
 # Models
 from ...models.models import (
@@ -146,7 +146,7 @@ def send_email(to, subject, template):
         }
 
         logger.info(f"Sending test email via Brevo API to {to} from {sender_email}")
-        response = requests.post(url, json=payload, headers=headers)
+        response = http_client.post('brevo', url, json=payload, headers=headers)
 
         if response.status_code >= 200 and response.status_code < 300:
             logger.info(f"Test email sent via Brevo API. Status: {response.status_code}")
@@ -176,7 +176,8 @@ def send_sms(phone_number, message):
             'Body': message
         }
 
-        response = requests.post(
+        response = http_client.post(
+            'sms',
             url,
             data=data,
             auth=(account_sid, auth_token)
@@ -1985,7 +1986,7 @@ def forgot_password():
                 }
 
                 logger.info(f"Sending password reset email via Brevo API to {email}")
-                response = requests.post(url, json=payload, headers=headers)
+                response = http_client.post('brevo', url, json=payload, headers=headers)
 
                 if response.status_code >= 200 and response.status_code < 300:
                     logger.info(f"Password reset email sent via Brevo API. Status: {response.status_code}")
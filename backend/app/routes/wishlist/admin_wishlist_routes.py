@@ -27,6 +27,11 @@ from ...models.models import WishlistItem, Product, User, Category, Brand, UserR
 # Schemas
 from ...schemas.schemas import wishlist_item_schema, wishlist_items_schema
 
+# Services
+from ...services.exports import (
+    ExportSpec, export_options, export_response, exporter, iter_query, render_csv, start_export, wants_stream
+)
+
 # Setup logger
 logger = logging.getLogger(__name__)
 
@@ -933,12 +938,92 @@ def bulk_delete_wishlist_items():
         logger.error(f"Error in bulk delete wishlist items: {str(e)}", exc_info=True)
         return jsonify({"success": False, "error": "Failed to bulk delete wishlist items", "details": str(e)}), 500
 
+WISHLIST_EXPORT_COLUMNS = [
+    ('Wishlist Item ID', 'id'), ('User ID', 'user_id'), ('User Email', 'user_email'),
+    ('User Name', 'user_name'), ('User Active', 'user_active'), ('Product ID', 'product_id'),
+    ('Product Name', 'product_name'), ('Product Price', 'product_price'),
+    ('Product Sale Price', 'product_sale_price'), ('Product Stock', 'product_stock'),
+    ('Product Active', 'product_active'), ('Product Featured', 'product_featured'),
+    ('Product On Sale', 'product_on_sale'), ('Category', 'category'), ('Brand', 'brand'),
+    ('Added Date', 'added_date')
+]
+
+def wishlist_export_query(params, *columns):
+    """Wishlist items joined to their product, user, category and brand, filtered for export."""
+    query = db.session.query(*columns).select_from(WishlistItem).join(
+        Product, WishlistItem.product_id == Product.id
+    ).join(
+        User, WishlistItem.user_id == User.id
+    ).outerjoin(
+        Category, Product.category_id == Category.id
+    ).outerjoin(
+        Brand, Product.brand_id == Brand.id
+    )
+
+    if not params.get('include_inactive_users'):
+        query = query.filter(User.is_active == True)
+
+    if not params.get('include_inactive_products'):
+        query = query.filter(Product.is_active == True)
+
+    if params.get('user_id'):
+        query = query.filter(WishlistItem.user_id == params['user_id'])
+
+    # parse_date_filter raises ValueError for bad dates before anything is streamed
+    if params.get('date_from'):
+        query = query.filter(WishlistItem.created_at >= parse_date_filter(params['date_from']))
+
+    if params.get('date_to'):
+        query = query.filter(WishlistItem.created_at <= parse_date_filter(params['date_to']))
+
+    return query.order_by(WishlistItem.created_at.desc())
+
+@exporter('wishlists')
+def wishlist_export_spec(params):
+    """One flat row per wishlist item across all users."""
+    query = wishlist_export_query(
+        params,
+        WishlistItem.id, User.id, User.email, User.name, User.is_active, Product.id, Product.name,
+        Product.price, Product.sale_price, Product.stock, Product.is_active, Product.is_featured,
+        Product.is_sale, Category.name, Brand.name, WishlistItem.created_at
+    )
+    yes_no = lambda value: 'Yes' if value else 'No'
+
+    def rows():
+        for row in iter_query(query):
+            yield {
+                'id': row[0],
+                'user_id': row[1],
+                'user_email': row[2],
+                'user_name': row[3],
+                'user_active': yes_no(row[4]),
+                'product_id': row[5],
+                'product_name': row[6],
+                'product_price': float(row[7]) if row[7] else '',
+                'product_sale_price': float(row[8]) if row[8] else '',
+                'product_stock': row[9],
+                'product_active': yes_no(row[10]),
+                'product_featured': yes_no(row[11]),
+                'product_on_sale': yes_no(row[12]),
+                'category': row[13] or '',
+                'brand': row[14] or '',
+                'added_date': row[15].isoformat() if row[15] else ''
+            }
+
+    return ExportSpec(WISHLIST_EXPORT_COLUMNS, rows(), f"wishlist_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+
 @admin_wishlist_routes.route('/export', methods=['GET', 'OPTIONS'])
 @cross_origin()
 @admin_required
 @admin_rate_limit("1000 per hour")
 def export_all_wishlist_data():
-    """Export comprehensive wishlist data for admin analysis."""
+    """
+    Export comprehensive wishlist data for admin analysis.
+
+    ``format=json`` (default) and ``format=csv`` return the legacy JSON bodies.
+    ``format=ndjson``, ``stream=true`` or ``gzip=true`` stream a flat download,
+    and ``async=true`` queues an export job.
+    """
     if request.method == 'OPTIONS':
         return jsonify({'status': 'ok'}), 200
 
@@ -947,8 +1032,8 @@ def export_all_wishlist_data():
 
         # Get export format
         export_format = request.args.get('format', 'json').lower()
-        if export_format not in ['json', 'csv']:
-            return jsonify({"success": False, "error": "Invalid export format. Supported: json, csv"}), 400
+        if export_format not in ['json', 'csv', 'ndjson']:
+            return jsonify({"success": False, "error": "Invalid export format. Supported: json, csv, ndjson"}), 400
 
         # Get export filters
         include_inactive_users = request.args.get('include_inactive_users', 'false').lower() == 'true'
@@ -956,51 +1041,25 @@ def export_all_wishlist_data():
         date_from = request.args.get('date_from')
         date_to = request.args.get('date_to')
         user_id = request.args.get('user_id', type=int)
+        filters = {
+            "include_inactive_users": include_inactive_users,
+            "include_inactive_products": include_inactive_products,
+            "date_from": date_from,
+            "date_to": date_to,
+            "user_id": user_id
+        }
 
-        # Build query
-        query = db.session.query(WishlistItem, Product, User, Category, Brand).join(
-            Product, WishlistItem.product_id == Product.id
-        ).join(
-            User, WishlistItem.user_id == User.id
-        ).outerjoin(
-            Category, Product.category_id == Category.id
-        ).outerjoin(
-            Brand, Product.brand_id == Brand.id
-        )
-
-        # Apply filters
-        if not include_inactive_users:
-            query = query.filter(User.is_active == True)
-
-        if not include_inactive_products:
-            query = query.filter(Product.is_active == True)
-
-        if user_id:
-            query = query.filter(WishlistItem.user_id == user_id)
-
-        if date_from:
-            try:
-                date_from_obj = parse_date_filter(date_from)
-                query = query.filter(WishlistItem.created_at >= date_from_obj)
-            except ValueError as e:
-                return jsonify({"success": False, "error": str(e)}), 400
-
-        if date_to:
-            try:
-                date_to_obj = parse_date_filter(date_to)
-                query = query.filter(WishlistItem.created_at <= date_to_obj)
-            except ValueError as e:
-                return jsonify({"success": False, "error": str(e)}), 400
-
-        # Order by creation date
-        query = query.order_by(WishlistItem.created_at.desc())
-
-        # Execute query
-        wishlist_items = query.all()
+        try:
+            if export_format == 'json':
+                query = wishlist_export_query(filters, WishlistItem, Product, User, Category, Brand)
+            else:
+                spec = wishlist_export_spec(filters)
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
 
         if export_format == 'json':
             export_data = []
-            for item, product, user, category, brand in wishlist_items:
+            for item, product, user, category, brand in query.all():
                 item_data = enhance_admin_wishlist_item_data(item, product, user, category, brand)
                 export_data.append(item_data)
 
@@ -1010,70 +1069,34 @@ def export_all_wishlist_data():
                 "exported_at": datetime.now().isoformat(),
                 "exported_by_admin": current_user_id,
                 "total_items": len(export_data),
-                "filters": {
-                    "include_inactive_users": include_inactive_users,
-                    "include_inactive_products": include_inactive_products,
-                    "date_from": date_from,
-                    "date_to": date_to,
-                    "user_id": user_id
-                },
+                "filters": filters,
                 "export_data": export_data
             }), 200
 
-        elif export_format == 'csv':
-            import csv
-            import io
-
-            output = io.StringIO()
-            writer = csv.writer(output)
-
-            # Write header
-            writer.writerow([
-                'Wishlist Item ID', 'User ID', 'User Email', 'User Name', 'User Active',
-                'Product ID', 'Product Name', 'Product Price', 'Product Sale Price',
-                'Product Stock', 'Product Active', 'Product Featured', 'Product On Sale',
-                'Category', 'Brand', 'Added Date'
-            ])
-
-            # Write data
-            for item, product, user, category, brand in wishlist_items:
-                writer.writerow([
-                    item.id,
-                    user.id,
-                    user.email,
-                    user.name,
-                    'Yes' if user.is_active else 'No',
-                    product.id,
-                    product.name,
-                    float(product.price) if product.price else '',
-                    float(product.sale_price) if product.sale_price else '',
-                    product.stock,
-                    'Yes' if product.is_active else 'No',
-                    'Yes' if product.is_featured else 'No',
-                    'Yes' if product.is_sale else 'No',
-                    category.name if category else '',
-                    brand.name if brand else '',
-                    item.created_at.isoformat() if item.created_at else ''
-                ])
-
-            csv_content = output.getvalue()
-            output.close()
-
+        _, compress, run_async = export_options(request.args)
+        if run_async:
+            manifest = start_export('wishlists', filters, export_format, compress, requested_by=current_user_id)
+            db.session.commit()
             return jsonify({
                 "success": True,
-                "export_format": "csv",
-                "exported_at": datetime.now().isoformat(),
-                "exported_by_admin": current_user_id,
-                "total_items": len(wishlist_items),
-                "filters": {
-                    "include_inactive_users": include_inactive_users,
-                    "include_inactive_products": include_inactive_products,
-                    "date_from": date_from,
-                    "date_to": date_to,
-                    "user_id": user_id
-                },
-                "csv_data": csv_content
-            }), 200
+                "message": "Export queued",
+                "export": manifest,
+                "status_url": f"/api/admin/exports/{manifest['id']}"
+            }), 202
+
+        if wants_stream(request.args, export_format, compress):
+            return export_response(spec, export_format, compress)
+
+        csv_content, total_items = render_csv(spec)
+        return jsonify({
+            "success": True,
+            "export_format": "csv",
+            "exported_at": datetime.now().isoformat(),
+            "exported_by_admin": current_user_id,
+            "total_items": total_items,
+            "filters": filters,
+            "csv_data": csv_content
+        }), 200
 
     except Exception as e:
         logger.error(f"Error exporting wishlist data: {str(e)}", exc_info=True)
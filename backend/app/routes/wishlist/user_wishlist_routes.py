@@ -22,9 +22,15 @@ from typing import Dict, List, Any, Optional, Tuple
 try:
     from app.models.models import User, Product, WishlistItem, Category, Brand
     from app.configuration.extensions import db, cache, limiter
+    from app.services.exports import (
+        ExportSpec, export_options, export_response, exporter, iter_query, render_csv, wants_stream
+    )
 except ImportError:
     from models.models import User, Product, WishlistItem, Category, Brand
     from configuration.extensions import db, cache, limiter
+    from services.exports import (
+        ExportSpec, export_options, export_response, exporter, iter_query, render_csv, wants_stream
+    )
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -1135,6 +1141,60 @@ def get_wishlist_stats():
         logger.error(f"Error getting wishlist stats for user {current_user_id}: {str(e)}")
         return jsonify({'error': 'Failed to get wishlist statistics'}), 500
 
+USER_WISHLIST_EXPORT_COLUMNS = [
+    ('Wishlist Item ID', 'wishlist_item_id'), ('Added Date', 'added_date'), ('Product ID', 'product_id'),
+    ('Product Name', 'product_name'), ('Product Slug', 'product_slug'), ('Description', 'description'),
+    ('Price', 'price'), ('Original Price', 'original_price'), ('Sale Price', 'sale_price'),
+    ('Is On Sale', 'is_on_sale'), ('Stock', 'stock'), ('SKU', 'sku'), ('Category', 'category'),
+    ('Brand', 'brand'), ('Is Featured', 'is_featured'), ('Is New', 'is_new'),
+    ('Thumbnail URL', 'thumbnail_url'), ('Availability Status', 'availability_status')
+]
+
+@exporter('user_wishlist')
+def user_wishlist_export_spec(params):
+    """A user's active wishlist items, newest first."""
+    query = db.session.query(
+        WishlistItem.id, WishlistItem.created_at, Product.id, Product.name, Product.slug,
+        Product.short_description, Product.description, Product.price, Product.sale_price, Product.is_sale,
+        Product.stock, Product.sku, Category.name, Brand.name, Product.is_featured, Product.is_new,
+        Product.thumbnail_url, Product.availability_status
+    ).select_from(WishlistItem).join(
+        Product, WishlistItem.product_id == Product.id
+    ).outerjoin(
+        Category, Product.category_id == Category.id
+    ).outerjoin(
+        Brand, Product.brand_id == Brand.id
+    ).filter(
+        WishlistItem.user_id == params['user_id'],
+        Product.is_active == True
+    ).order_by(WishlistItem.created_at.desc())
+
+    def rows():
+        for row in iter_query(query):
+            yield {
+                'wishlist_item_id': row[0],
+                'added_date': row[1].isoformat(),
+                'product_id': row[2],
+                'product_name': row[3],
+                'product_slug': row[4],
+                'description': row[5] or row[6],
+                'price': float(row[8]) if row[8] else float(row[7]),
+                'original_price': float(row[7]),
+                'sale_price': float(row[8]) if row[8] else None,
+                'is_on_sale': row[9],
+                'stock': row[10],
+                'sku': row[11],
+                'category': row[12],
+                'brand': row[13],
+                'is_featured': row[14],
+                'is_new': row[15],
+                'thumbnail_url': row[16],
+                'availability_status': row[17]
+            }
+
+    return ExportSpec(USER_WISHLIST_EXPORT_COLUMNS, rows(),
+                      f"wishlist_{params['user_id']}_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}")
+
 @user_wishlist_routes.route('/export', methods=['GET', 'OPTIONS'])
 @cross_origin()
 @jwt_required()
@@ -1144,7 +1204,9 @@ def export_wishlist():
     Export user's wishlist data in various formats.
     
     Query Parameters:
-        - format: Export format (json, csv) - default: json
+        - format: Export format (json, csv, ndjson) - default: json
+        - stream: Stream csv as a file download instead of JSON - default: false
+        - gzip: Gzip a streamed download - default: false
     """
     if request.method == 'OPTIONS':
         return '', 200
@@ -1159,43 +1221,13 @@ def export_wishlist():
         
         # Get export format
         export_format = request.args.get('format', 'json').lower()
-        if export_format not in ['json', 'csv']:
-            return jsonify({'error': 'Invalid export format. Supported formats: json, csv'}), 400
+        if export_format not in ['json', 'csv', 'ndjson']:
+            return jsonify({'error': 'Invalid export format. Supported formats: json, csv, ndjson'}), 400
         
-        wishlist_items = db.session.query(WishlistItem).join(Product).outerjoin(Category).outerjoin(Brand).filter(
-            WishlistItem.user_id == current_user_id,
-            Product.is_active == True
-        ).order_by(WishlistItem.created_at.desc()).all()
-        
-        # Prepare export data
-        export_data = []
-        for item in wishlist_items:
-            product = item.product
-            price = float(product.sale_price) if product.sale_price else float(product.price)
-            
-            export_item = {
-                'wishlist_item_id': item.id,
-                'added_date': item.created_at.isoformat(),
-                'product_id': product.id,
-                'product_name': product.name,
-                'product_slug': product.slug,
-                'description': item.product.short_description or item.product.description,
-                'price': price,
-                'original_price': float(product.price),
-                'sale_price': float(product.sale_price) if product.sale_price else None,
-                'is_on_sale': product.is_sale,
-                'stock': product.stock,
-                'sku': product.sku,
-                'category': product.category.name if product.category else None,
-                'brand': product.brand.name if product.brand else None,
-                'is_featured': product.is_featured,
-                'is_new': product.is_new,
-                'thumbnail_url': product.thumbnail_url,
-                'availability_status': product.availability_status
-            }
-            export_data.append(export_item)
+        spec = user_wishlist_export_spec({'user_id': current_user_id})
         
         if export_format == 'json':
+            export_data = list(spec.rows)
             return jsonify({
                 'export_format': 'json',
                 'total_items': len(export_data),
@@ -1204,55 +1236,18 @@ def export_wishlist():
                 'data': export_data
             }), 200
         
-        elif export_format == 'csv':
-            # Create CSV data
-            output = io.StringIO()
-            if export_data:
-                # Define proper CSV headers
-                fieldnames = [
-                    'Wishlist Item ID', 'Added Date', 'Product ID', 'Product Name', 
-                    'Product Slug', 'Description', 'Price', 'Original Price', 
-                    'Sale Price', 'Is On Sale', 'Stock', 'SKU', 'Category', 
-                    'Brand', 'Is Featured', 'Is New', 'Thumbnail URL', 'Availability Status'
-                ]
-                
-                writer = csv.DictWriter(output, fieldnames=fieldnames)
-                writer.writeheader()
-                
-                # Map the data to match headers
-                for item in export_data:
-                    csv_row = {
-                        'Wishlist Item ID': item['wishlist_item_id'],
-                        'Added Date': item['added_date'],
-                        'Product ID': item['product_id'],
-                        'Product Name': item['product_name'],
-                        'Product Slug': item['product_slug'],
-                        'Description': item['description'],
-                        'Price': item['price'],
-                        'Original Price': item['original_price'],
-                        'Sale Price': item['sale_price'],
-                        'Is On Sale': item['is_on_sale'],
-                        'Stock': item['stock'],
-                        'SKU': item['sku'],
-                        'Category': item['category'],
-                        'Brand': item['brand'],
-                        'Is Featured': item['is_featured'],
-                        'Is New': item['is_new'],
-                        'Thumbnail URL': item['thumbnail_url'],
-                        'Availability Status': item['availability_status']
-                    }
-                    writer.writerow(csv_row)
-            
-            csv_data = output.getvalue()
-            output.close()
-            
-            return jsonify({
-                'export_format': 'csv',
-                'total_items': len(export_data),
-                'user_id': current_user_id,
-                'exported_at': datetime.now(timezone.utc).isoformat(),
-                'csv_data': csv_data
-            }), 200
+        _, compress, _ = export_options(request.args)
+        if wants_stream(request.args, export_format, compress):
+            return export_response(spec, export_format, compress)
+        
+        csv_data, total_items = render_csv(spec)
+        return jsonify({
+            'export_format': 'csv',
+            'total_items': total_items,
+            'user_id': current_user_id,
+            'exported_at': datetime.now(timezone.utc).isoformat(),
+            'csv_data': csv_data if total_items else ''
+        }), 200
     
     except Exception as e:
         logger.error(f"Error exporting wishlist for user {current_user_id}: {str(e)}")
@@ -0,0 +1,204 @@
+"""
+Buffered admin activity audit log for Mizizzi E-commerce platform.
+
+``record`` captures an event and its request details (client address, user
+agent, endpoint, method, time) and puts it on a bounded in-memory queue. It
+never touches the caller's database session, so logging an admin action:
+
+- no longer costs the request an extra commit, and
+- can no longer commit (or, on failure, poison) whatever else the request
+  has pending.
+
+A daemon writer thread drains the queue every AUDIT_LOG_FLUSH_SECONDS, or
+sooner once AUDIT_LOG_BATCH_SIZE events are waiting. It inserts the events
+in one multi-row INSERT on its own connection. If a batch is rejected it is
+retried row by row, so one bad event does not lose the rest. When the queue is
+full (the database is down or far behind) new events are dropped and
+counted. Every event is also written to the application log as an
+``ADMIN_ACTIVITY`` line, so a dropped event can still be recovered from the
+logs.
+
+Pending events are flushed at interpreter exit. With AUDIT_LOG_WRITER off
+(tests, scripts) nothing is written until ``flush()`` is called.
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime, UTC
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUEUE_SIZE = 10000
+DEFAULT_BATCH_SIZE = 200
+DEFAULT_FLUSH_SECONDS = 1.0
+
+def _request_details():
+    from flask import has_request_context, request
+
+    if not has_request_context():
+        return {'ip_address': None, 'user_agent': None, 'endpoint': None, 'method': None}
+    try:
+        from app.configuration.rate_limiting import client_address
+        ip_address = client_address()
+    except Exception:
+        ip_address = request.remote_addr
+    return {
+        'ip_address': ip_address,
+        'user_agent': request.headers.get('User-Agent'),
+        'endpoint': request.endpoint,
+        'method': request.method,
+    }
+
+class AuditLog:
+    """Bounded queue of admin_activity_logs rows and the thread that writes them."""
+
+    def __init__(self, app, queue_size=DEFAULT_QUEUE_SIZE, batch_size=DEFAULT_BATCH_SIZE,
+                 flush_seconds=DEFAULT_FLUSH_SECONDS, writer=True):
+        self.app = app
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.writer = writer
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._wake = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def record(self, admin_id, action, details=None, status_code=200):
+        """Queue an event; returns False if it had to be dropped."""
+        row = dict(_request_details(),
+                   admin_id=admin_id,
+                   action=action,
+                   details=details,
+                   status_code=status_code,
+                   created_at=datetime.now(UTC).replace(tzinfo=None))
+        logger.info(f"ADMIN_ACTIVITY: {json.dumps(row, default=str)}")
+
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 1000 == 0:
+                logger.error(f"Audit log queue full, {self.dropped} events dropped so far")
+            return False
+
+        if self._queue.qsize() >= self.batch_size:
+            self._wake.set()
+        self._ensure_writer()
+        return True
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def stats(self):
+        return {'pending': self.pending(), 'written': self.written,
+                'dropped': self.dropped, 'failed': self.failed}
+
+    # ----------------------------------------------------------------------
+    # Writing
+    # ----------------------------------------------------------------------
+    def flush(self):
+        """Write every queued event; returns the number written."""
+        total = 0
+        with self._flush_lock:
+            while True:
+                rows = self._drain()
+                if not rows:
+                    return total
+                total += self._write(rows)
+
+    def _drain(self):
+        rows = []
+        while len(rows) < self.batch_size:
+            try:
+                rows.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return rows
+
+    def _write(self, rows):
+        from app.configuration.extensions import db
+        from app.models.models import AdminActivityLog
+
+        table = AdminActivityLog.__table__
+        with self.app.app_context():
+            engine = db.engine
+            try:
+                with engine.begin() as conn:
+                    conn.execute(table.insert(), rows)
+                self.written += len(rows)
+                return len(rows)
+            except Exception as e:
+                logger.warning(f"Audit log batch of {len(rows)} failed, retrying row by row: {str(e)}")
+
+            written = 0
+            for row in rows:
+                try:
+                    with engine.begin() as conn:
+                        conn.execute(table.insert(), [row])
+                    written += 1
+                except Exception as e:
+                    self.failed += 1
+                    logger.error(f"Could not write audit event {row['action']} for admin {row['admin_id']}: {str(e)}")
+            self.written += written
+            return written
+
+    def _ensure_writer(self):
+        if not self.writer:
+            return
+        pid = os.getpid()
+        if self._thread is not None and self._pid == pid and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is not None and self._pid == pid and self._thread.is_alive():
+                return
+            # Started lazily, so each forked worker gets its own writer
+            self._pid = pid
+            self._thread = threading.Thread(target=self._run, name='audit-log-writer', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Audit log writer failed: {str(e)}")
+                time.sleep(self.flush_seconds)
+
+def get_audit_log(app=None):
+    from flask import current_app
+    return (app or current_app).extensions.get('audit_log')
+
+def record_admin_activity(admin_id, action, details=None, status_code=200):
+    """Queue an admin activity event for the current app (no-op without one)."""
+    from flask import has_app_context
+
+    audit_log = get_audit_log() if has_app_context() else None
+    if audit_log is None:
+        logger.warning(f"Audit log not initialized, event {action} for admin {admin_id} not stored")
+        return False
+    return audit_log.record(admin_id, action, details, status_code)
+
+def init_audit_log(app):
+    """Create the app's audit log queue and flush it at exit."""
+    audit_log = AuditLog(
+        app,
+        queue_size=app.config.get('AUDIT_LOG_QUEUE_SIZE', DEFAULT_QUEUE_SIZE),
+        batch_size=app.config.get('AUDIT_LOG_BATCH_SIZE', DEFAULT_BATCH_SIZE),
+        flush_seconds=app.config.get('AUDIT_LOG_FLUSH_SECONDS', DEFAULT_FLUSH_SECONDS),
+        writer=app.config.get('AUDIT_LOG_WRITER', True)
+    )
+    app.extensions['audit_log'] = audit_log
+    if audit_log.writer:
+        atexit.register(audit_log.flush)
+    return audit_log
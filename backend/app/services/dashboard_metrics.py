@@ -0,0 +1,463 @@
+"""
+Dashboard metrics store for Mizizzi E-commerce platform.
+
+The admin dashboard reads its revenue, order, payment, user and category
+totals from the dashboard_metrics rollup table instead of aggregating the
+orders table on every load:
+
+    - settled days are kept as 'day' buckets and today's settled hours as
+      'hour' buckets; the rest is aggregated live with a sargable created_at
+      range on the indexed column. An hour settles
+      DASHBOARD_METRICS_SETTLE_SECONDS after it ends, so a transaction that
+      flushed a row just before the hour closed has committed before the
+      hour is rolled up
+    - missing buckets are filled on demand with one grouped query over the
+      missing span, the same way the payment statistics rollups are
+    - every computed bucket has a '_bucket' marker row, so empty hours and
+      days are not recomputed on every request
+    - an order, order item or user write that lands in an already closed
+      hour (a status change, a deletion, a bulk UPDATE, a backdated row, an
+      item added to an older order) appends that hour to
+      dashboard_metric_changes in the same transaction; the next read drops
+      the affected hour and day buckets and rebuilds them from the source
+      rows. New orders fall in the live hour, so checkout never writes to
+      the store and there is no hot counter row to contend on
+
+Each bucket holds (count, amount) per metric and dimension:
+
+    orders          order status      orders, SUM(total_amount)
+    payments        payment status    orders, SUM(total_amount)
+    users           ''                users created
+    category_sales  category name     order items, SUM(OrderItem.total) of
+                                      orders that are not cancelled
+"""
+import logging
+from datetime import date, datetime, time, timedelta, UTC
+
+from sqlalchemy import event, inspect as sa_inspect
+
+logger = logging.getLogger(__name__)
+
+HOUR = 'hour'
+DAY = 'day'
+STEPS = {HOUR: timedelta(hours=1), DAY: timedelta(days=1)}
+BUCKET_MARKER = '_bucket'
+DEFAULT_SETTLE_SECONDS = 300
+
+def _utcnow():
+    return datetime.now(UTC).replace(tzinfo=None)
+
+def _naive(value):
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(UTC).replace(tzinfo=None)
+    return value
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+def _midnight(day):
+    return datetime.combine(_as_date(day), time.min)
+
+def _hour_start(value):
+    return value.replace(minute=0, second=0, microsecond=0)
+
+def _settled_hour(now):
+    """Start of the first hour that is still aggregated live."""
+    from flask import current_app
+
+    settle = current_app.config.get('DASHBOARD_METRICS_SETTLE_SECONDS', DEFAULT_SETTLE_SECONDS)
+    return _hour_start(now - timedelta(seconds=settle))
+
+def _bucket_starts(granularity, first, end):
+    starts, step = [], STEPS[granularity]
+    while first < end:
+        starts.append(first)
+        first += step
+    return starts
+
+# --------------------------------------------------------------------------
+# Aggregation from the source tables
+# --------------------------------------------------------------------------
+def _bucket_columns(column, granularity):
+    from sqlalchemy import extract, func
+
+    if granularity is None:
+        return []
+    if granularity == DAY:
+        return [func.date(column)]
+    return [func.date(column), extract('hour', column)]
+
+def _bucket_of(values, granularity, start):
+    if granularity is None:
+        return start
+    bucket = _midnight(values[0])
+    if granularity == HOUR:
+        bucket += timedelta(hours=int(values[1]))
+    return bucket
+
+def _ranged(query, column, start, end):
+    # Plain range predicates so the created_at indexes are usable
+    if start is not None:
+        query = query.filter(column >= start)
+    if end is not None:
+        query = query.filter(column < end)
+    return query
+
+def live_rows(start, end=None, granularity=None):
+    """
+    (bucket_start, metric, dimension, count, amount) for rows created in [start, end).
+
+    With no granularity everything is reported in a single bucket at ``start``.
+    """
+    from sqlalchemy import func, literal
+    from app.configuration.extensions import db
+    from app.models.models import Category, Order, OrderItem, OrderStatus, Product, User
+
+    order_buckets = _bucket_columns(Order.created_at, granularity)
+    user_buckets = _bucket_columns(User.created_at, granularity)
+    queries = [
+        ('orders', Order.created_at, order_buckets, Order.status,
+         db.session.query(*order_buckets, Order.status, func.count(Order.id), func.sum(Order.total_amount))),
+        ('payments', Order.created_at, order_buckets, Order.payment_status,
+         db.session.query(*order_buckets, Order.payment_status, func.count(Order.id), func.sum(Order.total_amount))),
+        ('users', User.created_at, user_buckets, None,
+         db.session.query(*user_buckets, literal(''), func.count(User.id), literal(0))),
+        ('category_sales', Order.created_at, order_buckets, Category.name,
+         db.session.query(*order_buckets, Category.name, func.count(OrderItem.id), func.sum(OrderItem.total))
+         .select_from(OrderItem)
+         .join(Order, Order.id == OrderItem.order_id)
+         .join(Product, Product.id == OrderItem.product_id)
+         .join(Category, Category.id == Product.category_id)
+         .filter(Order.status != OrderStatus.CANCELLED)),
+    ]
+
+    width = len(order_buckets)
+    rows = []
+    for metric, created_at, buckets, dimension, query in queries:
+        groups = buckets + ([dimension] if dimension is not None else [])
+        for values in _ranged(query, created_at, start, end).group_by(*groups):
+            name = values[width]
+            rows.append((_bucket_of(values[:width], granularity, start), metric,
+                         str(getattr(name, 'value', name) or ''), int(values[-2] or 0), float(values[-1] or 0)))
+    return rows
+
+# --------------------------------------------------------------------------
+# Rollups
+# --------------------------------------------------------------------------
+def _store_buckets(granularity, starts, rows):
+    """Replace the rollup rows of ``starts`` with ``rows`` (caller commits)."""
+    from app.configuration.extensions import db
+    from app.models.models import DashboardMetric
+
+    starts = set(starts)
+    DashboardMetric.query.filter(
+        DashboardMetric.granularity == granularity,
+        DashboardMetric.bucket_start.in_(starts)
+    ).delete(synchronize_session=False)
+
+    for bucket, metric, dimension, count, amount in rows:
+        if bucket in starts:
+            db.session.add(DashboardMetric(granularity=granularity, bucket_start=bucket, metric=metric,
+                                           dimension=dimension, count=count, amount=amount))
+    for bucket in starts:
+        db.session.add(DashboardMetric(granularity=granularity, bucket_start=bucket, metric=BUCKET_MARKER,
+                                       dimension='', count=0, amount=0))
+
+def ensure_buckets(granularity, first, end):
+    """Compute missing ``granularity`` buckets in [first, end) with one grouped query over the gap."""
+    from sqlalchemy.exc import IntegrityError
+    from app.configuration.extensions import db
+    from app.models.models import DashboardMetric
+
+    starts = _bucket_starts(granularity, first, end)
+    if not starts:
+        return 0
+    markers = DashboardMetric.query.filter(
+        DashboardMetric.granularity == granularity,
+        DashboardMetric.metric == BUCKET_MARKER,
+        DashboardMetric.bucket_start >= first,
+        DashboardMetric.bucket_start < end
+    )
+    if markers.count() == len(starts):
+        return 0
+
+    present = {_naive(row.bucket_start) for row in markers.with_entities(DashboardMetric.bucket_start)}
+    missing = [start for start in starts if start not in present]
+    rows = live_rows(missing[0], missing[-1] + STEPS[granularity], granularity)
+    try:
+        _store_buckets(granularity, missing, rows)
+        db.session.commit()
+    except IntegrityError:
+        # Another request filled the same buckets first
+        db.session.rollback()
+    return len(missing)
+
+def apply_recorded_changes():
+    """Drop the buckets touched by recorded changes so the next read rebuilds them."""
+    from sqlalchemy import and_, or_
+    from app.configuration.extensions import db
+    from app.models.models import DashboardMetric, DashboardMetricChange
+
+    changes = db.session.query(DashboardMetricChange.id, DashboardMetricChange.bucket_start).all()
+    if not changes:
+        return 0
+    hours = {_naive(bucket) for _, bucket in changes}
+    days = {_midnight(hour) for hour in hours}
+    DashboardMetric.query.filter(or_(
+        and_(DashboardMetric.granularity == HOUR, DashboardMetric.bucket_start.in_(hours)),
+        and_(DashboardMetric.granularity == DAY, DashboardMetric.bucket_start.in_(days))
+    )).delete(synchronize_session=False)
+    # Only the changes read above; ones committed meanwhile are applied on the next read
+    DashboardMetricChange.query.filter(
+        DashboardMetricChange.id.in_([change_id for change_id, _ in changes])
+    ).delete(synchronize_session=False)
+    db.session.commit()
+    return len(hours)
+
+def rebuild(first_day, last_day):
+    """Recompute the day buckets for [first_day, last_day]; returns the number of days."""
+    from app.configuration.extensions import db
+
+    end = min(_midnight(last_day) + STEPS[DAY], _midnight(_utcnow()))
+    starts = _bucket_starts(DAY, _midnight(first_day), end)
+    if not starts:
+        return 0
+    _store_buckets(DAY, starts, live_rows(starts[0], end, DAY))
+    db.session.commit()
+    return len(starts)
+
+def _first_day():
+    from sqlalchemy import func
+    from app.configuration.extensions import db
+    from app.models.models import Order, User
+
+    firsts = [value for value in (db.session.query(func.min(Order.created_at)).scalar(),
+                                  db.session.query(func.min(User.created_at)).scalar()) if value]
+    return _midnight(min(firsts)) if firsts else None
+
+def _summed(granularity, start, end):
+    from sqlalchemy import func
+    from app.configuration.extensions import db
+    from app.models.models import DashboardMetric
+
+    if start is not None and end is not None and start >= end:
+        return []
+    query = db.session.query(
+        DashboardMetric.metric, DashboardMetric.dimension,
+        func.sum(DashboardMetric.count), func.sum(DashboardMetric.amount)
+    ).filter(DashboardMetric.granularity == granularity, DashboardMetric.metric != BUCKET_MARKER)
+    query = _ranged(query, DashboardMetric.bucket_start, start, end)
+    return [(None, metric, dimension, int(count or 0), float(amount or 0))
+            for metric, dimension, count, amount in query.group_by(DashboardMetric.metric, DashboardMetric.dimension)]
+
+def _closed_rows(start, end, closed_day, settled):
+    """Rolled-up rows for [start, end): day buckets before closed_day, hour buckets after it."""
+    rows = _summed(DAY, start, min(end, closed_day))
+    return rows + _summed(HOUR, closed_day if start is None else max(start, closed_day), min(end, settled))
+
+def _totals(*row_lists):
+    totals = {}
+    for rows in row_lists:
+        for _, metric, dimension, count, amount in rows:
+            entry = totals.setdefault(metric, {}).setdefault(dimension, [0, 0.0])
+            entry[0] += count
+            entry[1] += amount
+    return totals
+
+def period_totals(now=None):
+    """
+    Totals for today, yesterday, this week, month and year, and all time.
+
+    Each period maps metric -> dimension -> [count, amount].
+    """
+    now = _naive(now) or _utcnow()
+    today = _midnight(now)
+    settled = _settled_hour(now)
+    closed_day = _midnight(settled)
+
+    apply_recorded_changes()
+    first_day = _first_day()
+    if first_day is not None:
+        ensure_buckets(DAY, first_day, closed_day)
+    ensure_buckets(HOUR, closed_day, settled)
+
+    today_rows = _summed(HOUR, today, settled) + live_rows(max(today, settled))
+    # Until yesterday's last hour settles it is aggregated live as well
+    unsettled = live_rows(settled, today) if settled < today else []
+    starts = {
+        'week': today - timedelta(days=today.weekday()),
+        'month': today.replace(day=1),
+        'year': today.replace(month=1, day=1),
+        'all': None
+    }
+    periods = {
+        'today': _totals(today_rows),
+        'yesterday': _totals(_closed_rows(today - STEPS[DAY], today, closed_day, settled), unsettled)
+    }
+    for name, start in starts.items():
+        earlier = unsettled if start is None or start < today else []
+        periods[name] = _totals(_closed_rows(start, today, closed_day, settled), earlier, today_rows)
+    return periods
+
+def daily_totals(metric, first_day, last_day, now=None):
+    """{date: {dimension: [count, amount]}} for ``metric`` on each day in [first_day, last_day]."""
+    from app.models.models import DashboardMetric
+
+    now = _naive(now) or _utcnow()
+    today = _midnight(now)
+    settled = _settled_hour(now)
+    closed_day = _midnight(settled)
+    first, end = _midnight(first_day), _midnight(last_day) + STEPS[DAY]
+
+    apply_recorded_changes()
+    ensure_buckets(DAY, first, min(end, closed_day))
+    days = {}
+    query = DashboardMetric.query.filter(
+        DashboardMetric.granularity == DAY,
+        DashboardMetric.metric == metric,
+        DashboardMetric.bucket_start >= first,
+        DashboardMetric.bucket_start < min(end, closed_day)
+    )
+    for row in query:
+        entry = days.setdefault(_as_date(row.bucket_start), {}).setdefault(row.dimension, [0, 0.0])
+        entry[0] += row.count
+        entry[1] += float(row.amount or 0)
+
+    # Today, and yesterday until its last hour settles: settled hours plus live rows
+    open_days = _bucket_starts(DAY, max(first, closed_day), min(end, today + STEPS[DAY]))
+    if open_days:
+        ensure_buckets(HOUR, closed_day, settled)
+    for day in open_days:
+        day_end = day + STEPS[DAY]
+        rows = live_rows(max(day, settled), day_end if day_end <= today else None)
+        days[day.date()] = _totals(_summed(HOUR, day, min(day_end, settled)), rows).get(metric, {})
+    return days
+
+def metric_sum(totals, metric, exclude=()):
+    """(count, amount) of ``metric`` over all dimensions except ``exclude``."""
+    count, amount = 0, 0.0
+    for dimension, (dimension_count, dimension_amount) in totals.get(metric, {}).items():
+        if dimension not in exclude:
+            count += dimension_count
+            amount += dimension_amount
+    return count, amount
+
+# --------------------------------------------------------------------------
+# Change capture
+# --------------------------------------------------------------------------
+# Columns whose change moves a row between rolled-up totals
+_TRACKED_COLUMNS = {
+    'Order': ('status', 'payment_status', 'total_amount', 'created_at'),
+    'User': ('created_at',),
+    'OrderItem': ('quantity', 'total', 'product_id', 'order_id'),
+}
+
+def _is_changed(obj, deleted):
+    state = sa_inspect(obj)
+    return deleted or any(state.attrs[name].history.has_changes()
+                          for name in _TRACKED_COLUMNS[type(obj).__name__])
+
+def _loaded_created_at(obj):
+    """Old and new created_at of a row, or None when the attribute is not loaded."""
+    state = sa_inspect(obj)
+    history = state.attrs.created_at.history
+    values = [value for value in [*(history.deleted or ()), *(history.added or ()), *(history.unchanged or ()),
+                                  state.dict.get('created_at')]
+              if isinstance(value, datetime)]
+    return values or None
+
+def _session_order(session, item):
+    """The item's order if the session already holds it, without loading it."""
+    from app.models.models import Order
+
+    order = item.__dict__.get('order')
+    if order is None and item.order_id is not None:
+        order = session.identity_map.get(session.identity_key(Order, item.order_id))
+    return order
+
+def _record_changes(session, flush_context):
+    from sqlalchemy import select
+    from app.models.models import Order, OrderItem, User
+
+    hours, unresolved = set(), {Order: set(), User: set()}
+    written = ([(obj, False, True) for obj in session.new] + [(obj, False, False) for obj in session.dirty]
+               + [(obj, True, False) for obj in session.deleted])
+    for obj, deleted, new in written:
+        if not isinstance(obj, (Order, User, OrderItem)) or not (new or _is_changed(obj, deleted)):
+            continue
+        if isinstance(obj, OrderItem):
+            order = _session_order(session, obj)
+            if order is not None and order in session.new:
+                continue  # recorded with its order, if that is backdated
+            values = _loaded_created_at(order) if order is not None else None
+            if values is not None:
+                hours.update(_hour_start(_naive(value)) for value in values)
+            elif obj.order_id is not None:
+                unresolved[Order].add(obj.order_id)
+            continue
+        values = _loaded_created_at(obj)
+        if values is not None:
+            hours.update(_hour_start(_naive(value)) for value in values)
+        elif not new:
+            unresolved[type(obj)].add(sa_inspect(obj).identity[0])
+
+    if not hours and not any(unresolved.values()):
+        return
+    connection = session.connection()
+    for model, ids in unresolved.items():
+        if ids:
+            result = connection.execute(select(model.__table__.c.created_at).where(model.__table__.c.id.in_(ids)))
+            hours.update(_hour_start(_naive(value)) for (value,) in result if value is not None)
+    cutoff = _hour_start(_utcnow())
+    _insert_changes(connection, {hour for hour in hours if hour < cutoff})
+
+def _insert_changes(connection, hours):
+    from app.models.models import DashboardMetricChange
+
+    if hours:
+        connection.execute(DashboardMetricChange.__table__.insert(),
+                           [{'bucket_start': hour, 'recorded_at': _utcnow()} for hour in sorted(hours)])
+
+def record_order_changes(order_ids):
+    """
+    Record rolled-up hours touched by bulk statements on ``order_ids``.
+
+    Bulk UPDATEs bypass the flush hook; the caller commits.
+    """
+    from app.configuration.extensions import db
+    from app.models.models import Order
+
+    if not order_ids:
+        return
+    cutoff = _hour_start(_utcnow())
+    hours = {_hour_start(_naive(created)) for (created,) in
+             db.session.query(Order.created_at).filter(Order.id.in_(list(order_ids))) if created is not None}
+    _insert_changes(db.session.connection(), {hour for hour in hours if hour < cutoff})
+
+_hooks_installed = False
+
+def init_dashboard_metrics(app):
+    """Install the change-capture hook once and add the ``flask dashboard rebuild`` command."""
+    global _hooks_installed
+    import click
+    from app.configuration.extensions import db
+
+    if not _hooks_installed:
+        event.listen(db.session, 'after_flush', _record_changes)
+        _hooks_installed = True
+
+    @app.cli.group('dashboard')
+    def dashboard_cli():
+        """Admin dashboard metrics."""
+
+    @dashboard_cli.command('rebuild')
+    @click.option('--days', default=30, show_default=True, help='Number of closed days to recompute.')
+    def rebuild_command(days):
+        """Recompute the daily dashboard rollups for the last DAYS closed days."""
+        today = _utcnow().date()
+        count = rebuild(today - timedelta(days=days), today - timedelta(days=1))
+        click.echo(f"Rebuilt dashboard metrics for {count} days")
@@ -0,0 +1,321 @@
+"""
+Transactional email templates for Mizizzi E-commerce platform.
+
+Email bodies live as Jinja2 templates under app/templates/emails and share one
+layout. The environment is built once per process and every template is
+compiled at startup (auto_reload is off, the template cache is unbounded), so a
+send only pays for rendering. Templates are rendered from a plain-dict order
+snapshot built from a single eager-loaded query, which also lets bulk
+notifications render many orders in one pass (``render_order_emails``), a
+chunk of orders per query.
+"""
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'templates', 'emails')
+DATE_FORMAT = '%B %d, %Y at %I:%M %p'
+RENDER_CHUNK_SIZE = 50
+
+_env = None
+_env_lock = threading.Lock()
+
+def format_money(value):
+    """Format an amount the way the emails always have: thousands separators, two decimals."""
+    return "{:,.2f}".format(float(value or 0))
+
+def get_environment():
+    """Return the shared template environment, creating it on first use."""
+    global _env
+    if _env is None:
+        with _env_lock:
+            if _env is None:
+                env = Environment(
+                    loader=FileSystemLoader(TEMPLATE_DIR),
+                    autoescape=select_autoescape(['html']),
+                    auto_reload=False,
+                    cache_size=-1
+                )
+                env.filters['money'] = format_money
+                _env = env
+    return _env
+
+def precompile():
+    """Compile every email template so the first send does not pay for parsing."""
+    env = get_environment()
+    names = env.list_templates(extensions=['html'])
+    for name in names:
+        env.get_template(name)
+    logger.info(f"Compiled {len(names)} email templates")
+    return names
+
+def render(name, **context):
+    """Render a template by name (relative to the emails directory)."""
+    context.setdefault('current_year', datetime.utcnow().year)
+    return get_environment().get_template(name).render(**context)
+
+# --------------------------------------------------------------------------
+# Order snapshots
+# --------------------------------------------------------------------------
+PAYMENT_METHOD_LABELS = {
+    'mpesa': 'M-Pesa',
+    'airtel': 'Airtel Money',
+    'card': 'Credit/Debit Card',
+    'cash_on_delivery': 'Cash on Delivery'
+}
+
+def order_snapshot_options():
+    """Loader options that fetch everything an order email needs with the order."""
+    from sqlalchemy.orm import configure_mappers, joinedload, selectinload
+    from app.models.models import Order, OrderItem, Product
+
+    # Order.user is a backref and only exists once the mappers are configured.
+    configure_mappers()
+    return (
+        selectinload(Order.items).joinedload(OrderItem.product).options(
+            selectinload(Product.images),
+            joinedload(Product.category)
+        ),
+        selectinload(Order.items).joinedload(OrderItem.variant),
+        joinedload(Order.user)
+    )
+
+def load_orders(order_ids):
+    """Load orders with their items, products, images, variants and customer in a fixed number of queries."""
+    from app.models.models import Order
+
+    order_ids = list(dict.fromkeys(order_ids))
+    if not order_ids:
+        return []
+    orders = Order.query.options(*order_snapshot_options()).filter(Order.id.in_(order_ids)).all()
+    by_id = {order.id: order for order in orders}
+    return [by_id[order_id] for order_id in order_ids if order_id in by_id]
+
+def _parse_address(address):
+    if isinstance(address, str):
+        try:
+            return json.loads(address) or {}
+        except json.JSONDecodeError:
+            return {}
+    return address or {}
+
+def _item_snapshot(item):
+    product = item.product
+    variant = item.variant
+    image_url = None
+    if product is not None and product.images:
+        image_url = min(product.images, key=lambda image: image.sort_order or 0).url
+    color = variant.color if variant else None
+    size = variant.size if variant else None
+    total = item.total if item.total is not None else (item.price or 0) * (item.quantity or 0)
+    return {
+        'id': item.id,
+        'name': product.name if product is not None else None,
+        'image_url': image_url,
+        'category_name': product.category.name if product is not None and product.category else None,
+        'has_variant': variant is not None,
+        'color': color,
+        'size': size,
+        'variant_parts': [part for part in (color, size) if part],
+        'quantity': item.quantity,
+        'price': item.price or 0,
+        'total': total
+    }
+
+def build_order_snapshot(order, to_email=None, customer_name=None):
+    """
+    Flatten an order into the context shared by every order template.
+
+    The order should have been loaded with order_snapshot_options(); anything
+    not loaded is fetched lazily, so the snapshot is still correct, just slower.
+    """
+    status = order.status.value if hasattr(order.status, 'value') else (order.status or '')
+    user = order.user
+    if not customer_name:
+        customer_name = getattr(user, 'name', None) or 'Valued Customer'
+    if not to_email:
+        to_email = getattr(user, 'email', None)
+
+    items = [_item_snapshot(item) for item in order.items]
+    payment_method = order.payment_method or ''
+    created_at = order.created_at or datetime.utcnow()
+
+    return {
+        'order': {
+            'id': order.id,
+            'order_number': order.order_number,
+            'status': status,
+            'total_amount': order.total_amount or 0,
+            'subtotal': order.subtotal or 0,
+            'shipping_cost': order.shipping_cost or 0,
+            'payment_method': order.payment_method,
+            'shipping_method': order.shipping_method,
+            'tracking_number': order.tracking_number
+        },
+        'items': items,
+        'items_subtotal': sum((item['price'] or 0) * (item['quantity'] or 0) for item in items),
+        'shipping_address': _parse_address(order.shipping_address),
+        'payment_method': PAYMENT_METHOD_LABELS.get(payment_method, payment_method.replace('_', ' ').title()),
+        'order_date': created_at.strftime(DATE_FORMAT),
+        'to_email': to_email,
+        'customer_name': customer_name
+    }
+
+# --------------------------------------------------------------------------
+# Order email kinds
+# --------------------------------------------------------------------------
+_JOURNEY_DONE = ("#FF6600", "#FF6600", "#fff", "#FF6600", "#fff")
+_JOURNEY_TODO = ("#fff", "#eee", "#FF6600", "#fff", "#333")
+_JOURNEY_PARTS = ('bg', 'border', 'circle_bg', 'circle_text', 'text')
+_JOURNEY_PROGRESS = {'processing': 2, 'shipped': 3, 'delivered': 4}
+
+def _journey_steps(status):
+    reached = _JOURNEY_PROGRESS.get(status, 1)
+    context = {}
+    for step in range(1, 5):
+        colors = _JOURNEY_DONE if step <= reached else _JOURNEY_TODO
+        for part, color in zip(_JOURNEY_PARTS, colors):
+            context[f'journey_step_{step}_{part}'] = color
+    return context
+
+def _progress_steps(active_color, reached):
+    context = {}
+    for step in range(1, 5):
+        done = step <= reached
+        context[f'step{step}_color'] = active_color if done else "#E5E7EB"
+        context[f'step{step}_text_color'] = "#FFFFFF" if done else "#9CA3AF"
+    return context
+
+_DELIVERED_STEPS = {
+    'step1_bg': "#10B981", 'step1_color': "#FFFFFF", 'step1_label_color': "#1F2937",
+    'step2_bg': "#10B981", 'step2_color': "#FFFFFF", 'step2_label_color': "#10B981",
+    'step3_bg': "#10B981", 'step3_color': "#FFFFFF", 'step3_label_color': "#10B981",
+    'step4_bg': "#10B981", 'step4_color': "#FFFFFF", 'step4_label_color': "#10B981"
+}
+
+STATUS_INFO = {
+    'pending': {
+        "title": "Order Received",
+        "description": "Your order has been received and is awaiting processing.",
+        "color": "#0088cc",
+        "next_step": "Our team will begin processing your order soon."
+    },
+    'shipped': {
+        "title": "Order Shipped",
+        "description": "Your order has been shipped and is on its way to you!",
+        "color": "#9933cc",
+        "next_step": "Our delivery agent will contact you shortly to arrange delivery."
+    },
+    'delivered': {
+        "title": "Order Delivered",
+        "description": "Your order has been delivered successfully.",
+        "color": "#33cc33",
+        "next_step": "We hope you enjoy your purchase! If you have any issues, please contact our support team."
+    },
+    'cancelled': {
+        "title": "Order Cancelled",
+        "description": "Your order has been cancelled as requested.",
+        "color": "#cc3333",
+        "next_step": "If you didn't request this cancellation or have questions, please contact our support team."
+    },
+    'refunded': {
+        "title": "Order Refunded",
+        "description": "A refund has been processed for your order.",
+        "color": "#999999",
+        "next_step": "The refund should appear in your account within 3-5 business days."
+    }
+}
+
+def _status_data(status):
+    return STATUS_INFO.get(status, {
+        "title": f"Order Status: {status.capitalize()}",
+        "description": f"Your order status has been updated to {status}.",
+        "color": "#666666",
+        "next_step": "Please contact our support team if you have any questions."
+    })
+
+def render_order_email(kind, snapshot, **extra):
+    """
+    Render one order email from a snapshot.
+
+    kind is one of 'confirmation', 'status', 'cancellation', 'refund' or
+    'returned'; 'status' picks the template for the order's current status.
+    Returns (subject, html_content).
+    """
+    number = snapshot['order']['order_number']
+    status = snapshot['order']['status']
+    now = datetime.utcnow().strftime(DATE_FORMAT)
+    context = dict(snapshot, **extra)
+
+    if kind == 'status' and status == 'returned':
+        kind = 'returned'
+
+    if kind == 'confirmation':
+        context.update(_journey_steps(status))
+        return (f"Order Confirmation #{number} - MIZIZZI",
+                render('order/confirmation.html', **context))
+    if kind == 'cancellation':
+        context.setdefault('cancellation_date', now)
+        context.setdefault('cancellation_reason', None)
+        return f"Order Cancelled - #{number}", render('order/cancellation.html', **context)
+    if kind == 'refund':
+        context.setdefault('refund_date', now)
+        return f"Refund Processed - #{number}", render('order/refund.html', **context)
+    if kind == 'returned':
+        context.setdefault('return_date', now)
+        return f"Return Processed - #{number}", render('order/returned.html', **context)
+    if kind != 'status':
+        raise ValueError(f"Unknown order email kind: {kind}")
+
+    if status == 'processing':
+        context.update(_progress_steps("#FF6600", 2))
+        return f"Order Processing - #{number} - MIZIZZI", render('order/processing.html', **context)
+    if status == 'shipped':
+        context.update(_progress_steps("#9333EA", 3))
+        return f"Your Order Has Shipped! - #{number}", render('order/shipped.html', **context)
+    if status == 'delivered':
+        context.update(_DELIVERED_STEPS)
+        return f"Order Delivered - #{number} - MIZIZZI", render('order/delivered.html', **context)
+    if status == 'cancelled':
+        return f"Order Cancelled - #{number}", render('order/cancelled.html', **context)
+
+    status_data = _status_data(status)
+    context.setdefault('update_date', now)
+    context['status_data'] = status_data
+    return (f"Order Status Update: {status_data['title']} - #{number}",
+            render('order/status_update.html', **context))
+
+def render_order_emails(order_ids, kind='status', chunk_size=RENDER_CHUNK_SIZE, **extra):
+    """
+    Render the same kind of email for many orders, one chunk at a time.
+
+    Each chunk of order_ids is loaded with one eager-loaded query, so only a
+    chunk's orders and HTML are held at once. Orders without a customer email,
+    or whose email fails to render, are skipped. Yields dicts with order_id,
+    to_email, customer_name, subject and html_content, in the order of order_ids.
+    """
+    order_ids = list(dict.fromkeys(order_ids))
+    for start in range(0, len(order_ids), chunk_size):
+        for order in load_orders(order_ids[start:start + chunk_size]):
+            snapshot = build_order_snapshot(order)
+            if not snapshot['to_email']:
+                logger.warning(f"Skipping {kind} email for order {order.id}: no customer email")
+                continue
+            try:
+                subject, html_content = render_order_email(kind, snapshot, **extra)
+            except Exception as e:
+                logger.error(f"Error rendering {kind} email for order {order.id}: {str(e)}", exc_info=True)
+                continue
+            yield {
+                'order_id': order.id,
+                'to_email': snapshot['to_email'],
+                'customer_name': snapshot['customer_name'],
+                'subject': subject,
+                'html_content': html_content
+            }
@@ -0,0 +1,325 @@
+"""
+Streaming data exports for Mizizzi E-commerce platform.
+
+Exports are described once by an *exporter*: a function registered with
+``@exporter(name)`` that takes the request's filter parameters and returns an
+ExportSpec, i.e. the columns and an iterator of row dicts. Exporters iterate
+their query with ``yield_per`` so rows come off a server-side cursor in
+batches instead of being loaded with ``.all()``.
+
+The same spec can then be delivered three ways:
+
+    export_response()   - a chunked HTTP response (CSV or NDJSON, optionally
+                          gzipped) that starts streaming immediately
+    render_csv()        - the whole CSV as a string, for endpoints that still
+                          return it inside JSON
+    start_export()      - an ``exports.generate`` job that writes the file to
+                          EXPORTS_DIR for very large ranges; progress and the
+                          download are served by /api/admin/exports/<id>
+
+EXPORTS_DIR must be storage shared by web and worker processes when they run
+on different machines. Each manifest carries an ``expires_at``
+EXPORTS_RETENTION_HOURS after the export finished; expired exports are
+answered with 410 and deleted by ``flask exports purge`` (or the
+``exports.purge`` job, e.g. enqueued from cron).
+"""
+import csv
+import io
+import json
+import logging
+import os
+import re
+import uuid
+import zlib
+from datetime import date, datetime, timedelta, UTC
+from decimal import Decimal
+
+from app.configuration.database import ANALYTICS, REPLICA_OPTION, WORKLOAD_OPTION, use_workload
+from app.services.jobs import enqueue, job
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ('csv', 'ndjson')
+MIMETYPES = {'csv': 'text/csv; charset=utf-8', 'ndjson': 'application/x-ndjson'}
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_RETENTION_HOURS = 24
+CHUNK_SIZE = 64 * 1024
+EXPORT_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+class ExportSpec:
+    """Columns as (header, key) pairs plus an iterator of row dicts keyed by ``key``."""
+
+    def __init__(self, columns, rows, filename):
+        self.columns = columns
+        self.rows = rows
+        self.filename = filename
+
+_exporters = {}
+
+def exporter(name):
+    """Register the decorated function as the exporter called ``name``."""
+    def decorator(func):
+        _exporters[name] = func
+        return func
+    return decorator
+
+def get_exporter(name):
+    return _exporters.get(name)
+
+def iter_query(query, batch_size=None):
+    """Iterate a query in batches from a server-side cursor on a replica, else the analytics pool."""
+    from flask import current_app
+    batch_size = batch_size or current_app.config.get('EXPORTS_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+    options = {WORKLOAD_OPTION: ANALYTICS, REPLICA_OPTION: True}
+    return query.execution_options(**options).yield_per(batch_size)
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if hasattr(value, 'value'):
+        return value.value
+    return str(value)
+
+# --------------------------------------------------------------------------
+# Encoders
+# --------------------------------------------------------------------------
+def csv_chunks(spec, chunk_size=CHUNK_SIZE):
+    """Yield the CSV rendering of ``spec`` in text chunks of roughly ``chunk_size``."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([header for header, _ in spec.columns])
+    keys = [key for _, key in spec.columns]
+    for row in spec.rows:
+        writer.writerow(['' if row.get(key) is None else row.get(key) for key in keys])
+        if buffer.tell() >= chunk_size:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def ndjson_chunks(spec, chunk_size=CHUNK_SIZE):
+    """Yield one JSON object per line, grouped into chunks of roughly ``chunk_size``."""
+    keys = [key for _, key in spec.columns]
+    lines, size = [], 0
+    for row in spec.rows:
+        line = json.dumps({key: row.get(key) for key in keys}, default=_json_default) + '\n'
+        lines.append(line)
+        size += len(line)
+        if size >= chunk_size:
+            yield ''.join(lines)
+            lines, size = [], 0
+    if lines:
+        yield ''.join(lines)
+
+def encode_chunks(spec, fmt):
+    return csv_chunks(spec) if fmt == 'csv' else ndjson_chunks(spec)
+
+def gzip_chunks(chunks):
+    """Incrementally gzip text chunks."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31 = gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+def _counted(rows, counter):
+    for row in rows:
+        counter[0] += 1
+        yield row
+
+def render_csv(spec):
+    """(csv_text, row_count) for endpoints that still embed the CSV in JSON."""
+    counter = [0]
+    spec.rows = _counted(spec.rows, counter)
+    return ''.join(csv_chunks(spec)), counter[0]
+
+# --------------------------------------------------------------------------
+# Delivery
+# --------------------------------------------------------------------------
+def _filename(spec, fmt, compress):
+    return f"{spec.filename}.{fmt}{'.gz' if compress else ''}"
+
+def export_response(spec, fmt='csv', compress=False):
+    """Chunked download response for ``spec``; rows are read while the response is sent."""
+    from flask import Response, stream_with_context
+
+    chunks = encode_chunks(spec, fmt)
+    if compress:
+        chunks = gzip_chunks(chunks)
+        mimetype = 'application/gzip'
+    else:
+        chunks = (chunk.encode('utf-8') for chunk in chunks)
+        mimetype = MIMETYPES[fmt]
+
+    response = Response(stream_with_context(chunks), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename={_filename(spec, fmt, compress)}'
+    response.headers['X-Accel-Buffering'] = 'no'  # let nginx pass chunks straight through
+    return response
+
+def export_options(args):
+    """(format, compress, run_async) from request args; format is None when unsupported."""
+    fmt = args.get('format', 'csv').lower()
+    truthy = ('true', '1', 'yes')
+    return (fmt if fmt in FORMATS else None,
+            args.get('gzip', 'false').lower() in truthy,
+            args.get('async', 'false').lower() in truthy)
+
+def wants_stream(args, fmt, compress):
+    """Whether a download was asked for instead of an endpoint's legacy JSON body."""
+    return fmt != 'csv' or compress or args.get('stream', 'false').lower() in ('true', '1', 'yes')
+
+def _exports_dir():
+    from flask import current_app
+    directory = current_app.config.get('EXPORTS_DIR') or os.path.join(current_app.instance_path, 'exports')
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+def _manifest_path(export_id):
+    return os.path.join(_exports_dir(), f"{export_id}.json")
+
+def read_manifest(export_id):
+    if not EXPORT_ID_PATTERN.match(export_id or ''):
+        return None
+    try:
+        with open(_manifest_path(export_id)) as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return None
+
+def _write_manifest(export_id, manifest):
+    path = _manifest_path(export_id)
+    with open(f"{path}.tmp", 'w') as handle:
+        json.dump(manifest, handle)
+    os.replace(f"{path}.tmp", path)
+
+def export_file_path(manifest):
+    return os.path.join(_exports_dir(), manifest['file'])
+
+def _expires_at(finished_at, retention_hours=None):
+    from flask import current_app
+    hours = retention_hours or current_app.config.get('EXPORTS_RETENTION_HOURS', DEFAULT_RETENTION_HOURS)
+    return (finished_at + timedelta(hours=hours)).isoformat()
+
+def is_expired(manifest, now=None):
+    expires_at = manifest.get('expires_at')
+    if not expires_at:
+        return False
+    return datetime.fromisoformat(expires_at) <= (now or datetime.now(UTC))
+
+def start_export(name, params, fmt='csv', compress=False, requested_by=None):
+    """Queue an export job; returns the manifest (the caller commits)."""
+    export_id = uuid.uuid4().hex
+    now = datetime.now(UTC)
+    manifest = {
+        'id': export_id,
+        'exporter': name,
+        'format': fmt,
+        'gzip': compress,
+        'status': 'pending',
+        'requested_by': requested_by,
+        'created_at': now.isoformat(),
+        'expires_at': _expires_at(now),
+        'file': None,
+        'filename': None,
+        'rows': None,
+        'error': None
+    }
+    _write_manifest(export_id, manifest)
+    enqueue('exports.generate', {'export_id': export_id, 'name': name, 'params': params,
+                                 'fmt': fmt, 'compress': compress},
+            idempotency_key=f"export:{export_id}")
+    return read_manifest(export_id) or manifest
+
+@job('exports.generate', max_attempts=2)
+@use_workload(ANALYTICS)
+def generate_export(export_id, name, params, fmt='csv', compress=False):
+    """Job handler: write the export to EXPORTS_DIR and mark the manifest ready."""
+    manifest = read_manifest(export_id) or {'id': export_id}
+    build = get_exporter(name)
+    if build is None:
+        manifest.update(status='failed', error=f"Unknown exporter {name}",
+                        expires_at=_expires_at(datetime.now(UTC)))
+        _write_manifest(export_id, manifest)
+        return True
+
+    spec = build(params or {})
+    counter = [0]
+    spec.rows = _counted(spec.rows, counter)
+    filename = _filename(spec, fmt, compress)
+    stored = f"{export_id}-{filename}"
+    path = os.path.join(_exports_dir(), stored)
+    chunks = encode_chunks(spec, fmt)
+    try:
+        with open(f"{path}.part", 'wb') as handle:
+            for chunk in (gzip_chunks(chunks) if compress else (c.encode('utf-8') for c in chunks)):
+                handle.write(chunk)
+        os.replace(f"{path}.part", path)
+    except Exception as e:
+        manifest.update(status='failed', error=str(e), expires_at=_expires_at(datetime.now(UTC)))
+        _write_manifest(export_id, manifest)
+        raise
+
+    completed_at = datetime.now(UTC)
+    manifest.update(status='ready', file=stored, filename=filename, rows=counter[0],
+                    completed_at=completed_at.isoformat(), expires_at=_expires_at(completed_at))
+    _write_manifest(export_id, manifest)
+    logger.info(f"Export {export_id} ({name}) wrote {counter[0]} rows to {stored}")
+    return True
+
+# --------------------------------------------------------------------------
+# Retention
+# --------------------------------------------------------------------------
+def purge_expired_exports(now=None, retention_hours=None):
+    """Delete ready and failed exports past their expiry, file and manifest; returns the number purged."""
+    now = now or datetime.now(UTC)
+    directory = _exports_dir()
+    purged = 0
+    for entry in os.listdir(directory):
+        export_id, extension = os.path.splitext(entry)
+        if extension != '.json' or not EXPORT_ID_PATTERN.match(export_id):
+            continue
+        manifest = read_manifest(export_id)
+        if manifest is None or manifest.get('status') not in ('ready', 'failed'):
+            continue
+        finished = manifest.get('completed_at') or manifest.get('created_at')
+        if finished and (retention_hours is not None or not manifest.get('expires_at')):
+            manifest['expires_at'] = _expires_at(datetime.fromisoformat(finished), retention_hours)
+        if not is_expired(manifest, now):
+            continue
+        paths = [_manifest_path(export_id)]
+        if manifest.get('file'):
+            paths[:0] = [export_file_path(manifest), f"{export_file_path(manifest)}.part"]
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        purged += 1
+
+    if purged:
+        logger.info(f"Purged {purged} expired exports")
+    return purged
+
+@job('exports.purge', max_attempts=1)
+def purge_exports_job():
+    """Job handler for periodic export purges (e.g. enqueued from cron)."""
+    purge_expired_exports()
+    return True
+
+def init_exports(app):
+    """Register the ``flask exports`` CLI."""
+    import click
+
+    @app.cli.group('exports')
+    def exports_cli():
+        """Export file maintenance commands."""
+
+    @exports_cli.command('purge')
+    @click.option('--hours', default=None, type=int, help='Hours after which a finished export is deleted.')
+    def purge(hours):
+        """Delete exports older than EXPORTS_RETENTION_HOURS (or --hours)."""
+        click.echo(f"Purged {purge_expired_exports(retention_hours=hours)} exports")
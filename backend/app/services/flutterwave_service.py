@@ -9,13 +9,14 @@ from datetime import datetime, timedelta
 import logging
 import os
 from dotenv import load_dotenv
-import time
 import traceback
 import uuid
 from typing import Dict, Optional, Any, Union
 import hashlib
 import hmac
 
+from app.services.http_client import http_client
+
 # Load environment variables
 load_dotenv()
 
@@ -42,10 +43,7 @@ CHARGE_URL = f"{BASE_URL}/charges"
 VERIFY_URL = f"{BASE_URL}/transactions"
 REFUND_URL = f"{BASE_URL}/transactions"
 
-# Configuration
-MAX_RETRIES = 3
-RETRY_DELAY = 2  # seconds
-REQUEST_TIMEOUT = 30  # seconds
+# Configuration (timeouts and transport retries live in services/http_client.py)
 
 
 class FlutterwaveError(Exception):
@@ -213,58 +211,37 @@ class FlutterwaveService:
                     }
                 })
 
-            for attempt in range(MAX_RETRIES):
-                try:
-                    headers = self.get_headers()
-
-                    logger.info(f"Card payment payload: {json.dumps({k: v for k, v in payload.items() if k != 'card'}, indent=2)}")
-
-                    # Make request
-                    response = requests.post(
-                        CHARGE_URL,
-                        headers=headers,
-                        json=payload,
-                        timeout=REQUEST_TIMEOUT
-                    )
-
-                    logger.info(f"Card payment response: Status={response.status_code}")
-
-                    if response.status_code in [200, 201]:
-                        try:
-                            result = response.json()
-
-                            if result.get('status') == 'success':
-                                logger.info("Card payment initiated successfully")
-                                return result
-                            else:
-                                error_msg = result.get('message', 'Unknown error')
-                                logger.error(f"Card payment failed: {error_msg}")
-                                if attempt < MAX_RETRIES - 1:
-                                    time.sleep(RETRY_DELAY)
-                                    continue
-                                raise FlutterwaveError(f"Card payment failed: {error_msg}", details=result)
-
-                        except json.JSONDecodeError as e:
-                            logger.error(f"Failed to parse card payment response: {str(e)}")
-                            if attempt < MAX_RETRIES - 1:
-                                time.sleep(RETRY_DELAY)
-                                continue
-                            raise FlutterwaveError("Invalid response format from Flutterwave API")
-                    else:
-                        logger.error(f"Card payment request failed: {response.status_code} - {response.text}")
-                        if attempt < MAX_RETRIES - 1:
-                            time.sleep(RETRY_DELAY)
-                            continue
-                        raise FlutterwaveError(f"Card payment request failed: {response.status_code}")
-
-                except requests.RequestException as e:
-                    logger.error(f"Request exception during card payment: {str(e)}")
-                    if attempt < MAX_RETRIES - 1:
-                        time.sleep(RETRY_DELAY)
-                        continue
-                    raise FlutterwaveError(f"Network error during card payment: {str(e)}")
-
-            raise FlutterwaveError("Card payment failed after all retry attempts")
+            headers = self.get_headers()
+
+            logger.info(f"Card payment payload: {json.dumps({k: v for k, v in payload.items() if k != 'card'}, indent=2)}")
+
+            # Charges are not idempotent: the shared client only retries them when the
+            # request never reached Flutterwave, so a card is never charged twice.
+            try:
+                response = http_client.post('flutterwave', CHARGE_URL, headers=headers, json=payload)
+            except requests.RequestException as e:
+                logger.error(f"Request exception during card payment: {str(e)}")
+                raise FlutterwaveError(f"Network error during card payment: {str(e)}")
+
+            logger.info(f"Card payment response: Status={response.status_code}")
+
+            if response.status_code not in [200, 201]:
+                logger.error(f"Card payment request failed: {response.status_code} - {response.text}")
+                raise FlutterwaveError(f"Card payment request failed: {response.status_code}")
+
+            try:
+                result = response.json()
+            except json.JSONDecodeError as e:
+                logger.error(f"Failed to parse card payment response: {str(e)}")
+                raise FlutterwaveError("Invalid response format from Flutterwave API")
+
+            if result.get('status') != 'success':
+                error_msg = result.get('message', 'Unknown error')
+                logger.error(f"Card payment failed: {error_msg}")
+                raise FlutterwaveError(f"Card payment failed: {error_msg}", details=result)
+
+            logger.info("Card payment initiated successfully")
+            return result
 
         except FlutterwaveError:
             raise
@@ -291,42 +268,29 @@ class FlutterwaveService:
 
         logger.info(f"Verifying transaction: {transaction_id}")
 
-        for attempt in range(MAX_RETRIES):
-            try:
-                headers = self.get_headers()
-                url = f"{VERIFY_URL}/{transaction_id}/verify"
-
-                # Make request
-                response = requests.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
-
-                logger.info(f"Transaction verification response: Status={response.status_code}")
-
-                if response.status_code == 200:
-                    try:
-                        result = response.json()
-                        logger.info("Transaction verification completed successfully")
-                        return result
-                    except json.JSONDecodeError as e:
-                        logger.error(f"Failed to parse verification response: {str(e)}")
-                        if attempt < MAX_RETRIES - 1:
-                            time.sleep(RETRY_DELAY)
-                            continue
-                        raise FlutterwaveError("Invalid response format from Flutterwave API")
-                else:
-                    logger.error(f"Transaction verification failed: {response.status_code} - {response.text}")
-                    if attempt < MAX_RETRIES - 1:
-                        time.sleep(RETRY_DELAY)
-                        continue
-                    raise FlutterwaveError(f"Transaction verification failed: {response.status_code}")
+        headers = self.get_headers()
+        url = f"{VERIFY_URL}/{transaction_id}/verify"
 
-            except requests.RequestException as e:
-                logger.error(f"Request exception during verification: {str(e)}")
-                if attempt < MAX_RETRIES - 1:
-                    time.sleep(RETRY_DELAY)
-                    continue
-                raise FlutterwaveError(f"Network error during verification: {str(e)}")
+        try:
+            response = http_client.get('flutterwave', url, headers=headers)
+        except requests.RequestException as e:
+            logger.error(f"Request exception during verification: {str(e)}")
+            raise FlutterwaveError(f"Network error during verification: {str(e)}")
+
+        logger.info(f"Transaction verification response: Status={response.status_code}")
 
-        raise FlutterwaveError("Transaction verification failed after all retry attempts")
+        if response.status_code != 200:
+            logger.error(f"Transaction verification failed: {response.status_code} - {response.text}")
+            raise FlutterwaveError(f"Transaction verification failed: {response.status_code}")
+
+        try:
+            result = response.json()
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to parse verification response: {str(e)}")
+            raise FlutterwaveError("Invalid response format from Flutterwave API")
+
+        logger.info("Transaction verification completed successfully")
+        return result
 
     def initiate_refund(
         self,
@@ -356,57 +320,34 @@ class FlutterwaveService:
             validated_amount = self.validate_amount(amount)
             payload["amount"] = validated_amount
 
-        for attempt in range(MAX_RETRIES):
-            try:
-                headers = self.get_headers()
-                url = f"{REFUND_URL}/{transaction_id}/refund"
-
-                # Make request
-                response = requests.post(
-                    url,
-                    headers=headers,
-                    json=payload,
-                    timeout=REQUEST_TIMEOUT
-                )
-
-                logger.info(f"Refund response: Status={response.status_code}")
-
-                if response.status_code in [200, 201]:
-                    try:
-                        result = response.json()
-
-                        if result.get('status') == 'success':
-                            logger.info("Refund initiated successfully")
-                            return result
-                        else:
-                            error_msg = result.get('message', 'Unknown error')
-                            logger.error(f"Refund failed: {error_msg}")
-                            if attempt < MAX_RETRIES - 1:
-                                time.sleep(RETRY_DELAY)
-                                continue
-                            raise FlutterwaveError(f"Refund failed: {error_msg}", details=result)
-
-                    except json.JSONDecodeError as e:
-                        logger.error(f"Failed to parse refund response: {str(e)}")
-                        if attempt < MAX_RETRIES - 1:
-                            time.sleep(RETRY_DELAY)
-                            continue
-                        raise FlutterwaveError("Invalid response format from Flutterwave API")
-                else:
-                    logger.error(f"Refund request failed: {response.status_code} - {response.text}")
-                    if attempt < MAX_RETRIES - 1:
-                        time.sleep(RETRY_DELAY)
-                        continue
-                    raise FlutterwaveError(f"Refund request failed: {response.status_code}")
+        headers = self.get_headers()
+        url = f"{REFUND_URL}/{transaction_id}/refund"
 
-            except requests.RequestException as e:
-                logger.error(f"Request exception during refund: {str(e)}")
-                if attempt < MAX_RETRIES - 1:
-                    time.sleep(RETRY_DELAY)
-                    continue
-                raise FlutterwaveError(f"Network error during refund: {str(e)}")
+        try:
+            response = http_client.post('flutterwave', url, headers=headers, json=payload)
+        except requests.RequestException as e:
+            logger.error(f"Request exception during refund: {str(e)}")
+            raise FlutterwaveError(f"Network error during refund: {str(e)}")
+
+        logger.info(f"Refund response: Status={response.status_code}")
+
+        if response.status_code not in [200, 201]:
+            logger.error(f"Refund request failed: {response.status_code} - {response.text}")
+            raise FlutterwaveError(f"Refund request failed: {response.status_code}")
+
+        try:
+            result = response.json()
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to parse refund response: {str(e)}")
+            raise FlutterwaveError("Invalid response format from Flutterwave API")
+
+        if result.get('status') != 'success':
+            error_msg = result.get('message', 'Unknown error')
+            logger.error(f"Refund failed: {error_msg}")
+            raise FlutterwaveError(f"Refund failed: {error_msg}", details=result)
 
-        raise FlutterwaveError("Refund failed after all retry attempts")
+        logger.info("Refund initiated successfully")
+        return result
 
     def verify_webhook_signature(self, payload: str, signature: str) -> bool:
         """
@@ -566,7 +507,7 @@ class FlutterwaveService:
         try:
             headers = self.get_headers()
             # Test with a simple API call
-            response = requests.get(f"{self.base_url}/banks/NG", headers=headers, timeout=10)
+            response = http_client.get('flutterwave', f"{self.base_url}/banks/NG", headers=headers, timeout=10)
             return response.status_code == 200
         except Exception as e:
             logger.error(f"Connection test failed: {str(e)}")
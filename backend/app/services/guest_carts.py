@@ -0,0 +1,134 @@
+"""
+Guest carts for Mizizzi E-commerce platform.
+
+Anonymous visitors get a *virtual* cart: an id taken from their guest cookie
+(or a fresh UUID) and no items. Nothing is written for it, so bots and
+first-time visitors browsing the catalogue never touch the carts table. The
+cart becomes a row only when something is put in it (materialize_guest_cart,
+called from the add-to-cart path).
+
+Materialized guest carts that have seen no activity for GUEST_CART_TTL_DAYS,
+or whose expires_at has passed, are deleted in bulk by the
+``carts.purge_guests`` job / ``flask carts purge-guests``.
+"""
+import logging
+import uuid
+from datetime import datetime, timedelta
+
+from flask import request
+
+from app.services.jobs import job
+
+logger = logging.getLogger(__name__)
+
+GUEST_COOKIES = ('guest_id', 'guest_cart_id')
+DEFAULT_TTL_DAYS = 30
+DEFAULT_PURGE_BATCH_SIZE = 500
+
+class VirtualGuestCart:
+    """An anonymous visitor's cart before its first item: no row and nothing to store."""
+
+    is_virtual = True
+    id = None
+    user_id = None
+    is_active = True
+    subtotal = tax = shipping = discount = total = 0.0
+    coupon_code = None
+
+    def __init__(self, guest_id):
+        self.guest_id = guest_id
+        self.items = []
+
+    def to_dict(self):
+        return {
+            'id': None,
+            'guest_id': self.guest_id,
+            'is_active': True,
+            'subtotal': 0.0,
+            'tax': 0.0,
+            'shipping': 0.0,
+            'discount': 0.0,
+            'total': 0.0,
+            'items': [],
+            'is_virtual': True
+        }
+
+def guest_id_from_request():
+    """The guest cart id from the request cookies, or None."""
+    for name in GUEST_COOKIES:
+        value = request.cookies.get(name)
+        if value:
+            return value[:36]
+    return None
+
+def get_guest_cart():
+    """The visitor's active guest Cart if it was materialized, else a VirtualGuestCart. Never writes."""
+    from app.models.models import Cart
+
+    guest_id = guest_id_from_request()
+    if guest_id:
+        cart = Cart.query.filter_by(guest_id=guest_id, is_active=True).first()
+        if cart:
+            return cart
+    return VirtualGuestCart(guest_id or str(uuid.uuid4()))
+
+def materialize_guest_cart(cart):
+    """Turn a virtual guest cart into a Cart row (flushed, not committed); real carts pass through."""
+    from app.configuration.extensions import db
+    from app.models.models import Cart
+
+    if not getattr(cart, 'is_virtual', False):
+        return cart
+    row = Cart(guest_id=cart.guest_id, is_active=True)
+    db.session.add(row)
+    db.session.flush()
+    return row
+
+def purge_expired_guest_carts(now=None, ttl_days=None, batch_size=None):
+    """Delete idle or expired guest carts and their items in batches; returns the number of carts."""
+    from flask import current_app
+    from sqlalchemy import or_
+    from app.configuration.extensions import db
+    from app.models.models import Cart, CartItem
+
+    now = now or datetime.utcnow()
+    ttl_days = ttl_days or current_app.config.get('GUEST_CART_TTL_DAYS', DEFAULT_TTL_DAYS)
+    batch_size = batch_size or current_app.config.get('GUEST_CART_PURGE_BATCH_SIZE', DEFAULT_PURGE_BATCH_SIZE)
+    cutoff = now - timedelta(days=ttl_days)
+
+    purged = 0
+    while True:
+        cart_ids = [cart_id for (cart_id,) in db.session.query(Cart.id).filter(
+            Cart.user_id.is_(None),
+            or_(Cart.last_activity < cutoff, Cart.expires_at < now)
+        ).order_by(Cart.id).limit(batch_size)]
+        if not cart_ids:
+            break
+        CartItem.query.filter(CartItem.cart_id.in_(cart_ids)).delete(synchronize_session=False)
+        Cart.query.filter(Cart.id.in_(cart_ids)).delete(synchronize_session=False)
+        db.session.commit()
+        purged += len(cart_ids)
+
+    if purged:
+        logger.info(f"Purged {purged} expired guest carts")
+    return purged
+
+@job('carts.purge_guests', max_attempts=1)
+def purge_guest_carts_job():
+    """Job handler for periodic guest cart purges (e.g. enqueued from cron)."""
+    purge_expired_guest_carts()
+    return True
+
+def init_guest_carts(app):
+    """Register the ``flask carts`` CLI."""
+    import click
+
+    @app.cli.group('carts')
+    def carts_cli():
+        """Cart maintenance commands."""
+
+    @carts_cli.command('purge-guests')
+    @click.option('--days', default=None, type=int, help='Idle days after which a guest cart is purged.')
+    def purge_guests(days):
+        """Delete guest carts idle for more than GUEST_CART_TTL_DAYS (or --days)."""
+        click.echo(f"Purged {purge_expired_guest_carts(ttl_days=days)} guest carts")
@@ -0,0 +1,340 @@
+"""
+Shared outbound HTTP client for Mizizzi E-commerce platform.
+
+Every call to a third party (M-PESA, Pesapal, Flutterwave, Brevo, Twilio SMS,
+order webhooks) goes through one pooled ``requests.Session`` per integration, so
+TCP/TLS connections are kept alive and reused instead of being opened for each
+request. Each integration has its own timeouts and retry budget, and each
+(integration, host) pair has a circuit breaker: once a provider keeps failing,
+calls fail fast for a cool-down period instead of tying up workers on
+connections that are going to time out anyway.
+
+Retries are deliberately conservative. Idempotent requests (GET/HEAD/OPTIONS,
+or calls flagged ``idempotent=True`` such as status queries) are retried on
+connection errors, timeouts and 429/502/503/504 responses. Anything else -
+an STK push, a card charge, a refund - is only retried when the request never
+reached the provider (the connection could not be established), so a retry
+can never charge a customer twice.
+"""
+import logging
+import random
+import threading
+import time
+from collections import deque
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = frozenset([429, 502, 503, 504])
+IDEMPOTENT_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS'])
+LATENCY_SAMPLES = 512
+
+DEFAULT_PROFILE = {
+    'connect_timeout': 5,
+    'read_timeout': 30,
+    'max_retries': 2,
+    'backoff': 0.3,
+    'backoff_cap': 5,
+    'failure_threshold': 5,
+    'reset_timeout': 30,
+    'pool_maxsize': 10
+}
+
+# Per-integration overrides of DEFAULT_PROFILE. Webhooks and emails are
+# delivered from background jobs, which already retry with their own backoff.
+# SMS carries login codes sent inline, so it gives up quickly.
+PROFILES = {
+    'mpesa': {'read_timeout': 30},
+    'pesapal': {'read_timeout': 30},
+    'flutterwave': {'read_timeout': 30},
+    'brevo': {'read_timeout': 20, 'max_retries': 1},
+    'sms': {'connect_timeout': 3, 'read_timeout': 10, 'max_retries': 1},
+    'webhook': {'connect_timeout': 3, 'read_timeout': 10, 'max_retries': 0}
+}
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised instead of calling a provider whose circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure breaker.
+
+    Closed until ``failure_threshold`` failures in a row, then open (calls are
+    rejected) for ``reset_timeout`` seconds, then half-open: one trial call is
+    let through and its outcome closes or re-opens the breaker.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    return False
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning(f"Circuit opened after {self.failures} consecutive failures")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+class IntegrationMetrics:
+    """Request, error and latency counters for one integration."""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.rejected = 0
+        self.statuses = {}
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+        self._samples = deque(maxlen=LATENCY_SAMPLES)
+        self._lock = threading.Lock()
+
+    def observe(self, elapsed, status=None, error=False):
+        with self._lock:
+            self.requests += 1
+            if error:
+                self.errors += 1
+            if status is not None:
+                bucket = f"{status // 100}xx"
+                self.statuses[bucket] = self.statuses.get(bucket, 0) + 1
+            self.latency_total += elapsed
+            self.latency_max = max(self.latency_max, elapsed)
+            self._samples.append(elapsed)
+
+    def count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def snapshot(self):
+        with self._lock:
+            samples = sorted(self._samples)
+            count = self.requests
+
+            def percentile(p):
+                if not samples:
+                    return 0.0
+                return samples[min(len(samples) - 1, int(p * len(samples)))]
+
+            return {
+                'requests': count,
+                'errors': self.errors,
+                'retries': self.retries,
+                'rejected': self.rejected,
+                'statuses': dict(self.statuses),
+                'latency_avg_ms': round(self.latency_total / count * 1000, 2) if count else 0.0,
+                'latency_p50_ms': round(percentile(0.50) * 1000, 2),
+                'latency_p95_ms': round(percentile(0.95) * 1000, 2),
+                'latency_max_ms': round(self.latency_max * 1000, 2)
+            }
+
+
+def _request_not_sent(exc):
+    """True when the request provably never reached the server."""
+    if isinstance(exc, requests.exceptions.ConnectTimeout):
+        return True
+    if isinstance(exc, requests.exceptions.ConnectionError) and exc.args:
+        return isinstance(getattr(exc.args[0], 'reason', None), NewConnectionError)
+    return False
+
+
+class HttpClient:
+    """Pooled sessions, timeouts, retries, circuit breakers and metrics per integration."""
+
+    def __init__(self, profiles=None):
+        self.profiles = {name: dict(DEFAULT_PROFILE, **overrides) for name, overrides in PROFILES.items()}
+        self.profiles['default'] = dict(DEFAULT_PROFILE)
+        for name, overrides in (profiles or {}).items():
+            self.profiles[name] = dict(self.profiles.get(name, DEFAULT_PROFILE), **overrides)
+        self._sessions = {}
+        self._breakers = {}
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def configure(self, app):
+        defaults = {
+            'pool_maxsize': app.config.get('HTTP_CLIENT_POOL_MAXSIZE'),
+            'failure_threshold': app.config.get('HTTP_CLIENT_BREAKER_FAILURES'),
+            'reset_timeout': app.config.get('HTTP_CLIENT_BREAKER_RESET_SECONDS')
+        }
+        defaults = {key: value for key, value in defaults.items() if value is not None}
+        for profile in self.profiles.values():
+            profile.update(defaults)
+        for name, overrides in (app.config.get('HTTP_CLIENT_PROFILES') or {}).items():
+            self.profiles[name] = dict(self.profiles.get(name, self.profiles['default']), **overrides)
+        with self._lock:
+            # Existing sessions may already be held by clients; re-mount rather than replace them
+            for integration, session in self._sessions.items():
+                self._mount(session, self.profile(integration)['pool_maxsize'])
+            self._breakers.clear()
+
+    def profile(self, integration):
+        return self.profiles.get(integration) or self.profiles['default']
+
+    # ----------------------------------------------------------------------
+    # Per-integration state
+    # ----------------------------------------------------------------------
+    def session(self, integration):
+        session = self._sessions.get(integration)
+        if session is None:
+            with self._lock:
+                session = self._sessions.get(integration)
+                if session is None:
+                    session = requests.Session()
+                    self._mount(session, self.profile(integration)['pool_maxsize'])
+                    self._sessions[integration] = session
+        return session
+
+    @staticmethod
+    def _mount(session, size):
+        # Retries are handled in request(), so urllib3's own retry layer is disabled
+        adapter = HTTPAdapter(pool_connections=size, pool_maxsize=size, max_retries=0)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+
+    def breaker(self, integration, url):
+        key = (integration, urlsplit(url).netloc)
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.get(key)
+                if breaker is None:
+                    profile = self.profile(integration)
+                    breaker = CircuitBreaker(profile['failure_threshold'], profile['reset_timeout'])
+                    self._breakers[key] = breaker
+        return breaker
+
+    def metrics(self, integration):
+        metrics = self._metrics.get(integration)
+        if metrics is None:
+            with self._lock:
+                metrics = self._metrics.setdefault(integration, IntegrationMetrics())
+        return metrics
+
+    # ----------------------------------------------------------------------
+    # Requests
+    # ----------------------------------------------------------------------
+    def request(self, integration, method, url, idempotent=None, **kwargs):
+        """
+        Send a request for ``integration`` and return the ``requests.Response``.
+
+        ``timeout`` defaults to the integration's (connect, read) timeouts.
+        Raises the last ``requests.RequestException`` when every attempt
+        failed, or ``CircuitOpenError`` when the provider's breaker is open.
+        Non-2xx responses are returned, not raised.
+        """
+        method = method.upper()
+        profile = self.profile(integration)
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        kwargs.setdefault('timeout', (profile['connect_timeout'], profile['read_timeout']))
+
+        session = self.session(integration)
+        breaker = self.breaker(integration, url)
+        metrics = self.metrics(integration)
+        send = getattr(session, method.lower())
+
+        attempt = 0
+        while True:
+            attempt += 1
+            if not breaker.allow():
+                metrics.count('rejected')
+                raise CircuitOpenError(f"Circuit open for {integration} ({urlsplit(url).netloc})")
+
+            started = time.perf_counter()
+            try:
+                response = send(url, **kwargs)
+            except requests.exceptions.RequestException as e:
+                metrics.observe(time.perf_counter() - started, error=True)
+                breaker.record_failure()
+                retryable = idempotent or _request_not_sent(e)
+                if not retryable or attempt > profile['max_retries']:
+                    raise
+                logger.warning(f"{integration} {method} {url} failed ({e.__class__.__name__}), "
+                               f"retrying ({attempt}/{profile['max_retries']})")
+            else:
+                status = getattr(response, 'status_code', None)
+                status = status if isinstance(status, int) else None
+                server_error = status is not None and status >= 500
+                metrics.observe(time.perf_counter() - started, status=status, error=server_error)
+                if server_error:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+                if not (idempotent and status in RETRY_STATUSES) or attempt > profile['max_retries']:
+                    return response
+                logger.warning(f"{integration} {method} {url} returned {status}, "
+                               f"retrying ({attempt}/{profile['max_retries']})")
+
+            metrics.count('retries')
+            delay = min(profile['backoff_cap'], profile['backoff'] * (2 ** (attempt - 1)))
+            time.sleep(delay * random.uniform(0.5, 1.0))
+
+    def get(self, integration, url, **kwargs):
+        return self.request(integration, 'GET', url, **kwargs)
+
+    def post(self, integration, url, **kwargs):
+        return self.request(integration, 'POST', url, **kwargs)
+
+    def stats(self):
+        breakers = {}
+        for (integration, host), breaker in list(self._breakers.items()):
+            breakers[f"{integration}:{host}"] = {'state': breaker.state, 'failures': breaker.failures}
+        return {
+            'integrations': {name: metrics.snapshot() for name, metrics in list(self._metrics.items())},
+            'breakers': breakers
+        }
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+            self._breakers.clear()
+
+
+http_client = HttpClient()
+
+def init_http_client(app):
+    """Apply HTTP_CLIENT_* settings to the shared client."""
+    http_client.configure(app)
+    app.extensions['http_client'] = http_client
+    return http_client
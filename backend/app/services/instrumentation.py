@@ -0,0 +1,283 @@
+"""
+Opt-in request instrumentation for Mizizzi E-commerce platform.
+
+With INSTRUMENTATION_ENABLED every request records:
+
+    mizizzi_http_request_duration_seconds     latency by method, endpoint and status
+    mizizzi_db_statements_per_request         SQL statements executed by the request
+    mizizzi_db_seconds_per_request            time spent in those statements
+    mizizzi_db_slow_statements_total          statements slower than INSTRUMENTATION_SLOW_QUERY_MS
+    mizizzi_db_repeated_statements_total      likely N+1 patterns (below)
+
+SQL is counted with SQLAlchemy cursor events, so every engine (OLTP,
+analytics and replicas) is covered. A statement whose text repeats at least
+INSTRUMENTATION_N_PLUS_ONE_THRESHOLD times in one request is flagged as a
+likely N+1 and logged once per endpoint and statement. Slow statements are
+logged with their endpoint. Responses carry a ``Server-Timing`` header with
+the request's database time and statement count.
+
+The metrics are served in Prometheus text format at /metrics (bearer
+METRICS_TOKEN when set). Under gunicorn set PROMETHEUS_MULTIPROC_DIR so the
+endpoint aggregates every worker.
+
+INSTRUMENTATION_PROFILE_SAMPLE_RATE profiles that fraction of requests
+(optionally only the endpoints in INSTRUMENTATION_PROFILE_ENDPOINTS) and
+writes the result to INSTRUMENTATION_PROFILE_DIR: an HTML report when
+pyinstrument is installed, else a cProfile ``.prof`` file for pstats or
+snakeviz.
+"""
+import contextvars
+import logging
+import os
+import random
+import time
+import uuid
+from collections import Counter
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SLOW_QUERY_MS = 200
+DEFAULT_N_PLUS_ONE_THRESHOLD = 10
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+MAX_LOGGED_STATEMENT = 500
+
+_current = contextvars.ContextVar('request_instrumentation', default=None)
+_listeners_installed = False
+
+class RequestStats:
+    """SQL statements executed while handling one request."""
+
+    __slots__ = ('endpoint', 'started', 'statements', 'db_seconds', 'slow', 'texts', 'profiler')
+
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+        self.started = time.perf_counter()
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.slow = 0
+        self.texts = Counter()
+        self.profiler = None
+
+class Instrumentation:
+    """Prometheus metrics and per-request SQL accounting for one app."""
+
+    def __init__(self, app):
+        from prometheus_client import CollectorRegistry, Counter as PromCounter, Histogram
+
+        config = app.config
+        self.slow_query_seconds = config.get('INSTRUMENTATION_SLOW_QUERY_MS', DEFAULT_SLOW_QUERY_MS) / 1000.0
+        self.n_plus_one_threshold = config.get('INSTRUMENTATION_N_PLUS_ONE_THRESHOLD', DEFAULT_N_PLUS_ONE_THRESHOLD)
+        self.profile_rate = config.get('INSTRUMENTATION_PROFILE_SAMPLE_RATE', 0.0)
+        self.profile_endpoints = set(config.get('INSTRUMENTATION_PROFILE_ENDPOINTS') or ())
+        self.profile_dir = config.get('INSTRUMENTATION_PROFILE_DIR') or os.path.join(app.instance_path, 'profiles')
+        self.metrics_token = config.get('METRICS_TOKEN')
+        self._reported = set()
+
+        self.registry = CollectorRegistry()
+        self.latency = Histogram(
+            'mizizzi_http_request_duration_seconds', 'Request latency',
+            ['method', 'endpoint', 'status'], buckets=LATENCY_BUCKETS, registry=self.registry)
+        self.statements = Histogram(
+            'mizizzi_db_statements_per_request', 'SQL statements executed per request',
+            ['endpoint'], buckets=STATEMENT_BUCKETS, registry=self.registry)
+        self.db_time = Histogram(
+            'mizizzi_db_seconds_per_request', 'Time spent in SQL per request',
+            ['endpoint'], buckets=LATENCY_BUCKETS, registry=self.registry)
+        self.slow_statements = PromCounter(
+            'mizizzi_db_slow_statements_total', 'SQL statements slower than the slow-query threshold',
+            ['endpoint'], registry=self.registry)
+        self.repeated_statements = PromCounter(
+            'mizizzi_db_repeated_statements_total', 'Requests that repeated one statement past the N+1 threshold',
+            ['endpoint'], registry=self.registry)
+
+    # ----------------------------------------------------------------------
+    # Request hooks
+    # ----------------------------------------------------------------------
+    def before_request(self):
+        from flask import g, request
+        stats = RequestStats(request.endpoint or 'unmatched')
+        g._instrumentation_token = _current.set(stats)
+        if self._should_profile(stats.endpoint):
+            stats.profiler = _start_profiler()
+
+    def after_request(self, response):
+        from flask import request
+        stats = _current.get()
+        if stats is None:
+            return response
+
+        elapsed = time.perf_counter() - stats.started
+        endpoint = stats.endpoint
+        self.latency.labels(request.method, endpoint, str(response.status_code)).observe(elapsed)
+        self.statements.labels(endpoint).observe(stats.statements)
+        self.db_time.labels(endpoint).observe(stats.db_seconds)
+        if stats.slow:
+            self.slow_statements.labels(endpoint).inc(stats.slow)
+        self._report_repeats(stats)
+
+        response.headers.add('Server-Timing',
+                             f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.statements} queries", '
+                             f'app;dur={elapsed * 1000:.1f}')
+
+        if stats.profiler is not None:
+            self._dump_profile(stats)
+        return response
+
+    def teardown_request(self, exc=None):
+        from flask import g
+        token = g.pop('_instrumentation_token', None)
+        if token is not None:
+            stats = _current.get()
+            if stats is not None and stats.profiler is not None:
+                _stop_profiler(stats.profiler)
+            _current.reset(token)
+
+    # ----------------------------------------------------------------------
+    # N+1 detection
+    # ----------------------------------------------------------------------
+    def _report_repeats(self, stats):
+        if not self.n_plus_one_threshold or not stats.texts:
+            return
+        statement, count = stats.texts.most_common(1)[0]
+        if count < self.n_plus_one_threshold:
+            return
+        self.repeated_statements.labels(stats.endpoint).inc()
+        key = (stats.endpoint, statement)
+        if key not in self._reported:
+            self._reported.add(key)
+            logger.warning(f"Likely N+1 in {stats.endpoint}: statement ran {count} times in one request: "
+                           f"{statement[:MAX_LOGGED_STATEMENT]}")
+
+    # ----------------------------------------------------------------------
+    # Profiling
+    # ----------------------------------------------------------------------
+    def _should_profile(self, endpoint):
+        if self.profile_rate <= 0:
+            return False
+        if self.profile_endpoints and endpoint not in self.profile_endpoints:
+            return False
+        return random.random() < self.profile_rate
+
+    def _dump_profile(self, stats):
+        profiler, stats.profiler = stats.profiler, None
+        try:
+            os.makedirs(self.profile_dir, exist_ok=True)
+            base = os.path.join(self.profile_dir,
+                                f"{stats.endpoint.replace('.', '-')}-{int(time.time())}-{uuid.uuid4().hex[:8]}")
+            path = _write_profile(profiler, base)
+            logger.info(f"Profiled {stats.endpoint} to {path}")
+        except Exception as e:
+            logger.error(f"Could not write profile for {stats.endpoint}: {str(e)}")
+
+    # ----------------------------------------------------------------------
+    # Exposition
+    # ----------------------------------------------------------------------
+    def render(self):
+        from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, generate_latest
+        registry = self.registry
+        if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+            from prometheus_client import multiprocess
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+
+def _start_profiler():
+    try:
+        from pyinstrument import Profiler
+        profiler = Profiler()
+    except ImportError:
+        import cProfile
+        profiler = cProfile.Profile()
+    try:
+        (profiler.start if hasattr(profiler, 'start') else profiler.enable)()
+        return profiler
+    except Exception as e:
+        # Only one profiler can run per thread; skip rather than fail the request
+        logger.debug(f"Could not start profiler: {str(e)}")
+        return None
+
+def _stop_profiler(profiler):
+    try:
+        (profiler.stop if hasattr(profiler, 'start') else profiler.disable)()
+    except Exception:
+        pass
+
+def _write_profile(profiler, base):
+    _stop_profiler(profiler)
+    if hasattr(profiler, 'output_html'):
+        path = f"{base}.html"
+        with open(path, 'w') as handle:
+            handle.write(profiler.output_html())
+    else:
+        path = f"{base}.prof"
+        profiler.dump_stats(path)
+    return path
+
+# --------------------------------------------------------------------------
+# SQL accounting
+# --------------------------------------------------------------------------
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _current.get() is not None:
+        context._instrumentation_started = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    started = getattr(context, '_instrumentation_started', None)
+    if stats is None or started is None:
+        return
+    elapsed = time.perf_counter() - started
+    stats.statements += 1
+    stats.db_seconds += elapsed
+    stats.texts[statement] += 1
+
+    instrumentation = _instrumentation()
+    if instrumentation is not None and elapsed >= instrumentation.slow_query_seconds:
+        stats.slow += 1
+        logger.warning(f"Slow query in {stats.endpoint} ({elapsed * 1000:.0f}ms): "
+                       f"{statement[:MAX_LOGGED_STATEMENT]}")
+
+def _instrumentation():
+    try:
+        from flask import current_app
+        return current_app.extensions.get('instrumentation')
+    except RuntimeError:
+        return None
+
+def current_request_stats():
+    """The current request's SQL counters, or None when not instrumented."""
+    return _current.get()
+
+def init_instrumentation(app):
+    """Install request hooks, SQL listeners and /metrics when INSTRUMENTATION_ENABLED is on."""
+    global _listeners_installed
+    if not app.config.get('INSTRUMENTATION_ENABLED', False):
+        return None
+
+    from flask import Response, abort, request
+
+    instrumentation = Instrumentation(app)
+    app.extensions['instrumentation'] = instrumentation
+
+    if not _listeners_installed:
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        _listeners_installed = True
+
+    # First, so the measured latency includes the other before_request hooks
+    app.before_request_funcs.setdefault(None, []).insert(0, instrumentation.before_request)
+    app.after_request(instrumentation.after_request)
+    app.teardown_request(instrumentation.teardown_request)
+
+    @app.route('/metrics', methods=['GET'])
+    def metrics():
+        if instrumentation.metrics_token and \
+                request.headers.get('Authorization') != f"Bearer {instrumentation.metrics_token}":
+            abort(401)
+        body, content_type = instrumentation.render()
+        return Response(body, content_type=content_type)
+
+    return instrumentation
@@ -0,0 +1,344 @@
+"""
+Hot-SKU availability cache for Mizizzi E-commerce platform.
+
+Availability reads (product pages, cart validation, checkout pre-checks) are
+served from a short-lived snapshot keyed by (product_id, variant_id) instead of
+hitting the inventory table on every request. The snapshot is written through
+whenever an Inventory row is committed, so a cached value is always the value
+of the last committed write.
+
+That guarantee only holds when every worker reads the same store, so the cache
+is enabled only for a shared Flask-Caching backend (redis, memcached, ...). With
+a per-process backend (the default 'simple' cache) a write in one gunicorn
+worker would leave the others serving stale stock, so reads go straight to the
+database unless INVENTORY_CACHE_ALLOW_LOCAL is set (single-process servers and
+tests).
+"""
+import logging
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import event, inspect as sa_inspect
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 10  # seconds
+KEY_PREFIX = 'inventory:availability'
+
+# Flask-Caching backends that live in one process and are not seen by other workers
+PER_PROCESS_CACHE_TYPES = frozenset(['null', 'nullcache', 'simple', 'simplecache'])
+
+def is_shared_cache_type(cache_type):
+    name = (cache_type or 'null').rsplit('.', 1)[-1].lower()
+    return name not in PER_PROCESS_CACHE_TYPES
+
+def _cache_key(product_id, variant_id=None):
+    return f"{KEY_PREFIX}:{int(product_id)}:{int(variant_id) if variant_id else 0}"
+
+def snapshot_inventory(inventory):
+    """
+    Build a cacheable availability snapshot from an Inventory row.
+
+    Only attributes already loaded on the instance are read, so this is safe to
+    call from session flush events without triggering further SQL.
+    """
+    state = sa_inspect(inventory)
+    loaded = state.dict
+
+    stock_level = loaded.get('stock_level') or 0
+    reserved_quantity = loaded.get('reserved_quantity') or 0
+    low_stock_threshold = loaded.get('low_stock_threshold')
+    if low_stock_threshold is None:
+        low_stock_threshold = 5
+    available_quantity = max(0, stock_level - reserved_quantity)
+    last_updated = loaded.get('last_updated')
+    if not isinstance(last_updated, datetime):
+        last_updated = datetime.now()
+    created_at = loaded.get('created_at')
+
+    return {
+        'id': loaded.get('id'),
+        'product_id': loaded.get('product_id'),
+        'variant_id': loaded.get('variant_id'),
+        'stock_level': stock_level,
+        'reserved_quantity': reserved_quantity,
+        'available_quantity': available_quantity,
+        'reorder_level': loaded.get('reorder_level'),
+        'low_stock_threshold': low_stock_threshold,
+        'sku': loaded.get('sku'),
+        'location': loaded.get('location'),
+        'status': loaded.get('status') or ('active' if available_quantity > 0 else 'out_of_stock'),
+        'is_in_stock': available_quantity > 0,
+        'is_low_stock': 0 < available_quantity <= low_stock_threshold,
+        'last_updated': last_updated.isoformat(),
+        'created_at': created_at.isoformat() if isinstance(created_at, datetime) else None
+    }
+
+class AvailabilityCache:
+    """
+    Availability snapshots stored in the shared Flask-Caching backend.
+
+    Disabled (every read misses and nothing is stored) when the backend is
+    per-process and INVENTORY_CACHE_ALLOW_LOCAL is off. If no cache backend is
+    usable a small in-process store is used instead, under the same rule.
+    """
+
+    def __init__(self, ttl=DEFAULT_TTL):
+        self.ttl = ttl
+        self.enabled = True
+        self._local = {}
+        self._local_lock = threading.Lock()
+        self._listeners = []
+        self.hits = 0
+        self.misses = 0
+
+    def configure(self, app):
+        self.ttl = app.config.get('INVENTORY_CACHE_TTL', self.ttl)
+        shared = is_shared_cache_type(app.config.get('CACHE_TYPE'))
+        self.enabled = shared or app.config.get('INVENTORY_CACHE_ALLOW_LOCAL', False)
+        if not self.enabled:
+            logger.warning("Availability cache disabled: CACHE_TYPE is per-process, so cached stock "
+                           "would go stale in other workers. Use a shared cache (e.g. redis) to enable it.")
+
+    # ----------------------------------------------------------------------
+    # Storage
+    # ----------------------------------------------------------------------
+    def _backend(self):
+        try:
+            from app.configuration.extensions import cache
+            if cache.cache is not None:
+                return cache
+        except Exception:
+            pass
+        return None
+
+    def get(self, product_id, variant_id=None):
+        if not self.enabled:
+            self.misses += 1
+            return None
+        key = _cache_key(product_id, variant_id)
+        value = None
+        backend = self._backend()
+        if backend is not None:
+            try:
+                value = backend.get(key)
+            except Exception as e:
+                logger.warning(f"Availability cache read failed for {key}: {str(e)}")
+        else:
+            with self._local_lock:
+                entry = self._local.get(key)
+                if entry and entry[0] > time.monotonic():
+                    value = entry[1]
+
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, snapshot):
+        if not self.enabled:
+            return
+        key = _cache_key(snapshot['product_id'], snapshot.get('variant_id'))
+        backend = self._backend()
+        if backend is not None:
+            try:
+                backend.set(key, snapshot, timeout=self.ttl)
+                return
+            except Exception as e:
+                logger.warning(f"Availability cache write failed for {key}: {str(e)}")
+        with self._local_lock:
+            self._local[key] = (time.monotonic() + self.ttl, snapshot)
+
+    def invalidate(self, product_id, variant_id=None):
+        key = _cache_key(product_id, variant_id)
+        backend = self._backend()
+        if backend is not None:
+            try:
+                backend.delete(key)
+            except Exception as e:
+                logger.warning(f"Availability cache delete failed for {key}: {str(e)}")
+        with self._local_lock:
+            self._local.pop(key, None)
+
+    def clear(self):
+        with self._local_lock:
+            self._local.clear()
+        self.hits = 0
+        self.misses = 0
+
+    # ----------------------------------------------------------------------
+    # Change events
+    # ----------------------------------------------------------------------
+    def subscribe(self, listener):
+        """Register a callable invoked with (product_id, variant_id, snapshot) on every committed change."""
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+        return listener
+
+    def unsubscribe(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def publish(self, product_id, variant_id, snapshot):
+        for listener in list(self._listeners):
+            try:
+                listener(product_id, variant_id, snapshot)
+            except Exception as e:
+                logger.error(f"Availability change listener failed: {str(e)}")
+
+    def write_through(self, product_id, variant_id, snapshot):
+        """Store (or drop, when snapshot is None) a committed value and publish it."""
+        if snapshot is None:
+            self.invalidate(product_id, variant_id)
+        else:
+            self.set(snapshot)
+        self.publish(product_id, variant_id, snapshot)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / total, 4) if total else 0.0,
+            'ttl_seconds': self.ttl,
+            'enabled': self.enabled,
+            'backend': 'flask-caching' if self._backend() is not None else 'local'
+        }
+
+availability_cache = AvailabilityCache()
+
+def get_availability(product_id, variant_id=None):
+    """
+    Return the availability snapshot for a product/variant.
+
+    Served from the cache when possible; on a miss the inventory row is read
+    once and cached. Returns None when no inventory record exists, leaving the
+    caller to fall back to product stock.
+    """
+    snapshot = availability_cache.get(product_id, variant_id)
+    if snapshot is not None:
+        return snapshot
+
+    from app.models.models import Inventory
+
+    inventory = Inventory.query.filter_by(
+        product_id=product_id,
+        variant_id=variant_id
+    ).first()
+    if not inventory:
+        return None
+
+    snapshot = snapshot_inventory(inventory)
+    availability_cache.set(snapshot)
+    return snapshot
+
+# --------------------------------------------------------------------------
+# Write-through from committed inventory changes
+# --------------------------------------------------------------------------
+_PENDING_KEY = 'inventory_cache_pending'
+
+def _collect_inventory_changes(session, flush_context):
+    from app.models.models import Inventory
+
+    pending = session.info.setdefault(_PENDING_KEY, {})
+    for obj in session.new.union(session.dirty):
+        if isinstance(obj, Inventory) and obj.product_id is not None:
+            pending[(obj.product_id, obj.variant_id)] = obj
+    for obj in session.deleted:
+        if isinstance(obj, Inventory) and obj.product_id is not None:
+            pending[(obj.product_id, obj.variant_id)] = None
+
+def _snapshot_pending(session, flush_context):
+    # Snapshots are taken after the flush so generated ids are available;
+    # they are only written to the cache once the transaction commits.
+    pending = session.info.get(_PENDING_KEY)
+    if not pending:
+        return
+    snapshots = session.info.setdefault(_PENDING_KEY + '_snapshots', {})
+    for key, obj in pending.items():
+        snapshots[key] = snapshot_inventory(obj) if obj is not None else None
+    pending.clear()
+
+def _apply_committed_changes(session):
+    session.info.pop(_PENDING_KEY, None)
+    snapshots = session.info.pop(_PENDING_KEY + '_snapshots', None)
+    if not snapshots:
+        return
+    for (product_id, variant_id), snapshot in snapshots.items():
+        availability_cache.write_through(product_id, variant_id, snapshot)
+
+def _discard_pending_changes(session, *args):
+    # Rolled-back values never reached the cache, but a rollback may also undo
+    # flushed work an outer transaction was going to commit; dropping the keys
+    # forces the next read to see whatever is actually committed.
+    pending = session.info.pop(_PENDING_KEY, None) or {}
+    snapshots = session.info.pop(_PENDING_KEY + '_snapshots', None) or {}
+    for product_id, variant_id in set(pending) | set(snapshots):
+        availability_cache.invalidate(product_id, variant_id)
+
+def refresh_availability(keys):
+    """
+    Re-read and write through the given (product_id, variant_id) keys.
+
+    Used after bulk UPDATE statements, which bypass the ORM unit of work and
+    therefore the flush hooks.
+    """
+    from app.models.models import Inventory
+    from sqlalchemy import and_, or_
+
+    keys = list({(pid, vid) for pid, vid in keys})
+    if not keys:
+        return
+    conditions = [
+        and_(Inventory.product_id == pid,
+             Inventory.variant_id.is_(None) if vid is None else Inventory.variant_id == vid)
+        for pid, vid in keys
+    ]
+    seen = set()
+    for inventory in Inventory.query.filter(or_(*conditions)).populate_existing().all():
+        key = (inventory.product_id, inventory.variant_id)
+        seen.add(key)
+        availability_cache.write_through(inventory.product_id, inventory.variant_id,
+                                         snapshot_inventory(inventory))
+    for product_id, variant_id in keys:
+        if (product_id, variant_id) not in seen:
+            availability_cache.write_through(product_id, variant_id, None)
+
+def _emit_stock_update(product_id, variant_id, snapshot):
+    """Default change listener: push the new availability to the product and admin rooms."""
+    from flask import has_app_context
+
+    if not has_app_context():
+        return
+    from app.websocket import broadcast_stock_update
+    broadcast_stock_update(product_id, variant_id, {
+        'type': 'stock_updated',
+        'product_id': product_id,
+        'variant_id': variant_id,
+        'stock': snapshot['available_quantity'] if snapshot else 0,
+        'status': snapshot['status'] if snapshot else 'unavailable',
+        'timestamp': datetime.utcnow().isoformat()
+    })
+
+_hooks_installed = False
+
+def init_inventory_cache(app):
+    """Configure the cache for the app and install the session write-through hooks once."""
+    global _hooks_installed
+    from app.configuration.extensions import db
+
+    availability_cache.configure(app)
+    if app.config.get('INVENTORY_CACHE_PUBLISH_SOCKETIO', True):
+        availability_cache.subscribe(_emit_stock_update)
+
+    if not _hooks_installed:
+        event.listen(db.session, 'after_flush', _collect_inventory_changes)
+        event.listen(db.session, 'after_flush_postexec', _snapshot_pending)
+        event.listen(db.session, 'after_commit', _apply_committed_changes)
+        event.listen(db.session, 'after_rollback', _discard_pending_changes)
+        _hooks_installed = True
+
+    app.extensions['inventory_cache'] = availability_cache
+    return availability_cache
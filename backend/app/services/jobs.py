@@ -0,0 +1,456 @@
+"""
+Durable background jobs for Mizizzi E-commerce platform.
+
+Side effects that talk to third parties (transactional email through Brevo,
+order webhooks) are enqueued here instead of being executed inside the
+request, so status changes and payment callbacks no longer wait on those APIs.
+
+A job is a registered handler name plus a JSON payload of keyword arguments.
+Jobs are stored by a pluggable broker:
+
+    database  - the background_jobs table (default, no extra infrastructure)
+    redis     - sorted sets in Redis (JOBS_REDIS_URL)
+
+and executed by JobWorker, either as a separate process (``flask jobs work``)
+or as a daemon thread inside the web process (JOBS_RUN_IN_PROCESS).
+
+Failed jobs are retried with exponential backoff and jitter; a job that still
+fails after max_attempts is dead-lettered and kept for inspection. Enqueuing
+with an idempotency key that was already used returns the existing job instead
+of creating a second one, so a duplicated payment callback sends one email.
+
+With JOBS_EAGER set (tests), jobs run inline at enqueue time.
+"""
+import json
+import logging
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, UTC
+
+logger = logging.getLogger(__name__)
+
+PENDING = 'pending'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+DEAD = 'dead'
+
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_BACKOFF = 30  # seconds before the first retry
+MAX_BACKOFF = 3600
+
+class JobError(Exception):
+    """Raised by a handler (or for a handler returning False) to request a retry."""
+
+class JobSpec:
+    def __init__(self, name, func, max_attempts=None, backoff=None):
+        self.name = name
+        self.func = func
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+
+_registry = {}
+
+def job(name, max_attempts=None, backoff=None):
+    """Register the decorated function as the handler for jobs called ``name``."""
+    def decorator(func):
+        _registry[name] = JobSpec(name, func, max_attempts, backoff)
+        return func
+    return decorator
+
+def get_job_spec(name):
+    return _registry.get(name)
+
+def retry_delay(attempt, base=DEFAULT_BACKOFF, cap=MAX_BACKOFF):
+    """Exponential backoff with jitter for the given (1-based) attempt number."""
+    delay = min(cap, base * (2 ** max(attempt - 1, 0)))
+    return delay * random.uniform(0.5, 1.0)
+
+def _utcnow():
+    return datetime.now(UTC).replace(tzinfo=None)
+
+# --------------------------------------------------------------------------
+# Brokers
+# --------------------------------------------------------------------------
+class DatabaseBroker:
+    """Jobs stored in the background_jobs table; claims use SKIP LOCKED where supported."""
+
+    name = 'database'
+
+    def enqueue(self, name, payload, idempotency_key=None, run_at=None, max_attempts=DEFAULT_MAX_ATTEMPTS,
+                commit=False):
+        from sqlalchemy.exc import IntegrityError
+        from app.configuration.extensions import db
+        from app.models.models import BackgroundJob
+
+        if idempotency_key:
+            existing = BackgroundJob.query.filter_by(idempotency_key=idempotency_key).first()
+            if existing:
+                return existing.id, False
+
+        record = BackgroundJob(
+            name=name,
+            payload=payload,
+            idempotency_key=idempotency_key,
+            status=PENDING,
+            max_attempts=max_attempts,
+            run_at=run_at or _utcnow()
+        )
+        if idempotency_key:
+            # A savepoint lets a concurrent duplicate fail without aborting the caller's transaction
+            try:
+                with db.session.begin_nested():
+                    db.session.add(record)
+            except IntegrityError:
+                existing = BackgroundJob.query.filter_by(idempotency_key=idempotency_key).first()
+                return existing.id, False
+        else:
+            db.session.add(record)
+            db.session.flush()
+
+        if commit:
+            db.session.commit()
+        return record.id, True
+
+    def claim(self, limit, visibility_timeout):
+        from sqlalchemy import and_, or_
+        from app.configuration.extensions import db
+        from app.models.models import BackgroundJob
+
+        now = _utcnow()
+        stale = now - timedelta(seconds=visibility_timeout)
+        rows = BackgroundJob.query.filter(or_(
+            and_(BackgroundJob.status == PENDING, BackgroundJob.run_at <= now),
+            # Jobs whose worker died mid-run become visible again
+            and_(BackgroundJob.status == RUNNING, BackgroundJob.locked_at < stale)
+        )).order_by(BackgroundJob.run_at).limit(limit).with_for_update(skip_locked=True).all()
+
+        claimed = []
+        for row in rows:
+            row.status = RUNNING
+            row.locked_at = now
+            row.attempts = (row.attempts or 0) + 1
+            claimed.append({
+                'id': row.id,
+                'name': row.name,
+                'payload': row.payload or {},
+                'attempts': row.attempts,
+                'max_attempts': row.max_attempts
+            })
+        db.session.commit()
+        return claimed
+
+    def _finish(self, job_id, **values):
+        from app.configuration.extensions import db
+        from app.models.models import BackgroundJob
+
+        BackgroundJob.query.filter_by(id=job_id).update(values, synchronize_session=False)
+        db.session.commit()
+
+    def ack(self, job):
+        self._finish(job['id'], status=SUCCEEDED, locked_at=None, last_error=None)
+
+    def retry(self, job, run_at, error):
+        self._finish(job['id'], status=PENDING, locked_at=None, run_at=run_at, last_error=error)
+
+    def dead(self, job, error):
+        self._finish(job['id'], status=DEAD, locked_at=None, last_error=error)
+
+    def stats(self):
+        from sqlalchemy import func
+        from app.configuration.extensions import db
+        from app.models.models import BackgroundJob
+
+        counts = dict(db.session.query(BackgroundJob.status, func.count(BackgroundJob.id))
+                      .group_by(BackgroundJob.status).all())
+        return {
+            'broker': self.name,
+            'pending': counts.get(PENDING, 0),
+            'running': counts.get(RUNNING, 0),
+            'succeeded': counts.get(SUCCEEDED, 0),
+            'dead': counts.get(DEAD, 0)
+        }
+
+# Atomically move due ids from one sorted set to another, rescored
+_REDIS_MOVE_DUE = """
+local ids = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, tonumber(ARGV[3]))
+for _, id in ipairs(ids) do
+    redis.call('ZREM', KEYS[1], id)
+    redis.call('ZADD', KEYS[2], ARGV[2], id)
+end
+return ids
+"""
+
+class RedisBroker:
+    """Jobs stored in Redis: a schedule zset, an in-flight zset and a dead-letter list."""
+
+    name = 'redis'
+
+    def __init__(self, url, prefix='mizizzi:jobs', idempotency_ttl=7 * 24 * 3600):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self.idempotency_ttl = idempotency_ttl
+        self._move_due = self.client.register_script(_REDIS_MOVE_DUE)
+
+    def _key(self, *parts):
+        return ':'.join((self.prefix,) + parts)
+
+    def enqueue(self, name, payload, idempotency_key=None, run_at=None, max_attempts=DEFAULT_MAX_ATTEMPTS,
+                commit=False):
+        job_id = uuid.uuid4().hex
+        if idempotency_key:
+            idem_key = self._key('idem', idempotency_key)
+            if not self.client.set(idem_key, job_id, nx=True, ex=self.idempotency_ttl):
+                existing = self.client.get(idem_key)
+                return existing.decode() if existing else None, False
+
+        record = {
+            'id': job_id,
+            'name': name,
+            'payload': payload,
+            'attempts': 0,
+            'max_attempts': max_attempts,
+            'idempotency_key': idempotency_key,
+            'last_error': None
+        }
+        score = (run_at or _utcnow()).replace(tzinfo=UTC).timestamp()
+        pipe = self.client.pipeline()
+        pipe.set(self._key('job', job_id), json.dumps(record))
+        pipe.zadd(self._key('queue'), {job_id: score})
+        pipe.execute()
+        return job_id, True
+
+    def claim(self, limit, visibility_timeout):
+        now = time.time()
+        # Jobs whose worker died mid-run become visible again
+        self._move_due(keys=[self._key('inflight'), self._key('queue')], args=[now, now, limit])
+        ids = self._move_due(keys=[self._key('queue'), self._key('inflight')],
+                             args=[now, now + visibility_timeout, limit])
+
+        claimed = []
+        for raw_id in ids:
+            job_id = raw_id.decode() if isinstance(raw_id, bytes) else raw_id
+            raw = self.client.get(self._key('job', job_id))
+            if raw is None:
+                self.client.zrem(self._key('inflight'), job_id)
+                continue
+            record = json.loads(raw)
+            record['attempts'] = record.get('attempts', 0) + 1
+            self.client.set(self._key('job', job_id), json.dumps(record))
+            claimed.append(record)
+        return claimed
+
+    def ack(self, job):
+        pipe = self.client.pipeline()
+        pipe.zrem(self._key('inflight'), job['id'])
+        pipe.delete(self._key('job', job['id']))
+        pipe.execute()
+
+    def retry(self, job, run_at, error):
+        record = dict(job, last_error=error)
+        pipe = self.client.pipeline()
+        pipe.set(self._key('job', job['id']), json.dumps(record))
+        pipe.zrem(self._key('inflight'), job['id'])
+        pipe.zadd(self._key('queue'), {job['id']: run_at.replace(tzinfo=UTC).timestamp()})
+        pipe.execute()
+
+    def dead(self, job, error):
+        record = dict(job, last_error=error, status=DEAD, failed_at=_utcnow().isoformat())
+        pipe = self.client.pipeline()
+        pipe.zrem(self._key('inflight'), job['id'])
+        pipe.delete(self._key('job', job['id']))
+        pipe.lpush(self._key('dead'), json.dumps(record))
+        pipe.execute()
+
+    def stats(self):
+        return {
+            'broker': self.name,
+            'pending': self.client.zcard(self._key('queue')),
+            'running': self.client.zcard(self._key('inflight')),
+            'dead': self.client.llen(self._key('dead'))
+        }
+
+def create_broker(app):
+    broker_name = app.config.get('JOBS_BROKER', 'database')
+    if broker_name == 'redis':
+        return RedisBroker(app.config['JOBS_REDIS_URL'])
+    return DatabaseBroker()
+
+def get_broker():
+    from flask import current_app
+
+    state = current_app.extensions.get('jobs')
+    if state is None:
+        state = current_app.extensions['jobs'] = {'broker': create_broker(current_app)}
+    return state['broker']
+
+# --------------------------------------------------------------------------
+# Enqueue / execute
+# --------------------------------------------------------------------------
+def _execute(spec, payload):
+    result = spec.func(**payload)
+    if result is False:
+        raise JobError(f"Job handler {spec.name} reported failure")
+    return result
+
+def enqueue(name, payload=None, idempotency_key=None, delay=None, commit=False):
+    """
+    Queue a registered job for background execution.
+
+    ``payload`` is passed to the handler as keyword arguments and must be JSON
+    serialisable. With the database broker the job row is only added to the
+    current session, so it is persisted (or discarded) together with the
+    caller's transaction; enqueue before the business commit, or pass
+    ``commit=True`` when there is nothing else to commit. Jobs enqueued by a
+    job handler are committed with that job's acknowledgement. Returns the job
+    id, or None when the job ran inline in eager mode.
+    """
+    from flask import current_app
+
+    spec = get_job_spec(name)
+    if spec is None:
+        raise ValueError(f"Unknown job: {name}")
+    payload = payload or {}
+
+    if current_app.config.get('JOBS_EAGER', False):
+        try:
+            _execute(spec, payload)
+        except Exception as e:
+            logger.error(f"Eager job {name} failed: {str(e)}")
+        return None
+
+    run_at = _utcnow() + timedelta(seconds=delay) if delay else None
+    max_attempts = spec.max_attempts or current_app.config.get('JOBS_MAX_ATTEMPTS', DEFAULT_MAX_ATTEMPTS)
+    job_id, created = get_broker().enqueue(
+        name, payload,
+        idempotency_key=idempotency_key,
+        run_at=run_at,
+        max_attempts=max_attempts,
+        commit=commit
+    )
+    if created:
+        logger.info(f"Enqueued job {name} ({job_id})")
+    else:
+        logger.info(f"Job {name} with idempotency key {idempotency_key} already queued as {job_id}")
+    return job_id
+
+def job_stats():
+    try:
+        return get_broker().stats()
+    except Exception as e:
+        logger.error(f"Could not read job stats: {str(e)}")
+        return {'error': str(e)}
+
+class JobWorker:
+    """Claims due jobs from the broker and runs them inside an app context."""
+
+    def __init__(self, app, broker=None, batch_size=None, poll_interval=None):
+        self.app = app
+        self.broker = broker
+        self.batch_size = batch_size or app.config.get('JOBS_BATCH_SIZE', 10)
+        self.poll_interval = poll_interval or app.config.get('JOBS_POLL_INTERVAL', 1.0)
+        self.visibility_timeout = app.config.get('JOBS_VISIBILITY_TIMEOUT', 300)
+        self.backoff = app.config.get('JOBS_BACKOFF_SECONDS', DEFAULT_BACKOFF)
+
+    def run_once(self):
+        """Process one batch of due jobs; returns how many were claimed."""
+        with self.app.app_context():
+            broker = self.broker or get_broker()
+            jobs = broker.claim(self.batch_size, self.visibility_timeout)
+            for claimed in jobs:
+                self._run(broker, claimed)
+            return len(jobs)
+
+    def _run(self, broker, claimed):
+        from app.configuration.extensions import db
+
+        spec = get_job_spec(claimed['name'])
+        if spec is None:
+            logger.error(f"No handler registered for job {claimed['name']} ({claimed['id']})")
+            broker.dead(claimed, 'No handler registered')
+            return
+
+        try:
+            _execute(spec, claimed.get('payload') or {})
+        except Exception as e:
+            db.session.rollback()
+            error = f"{type(e).__name__}: {str(e)}"
+            if claimed['attempts'] >= claimed['max_attempts']:
+                logger.error(f"Job {claimed['name']} ({claimed['id']}) dead-lettered after "
+                             f"{claimed['attempts']} attempts: {error}")
+                broker.dead(claimed, error)
+            else:
+                delay = retry_delay(claimed['attempts'], spec.backoff or self.backoff)
+                logger.warning(f"Job {claimed['name']} ({claimed['id']}) failed, retrying in {delay:.0f}s: {error}")
+                broker.retry(claimed, _utcnow() + timedelta(seconds=delay), error)
+            return
+
+        broker.ack(claimed)
+
+    def run_forever(self, stop_event=None):
+        logger.info(f"Job worker started (batch size {self.batch_size})")
+        while not (stop_event and stop_event.is_set()):
+            try:
+                processed = self.run_once()
+            except Exception as e:
+                logger.error(f"Job worker iteration failed: {str(e)}", exc_info=True)
+                processed = 0
+            if not processed:
+                time.sleep(self.poll_interval)
+
+# --------------------------------------------------------------------------
+# App integration
+# --------------------------------------------------------------------------
+# Modules that register job handlers; imported so a worker process knows every job
+HANDLER_MODULES = (
+    'app.routes.order.order_email_templates',
+    'app.routes.order.admin_order_routes',
+    'app.services.payment_callbacks',
+    'app.services.exports',
+    'app.services.guest_carts',
+)
+
+def init_jobs(app):
+    """Set up the broker, load handlers, register the CLI and optionally start an in-process worker."""
+    import click
+    from importlib import import_module
+
+    app.extensions['jobs'] = {'broker': create_broker(app)}
+
+    for module in HANDLER_MODULES:
+        try:
+            import_module(module)
+        except Exception as e:
+            logger.error(f"Could not load job handlers from {module}: {str(e)}")
+
+    @app.cli.group('jobs')
+    def jobs_cli():
+        """Background job commands."""
+
+    @jobs_cli.command('work')
+    @click.option('--batch-size', default=None, type=int)
+    def work(batch_size):
+        """Run a job worker until interrupted."""
+        JobWorker(app, batch_size=batch_size).run_forever()
+
+    @jobs_cli.command('stats')
+    def stats():
+        """Print queue depth per status."""
+        with app.app_context():
+            click.echo(json.dumps(job_stats()))
+
+    if app.config.get('JOBS_RUN_IN_PROCESS', False) and not app.config.get('JOBS_EAGER', False):
+        stop_event = threading.Event()
+        thread = threading.Thread(
+            target=JobWorker(app).run_forever,
+            kwargs={'stop_event': stop_event},
+            name='job-worker',
+            daemon=True
+        )
+        thread.start()
+        app.extensions['jobs']['stop_event'] = stop_event
+
+    return app.extensions['jobs']['broker']
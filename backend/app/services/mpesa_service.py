@@ -10,13 +10,15 @@ from datetime import datetime, timedelta
 import logging
 import os
 from dotenv import load_dotenv
-import time
 import traceback
 import re
 import uuid
 from typing import Dict, Optional, Any, Union
 import random
 
+from app.services.http_client import http_client
+from app.services.token_cache import get_token_cache, token_name
+
 # Load environment variables
 load_dotenv()
 
@@ -45,18 +47,9 @@ TOKEN_URL = f"{BASE_URL}/oauth/v1/generate?grant_type=client_credentials"
 STK_PUSH_URL = f"{BASE_URL}/mpesa/stkpush/v1/processrequest"
 QUERY_URL = f"{BASE_URL}/mpesa/stkpushquery/v1/query"
 
-# Configuration
-MAX_RETRIES = 3
-RETRY_DELAY = 2  # seconds
-REQUEST_TIMEOUT = 30  # seconds
+# Configuration (timeouts and transport retries live in services/http_client.py)
 TRANSACTION_TYPE = "CustomerPayBillOnline"
 
-# Cache for access tokens
-_token_cache = {
-    'token': None,
-    'expires_at': None
-}
-
 
 class MpesaError(Exception):
     """Custom exception for M-PESA related errors."""
@@ -140,86 +133,61 @@ class MpesaService:
         """
         Generate OAuth access token for M-PESA API with caching.
 
+        The token is shared by all workers through the token cache, so only one
+        of them calls Daraja when it is about to expire.
+
         Args:
             force_refresh (bool): Force token refresh even if cached token is valid
 
         Returns:
             str: Access token or None if failed
         """
-        global _token_cache
+        try:
+            cache = get_token_cache(token_name('mpesa', BASE_URL, self.consumer_key), self._fetch_access_token)
+            return cache.get_token(force_refresh=force_refresh)
+        except requests.RequestException as e:
+            logger.error(f"Request exception generating access token: {str(e)}")
+            return None
+        except Exception as e:
+            logger.error(f"Unexpected exception generating access token: {str(e)}")
+            return None
 
-        # Check if we have a valid cached token
-        if not force_refresh and _token_cache['token'] and _token_cache['expires_at']:
-            if datetime.now() < _token_cache['expires_at']:
-                logger.info("Using cached access token")
-                return _token_cache['token']
+    def _fetch_access_token(self):
+        """Request a new token from Daraja: (token, seconds until expiry)."""
+        # Encode credentials
+        auth_string = f"{self.consumer_key}:{self.consumer_secret}"
+        auth_bytes = auth_string.encode("ascii")
+        encoded_auth = base64.b64encode(auth_bytes).decode("ascii")
+
+        # Set headers
+        headers = {
+            "Authorization": f"Basic {encoded_auth}",
+            "Content-Type": "application/json"
+        }
 
-        for attempt in range(MAX_RETRIES):
-            try:
-                # Encode credentials
-                auth_string = f"{self.consumer_key}:{self.consumer_secret}"
-                auth_bytes = auth_string.encode("ascii")
-                encoded_auth = base64.b64encode(auth_bytes).decode("ascii")
-
-                # Set headers
-                headers = {
-                    "Authorization": f"Basic {encoded_auth}",
-                    "Content-Type": "application/json"
-                }
-
-                logger.info(f"Requesting access token (attempt {attempt + 1}/{MAX_RETRIES})")
-
-                # Make request
-                response = requests.get(TOKEN_URL, headers=headers, timeout=REQUEST_TIMEOUT)
-
-                # Check if request was successful
-                if response.status_code == 200:
-                    result = response.json()
-                    token = result.get("access_token")
-                    expires_in = result.get("expires_in", 3600)  # Default 1 hour
-
-                    # Ensure expires_in is a valid integer
-                    try:
-                        expires_in = int(expires_in)
-                    except (ValueError, TypeError):
-                        expires_in = 3600  # Default to 1 hour
-
-                    if not token:
-                        logger.error("No access token in response")
-                        if attempt < MAX_RETRIES - 1:
-                            time.sleep(RETRY_DELAY)
-                            continue
-                        return None
-
-                    # Cache the token
-                    _token_cache['token'] = token
-                    # Ensure expires_in is an integer
-                    expires_in = int(expires_in) if expires_in else 3600
-                    _token_cache['expires_at'] = datetime.now() + timedelta(seconds=expires_in - 60)  # 1 minute buffer
-
-                    logger.info("Access token generated successfully")
-                    return token
-                else:
-                    logger.error(f"Error generating access token: {response.status_code} - {response.text}")
-                    if attempt < MAX_RETRIES - 1:
-                        time.sleep(RETRY_DELAY)
-                        continue
-                    return None
+        logger.info("Requesting access token")
 
-            except requests.RequestException as e:
-                logger.error(f"Request exception generating access token: {str(e)}")
-                if attempt < MAX_RETRIES - 1:
-                    time.sleep(RETRY_DELAY)
-                    continue
-                return None
-            except Exception as e:
-                logger.error(f"Unexpected exception generating access token: {str(e)}")
-                if attempt < MAX_RETRIES - 1:
-                    time.sleep(RETRY_DELAY)
-                    continue
-                return None
+        # Transport retries and timeouts are handled by the shared HTTP client
+        response = http_client.get('mpesa', TOKEN_URL, headers=headers)
 
-        return None
+        if response.status_code != 200:
+            logger.error(f"Error generating access token: {response.status_code} - {response.text}")
+            return None
+
+        result = response.json()
+        token = result.get("access_token")
+        if not token:
+            logger.error("No access token in response")
+            return None
+
+        # Ensure expires_in is a valid integer
+        try:
+            expires_in = int(result.get("expires_in", 3600))
+        except (ValueError, TypeError):
+            expires_in = 3600  # Default to 1 hour
+
+        logger.info("Access token generated successfully")
+        return token, expires_in
 
     def generate_password(self) -> tuple[str, str]:
         """
@@ -269,89 +237,65 @@ class MpesaService:
 
             logger.info(f"Initiating STK Push: Phone={formatted_phone}, Amount={validated_amount}")
 
-            for attempt in range(MAX_RETRIES):
-                try:
-                    # Generate access token
-                    token = self.generate_access_token()
-                    if not token:
-                        logger.error("Failed to generate access token")
-                        if attempt < MAX_RETRIES - 1:
-                            time.sleep(RETRY_DELAY)
-                            continue
-                        raise MpesaError("Failed to generate access token")
-
-                    # Generate password and timestamp
-                    password, timestamp = self.generate_password()
-
-                    # Set headers
-                    headers = {
-                        "Authorization": f"Bearer {token}",
-                        "Content-Type": "application/json"
-                    }
-
-                    # Set payload
-                    payload = {
-                        "BusinessShortCode": self.business_short_code,
-                        "Password": password,
-                        "Timestamp": timestamp,
-                        "TransactionType": TRANSACTION_TYPE,
-                        "Amount": validated_amount,
-                        "PartyA": formatted_phone,
-                        "PartyB": self.business_short_code,
-                        "PhoneNumber": formatted_phone,
-                        "CallBackURL": self.callback_url,
-                        "AccountReference": account_reference,
-                        "TransactionDesc": transaction_desc
-                    }
-
-                    logger.info(f"STK Push payload: {json.dumps(payload, indent=2)}")
-
-                    # Make request
-                    response = requests.post(
-                        STK_PUSH_URL,
-                        headers=headers,
-                        json=payload,
-                        timeout=REQUEST_TIMEOUT
-                    )
-
-                    logger.info(f"STK Push response: Status={response.status_code}, Content={response.text}")
-
-                    # Check if request was successful
-                    if response.status_code == 200:
-                        try:
-                            result = response.json()
-                            # Validate response
-                            if result.get('ResponseCode') == '0':
-                                logger.info("STK Push initiated successfully")
-                                return result
-                            else:
-                                error_msg = result.get('errorMessage') or result.get('ResponseDescription', 'Unknown error')
-                                logger.error(f"STK Push failed: {error_msg}")
-                                if attempt < MAX_RETRIES - 1:
-                                    time.sleep(RETRY_DELAY)
-                                    continue
-                                raise MpesaError(f"STK Push failed: {error_msg}", details=result)
-                        except json.JSONDecodeError as e:
-                            logger.error(f"Failed to parse STK Push response: {str(e)}")
-                            if attempt < MAX_RETRIES - 1:
-                                time.sleep(RETRY_DELAY)
-                                continue
-                            raise MpesaError("Invalid response format from M-PESA API")
-                    else:
-                        logger.error(f"STK Push request failed: {response.status_code} - {response.text}")
-                        if attempt < MAX_RETRIES - 1:
-                            time.sleep(RETRY_DELAY)
-                            continue
-                        raise MpesaError(f"STK Push request failed: {response.status_code}")
-
-                except requests.RequestException as e:
-                    logger.error(f"Request exception during STK Push: {str(e)}")
-                    if attempt < MAX_RETRIES - 1:
-                        time.sleep(RETRY_DELAY)
-                        continue
-                    raise MpesaError(f"Network error during STK Push: {str(e)}")
-
-            raise MpesaError("STK Push failed after all retry attempts")
+            # Generate access token
+            token = self.generate_access_token()
+            if not token:
+                logger.error("Failed to generate access token")
+                raise MpesaError("Failed to generate access token")
+
+            # Generate password and timestamp
+            password, timestamp = self.generate_password()
+
+            # Set headers
+            headers = {
+                "Authorization": f"Bearer {token}",
+                "Content-Type": "application/json"
+            }
+
+            # Set payload
+            payload = {
+                "BusinessShortCode": self.business_short_code,
+                "Password": password,
+                "Timestamp": timestamp,
+                "TransactionType": TRANSACTION_TYPE,
+                "Amount": validated_amount,
+                "PartyA": formatted_phone,
+                "PartyB": self.business_short_code,
+                "PhoneNumber": formatted_phone,
+                "CallBackURL": self.callback_url,
+                "AccountReference": account_reference,
+                "TransactionDesc": transaction_desc
+            }
+
+            logger.info(f"STK Push payload: {json.dumps(payload, indent=2)}")
+
+            # An STK push is not idempotent: the shared client only retries it when
+            # the request never reached Safaricom, so the customer is never prompted twice.
+            try:
+                response = http_client.post('mpesa', STK_PUSH_URL, headers=headers, json=payload)
+            except requests.RequestException as e:
+                logger.error(f"Request exception during STK Push: {str(e)}")
+                raise MpesaError(f"Network error during STK Push: {str(e)}")
+
+            logger.info(f"STK Push response: Status={response.status_code}, Content={response.text}")
+
+            if response.status_code != 200:
+                logger.error(f"STK Push request failed: {response.status_code} - {response.text}")
+                raise MpesaError(f"STK Push request failed: {response.status_code}")
+
+            try:
+                result = response.json()
+            except json.JSONDecodeError as e:
+                logger.error(f"Failed to parse STK Push response: {str(e)}")
+                raise MpesaError("Invalid response format from M-PESA API")
+
+            if result.get('ResponseCode') != '0':
+                error_msg = result.get('errorMessage') or result.get('ResponseDescription', 'Unknown error')
+                logger.error(f"STK Push failed: {error_msg}")
+                raise MpesaError(f"STK Push failed: {error_msg}", details=result)
+
+            logger.info("STK Push initiated successfully")
+            return result
 
         except MpesaError:
             raise
@@ -378,73 +322,52 @@ class MpesaService:
 
         logger.info(f"Querying STK status for: {checkout_request_id}")
 
-        for attempt in range(MAX_RETRIES):
-            try:
-                # Generate access token
-                token = self.generate_access_token()
-                if not token:
-                    logger.error("Failed to generate access token")
-                    if attempt < MAX_RETRIES - 1:
-                        time.sleep(RETRY_DELAY)
-                        continue
-                    raise MpesaError("Failed to generate access token")
-
-                # Generate password and timestamp
-                password, timestamp = self.generate_password()
-
-                # Set headers
-                headers = {
-                    "Authorization": f"Bearer {token}",
-                    "Content-Type": "application/json"
-                }
-
-                # Set payload
-                payload = {
-                    "BusinessShortCode": self.business_short_code,
-                    "Password": password,
-                    "Timestamp": timestamp,
-                    "CheckoutRequestID": checkout_request_id
-                }
-
-                logger.info(f"Status query payload: {json.dumps(payload, indent=2)}")
-
-                # Make request
-                response = requests.post(
-                    QUERY_URL,
-                    headers=headers,
-                    json=payload,
-                    timeout=REQUEST_TIMEOUT
-                )
-
-                logger.info(f"Status query response: Status={response.status_code}, Content={response.text}")
-
-                # Check if request was successful
-                if response.status_code == 200:
-                    try:
-                        result = response.json()
-                        logger.info("Status query completed successfully")
-                        return result
-                    except json.JSONDecodeError as e:
-                        logger.error(f"Failed to parse status query response: {str(e)}")
-                        if attempt < MAX_RETRIES - 1:
-                            time.sleep(RETRY_DELAY)
-                            continue
-                        raise MpesaError("Invalid response format from M-PESA API")
-                else:
-                    logger.error(f"Status query request failed: {response.status_code} - {response.text}")
-                    if attempt < MAX_RETRIES - 1:
-                        time.sleep(RETRY_DELAY)
-                        continue
-                    raise MpesaError(f"Status query request failed: {response.status_code}")
+        # Generate access token
+        token = self.generate_access_token()
+        if not token:
+            logger.error("Failed to generate access token")
+            raise MpesaError("Failed to generate access token")
 
-            except requests.RequestException as e:
-                logger.error(f"Request exception during status query: {str(e)}")
-                if attempt < MAX_RETRIES - 1:
-                    time.sleep(RETRY_DELAY)
-                    continue
-                raise MpesaError(f"Network error during status query: {str(e)}")
+        # Generate password and timestamp
+        password, timestamp = self.generate_password()
+
+        # Set headers
+        headers = {
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json"
+        }
+
+        # Set payload
+        payload = {
+            "BusinessShortCode": self.business_short_code,
+            "Password": password,
+            "Timestamp": timestamp,
+            "CheckoutRequestID": checkout_request_id
+        }
+
+        logger.info(f"Status query payload: {json.dumps(payload, indent=2)}")
+
+        # A status query is read-only, so the shared client may retry it freely
+        try:
+            response = http_client.post('mpesa', QUERY_URL, headers=headers, json=payload, idempotent=True)
+        except requests.RequestException as e:
+            logger.error(f"Request exception during status query: {str(e)}")
+            raise MpesaError(f"Network error during status query: {str(e)}")
+
+        logger.info(f"Status query response: Status={response.status_code}, Content={response.text}")
+
+        if response.status_code != 200:
+            logger.error(f"Status query request failed: {response.status_code} - {response.text}")
+            raise MpesaError(f"Status query request failed: {response.status_code}")
+
+        try:
+            result = response.json()
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to parse status query response: {str(e)}")
+            raise MpesaError("Invalid response format from M-PESA API")
 
-        raise MpesaError("Status query failed after all retry attempts")
+        logger.info("Status query completed successfully")
+        return result
 
     def process_stk_callback(self, callback_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
@@ -0,0 +1,101 @@
+"""
+Order number service for Mizizzi E-commerce platform.
+
+Order numbers keep the customer-facing 9-digit "3xxxxxxxx" format, but are
+derived from a monotonically increasing counter instead of random digits, so
+two orders can never be handed the same number and order creation never has
+to retry on the unique index.
+
+The counter is the PostgreSQL sequence ``order_number_seq``; nextval() takes no
+row locks and is not rolled back, so concurrent checkouts never wait on each
+other. On databases without sequences (SQLite in development and tests) an
+in-process counter seeded from the orders table is used instead.
+
+Counter values are spread over the 8-digit space with a fixed bijection
+(multiplication by a constant coprime with 10**8), so consecutive orders do not
+get consecutive numbers and order volume cannot be read off the numbers.
+"""
+import logging
+import threading
+
+from sqlalchemy import func
+
+logger = logging.getLogger(__name__)
+
+PREFIX = '3'
+DIGITS = 8
+MODULUS = 10 ** DIGITS
+# Odd and not divisible by 5, hence invertible modulo 10**8
+MULTIPLIER = 73939133
+OFFSET = 48271
+INVERSE = pow(MULTIPLIER, -1, MODULUS)
+
+def format_order_number(value):
+    """Map a counter value onto the 9-digit order number space."""
+    scrambled = (value * MULTIPLIER + OFFSET) % MODULUS
+    return f"{PREFIX}{scrambled:0{DIGITS}d}"
+
+def parse_order_number(order_number):
+    """Return the counter value behind an order number, or None if it is not one of ours."""
+    if not order_number or len(order_number) != DIGITS + 1 or not order_number.startswith(PREFIX):
+        return None
+    if not order_number[1:].isdigit():
+        return None
+    return ((int(order_number[1:]) - OFFSET) * INVERSE) % MODULUS
+
+class _LocalCounter:
+    """Thread-safe counter for databases without sequences, seeded once from existing orders."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._next = None
+
+    def reset(self):
+        with self._lock:
+            self._next = None
+
+    def next_value(self, session):
+        with self._lock:
+            if self._next is None:
+                from app.models.models import Order
+
+                # Seed past every number already issued so the counter never walks into one
+                numbers = session.query(Order.order_number).filter(
+                    Order.order_number.like(PREFIX + '_' * DIGITS)
+                ).all()
+                values = [parse_order_number(number) for (number,) in numbers]
+                self._next = max([v for v in values if v is not None], default=0) + 1
+            value = self._next
+            self._next += 1
+            return value
+
+_local_counter = _LocalCounter()
+
+def _next_counter_value(session):
+    bind = session.get_bind()
+    if bind.dialect.supports_sequences:
+        from app.models.models import order_number_seq
+        return session.execute(order_number_seq.next_value()).scalar()
+    return _local_counter.next_value(session)
+
+def next_order_number(session=None):
+    """
+    Allocate the next order number.
+
+    Numbers issued before this service existed were random, so each candidate
+    is checked against the unique index; a hit is skipped (not retried on
+    insert) and only happens while the counter walks over a legacy number.
+    """
+    from app.configuration.extensions import db
+    from app.models.models import Order
+
+    session = session or db.session
+    while True:
+        value = _next_counter_value(session)
+        order_number = format_order_number(value % MODULUS)
+        taken = session.query(func.count(Order.id)).filter(
+            Order.order_number == order_number
+        ).scalar()
+        if not taken:
+            return order_number
+        logger.info(f"Skipping order number {order_number}: already issued")
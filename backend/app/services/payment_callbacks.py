@@ -0,0 +1,142 @@
+"""
+Payment callback inbox for Mizizzi E-commerce platform.
+
+M-PESA and Pesapal retry callbacks that are not acknowledged quickly, so the
+callback routes only persist what they received and answer. Each callback is
+stored once per provider reference (CheckoutRequestID / OrderTrackingId) in
+the payment_callbacks table and queued as a ``payments.process_callback`` job.
+
+The job applies the callback exactly once: the inbox row and the transaction
+are locked, a processed inbox row is skipped, and the transaction is only
+moved out of a pending state once (the same write-once rule the
+reconciliation worker follows). Duplicate deliveries just bump ``deliveries``;
+a redelivery for a transaction that is still pending is queued again.
+"""
+import logging
+from datetime import datetime, UTC
+
+from app.services.jobs import JobError, enqueue, job
+from app.services.payment_reconciliation import (
+    apply_mpesa_result, get_provider, notify_payment_status, pesapal_outcome, query_pesapal_status
+)
+
+logger = logging.getLogger(__name__)
+
+RECEIVED = 'received'
+PROCESSED = 'processed'
+PROCESS_CALLBACK_JOB = 'payments.process_callback'
+
+def _utcnow():
+    return datetime.now(UTC).replace(tzinfo=None)
+
+def _queue(callback):
+    return enqueue(PROCESS_CALLBACK_JOB, {'callback_id': callback.id},
+                   idempotency_key=f"payment-callback:{callback.id}:{callback.deliveries}")
+
+def record_callback(provider, reference, payload, transaction_id=None):
+    """
+    Persist a provider callback and queue it for processing; the caller commits.
+
+    Returns (callback, created). A duplicate delivery is counted and only
+    re-queued while the payment it refers to is still unsettled.
+    """
+    from sqlalchemy.exc import IntegrityError
+    from app.configuration.extensions import db
+    from app.models.models import PaymentCallback
+
+    callback = PaymentCallback.query.filter_by(provider=provider, reference=reference).first()
+    if callback is None:
+        callback = PaymentCallback(
+            provider=provider,
+            reference=reference,
+            transaction_id=transaction_id,
+            payload=payload or {},
+            status=RECEIVED,
+            deliveries=1
+        )
+        try:
+            # A concurrent duplicate fails on the unique key without aborting the caller's transaction
+            with db.session.begin_nested():
+                db.session.add(callback)
+        except IntegrityError:
+            callback = PaymentCallback.query.filter_by(provider=provider, reference=reference).first()
+        else:
+            _queue(callback)
+            return callback, True
+
+    callback.deliveries = (callback.deliveries or 0) + 1
+    if callback.status == PROCESSED and callback.result not in get_provider(provider).final_states:
+        callback.payload = payload or callback.payload
+        callback.status = RECEIVED
+        _queue(callback)
+    return callback, False
+
+def apply_mpesa_callback(transaction, payload, now):
+    """Apply an STK callback body to an unsettled M-PESA transaction."""
+    stk_callback = (payload.get('Body') or {}).get('stkCallback') or {}
+    receipt_number = None
+    items = (stk_callback.get('CallbackMetadata') or {}).get('Item') or []
+    if isinstance(items, list):
+        for item in items:
+            if isinstance(item, dict) and item.get('Name') == 'MpesaReceiptNumber':
+                receipt_number = item.get('Value')
+                break
+
+    transaction.callback_response = payload
+    transaction.callback_received_at = now
+    return apply_mpesa_result(transaction, stk_callback.get('ResultCode'), stk_callback.get('ResultDesc'),
+                              receipt_number, now)
+
+@job(PROCESS_CALLBACK_JOB)
+def process_payment_callback(callback_id):
+    """Apply one inbox entry; a processed entry or an already settled payment is left alone."""
+    import json
+    from app.configuration.extensions import db
+    from app.models.models import PaymentCallback
+
+    callback = db.session.get(PaymentCallback, callback_id)
+    if callback is None or callback.status == PROCESSED:
+        return True
+    provider = get_provider(callback.provider)
+
+    # Pesapal's IPN only says something changed; ask for the status before taking any locks
+    status_response = None
+    if provider.name == 'pesapal':
+        status_response = query_pesapal_status(callback.reference)
+        if pesapal_outcome(status_response) is None:
+            raise JobError(f"Pesapal status unavailable for {callback.reference}")
+
+    now = _utcnow()
+    callback = PaymentCallback.query.filter_by(id=callback_id).with_for_update().first()
+    if callback is None or callback.status == PROCESSED:
+        return True
+
+    if callback.transaction_id:
+        query = provider.model.query.filter_by(id=callback.transaction_id)
+    else:
+        query = provider.model.query.filter(getattr(provider.model, provider.reference) == callback.reference)
+    transaction = query.with_for_update().first()
+
+    outcome = None
+    if transaction is not None and transaction.status not in provider.final_states:
+        if provider.name == 'mpesa':
+            outcome = apply_mpesa_callback(transaction, callback.payload or {}, now)
+        else:
+            transaction.callback_response = json.dumps(callback.payload or {})
+            transaction.callback_received_at = now
+            outcome = provider.apply(transaction, status_response, now)
+        if outcome in provider.final_states:
+            transaction.next_status_check_at = None
+        else:
+            # Still pending at the provider; let the reconciler look again soon
+            transaction.next_status_check_at = now
+
+    callback.status = PROCESSED
+    callback.processed_at = now
+    callback.result = transaction.status if transaction is not None else None
+    db.session.commit()
+
+    if outcome in provider.final_states:
+        logger.info(f"{provider.name} callback {callback.reference} settled transaction {transaction.id} as {outcome}")
+        notify_payment_status(provider.name, transaction)
+    return True
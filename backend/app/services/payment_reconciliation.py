@@ -0,0 +1,395 @@
+"""
+Payment status reconciliation for Mizizzi E-commerce platform.
+
+Card (Pesapal) and M-PESA payments settle asynchronously. Instead of the
+frontend's status polls calling the provider on every request, pending
+transactions are tracked here and reconciled by a worker:
+
+    - each pending row carries ``next_status_check_at``; the worker claims due
+      rows in batches (SKIP LOCKED where supported) and leases them, so several
+      reconcilers never query the same transaction at once
+    - providers are queried outside any database transaction, optionally with
+      a small thread pool, on a backoff schedule (PAYMENT_RECONCILE_SCHEDULE)
+    - results are applied write-once: the row is re-read under lock and only a
+      still-pending transaction is moved to its final state, so a callback that
+      settled it in the meantime wins
+    - the customer is notified over their SocketIO user room after the commit
+
+Status endpoints only read the local row. The worker runs as its own process
+(``flask payments reconcile``) or, on single-process hosts, as a daemon thread
+(PAYMENT_RECONCILE_IN_PROCESS).
+"""
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, UTC
+
+logger = logging.getLogger(__name__)
+
+PENDING = 'pending'
+PESAPAL_FINAL = ('completed', 'failed', 'cancelled', 'expired')
+MPESA_FINAL = ('completed', 'failed', 'cancelled')
+
+# Seconds between provider queries, by number of checks already made; the last entry repeats
+DEFAULT_SCHEDULE = (5, 10, 15, 30, 60, 120, 300)
+DEFAULT_LEASE_SECONDS = 60
+DEFAULT_MAX_AGE_SECONDS = 3600  # stop polling M-PESA after an hour without a result
+
+def _utcnow():
+    return datetime.now(UTC).replace(tzinfo=None)
+
+def _naive(value):
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(UTC).replace(tzinfo=None)
+    return value
+
+def _config(name, default):
+    try:
+        from flask import current_app
+        return current_app.config.get(name, default)
+    except RuntimeError:
+        return default
+
+def next_check_delay(checks_made):
+    """Seconds to wait before the next provider query after ``checks_made`` queries."""
+    schedule = _config('PAYMENT_RECONCILE_SCHEDULE', DEFAULT_SCHEDULE) or DEFAULT_SCHEDULE
+    return schedule[min(checks_made or 0, len(schedule) - 1)]
+
+def schedule_status_check(transaction, now=None):
+    """Put a transaction that is now waiting on the provider into the reconciliation schedule."""
+    now = now or _utcnow()
+    transaction.status_check_count = transaction.status_check_count or 0
+    transaction.next_status_check_at = now + timedelta(seconds=next_check_delay(transaction.status_check_count))
+
+# --------------------------------------------------------------------------
+# Provider queries (module level so they can be swapped in tests)
+# --------------------------------------------------------------------------
+def query_mpesa_status(checkout_request_id):
+    from app.utils.mpesa_utils import MpesaClient
+    return MpesaClient().query_stk_status(checkout_request_id)
+
+def query_pesapal_status(tracking_id):
+    from app.utils.pesapal_utils import get_transaction_status
+    return get_transaction_status(tracking_id)
+
+# --------------------------------------------------------------------------
+# Applying results
+# --------------------------------------------------------------------------
+def mark_order_paid(order_id):
+    """Mark the order behind a completed payment as paid and confirm it if still pending."""
+    from app.configuration.extensions import db
+    from app.models.models import Order, OrderStatus, PaymentStatus
+
+    try:
+        order = db.session.get(Order, int(order_id))
+    except (TypeError, ValueError):
+        order = None
+    if not order:
+        logger.warning(f"Order {order_id} not found for completed payment")
+        return None
+
+    order.payment_status = PaymentStatus.PAID
+    if order.status == OrderStatus.PENDING:
+        order.status = OrderStatus.CONFIRMED
+    order.updated_at = datetime.now(UTC)
+    return order
+
+def queue_order_confirmation(transaction):
+    """Queue the order confirmation email once per order, whichever path settled the payment."""
+    from app.configuration.extensions import db
+    from app.models.models import User
+    from app.services.jobs import enqueue
+
+    user = db.session.get(User, transaction.user_id) if transaction.user_id else None
+    if not (user and user.email and transaction.order_id):
+        return None
+    return enqueue('email.order_confirmation', {
+        'order_id': transaction.order_id,
+        'to_email': user.email,
+        'customer_name': user.name or "Valued Customer"
+    }, idempotency_key=f"order-confirmation:{transaction.order_id}")
+
+def pesapal_outcome(status_response):
+    """Map a Pesapal status response to 'completed', 'failed', 'cancelled', 'pending' or None (no answer)."""
+    if not status_response or status_response.get('status') != 'success':
+        return None
+    data = status_response.get('data') or status_response
+    payment_status = str(data.get('payment_status') or data.get('payment_status_description') or '').upper()
+    status_code = data.get('status_code', (data.get('response') or {}).get('status_code'))
+
+    # Pesapal status codes: 0 invalid (usually not yet paid), 1 completed, 2 failed, 3 reversed
+    if payment_status in ('COMPLETED', 'COMPLETE', 'SUCCESS') or status_code == 1:
+        return 'completed'
+    if payment_status in ('FAILED', 'FAIL', 'ERROR', 'DECLINED', 'REVERSED') or status_code in (2, 3):
+        return 'failed'
+    if payment_status in ('CANCELLED', 'CANCELED', 'CANCEL'):
+        return 'cancelled'
+    return PENDING
+
+def apply_pesapal_result(transaction, status_response, now=None):
+    """Apply a Pesapal status response to a pending transaction; returns the new final status or None."""
+    now = now or _utcnow()
+    outcome = pesapal_outcome(status_response)
+    if status_response is not None:
+        transaction.status_response = json.dumps(status_response, default=str)
+
+    if outcome in (None, PENDING):
+        expires_at = _naive(transaction.expires_at)
+        if expires_at and now > expires_at:
+            transaction.status = 'expired'
+            transaction.error_message = 'Transaction expired'
+            return 'expired'
+        return None
+
+    data = status_response.get('data') or status_response
+    transaction.status = outcome
+    if outcome == 'completed':
+        transaction.payment_method = data.get('payment_method') or 'CARD'
+        transaction.pesapal_receipt_number = data.get('confirmation_code')
+        transaction.transaction_date = now
+        payment_account = data.get('payment_account') or ''
+        if payment_account.startswith('****'):
+            transaction.last_four_digits = payment_account[-4:]
+        if 'visa' in payment_account.lower():
+            transaction.card_type = 'VISA'
+        elif 'master' in payment_account.lower():
+            transaction.card_type = 'MASTERCARD'
+        mark_order_paid(transaction.order_id)
+        queue_order_confirmation(transaction)
+    elif outcome == 'failed':
+        transaction.error_message = (data.get('error_message') or 'Card payment failed')[:500]
+    elif outcome == 'cancelled':
+        transaction.cancelled_at = now
+    return outcome
+
+def mpesa_outcome(result_code):
+    """Map an STK ResultCode to 'completed', 'cancelled' or 'failed'."""
+    if str(result_code) == '0':
+        return 'completed'
+    if str(result_code) in ('1032', '1037'):
+        return 'cancelled'
+    return 'failed'
+
+def apply_mpesa_result(transaction, result_code, result_desc=None, receipt_number=None, now=None):
+    """Apply an STK result to a pending M-PESA transaction; returns the new status."""
+    now = now or _utcnow()
+    outcome = mpesa_outcome(result_code)
+    transaction.status = outcome
+    transaction.result_code = str(result_code)
+    transaction.result_desc = result_desc
+    transaction.updated_at = now
+    if outcome == 'completed':
+        transaction.transaction_date = now
+        if receipt_number:
+            transaction.mpesa_receipt_number = receipt_number
+        mark_order_paid(transaction.order_id)
+    return outcome
+
+def apply_mpesa_query(transaction, status_response, now=None):
+    """Apply an STK query response; returns the new final status or None while M-PESA is still processing."""
+    now = now or _utcnow()
+    if status_response and str(status_response.get('ResponseCode')) == '0' \
+            and status_response.get('ResultCode') is not None:
+        return apply_mpesa_result(transaction, status_response.get('ResultCode'),
+                                  status_response.get('ResultDesc'),
+                                  status_response.get('MpesaReceiptNumber'), now)
+
+    created_at = _naive(transaction.created_at)
+    max_age = _config('PAYMENT_RECONCILE_MAX_AGE_SECONDS', DEFAULT_MAX_AGE_SECONDS)
+    if created_at and now - created_at > timedelta(seconds=max_age):
+        transaction.status = 'failed'
+        transaction.error_message = 'No result from M-PESA before timeout'
+        transaction.updated_at = now
+        return 'failed'
+    return None
+
+def notify_payment_status(provider, transaction):
+    """Push the settled status to the customer's SocketIO room (call after commit)."""
+    if not transaction.user_id:
+        return
+    try:
+        from app.websocket import broadcast_to_user
+        broadcast_to_user(transaction.user_id, 'payment_status', {
+            'provider': provider,
+            'transaction_id': transaction.id,
+            'order_id': transaction.order_id,
+            'status': transaction.status
+        })
+    except Exception as e:
+        logger.error(f"Could not push payment status for {provider} transaction {transaction.id}: {str(e)}")
+
+# --------------------------------------------------------------------------
+# Reconciler
+# --------------------------------------------------------------------------
+class _Provider:
+    def __init__(self, name, model, reference, final_states, query, apply):
+        self.name = name
+        self.model = model
+        self.reference = reference
+        self.final_states = final_states
+        self.query = query
+        self.apply = apply
+
+def _providers():
+    from app.models.models import MpesaTransaction, PesapalTransaction
+    return (
+        _Provider('mpesa', MpesaTransaction, 'checkout_request_id', MPESA_FINAL,
+                  lambda ref: query_mpesa_status(ref), apply_mpesa_query),
+        _Provider('pesapal', PesapalTransaction, 'pesapal_tracking_id', PESAPAL_FINAL,
+                  lambda ref: query_pesapal_status(ref), apply_pesapal_result),
+    )
+
+def get_provider(name):
+    """Model, reference column, final states and status handling for 'mpesa' or 'pesapal'."""
+    for provider in _providers():
+        if provider.name == name:
+            return provider
+    raise ValueError(f"Unknown payment provider: {name}")
+
+class PaymentReconciler:
+    """Polls providers for due pending transactions and records their final state once."""
+
+    def __init__(self, app, batch_size=None, concurrency=None, poll_interval=None):
+        self.app = app
+        self.batch_size = batch_size or app.config.get('PAYMENT_RECONCILE_BATCH_SIZE', 50)
+        self.concurrency = concurrency or app.config.get('PAYMENT_RECONCILE_CONCURRENCY', 4)
+        self.poll_interval = poll_interval or app.config.get('PAYMENT_RECONCILE_POLL_INTERVAL', 2.0)
+        self.lease_seconds = app.config.get('PAYMENT_RECONCILE_LEASE_SECONDS', DEFAULT_LEASE_SECONDS)
+
+    def claim(self, provider, now):
+        """Lease due pending rows and return (id, provider reference) pairs."""
+        from app.configuration.extensions import db
+
+        model = provider.model
+        rows = model.query.filter(
+            model.status == PENDING,
+            model.next_status_check_at <= now
+        ).order_by(model.next_status_check_at).limit(self.batch_size).with_for_update(skip_locked=True).all()
+
+        claimed = []
+        lease_until = now + timedelta(seconds=self.lease_seconds)
+        for row in rows:
+            row.next_status_check_at = lease_until
+            reference = getattr(row, provider.reference)
+            if reference:
+                claimed.append((row.id, reference))
+            else:
+                # Nothing to ask the provider about; leave it to the callback
+                row.next_status_check_at = None
+        db.session.commit()
+        return claimed
+
+    def _query(self, provider, reference):
+        with self.app.app_context():
+            try:
+                return provider.query(reference)
+            except Exception as e:
+                logger.error(f"{provider.name} status query for {reference} failed: {str(e)}")
+                return None
+
+    def query_all(self, provider, claimed):
+        references = [reference for _, reference in claimed]
+        if self.concurrency <= 1 or len(references) <= 1:
+            return [self._query(provider, reference) for reference in references]
+        with ThreadPoolExecutor(max_workers=min(self.concurrency, len(references))) as pool:
+            return list(pool.map(lambda reference: self._query(provider, reference), references))
+
+    def apply(self, provider, transaction_id, status_response):
+        """Re-read the row under lock and apply the result if no callback got there first."""
+        from app.configuration.extensions import db
+
+        now = _utcnow()
+        transaction = provider.model.query.filter_by(id=transaction_id).with_for_update().first()
+        if not transaction or transaction.status != PENDING:
+            db.session.rollback()
+            return None
+
+        try:
+            outcome = provider.apply(transaction, status_response, now)
+            transaction.last_status_check = now
+            transaction.status_check_count = (transaction.status_check_count or 0) + 1
+            if outcome in provider.final_states:
+                transaction.next_status_check_at = None
+            else:
+                schedule_status_check(transaction, now)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Could not apply {provider.name} status for {transaction_id}: {str(e)}", exc_info=True)
+            return None
+
+        if outcome in provider.final_states:
+            logger.info(f"{provider.name} transaction {transaction_id} reconciled as {outcome}")
+            notify_payment_status(provider.name, transaction)
+        return outcome
+
+    def run_once(self):
+        """Reconcile one batch per provider; returns how many transactions were checked."""
+        checked = 0
+        with self.app.app_context():
+            for provider in _providers():
+                claimed = self.claim(provider, _utcnow())
+                if not claimed:
+                    continue
+                responses = self.query_all(provider, claimed)
+                for (transaction_id, _), status_response in zip(claimed, responses):
+                    self.apply(provider, transaction_id, status_response)
+                checked += len(claimed)
+        return checked
+
+    def run_forever(self, stop_event=None):
+        logger.info(f"Payment reconciler started (batch size {self.batch_size}, concurrency {self.concurrency})")
+        while not (stop_event and stop_event.is_set()):
+            try:
+                checked = self.run_once()
+            except Exception as e:
+                logger.error(f"Payment reconciliation iteration failed: {str(e)}", exc_info=True)
+                checked = 0
+            if not checked:
+                time.sleep(self.poll_interval)
+
+# --------------------------------------------------------------------------
+# App integration
+# --------------------------------------------------------------------------
+def init_payment_reconciliation(app):
+    """Register the CLI and optionally start an in-process reconciler."""
+    import click
+
+    @app.cli.group('payments')
+    def payments_cli():
+        """Payment reconciliation commands."""
+
+    @payments_cli.command('reconcile')
+    @click.option('--once', is_flag=True, help='Reconcile one batch and exit.')
+    def reconcile(once):
+        """Poll providers for pending payments until interrupted."""
+        reconciler = PaymentReconciler(app)
+        if once:
+            click.echo(json.dumps({'checked': reconciler.run_once()}))
+        else:
+            reconciler.run_forever()
+
+    @payments_cli.command('rollup-stats')
+    @click.option('--days', default=30, type=int, help='Closed days to recompute, counting back from today.')
+    def rollup_stats(days):
+        """Recompute the daily payment statistics rollups."""
+        from datetime import date
+        from app.services.payment_stats import refresh_rollups
+
+        first_day = date.today() - timedelta(days=days)
+        refreshed = {provider: refresh_rollups(provider, first_day, date.today())
+                     for provider in ('mpesa', 'pesapal')}
+        click.echo(json.dumps(refreshed))
+
+    if app.config.get('PAYMENT_RECONCILE_IN_PROCESS', False) and not app.config.get('TESTING', False):
+        stop_event = threading.Event()
+        thread = threading.Thread(
+            target=PaymentReconciler(app).run_forever,
+            kwargs={'stop_event': stop_event},
+            name='payment-reconciler',
+            daemon=True
+        )
+        thread.start()
+        app.extensions['payment_reconciler'] = {'stop_event': stop_event}
@@ -0,0 +1,225 @@
+"""
+Payment statistics for the M-PESA and Pesapal admin dashboards.
+
+Statistics are computed with database aggregates (COUNT / SUM grouped by day,
+status, payment method, card type and currency) instead of loading
+transactions into Python. Closed days are kept in the payment_daily_stats
+rollup table so long ranges read a few rows per day:
+
+    - a day is rolled up once it is older than PAYMENT_STATS_SETTLE_DAYS, so
+      late callbacks and reconciliation no longer change it
+    - missing rollups are filled on demand with one grouped query over the
+      missing span (``flask payments rollup-stats`` recomputes them)
+    - days without transactions get a single zero row with an empty status,
+      so they are not recomputed on every request
+    - partial days at either end of the range and recent days are aggregated
+      live using the (status, created_at) indexes
+"""
+import logging
+from datetime import date, datetime, time, timedelta, UTC
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTLE_DAYS = 2
+
+def _utcnow():
+    return datetime.now(UTC).replace(tzinfo=None)
+
+def _naive(value):
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(UTC).replace(tzinfo=None)
+    return value
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+def _midnight(day):
+    return datetime.combine(day, time.min)
+
+def _dimensions(provider):
+    """Model and (payment_method, card_type, currency) expressions for a provider."""
+    from sqlalchemy import func, literal
+    from app.models.models import MpesaTransaction, PesapalTransaction
+
+    if provider == 'pesapal':
+        model = PesapalTransaction
+        return model, (func.coalesce(model.payment_method, ''), func.coalesce(model.card_type, ''),
+                       func.coalesce(model.currency, ''))
+    if provider == 'mpesa':
+        model = MpesaTransaction
+        return model, (literal('MPESA'), literal(''), literal('KES'))
+    raise ValueError(f"Unknown payment provider: {provider}")
+
+def _live_rows(provider, start, end):
+    """(day, status, method, card_type, currency, count, amount) aggregated from the transactions table."""
+    from sqlalchemy import func
+    from app.configuration.extensions import db
+
+    model, (method, card_type, currency) = _dimensions(provider)
+    day = func.date(model.created_at)
+    query = db.session.query(
+        day, model.status, method, card_type, currency,
+        func.count(model.id), func.coalesce(func.sum(model.amount), 0)
+    )
+    if start is not None:
+        query = query.filter(model.created_at >= start)
+    if end is not None:
+        query = query.filter(model.created_at < end)
+    rows = query.group_by(day, model.status, method, card_type, currency).all()
+    return [(_as_date(r[0]), r[1] or '', r[2] or '', r[3] or '', r[4] or '', int(r[5]), float(r[6] or 0))
+            for r in rows]
+
+def _rollup_rows(provider, first_day, last_day):
+    from app.models.models import PaymentDailyStat
+
+    rows = PaymentDailyStat.query.filter(
+        PaymentDailyStat.provider == provider,
+        PaymentDailyStat.day >= first_day,
+        PaymentDailyStat.day <= last_day
+    ).all()
+    return [(row.day, row.status, row.payment_method, row.card_type, row.currency,
+             row.transaction_count, float(row.total_amount or 0)) for row in rows]
+
+def _store_rollups(provider, days, rows):
+    """Replace the rollup rows for ``days`` with ``rows`` (caller commits)."""
+    from app.configuration.extensions import db
+    from app.models.models import PaymentDailyStat
+
+    days = set(days)
+    PaymentDailyStat.query.filter(
+        PaymentDailyStat.provider == provider,
+        PaymentDailyStat.day.in_(days)
+    ).delete(synchronize_session=False)
+
+    seen = set()
+    for day, status, method, card_type, currency, count, amount in rows:
+        if day not in days:
+            continue
+        seen.add(day)
+        db.session.add(PaymentDailyStat(provider=provider, day=day, status=status, payment_method=method,
+                                        card_type=card_type, currency=currency, transaction_count=count,
+                                        total_amount=amount))
+    for day in days - seen:
+        db.session.add(PaymentDailyStat(provider=provider, day=day, status='', payment_method='', card_type='',
+                                        currency='', transaction_count=0, total_amount=0))
+
+def rollup_cutoff(now=None):
+    """First day that is still aggregated live rather than from rollups."""
+    from flask import current_app
+    settle_days = current_app.config.get('PAYMENT_STATS_SETTLE_DAYS', DEFAULT_SETTLE_DAYS)
+    return ((now or _utcnow()) - timedelta(days=settle_days)).date()
+
+def ensure_rollups(provider, first_day, last_day):
+    """Fill in missing rollups for closed days in [first_day, last_day] with one grouped query."""
+    from sqlalchemy.exc import IntegrityError
+    from app.configuration.extensions import db
+    from app.models.models import PaymentDailyStat
+
+    if first_day > last_day:
+        return
+    present = {_as_date(d) for (d,) in db.session.query(PaymentDailyStat.day).filter(
+        PaymentDailyStat.provider == provider,
+        PaymentDailyStat.day >= first_day,
+        PaymentDailyStat.day <= last_day
+    ).distinct()}
+    missing = [first_day + timedelta(days=i) for i in range((last_day - first_day).days + 1)]
+    missing = [day for day in missing if day not in present]
+    if not missing:
+        return
+
+    rows = _live_rows(provider, _midnight(missing[0]), _midnight(missing[-1] + timedelta(days=1)))
+    try:
+        _store_rollups(provider, missing, rows)
+        db.session.commit()
+    except IntegrityError:
+        # Another request filled the same days first
+        db.session.rollback()
+
+def refresh_rollups(provider, first_day, last_day):
+    """Recompute rollups for closed days in [first_day, last_day]; returns the number of days."""
+    from app.configuration.extensions import db
+
+    last_day = min(last_day, rollup_cutoff() - timedelta(days=1))
+    if first_day > last_day:
+        return 0
+    days = [first_day + timedelta(days=i) for i in range((last_day - first_day).days + 1)]
+    rows = _live_rows(provider, _midnight(first_day), _midnight(last_day + timedelta(days=1)))
+    _store_rollups(provider, days, rows)
+    db.session.commit()
+    return len(days)
+
+def aggregate_rows(provider, start=None, end=None):
+    """
+    Aggregated rows for transactions created in [start, end).
+
+    Whole closed days come from rollups, everything else from a live grouped
+    query. With no start, the range begins at the first transaction.
+    """
+    from sqlalchemy import func
+    from app.configuration.extensions import db
+
+    start, end = _naive(start), _naive(end)
+    model, _ = _dimensions(provider)
+    if start is None:
+        first = db.session.query(func.min(model.created_at)).scalar()
+        if first is None:
+            return []
+        start = _midnight(_as_date(first))
+
+    first_full_day = start.date() if start == _midnight(start.date()) else start.date() + timedelta(days=1)
+    end_day = end.date() if end is not None else _utcnow().date() + timedelta(days=1)
+    rollup_end = min(end_day, rollup_cutoff())  # exclusive
+
+    if first_full_day >= rollup_end:
+        return _live_rows(provider, start, end)
+
+    ensure_rollups(provider, first_full_day, rollup_end - timedelta(days=1))
+    rows = _rollup_rows(provider, first_full_day, rollup_end - timedelta(days=1))
+    if start < _midnight(first_full_day):
+        rows += _live_rows(provider, start, _midnight(first_full_day))
+    rows += _live_rows(provider, _midnight(rollup_end), end)
+    return rows
+
+def summarize(rows):
+    """Fold aggregated rows into totals by status, method, card type, currency and day."""
+    summary = {
+        'total_transactions': 0,
+        'by_status': {},
+        'payment_methods': {},
+        'card_types': {},
+        'currencies': {},
+        'daily': {}
+    }
+    for day, status, method, card_type, currency, count, amount in rows:
+        if not status:
+            continue  # zero row marking an empty rolled-up day
+        summary['total_transactions'] += count
+        by_status = summary['by_status'].setdefault(status, {'count': 0, 'amount': 0.0})
+        by_status['count'] += count
+        by_status['amount'] += amount
+
+        daily = summary['daily'].setdefault(day, {'total': 0, 'completed': 0, 'amount': 0.0})
+        daily['total'] += count
+        if status != 'completed':
+            continue
+        daily['completed'] += count
+        daily['amount'] += amount
+        if method:
+            entry = summary['payment_methods'].setdefault(method, {'count': 0, 'total_amount': 0.0})
+            entry['count'] += count
+            entry['total_amount'] += amount
+        if card_type:
+            summary['card_types'][card_type] = summary['card_types'].get(card_type, 0) + count
+        if currency:
+            entry = summary['currencies'].setdefault(currency, {'count': 0, 'total_amount': 0.0})
+            entry['count'] += count
+            entry['total_amount'] += amount
+    return summary
+
+def payment_stats(provider, start=None, end=None):
+    """Summary of ``provider`` transactions created in [start, end)."""
+    return summarize(aggregate_rows(provider, start, end))
@@ -0,0 +1,128 @@
+"""
+Short-lived principal cache for Mizizzi E-commerce platform.
+
+Authorization decorators only need to know who the caller is, their role and
+whether the account is active. That "principal" is resolved once per request
+(see app.utils.auth_utils.current_principal) and, with this cache, usually
+without loading the User row at all: principals are stored in the shared
+Flask-Caching backend under ``auth:principal:<user_id>`` for
+AUTH_PRINCIPAL_CACHE_TTL seconds.
+
+Entries are deleted after any commit that changes a user's role or is_active
+flag, or deletes the user, so a demotion or deactivation takes effect on the
+next request. As with the inventory cache this only holds when all workers
+share the backend; with a per-process backend the cache stays off unless
+AUTH_PRINCIPAL_CACHE_ALLOW_LOCAL is set.
+"""
+import logging
+
+from sqlalchemy import event, inspect as sa_inspect
+
+from app.services.inventory_cache import is_shared_cache_type
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 30  # seconds
+KEY_PREFIX = 'auth:principal'
+# User columns a principal is built from
+PRINCIPAL_COLUMNS = ('role', 'is_active')
+
+def _cache_key(user_id):
+    return f"{KEY_PREFIX}:{int(user_id)}"
+
+class PrincipalCache:
+    """Principal dicts keyed by user id in the Flask-Caching backend."""
+
+    def __init__(self, ttl=DEFAULT_TTL):
+        self.ttl = ttl
+        self.enabled = False
+
+    def configure(self, app):
+        self.ttl = app.config.get('AUTH_PRINCIPAL_CACHE_TTL', self.ttl)
+        shared = is_shared_cache_type(app.config.get('CACHE_TYPE'))
+        self.enabled = self.ttl > 0 and (shared or app.config.get('AUTH_PRINCIPAL_CACHE_ALLOW_LOCAL', False))
+
+    def _backend(self):
+        if not self.enabled:
+            return None
+        try:
+            from app.configuration.extensions import cache
+            if cache.cache is not None:
+                return cache
+        except Exception:
+            pass
+        return None
+
+    def get(self, user_id):
+        backend = self._backend()
+        if backend is None:
+            return None
+        try:
+            return backend.get(_cache_key(user_id))
+        except Exception as e:
+            logger.warning(f"Principal cache read failed for user {user_id}: {str(e)}")
+            return None
+
+    def set(self, user_id, principal):
+        backend = self._backend()
+        if backend is None:
+            return
+        try:
+            backend.set(_cache_key(user_id), principal, timeout=self.ttl)
+        except Exception as e:
+            logger.warning(f"Principal cache write failed for user {user_id}: {str(e)}")
+
+    def invalidate(self, user_ids):
+        backend = self._backend()
+        if backend is None or not user_ids:
+            return
+        try:
+            backend.delete_many(*[_cache_key(user_id) for user_id in user_ids])
+        except Exception as e:
+            logger.warning(f"Principal cache invalidation failed for users {sorted(user_ids)}: {str(e)}")
+
+principal_cache = PrincipalCache()
+
+# --------------------------------------------------------------------------
+# Invalidation
+# --------------------------------------------------------------------------
+_PENDING_KEY = 'principal_cache_invalidate'
+
+def _collect_principal_changes(session, flush_context):
+    from app.models.models import User
+
+    changed = set()
+    for obj in session.dirty:
+        if isinstance(obj, User):
+            state = sa_inspect(obj)
+            if any(state.attrs[name].history.has_changes() for name in PRINCIPAL_COLUMNS):
+                changed.add(obj.id)
+    changed.update(obj.id for obj in session.deleted if isinstance(obj, User))
+    if changed:
+        session.info.setdefault(_PENDING_KEY, set()).update(changed)
+
+def _invalidate_committed(session):
+    principal_cache.invalidate(session.info.pop(_PENDING_KEY, None))
+
+def _discard_pending(session):
+    session.info.pop(_PENDING_KEY, None)
+
+_hooks_installed = False
+
+def init_principal_cache(app):
+    """Configure the cache, install the invalidation hooks once and reset the request principal."""
+    global _hooks_installed
+    from app.configuration.extensions import db
+    from app.utils.auth_utils import reset_request_auth
+
+    principal_cache.configure(app)
+    if not _hooks_installed:
+        event.listen(db.session, 'after_flush', _collect_principal_changes)
+        event.listen(db.session, 'after_commit', _invalidate_committed)
+        event.listen(db.session, 'after_rollback', _discard_pending)
+        _hooks_installed = True
+
+    # First, so no other before_request hook can see the previous request's principal
+    app.before_request_funcs.setdefault(None, []).insert(0, reset_request_auth)
+    app.extensions['principal_cache'] = principal_cache
+    return principal_cache
@@ -0,0 +1,467 @@
+"""
+Realtime fan-out and presence for Mizizzi E-commerce platform.
+
+Every gunicorn worker and host runs its own SocketIO server, so two things
+have to be shared for realtime order, stock and admin notifications to reach
+the right sockets:
+
+    message queue  - SocketIO emits are published on a queue that every
+                     server subscribes to, so an emit from any worker (or the
+                     reconciler) reaches sockets connected to any other
+    presence       - who is connected, as which user and in which rooms
+
+Both are selected by REALTIME_BACKEND:
+
+    redis   - the SocketIO Redis manager on REALTIME_REDIS_URL (or an explicit
+              SOCKETIO_MESSAGE_QUEUE) and presence in Redis sorted sets
+    local   - SocketIO's in-process manager and presence in process memory
+              (single-process servers and tests)
+
+Presence entries expire: each worker refreshes the sockets it owns every
+REALTIME_PRESENCE_TTL / 3 seconds, so sockets of a worker that died stop
+being counted after at most REALTIME_PRESENCE_TTL seconds, and the Redis
+sets they were in are pruned or expire with them.
+
+High-frequency events (stock updates) go through ``emit_coalesced``. Events
+for the same room and key within REALTIME_COALESCE_MS are collapsed to the
+latest one, and a room with several pending events gets a single
+``<event>_batch`` emit carrying ``{'items': [...]}``. A room with one pending
+event gets the plain event, so existing clients keep working.
+"""
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PRESENCE_TTL = 90  # seconds
+DEFAULT_COALESCE_MS = 250
+ADMIN_ROOM = 'admin'
+USER_TYPES = ('admin', 'user', 'guest')
+
+def user_room(user_id):
+    return f"user_{user_id}"
+
+def product_room(product_id):
+    return f"product_{product_id}"
+
+def _server_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+# --------------------------------------------------------------------------
+# Presence stores
+# --------------------------------------------------------------------------
+class LocalPresenceStore:
+    """Presence in process memory; shared only by servers in this process."""
+
+    name = 'local'
+
+    def __init__(self):
+        self._sockets = {}
+        self._lock = threading.Lock()
+
+    def add(self, sid, info):
+        with self._lock:
+            self._sockets[sid] = dict(info, rooms=set(info.get('rooms') or ()))
+
+    def remove(self, sid):
+        with self._lock:
+            self._sockets.pop(sid, None)
+
+    def join(self, sid, room):
+        with self._lock:
+            if sid in self._sockets:
+                self._sockets[sid]['rooms'].add(room)
+
+    def leave(self, sid, room):
+        with self._lock:
+            if sid in self._sockets:
+                self._sockets[sid]['rooms'].discard(room)
+
+    def touch(self, sockets):
+        """Nothing expires in process memory."""
+
+    def get(self, sid):
+        with self._lock:
+            info = self._sockets.get(sid)
+            return dict(info, rooms=set(info['rooms'])) if info else None
+
+    def user_sids(self, user_id):
+        with self._lock:
+            return [sid for sid, info in self._sockets.items() if info.get('user_id') == str(user_id)]
+
+    def room_sids(self, room):
+        with self._lock:
+            return [sid for sid, info in self._sockets.items() if room in info['rooms']]
+
+    def stats(self):
+        with self._lock:
+            by_type = {user_type: 0 for user_type in USER_TYPES}
+            rooms = set()
+            for info in self._sockets.values():
+                by_type[info['user_type']] = by_type.get(info['user_type'], 0) + 1
+                rooms.update(info['rooms'])
+            return {
+                'total_clients': len(self._sockets),
+                'total_rooms': len(rooms),
+                'clients_by_type': by_type
+            }
+
+    def clear(self):
+        with self._lock:
+            self._sockets.clear()
+
+
+class RedisPresenceStore:
+    """
+    Presence in Redis.
+
+    Each socket is a JSON value under ``sid:<sid>``; the sets of all sockets,
+    sockets per user type, per user and per room are sorted sets scored by
+    expiry time, so entries left behind by a dead worker age out. Every set
+    also expires as a whole once nothing has refreshed it for a TTL, and the
+    sets a worker refreshes are pruned as it refreshes them, so per-user and
+    per-room sets do not grow with sockets that are gone.
+    """
+
+    name = 'redis'
+
+    def __init__(self, url, ttl=DEFAULT_PRESENCE_TTL, prefix='realtime:presence'):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def _key(self, *parts):
+        return ':'.join((self.prefix,) + tuple(str(part) for part in parts))
+
+    def _indexes(self, info):
+        keys = [self._key('all'), self._key('type', info['user_type'])]
+        if info.get('user_id'):
+            keys.append(self._key('user', info['user_id']))
+        keys.extend(self._key('room', room) for room in info.get('rooms') or ())
+        return keys
+
+    def _write(self, pipe, sid, info, expires_at):
+        record = dict(info, rooms=sorted(info.get('rooms') or ()))
+        pipe.set(self._key('sid', sid), json.dumps(record), ex=self.ttl)
+        for key in self._indexes(info):
+            pipe.zadd(key, {sid: expires_at})
+            pipe.expire(key, self.ttl)
+        for room in info.get('rooms') or ():
+            pipe.zadd(self._key('rooms'), {room: expires_at})
+        if info.get('rooms'):
+            pipe.expire(self._key('rooms'), self.ttl)
+
+    def _drop_empty_rooms(self, rooms):
+        """Remove rooms that no live socket is in from the set of rooms."""
+        rooms = sorted(rooms)
+        if not rooms:
+            return
+        now = time.time()
+        pipe = self.client.pipeline()
+        for room in rooms:
+            pipe.zcount(self._key('room', room), now, '+inf')
+        empty = [room for room, live in zip(rooms, pipe.execute()) if not live]
+        if empty:
+            self.client.zrem(self._key('rooms'), *empty)
+
+    def add(self, sid, info):
+        pipe = self.client.pipeline()
+        self._write(pipe, sid, info, time.time() + self.ttl)
+        pipe.execute()
+
+    def remove(self, sid):
+        info = self.get(sid)
+        pipe = self.client.pipeline()
+        pipe.delete(self._key('sid', sid))
+        if info:
+            for key in self._indexes(info):
+                pipe.zrem(key, sid)
+        pipe.execute()
+        if info:
+            self._drop_empty_rooms(info['rooms'])
+
+    def join(self, sid, room):
+        info = self.get(sid)
+        if info is None:
+            return
+        info['rooms'].add(room)
+        self.add(sid, info)
+
+    def leave(self, sid, room):
+        info = self.get(sid)
+        if info is None:
+            return
+        info['rooms'].discard(room)
+        pipe = self.client.pipeline()
+        pipe.zrem(self._key('room', room), sid)
+        self._write(pipe, sid, info, time.time() + self.ttl)
+        pipe.execute()
+        self._drop_empty_rooms([room])
+
+    def touch(self, sockets):
+        """Extend the expiry of ``{sid: info}`` (the sockets this worker owns) and prune expired entries."""
+        now = time.time()
+        pipe = self.client.pipeline()
+        touched = {self._key('all'), self._key('rooms')}
+        touched.update(self._key('type', user_type) for user_type in USER_TYPES)
+        for sid, info in sockets.items():
+            self._write(pipe, sid, info, now + self.ttl)
+            touched.update(self._indexes(info))
+        for key in sorted(touched):
+            pipe.zremrangebyscore(key, '-inf', now)
+        pipe.execute()
+
+    def get(self, sid):
+        raw = self.client.get(self._key('sid', sid))
+        if not raw:
+            return None
+        info = json.loads(raw)
+        info['rooms'] = set(info.get('rooms') or ())
+        return info
+
+    def _live(self, key):
+        return [sid.decode() if isinstance(sid, bytes) else sid
+                for sid in self.client.zrangebyscore(key, time.time(), '+inf')]
+
+    def user_sids(self, user_id):
+        return self._live(self._key('user', user_id))
+
+    def room_sids(self, room):
+        return self._live(self._key('room', room))
+
+    def stats(self):
+        now = time.time()
+        pipe = self.client.pipeline()
+        pipe.zcount(self._key('all'), now, '+inf')
+        pipe.zcount(self._key('rooms'), now, '+inf')
+        for user_type in USER_TYPES:
+            pipe.zcount(self._key('type', user_type), now, '+inf')
+        total, rooms, *by_type = pipe.execute()
+        return {
+            'total_clients': total,
+            'total_rooms': rooms,
+            'clients_by_type': dict(zip(USER_TYPES, by_type))
+        }
+
+# --------------------------------------------------------------------------
+# Fan-out
+# --------------------------------------------------------------------------
+class Realtime:
+    """
+    Emits and presence for one app.
+
+    ``socketio`` may be None (SocketIO disabled); emits are then dropped but
+    presence still works.
+    """
+
+    def __init__(self, socketio, presence, coalesce_seconds=DEFAULT_COALESCE_MS / 1000.0,
+                 heartbeat_seconds=DEFAULT_PRESENCE_TTL / 3.0, background=True):
+        self.socketio = socketio
+        self.presence = presence
+        self.coalesce_seconds = coalesce_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self.background = background
+        self.server_id = _server_id()
+        self._owned = {}
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._wake = threading.Event()
+        self.emits = 0
+
+    # ----------------------------------------------------------------------
+    # Presence
+    # ----------------------------------------------------------------------
+    def connected(self, sid, user_id=None, user_type='guest'):
+        info = {
+            'user_id': str(user_id) if user_id is not None else None,
+            'user_type': user_type if user_type in USER_TYPES else 'user',
+            'connected_at': datetime.utcnow().isoformat(),
+            'server': self.server_id,
+            'rooms': set()
+        }
+        with self._lock:
+            previous = self._owned.get(sid)
+            if previous is not None:
+                # Re-registered after authenticating: keep the rooms, drop the old indexes
+                info['rooms'] = previous['rooms']
+            self._owned[sid] = info
+        if previous is not None:
+            self._presence('remove', sid)
+        self._presence('add', sid, info)
+        self._ensure_thread()
+
+    def disconnected(self, sid):
+        with self._lock:
+            self._owned.pop(sid, None)
+        self._presence('remove', sid)
+
+    def joined(self, sid, room):
+        with self._lock:
+            if sid in self._owned:
+                self._owned[sid]['rooms'].add(room)
+        self._presence('join', sid, room)
+
+    def left(self, sid, room):
+        with self._lock:
+            if sid in self._owned:
+                self._owned[sid]['rooms'].discard(room)
+        self._presence('leave', sid, room)
+
+    def client_info(self, sid):
+        with self._lock:
+            info = self._owned.get(sid)
+            if info is not None:
+                return dict(info, rooms=set(info['rooms']))
+        return self._presence('get', sid)
+
+    def is_online(self, user_id):
+        return bool(self._presence('user_sids', user_id))
+
+    def stats(self):
+        stats = self._presence('stats') or {'total_clients': 0, 'total_rooms': 0,
+                                            'clients_by_type': {user_type: 0 for user_type in USER_TYPES}}
+        stats['backend'] = self.presence.name
+        with self._lock:
+            stats['local_clients'] = len(self._owned)
+        return stats
+
+    def heartbeat(self):
+        with self._lock:
+            owned = {sid: dict(info, rooms=set(info['rooms'])) for sid, info in self._owned.items()}
+        self._presence('touch', owned)
+
+    def _presence(self, method, *args):
+        try:
+            return getattr(self.presence, method)(*args)
+        except Exception as e:
+            logger.warning(f"Presence {method} failed: {str(e)}")
+            return None
+
+    # ----------------------------------------------------------------------
+    # Emits
+    # ----------------------------------------------------------------------
+    def emit(self, event, data, room=None, namespace=None):
+        """Emit through the message queue, so sockets on every server receive it."""
+        if self.socketio is None:
+            return False
+        try:
+            kwargs = {'namespace': namespace} if namespace else {}
+            if room is not None:
+                kwargs['room'] = room
+            self.socketio.emit(event, data, **kwargs)
+            self.emits += 1
+            return True
+        except Exception as e:
+            logger.error(f"Realtime emit of {event} to {room or 'all'} failed: {str(e)}")
+            return False
+
+    def emit_coalesced(self, event, data, room, key):
+        """
+        Queue ``data`` for ``room``; a later event with the same ``key`` replaces it.
+
+        Pending events are flushed every ``coalesce_seconds``. With a zero
+        interval the event is emitted straight away.
+        """
+        if self.coalesce_seconds <= 0:
+            return self.emit(event, data, room=room)
+        with self._lock:
+            self._pending.setdefault((event, room), {})[key] = data
+        self._ensure_thread()
+        return True
+
+    def flush(self):
+        """Emit every pending coalesced event; returns the number of emits."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        sent = 0
+        for (event, room), items in pending.items():
+            values = list(items.values())
+            if len(values) == 1:
+                self.emit(event, values[0], room=room)
+            else:
+                self.emit(f"{event}_batch", {'items': values, 'count': len(values)}, room=room)
+            sent += 1
+        return sent
+
+    # ----------------------------------------------------------------------
+    # Background flush and heartbeat
+    # ----------------------------------------------------------------------
+    def _ensure_thread(self):
+        if not self.background or (self._thread is not None and self._thread.is_alive()):
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name='realtime-flush', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        interval = self.coalesce_seconds if self.coalesce_seconds > 0 else self.heartbeat_seconds
+        next_heartbeat = time.monotonic() + self.heartbeat_seconds
+        while not self._wake.wait(interval):
+            try:
+                self.flush()
+                if time.monotonic() >= next_heartbeat:
+                    self.heartbeat()
+                    next_heartbeat = time.monotonic() + self.heartbeat_seconds
+            except Exception as e:
+                logger.error(f"Realtime background flush failed: {str(e)}")
+
+    def stop(self):
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self.flush()
+
+
+_local_presence = LocalPresenceStore()
+_detached = Realtime(None, _local_presence, coalesce_seconds=0, background=False)
+
+def get_realtime(app=None):
+    """The app's realtime layer, or a no-emit stand-in outside an app context."""
+    from flask import current_app, has_app_context
+
+    if app is None and not has_app_context():
+        return _detached
+    return (app or current_app).extensions.get('realtime') or _detached
+
+def realtime_message_queue(config):
+    """The SocketIO message_queue URL for ``config``, or None for the in-process manager."""
+    if config.get('SOCKETIO_MESSAGE_QUEUE'):
+        return config['SOCKETIO_MESSAGE_QUEUE']
+    if config.get('REALTIME_BACKEND', 'local') == 'redis':
+        return config.get('REALTIME_REDIS_URL')
+    return None
+
+def create_presence_store(app):
+    if app.config.get('REALTIME_BACKEND', 'local') == 'redis':
+        try:
+            return RedisPresenceStore(app.config.get('REALTIME_REDIS_URL'),
+                                      ttl=app.config.get('REALTIME_PRESENCE_TTL', DEFAULT_PRESENCE_TTL))
+        except Exception as e:
+            logger.error(f"Redis presence store unavailable, falling back to process memory: {str(e)}")
+    return _local_presence
+
+def reset_presence():
+    """Forget every in-process presence entry (used by tests)."""
+    _local_presence.clear()
+
+def init_realtime(app, socketio=None):
+    """Create the realtime layer for the app; ``socketio`` is None when SocketIO is disabled."""
+    ttl = app.config.get('REALTIME_PRESENCE_TTL', DEFAULT_PRESENCE_TTL)
+    realtime = Realtime(
+        socketio,
+        create_presence_store(app),
+        coalesce_seconds=app.config.get('REALTIME_COALESCE_MS', DEFAULT_COALESCE_MS) / 1000.0,
+        heartbeat_seconds=max(ttl / 3.0, 1.0)
+    )
+    app.extensions['realtime'] = realtime
+    return realtime
@@ -0,0 +1,138 @@
+"""
+Per-worker JWT revocation cache for Mizizzi E-commerce platform.
+
+Every authenticated request asks the ``token_in_blocklist_loader`` whether its
+token was revoked. Instead of a token_blacklist lookup per request, each
+worker keeps the set of revoked, not yet expired JTIs in memory and decides
+the common case (a token that was never revoked) without a query.
+
+The set is loaded once and then refreshed incrementally, at most every
+REVOCATION_CACHE_REFRESH_SECONDS, by reading only the rows revoked since the
+previous refresh (minus a grace window for transactions that committed late).
+A token revoked in this worker is added immediately; other workers pick it up
+on their next refresh, so a revoked token can be accepted elsewhere for at
+most the refresh interval. Entries are dropped once the token itself expires.
+
+The set is read on its own connection, never through ``db.session``, because
+the check can run in the middle of a view (``verify_jwt_in_request``) and must
+not commit or roll back whatever the request has pending. If the set cannot be
+loaded the check falls back to querying the database.
+"""
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REFRESH_SECONDS = 2.0
+DEFAULT_GRACE_SECONDS = 60
+PRUNE_INTERVAL = 60.0  # seconds between sweeps of expired entries
+
+def _utcnow():
+    return datetime.utcnow()
+
+class RevocationCache:
+    """Revoked JTIs mapped to the expiry of their token."""
+
+    def __init__(self, refresh_seconds=DEFAULT_REFRESH_SECONDS, grace_seconds=DEFAULT_GRACE_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self.grace = timedelta(seconds=grace_seconds)
+        self._revoked = {}
+        self._loaded = False
+        self._since = None  # revoked_at watermark of the last refresh
+        self._refreshed_at = 0.0
+        self._pruned_at = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, jti, expires_at):
+        """Record a revocation made by this worker."""
+        if jti:
+            self._revoked[jti] = expires_at
+
+    def is_revoked(self, jti):
+        """True/False from memory, or None when the set could not be loaded."""
+        self.refresh()
+        if not self._loaded:
+            return None
+        return jti in self._revoked
+
+    def refresh(self, force=False):
+        if not force and time.monotonic() - self._refreshed_at < self.refresh_seconds:
+            return
+        # One thread refreshes; the others keep answering from the current set
+        if not self._lock.acquire(blocking=not self._loaded):
+            return
+        try:
+            if not force and time.monotonic() - self._refreshed_at < self.refresh_seconds:
+                return
+            # Failed attempts are also spaced out; callers query the database meanwhile
+            self._refreshed_at = time.monotonic()
+            self._load()
+        except Exception as e:
+            logger.error(f"Error refreshing token revocation cache: {str(e)}")
+        finally:
+            self._lock.release()
+
+    def _load(self):
+        from sqlalchemy import select
+        from app.configuration.extensions import db
+        from app.models.models import TokenBlacklist
+
+        now = _utcnow()
+        query = select(TokenBlacklist.jti, TokenBlacklist.expires_at).where(
+            TokenBlacklist.expires_at > now
+        )
+        if self._since is not None:
+            query = query.where(TokenBlacklist.revoked_at >= self._since - self.grace)
+        with db.engine.connect() as conn:
+            rows = conn.execute(query).all()
+
+        revoked = self._revoked
+        revoked.update(rows)
+        if time.monotonic() - self._pruned_at >= PRUNE_INTERVAL:
+            for jti in [jti for jti, expires_at in list(revoked.items()) if expires_at is not None and expires_at <= now]:
+                revoked.pop(jti, None)
+            self._pruned_at = time.monotonic()
+
+        self._since = now
+        self._loaded = True
+
+    def clear(self):
+        self._revoked = {}
+        self._loaded = False
+        self._since = None
+        self._refreshed_at = 0.0
+
+    def __len__(self):
+        return len(self._revoked)
+
+def get_revocation_cache():
+    """The current app's cache, or None when disabled or outside an app context."""
+    from flask import current_app, has_app_context
+
+    if not has_app_context():
+        return None
+    return current_app.extensions.get('revocation_cache')
+
+def is_revoked(jti):
+    """True/False when the cache can decide, None when the caller should query."""
+    cache = get_revocation_cache()
+    return cache.is_revoked(jti) if cache is not None else None
+
+def remember_revoked(jti, expires_at):
+    cache = get_revocation_cache()
+    if cache is not None:
+        cache.add(jti, expires_at)
+
+def init_revocation_cache(app):
+    """Attach a revocation cache to ``app`` unless REVOCATION_CACHE_ENABLED is off."""
+    if not app.config.get('REVOCATION_CACHE_ENABLED', True):
+        app.extensions.pop('revocation_cache', None)
+        return None
+    cache = RevocationCache(
+        refresh_seconds=app.config.get('REVOCATION_CACHE_REFRESH_SECONDS', DEFAULT_REFRESH_SECONDS),
+        grace_seconds=app.config.get('REVOCATION_CACHE_GRACE_SECONDS', DEFAULT_GRACE_SECONDS)
+    )
+    app.extensions['revocation_cache'] = cache
+    return cache
@@ -26,6 +26,7 @@ except Exception:
 
 from ..app.models.models import Product, Category, Brand, Review, Order, OrderItem, db
 from ..app.models.search_analytics import SearchQuery, SearchClick, SearchConversion
+from ..configuration.database import ANALYTICS, use_workload
 
 logger = logging.getLogger(__name__)
 
@@ -42,9 +43,16 @@ class SearchMLService:
         self.model_version = None
         self.last_training = None
 
-        # Start background training scheduler
-        self.training_thread = threading.Thread(target=self._training_scheduler, daemon=True)
-        self.training_thread.start()
+        # The retraining scheduler is started explicitly (start_training_scheduler)
+        # so constructing the service stays cheap and spawns no threads
+        self.training_thread = None
+
+    def start_training_scheduler(self):
+        """Start the background retraining loop once."""
+        if self.training_thread is None:
+            self.training_thread = threading.Thread(target=self._training_scheduler, daemon=True)
+            self.training_thread.start()
+        return self.training_thread
 
     def _training_scheduler(self):
         """Background scheduler for model retraining"""
@@ -77,6 +85,7 @@ class SearchMLService:
 
         return recent_searches > 1000  # Retrain if 1000+ new searches
 
+    @use_workload(ANALYTICS)
     def train_models(self):
         """Train all ML models"""
         try:
@@ -0,0 +1,185 @@
+"""
+Application startup tracking and background warm-up for Mizizzi E-commerce platform.
+
+create_app only runs the critical path: configuration, extensions, the
+database and blueprint registration. Its phases are timed with
+``Startup.mark`` so slow steps show up in the logs and in /api/health-check.
+
+Heavy subsystems (the sentence-transformers model and FAISS index behind
+semantic search) are registered with ``Startup.register`` instead of being
+loaded inline. Depending on STARTUP_WARMUP they are then:
+
+    background  warmed in a daemon thread right after create_app returns
+    lazy        warmed in a daemon thread the first time they are needed
+                (``Startup.warm(app, name)``)
+    off         never warmed automatically
+
+Only processes that serve requests warm: an app created by a ``flask``
+command other than ``flask run`` (the job worker, the payment reconciler,
+migrations, shells) behaves as ``off``, so those processes never load the
+search model. ``flask startup warm`` warms in the foreground on demand.
+
+Until a subsystem is ready its callers degrade, e.g. search falls back to
+keyword search. Readiness is reported as ``startup`` by /api/health-check.
+
+``flask startup profile`` runs ``python -X importtime`` against create_app in
+a subprocess and prints the slowest imports.
+"""
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+PENDING = 'pending'
+WARMING = 'warming'
+READY = 'ready'
+FAILED = 'failed'
+
+class Startup:
+    """Critical-path phase timings plus the state of each lazily warmed subsystem."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._last = self.started
+        self.phases = {}
+        self.completed_seconds = None
+        self._subsystems = {}
+        self._lock = threading.Lock()
+
+    def mark(self, phase):
+        """Record the time spent since the previous mark under ``phase``."""
+        now = time.perf_counter()
+        self.phases[phase] = round(now - self._last, 3)
+        self._last = now
+
+    def complete(self):
+        self.completed_seconds = round(time.perf_counter() - self.started, 3)
+        return self.completed_seconds
+
+    def register(self, name, loader):
+        """Register ``loader(app)``, which returns False if the subsystem is unusable."""
+        self._subsystems[name] = {'loader': loader, 'state': PENDING, 'seconds': None, 'error': None}
+
+    def state(self, name):
+        entry = self._subsystems.get(name)
+        return entry['state'] if entry else None
+
+    def warm(self, app, name=None, wait=False):
+        """Start warming ``name`` (or every pending subsystem) in a daemon thread."""
+        names = [name] if name else list(self._subsystems)
+        threads = []
+        for subsystem in names:
+            with self._lock:
+                entry = self._subsystems.get(subsystem)
+                if entry is None or entry['state'] != PENDING:
+                    continue
+                entry['state'] = WARMING
+            thread = threading.Thread(target=self._run, args=(app, subsystem),
+                                      name=f"warm-{subsystem}", daemon=True)
+            thread.start()
+            threads.append(thread)
+        if wait:
+            for thread in threads:
+                thread.join()
+        return threads
+
+    def _run(self, app, name):
+        entry = self._subsystems[name]
+        started = time.perf_counter()
+        try:
+            with app.app_context():
+                ok = entry['loader'](app)
+            entry['state'] = READY if ok is not False else FAILED
+        except Exception as e:
+            entry['state'] = FAILED
+            entry['error'] = str(e)
+            logger.error(f"Warming {name} failed: {str(e)}")
+        entry['seconds'] = round(time.perf_counter() - started, 3)
+        logger.info(f"Subsystem {name} {entry['state']} after {entry['seconds']}s")
+
+    def report(self):
+        return {
+            'critical_path_seconds': self.completed_seconds,
+            'phases': dict(self.phases),
+            'subsystems': {
+                name: {key: value for key, value in entry.items() if key != 'loader'}
+                for name, entry in self._subsystems.items()
+            },
+        }
+
+def serves_requests():
+    """False while a ``flask`` command other than ``flask run`` is creating the app."""
+    import click
+
+    ctx = click.get_current_context(silent=True)
+    return ctx is None or ctx.info_name == 'run'
+
+def get_startup(app=None):
+    from flask import current_app
+    return (app or current_app).extensions.get('startup')
+
+# --------------------------------------------------------------------------
+# Import-time profiling
+# --------------------------------------------------------------------------
+def parse_importtime(stderr, top=25):
+    """Slowest modules from ``-X importtime`` output as (cumulative_us, self_us, module)."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        try:
+            self_us, cumulative_us, module = [part.strip() for part in line[len('import time:'):].split('|', 2)]
+            rows.append((int(cumulative_us), int(self_us), module.strip()))
+        except ValueError:
+            continue
+    rows.sort(reverse=True)
+    return rows[:top]
+
+def profile_imports(config_name='production', top=25):
+    """Import and create the app in a fresh interpreter with ``-X importtime``."""
+    code = (
+        "import time; started = time.perf_counter()\n"
+        "from app import create_app\n"
+        f"create_app({config_name!r}, enable_socketio=False)\n"
+        "print(round(time.perf_counter() - started, 3))\n"
+    )
+    backend_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    env = dict(os.environ, STARTUP_WARMUP='off')
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=backend_dir, env=env,
+                            capture_output=True, text=True)
+    total = result.stdout.strip().splitlines()[-1] if result.stdout.strip() else None
+    return total, parse_importtime(result.stderr, top=top), result.returncode
+
+def init_startup(app, startup):
+    """Publish ``startup`` on the app and add the ``flask startup`` commands."""
+    import click
+
+    app.extensions['startup'] = startup
+
+    @app.cli.group('startup')
+    def startup_cli():
+        """Startup profiling commands."""
+
+    @startup_cli.command('profile')
+    @click.option('--config', 'config_name', default='production', help='Configuration to create the app with.')
+    @click.option('--top', default=25, type=int, help='Number of slowest imports to show.')
+    def profile(config_name, top):
+        """Show create_app's wall time and its slowest imports."""
+        total, rows, returncode = profile_imports(config_name, top)
+        if returncode != 0:
+            click.echo(f"create_app exited with status {returncode}")
+        click.echo(f"create_app: {total}s")
+        click.echo(f"{'cumulative ms':>14} {'self ms':>9}  module")
+        for cumulative_us, self_us, module in rows:
+            click.echo(f"{cumulative_us / 1000:14.1f} {self_us / 1000:9.1f}  {module}")
+
+    @startup_cli.command('warm')
+    def warm():
+        """Warm every registered subsystem in the foreground."""
+        startup.warm(app, wait=True)
+        for name, entry in startup.report()['subsystems'].items():
+            click.echo(f"{name}: {entry['state']} ({entry['seconds']}s)")
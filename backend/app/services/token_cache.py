@@ -0,0 +1,418 @@
+"""
+Shared OAuth token cache for Mizizzi E-commerce platform.
+
+M-PESA and Pesapal hand out short-lived bearer tokens. Rather than every
+worker (and every cold start) fetching its own token, tokens live in a store
+shared by all workers:
+
+    database  - a row per token in the oauth_tokens table (default)
+    redis     - a key per token in Redis (OAUTH_TOKEN_REDIS_URL)
+    local     - process memory only (tests, scripts outside an app context)
+
+Refreshes are single-flight. A worker must hold a short lease on the token
+before calling the provider. Other workers keep using the current token while
+it is still valid, or wait briefly for the lease holder to publish a new one.
+Refresh starts ``refresh_margin`` seconds before expiry. It runs in a
+background thread, so the request that notices the token is ageing is not
+slowed down by the refresh.
+"""
+import hashlib
+import json
+import logging
+import os
+import random
+import socket
+import threading
+import time
+from datetime import datetime, timedelta, UTC
+
+from flask import current_app, has_app_context
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REFRESH_MARGIN = 120  # seconds before expiry to start refreshing
+DEFAULT_LEASE_SECONDS = 30
+POLL_INTERVAL = 0.1
+
+def _owner_id(suffix=''):
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}{suffix}"
+
+# --------------------------------------------------------------------------
+# Stores
+# --------------------------------------------------------------------------
+class LocalTokenStore:
+    """Tokens and leases in process memory."""
+
+    name = 'local'
+
+    def __init__(self):
+        self._records = {}
+        self._leases = {}
+        self._lock = threading.Lock()
+
+    def read(self, name):
+        with self._lock:
+            record = self._records.get(name)
+            return dict(record) if record else None
+
+    def write(self, name, token, expires_at):
+        with self._lock:
+            self._records[name] = {'token': token, 'expires_at': expires_at}
+
+    def acquire(self, name, owner, ttl):
+        now = time.time()
+        with self._lock:
+            holder = self._leases.get(name)
+            if holder and holder[1] > now and holder[0] != owner:
+                return False
+            self._leases[name] = (owner, now + ttl)
+            return True
+
+    def release(self, name, owner):
+        with self._lock:
+            holder = self._leases.get(name)
+            if holder and holder[0] == owner:
+                del self._leases[name]
+
+    def clear(self, name=None):
+        with self._lock:
+            if name is None:
+                self._records.clear()
+                self._leases.clear()
+            else:
+                self._records.pop(name, None)
+                self._leases.pop(name, None)
+
+
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+class RedisTokenStore:
+    """Tokens as JSON values that expire with the token; leases as SET NX PX keys."""
+
+    name = 'redis'
+
+    def __init__(self, url, prefix='oauth_token'):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self._release = self.client.register_script(_RELEASE_SCRIPT)
+
+    def _key(self, *parts):
+        return ':'.join((self.prefix,) + parts)
+
+    def read(self, name):
+        raw = self.client.get(self._key('value', name))
+        return json.loads(raw) if raw else None
+
+    def write(self, name, token, expires_at):
+        ttl = max(1, int(expires_at - time.time()))
+        self.client.set(self._key('value', name), json.dumps({'token': token, 'expires_at': expires_at}), ex=ttl)
+
+    def acquire(self, name, owner, ttl):
+        return bool(self.client.set(self._key('lease', name), owner, nx=True, px=int(ttl * 1000)))
+
+    def release(self, name, owner):
+        self._release(keys=[self._key('lease', name)], args=[owner])
+
+    def clear(self, name=None):
+        if name is not None:
+            self.client.delete(self._key('value', name), self._key('lease', name))
+
+
+class DatabaseTokenStore:
+    """
+    Tokens in the oauth_tokens table.
+
+    Statements run on their own connection and commit immediately, so reading
+    or refreshing a token never commits or rolls back the caller's session.
+    """
+
+    name = 'database'
+
+    @staticmethod
+    def _table():
+        from app.models.models import OAuthToken
+        return OAuthToken.__table__
+
+    @staticmethod
+    def _engine():
+        from app.configuration.extensions import db
+        return db.engine
+
+    @staticmethod
+    def _now():
+        return datetime.now(UTC).replace(tzinfo=None)
+
+    def _ensure_row(self, conn, name):
+        from sqlalchemy.exc import IntegrityError
+
+        table = self._table()
+        if conn.execute(table.select().with_only_columns(table.c.name).where(table.c.name == name)).first():
+            return
+        try:
+            with conn.begin_nested():
+                conn.execute(table.insert().values(name=name, updated_at=self._now()))
+        except IntegrityError:
+            pass  # another worker created it first
+
+    def read(self, name):
+        table = self._table()
+        with self._engine().connect() as conn:
+            row = conn.execute(
+                table.select().with_only_columns(table.c.token, table.c.expires_at).where(table.c.name == name)
+            ).first()
+        if not row or not row.token or not row.expires_at:
+            return None
+        expires_at = row.expires_at.replace(tzinfo=UTC).timestamp()
+        return {'token': row.token, 'expires_at': expires_at}
+
+    def write(self, name, token, expires_at):
+        table = self._table()
+        with self._engine().begin() as conn:
+            self._ensure_row(conn, name)
+            conn.execute(table.update().where(table.c.name == name).values(
+                token=token,
+                expires_at=datetime.fromtimestamp(expires_at, UTC).replace(tzinfo=None),
+                updated_at=self._now()
+            ))
+
+    def acquire(self, name, owner, ttl):
+        from sqlalchemy import or_
+
+        table = self._table()
+        now = self._now()
+        with self._engine().begin() as conn:
+            self._ensure_row(conn, name)
+            result = conn.execute(table.update().where(
+                table.c.name == name,
+                or_(table.c.lease_expires_at.is_(None),
+                    table.c.lease_expires_at < now,
+                    table.c.lease_owner == owner)
+            ).values(lease_owner=owner, lease_expires_at=now + timedelta(seconds=ttl)))
+            return result.rowcount == 1
+
+    def release(self, name, owner):
+        table = self._table()
+        with self._engine().begin() as conn:
+            conn.execute(table.update().where(
+                table.c.name == name, table.c.lease_owner == owner
+            ).values(lease_owner=None, lease_expires_at=None))
+
+    def clear(self, name=None):
+        table = self._table()
+        with self._engine().begin() as conn:
+            statement = table.delete()
+            if name is not None:
+                statement = statement.where(table.c.name == name)
+            conn.execute(statement)
+
+
+_local_store = LocalTokenStore()
+
+def get_token_store():
+    """The configured store for the current app, or the in-process store outside one."""
+    if has_app_context():
+        store = current_app.extensions.get('oauth_token_store')
+        if store is not None:
+            return store
+    return _local_store
+
+# --------------------------------------------------------------------------
+# Single-flight cache
+# --------------------------------------------------------------------------
+class SharedTokenCache:
+    """
+    Token for one set of provider credentials.
+
+    ``fetch`` is called without arguments and returns ``(token, expires_in)``,
+    or None when the provider did not issue a token.
+    """
+
+    def __init__(self, name, fetch, refresh_margin=DEFAULT_REFRESH_MARGIN, lease_seconds=DEFAULT_LEASE_SECONDS):
+        self.name = name
+        self.fetch = fetch
+        self.refresh_margin = refresh_margin
+        self.lease_seconds = lease_seconds
+        self._memo = None
+        self._lock = threading.Lock()
+        self._background = None
+        self.fetches = 0
+
+    def _fresh(self, record, now):
+        return record is not None and now < record['expires_at'] - self.refresh_margin
+
+    def _valid(self, record, now):
+        return record is not None and now < record['expires_at']
+
+    def get_token(self, force_refresh=False):
+        """Return a usable token, refreshing it through the shared store when needed."""
+        memo = self._memo
+        if not force_refresh and self._fresh(memo, time.time()):
+            return memo['token']
+
+        store = get_token_store()
+        with self._lock:
+            now = time.time()
+            stale = memo['token'] if force_refresh and memo else None
+            record = self._read(store)
+            if record and record['token'] == stale:
+                record = None
+
+            if self._fresh(record, now):
+                self._memo = record
+                return record['token']
+
+            if self._valid(record, now) and not force_refresh:
+                # Still usable: keep serving it and refresh ahead of expiry off the request path
+                self._memo = record
+                self._refresh_in_background(store)
+                return record['token']
+
+            return self._refresh_blocking(store, stale)
+
+    def get_record(self):
+        """The token this process last used as ``{'token', 'expires_at'}``, or None."""
+        memo = self._memo
+        return dict(memo) if memo else None
+
+    def invalidate(self):
+        """Forget the process copy, e.g. after the provider rejected the token."""
+        self._memo = None
+
+    def _read(self, store):
+        try:
+            return store.read(self.name)
+        except Exception as e:
+            logger.warning(f"Token store read failed for {self.name}: {str(e)}")
+            return None
+
+    def _fetch_and_store(self, store):
+        self.fetches += 1
+        result = self.fetch()
+        if not result:
+            return None
+        token, expires_in = result
+        expires_at = time.time() + max(int(expires_in), 1)
+        record = {'token': token, 'expires_at': expires_at}
+        try:
+            store.write(self.name, token, expires_at)
+        except Exception as e:
+            logger.warning(f"Token store write failed for {self.name}: {str(e)}")
+        self._memo = record
+        return token
+
+    def _refresh_blocking(self, store, stale=None):
+        owner = _owner_id()
+        deadline = time.monotonic() + self.lease_seconds
+        while True:
+            try:
+                acquired = store.acquire(self.name, owner, self.lease_seconds)
+            except Exception as e:
+                logger.warning(f"Token lease failed for {self.name}: {str(e)}")
+                acquired = True  # the store is unavailable; fall back to fetching directly
+            if acquired:
+                try:
+                    return self._fetch_and_store(store)
+                finally:
+                    try:
+                        store.release(self.name, owner)
+                    except Exception:
+                        pass
+
+            # Another worker is refreshing; wait for it to publish the new token
+            time.sleep(POLL_INTERVAL * random.uniform(0.5, 1.5))
+            record = self._read(store)
+            if self._valid(record, time.time()) and record['token'] != stale:
+                self._memo = record
+                return record['token']
+            if time.monotonic() > deadline:
+                logger.warning(f"Timed out waiting for {self.name} refresh, fetching directly")
+                return self._fetch_and_store(store)
+
+    def _refresh_in_background(self, store):
+        if self._background is not None and self._background.is_alive():
+            return
+        owner = _owner_id(':background')
+        try:
+            if not store.acquire(self.name, owner, self.lease_seconds):
+                return  # another worker is already refreshing
+        except Exception as e:
+            logger.warning(f"Token lease failed for {self.name}: {str(e)}")
+            return
+
+        app = current_app._get_current_object() if has_app_context() else None
+
+        def run():
+            def refresh():
+                try:
+                    self._fetch_and_store(store)
+                except Exception as e:
+                    logger.error(f"Background refresh of {self.name} failed: {str(e)}")
+                finally:
+                    try:
+                        store.release(self.name, owner)
+                    except Exception:
+                        pass
+
+            if app is not None:
+                with app.app_context():
+                    refresh()
+            else:
+                refresh()
+
+        self._background = threading.Thread(target=run, name=f"token-refresh-{self.name}", daemon=True)
+        self._background.start()
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+def token_name(provider, environment, consumer_key):
+    """Store key for a provider's credentials; the consumer key itself is not stored."""
+    return f"{provider}:{environment}:{hashlib.sha256(consumer_key.encode()).hexdigest()[:16]}"
+
+def get_token_cache(name, fetch, **options):
+    """
+    Return the process-wide cache for ``name``, creating it on first use.
+
+    Instances sharing credentials share one cache; ``fetch`` is updated so the
+    most recent client's credentials and HTTP settings are used for refreshes.
+    """
+    with _caches_lock:
+        cache = _caches.get(name)
+        if cache is None:
+            cache = _caches[name] = SharedTokenCache(name, fetch, **options)
+        else:
+            cache.fetch = fetch
+        return cache
+
+def reset_token_caches():
+    """Drop every process copy and the in-process store (used by tests)."""
+    with _caches_lock:
+        for cache in _caches.values():
+            cache.invalidate()
+    _local_store.clear()
+
+def create_token_store(app):
+    store_name = app.config.get('OAUTH_TOKEN_STORE', 'database')
+    if store_name == 'redis':
+        try:
+            return RedisTokenStore(app.config.get('OAUTH_TOKEN_REDIS_URL'))
+        except Exception as e:
+            logger.error(f"Redis token store unavailable, falling back to database: {str(e)}")
+            return DatabaseTokenStore()
+    if store_name == 'database':
+        return DatabaseTokenStore()
+    return _local_store
+
+def init_token_cache(app):
+    """Select the shared token store for the app."""
+    store = create_token_store(app)
+    app.extensions['oauth_token_store'] = store
+    return store
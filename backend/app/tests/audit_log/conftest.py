@@ -0,0 +1,25 @@
+"""
+Pytest configuration and fixtures for admin audit log tests.
+"""
+import pytest
+
+from app import create_app
+from app.configuration.extensions import db
+from app.services.audit_log import get_audit_log
+
+
+@pytest.fixture
+def app():
+    """Create application for testing (no background writer; tests flush explicitly)."""
+    app = create_app('testing')
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def audit_log(app):
+    return get_audit_log(app)
@@ -0,0 +1,57 @@
+"""
+Tests for the buffered admin activity audit log.
+"""
+from app.configuration.extensions import db
+from app.models.models import AdminActivityLog
+from app.services.audit_log import AuditLog, record_admin_activity
+
+
+class TestAuditLog:
+    """Queued events, bulk writes and the bounded queue."""
+
+    def test_events_are_queued_until_flushed(self, app, audit_log):
+        with app.test_request_context('/api/admin/login', method='POST',
+                                      headers={'User-Agent': 'pytest'}):
+            assert record_admin_activity(None, 'FAILED_LOGIN_ATTEMPT', 'User not found: x', 401)
+            assert record_admin_activity(7, 'SUCCESSFUL_LOGIN', 'Admin logged in', 200)
+
+        assert AdminActivityLog.query.count() == 0
+        assert audit_log.flush() == 2
+
+        logs = AdminActivityLog.query.order_by(AdminActivityLog.id).all()
+        assert [(log.admin_id, log.action) for log in logs] == [
+            (None, 'FAILED_LOGIN_ATTEMPT'), (7, 'SUCCESSFUL_LOGIN')
+        ]
+        assert logs[0].user_agent == 'pytest'
+        assert logs[0].method == 'POST'
+        assert logs[0].created_at is not None
+
+    def test_recording_leaves_the_request_session_alone(self, app, audit_log):
+        with app.test_request_context('/api/admin/profile'):
+            pending = AdminActivityLog(admin_id=1, action='BUSINESS_ROW')
+            db.session.add(pending)
+            record_admin_activity(1, 'PROFILE_ACCESS')
+
+            assert pending in db.session.new
+            db.session.rollback()
+
+        audit_log.flush()
+        assert [log.action for log in AdminActivityLog.query.all()] == ['PROFILE_ACCESS']
+
+    def test_full_queue_drops_and_counts(self, app):
+        audit_log = AuditLog(app, queue_size=2, writer=False)
+        results = [audit_log.record(1, f'ACTION_{i}') for i in range(3)]
+
+        assert results == [True, True, False]
+        assert audit_log.stats()['dropped'] == 1
+        assert audit_log.pending() == 2
+
+    def test_bad_event_does_not_lose_the_batch(self, app):
+        audit_log = AuditLog(app, writer=False)
+        audit_log.record(1, 'FIRST')
+        audit_log.record(1, None)  # action is NOT NULL
+        audit_log.record(1, 'THIRD')
+
+        assert audit_log.flush() == 2
+        assert audit_log.stats()['failed'] == 1
+        assert sorted(log.action for log in AdminActivityLog.query.all()) == ['FIRST', 'THIRD']
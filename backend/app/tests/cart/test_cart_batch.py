@@ -0,0 +1,66 @@
+"""
+Tests for the batch cart mutation endpoint.
+"""
+import json
+
+from app import db
+from app.models.models import CartItem
+
+
+class TestCartBatch:
+    """PATCH /api/cart/items:batch"""
+
+    def test_batch_applies_add_update_and_remove(self, client, auth_headers, app, create_cart,
+                                                  create_product, create_cart_item):
+        headers, user_id = auth_headers
+        with app.app_context():
+            cart_id = create_cart(user_id)
+            kept = create_product({'stock': 20})
+            removed = create_product({'stock': 20})
+            added = create_product({'stock': 20})
+            kept_item = create_cart_item(cart_id, kept, quantity=1)
+            removed_item = create_cart_item(cart_id, removed, quantity=1)
+
+        response = client.patch('/api/cart/items:batch', headers=headers, json={'operations': [
+            {'op': 'update', 'item_id': kept_item, 'quantity': 4},
+            {'op': 'remove', 'item_id': removed_item},
+            {'op': 'add', 'product_id': added, 'quantity': 2},
+            {'op': 'add', 'product_id': added, 'quantity': 1}
+        ]})
+
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data['success'] is True
+        quantities = {item['product_id']: item['quantity'] for item in data['items']}
+        assert quantities == {kept: 4, added: 3}
+
+    def test_batch_is_all_or_nothing(self, client, auth_headers, app, create_cart,
+                                     create_product, create_cart_item):
+        headers, user_id = auth_headers
+        with app.app_context():
+            cart_id = create_cart(user_id)
+            product_id = create_product({'stock': 5})
+            item_id = create_cart_item(cart_id, product_id, quantity=1)
+
+        response = client.patch('/api/cart/items:batch', headers=headers, json={'operations': [
+            {'op': 'update', 'item_id': item_id, 'quantity': 2},
+            {'op': 'add', 'product_id': product_id, 'quantity': 50}
+        ]})
+
+        assert response.status_code == 400
+        data = json.loads(response.data)
+        assert data['errors'][0]['code'] == 'insufficient_stock'
+        with app.app_context():
+            assert db.session.get(CartItem, item_id).quantity == 1
+
+    def test_batch_rejects_malformed_operations(self, client, auth_headers):
+        headers, user_id = auth_headers
+
+        response = client.patch('/api/cart/items:batch', headers=headers, json={'operations': [
+            {'op': 'add'},
+            {'op': 'rename', 'item_id': 1}
+        ]})
+
+        assert response.status_code == 400
+        codes = [error['code'] for error in json.loads(response.data)['errors']]
+        assert codes == ['missing_field', 'invalid_operation']
@@ -0,0 +1,75 @@
+"""
+Tests for merging a guest cart into a user cart.
+"""
+import pytest
+import uuid
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models.models import Cart, CartItem
+
+
+class TestCartMerge:
+    """Guest-to-user cart merge."""
+
+    def test_merge_adds_quantities_and_inserts_new_lines(self, app, create_user, create_product,
+                                                         create_product_variant, create_cart,
+                                                         create_cart_item):
+        user_id = create_user()
+        product_a = create_product()
+        product_b = create_product()
+        variant_id = create_product_variant(product_a)
+
+        user_cart_id = create_cart(user_id=user_id)
+        create_cart_item(user_cart_id, product_a, quantity=2)
+        create_cart_item(user_cart_id, product_a, variant_id=variant_id, quantity=1)
+
+        guest_cart_id = create_cart(guest_id=str(uuid.uuid4()))
+        create_cart_item(guest_cart_id, product_a, quantity=3)
+        create_cart_item(guest_cart_id, product_a, variant_id=variant_id, quantity=4)
+        create_cart_item(guest_cart_id, product_b, quantity=1)
+
+        with app.app_context():
+            guest_cart = db.session.get(Cart, guest_cart_id)
+            merged = guest_cart.merge_with_user_cart(user_id)
+
+            assert merged.id == user_cart_id
+            quantities = {
+                (item.product_id, item.variant_id): item.quantity
+                for item in CartItem.query.filter_by(cart_id=user_cart_id).all()
+            }
+            assert quantities == {
+                (product_a, None): 5,
+                (product_a, variant_id): 5,
+                (product_b, None): 1
+            }
+            assert merged.subtotal == pytest.approx(19.99 * 11)
+            assert db.session.get(Cart, guest_cart_id).is_active is False
+
+    def test_merge_creates_user_cart_and_copies_payment_method(self, app, create_user, create_product,
+                                                               create_cart, create_cart_item,
+                                                               create_payment_method):
+        user_id = create_user()
+        product_id = create_product()
+        payment_method_id = create_payment_method()
+        guest_cart_id = create_cart(guest_id=str(uuid.uuid4()))
+        create_cart_item(guest_cart_id, product_id, quantity=2)
+
+        with app.app_context():
+            guest_cart = db.session.get(Cart, guest_cart_id)
+            guest_cart.payment_method_id = payment_method_id
+            db.session.commit()
+
+            merged = guest_cart.merge_with_user_cart(user_id)
+
+            assert merged.user_id == user_id
+            assert merged.payment_method_id == payment_method_id
+            assert [item.quantity for item in CartItem.query.filter_by(cart_id=merged.id)] == [2]
+
+    def test_duplicate_line_is_rejected(self, app, create_product, create_cart, create_cart_item):
+        product_id = create_product()
+        cart_id = create_cart(guest_id=str(uuid.uuid4()))
+        create_cart_item(cart_id, product_id)
+
+        with pytest.raises(IntegrityError):
+            create_cart_item(cart_id, product_id)
@@ -0,0 +1,68 @@
+"""
+Tests for virtual guest carts and the guest cart purge.
+"""
+from datetime import datetime, timedelta
+
+from app import db
+from app.models.models import Cart, CartItem
+from app.services.guest_carts import (
+    VirtualGuestCart,
+    get_guest_cart,
+    purge_expired_guest_carts,
+)
+
+
+class TestVirtualGuestCarts:
+    def test_anonymous_read_does_not_write_a_cart(self, app):
+        with app.test_request_context('/api/products'):
+            cart = get_guest_cart()
+
+        assert isinstance(cart, VirtualGuestCart)
+        assert cart.id is None
+        assert cart.guest_id
+        assert Cart.query.count() == 0
+
+    def test_unknown_cookie_keeps_its_guest_id(self, app):
+        with app.test_request_context('/api/products', headers={'Cookie': 'guest_id=abc-123'}):
+            cart = get_guest_cart()
+
+        assert cart.guest_id == 'abc-123'
+        assert Cart.query.count() == 0
+
+    def test_first_item_materializes_the_cart(self, app, client, create_product):
+        product_id = create_product()
+
+        response = client.post('/api/cart/items', json={'product_id': product_id, 'quantity': 1})
+
+        assert response.status_code in (200, 201)
+        guest_id = client.get_cookie('guest_id').value
+        cart = Cart.query.filter_by(guest_id=guest_id).one()
+        assert CartItem.query.filter_by(cart_id=cart.id).count() == 1
+
+        with app.test_request_context('/api/cart', headers={'Cookie': f'guest_id={guest_id}'}):
+            assert get_guest_cart().id == cart.id
+
+
+class TestGuestCartPurge:
+    def test_purges_idle_and_expired_guest_carts_in_batches(self, app, create_user, create_product,
+                                                            create_cart, create_cart_item):
+        product_id = create_product()
+        user_id = create_user()
+        now = datetime.utcnow()
+
+        idle_ids = [create_cart(guest_id=f'idle-{i}') for i in range(3)]
+        expired_id = create_cart(guest_id='expired')
+        fresh_id = create_cart(guest_id='fresh')
+        user_cart_id = create_cart(user_id=user_id)
+        create_cart_item(idle_ids[0], product_id)
+        Cart.query.filter(Cart.id.in_(idle_ids + [user_cart_id])).update(
+            {Cart.last_activity: now - timedelta(days=60)}, synchronize_session=False)
+        Cart.query.filter(Cart.id == expired_id).update(
+            {Cart.expires_at: now - timedelta(minutes=1)}, synchronize_session=False)
+        db.session.commit()
+
+        purged = purge_expired_guest_carts(now=now, ttl_days=30, batch_size=2)
+
+        assert purged == 4
+        assert {cart.id for cart in Cart.query.all()} == {fresh_id, user_cart_id}
+        assert CartItem.query.count() == 0
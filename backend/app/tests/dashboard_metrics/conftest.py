@@ -0,0 +1,96 @@
+"""
+Pytest configuration and fixtures for dashboard metrics tests.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+from app import create_app
+from app.configuration.extensions import db
+from app.models.models import (
+    Category, Order, OrderItem, OrderStatus, PaymentStatus, Product, User, UserRole
+)
+
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def admin_user(app):
+    admin = User(
+        name='Admin User',
+        email='admin@example.com',
+        role=UserRole.ADMIN,
+        phone='+254712345679',
+        is_active=True,
+        email_verified=True,
+        created_at=datetime.utcnow() - timedelta(days=60)
+    )
+    admin.set_password('adminpass123')
+    db.session.add(admin)
+    db.session.commit()
+    return admin
+
+
+@pytest.fixture
+def admin_headers(admin_user):
+    token = create_access_token(identity=str(admin_user.id))
+    return {'Authorization': f'Bearer {token}'}
+
+
+@pytest.fixture
+def product(app):
+    category = Category(name='Phones', slug='phones')
+    db.session.add(category)
+    db.session.flush()
+    product = Product(name='Phone', slug='phone', price=100.0, stock=50, category_id=category.id, sku='PH-1')
+    db.session.add(product)
+    db.session.commit()
+    return product
+
+
+@pytest.fixture
+def orders(app, admin_user, product):
+    """Orders spread over the last forty days, including one in the current hour."""
+    now = datetime.utcnow()
+    placed = [
+        (now - timedelta(days=40), OrderStatus.DELIVERED, PaymentStatus.PAID, 300.0),
+        (now - timedelta(days=3), OrderStatus.PENDING, PaymentStatus.PENDING, 200.0),
+        (now - timedelta(days=1), OrderStatus.CANCELLED, PaymentStatus.FAILED, 150.0),
+        (now - timedelta(days=1, hours=2), OrderStatus.SHIPPED, PaymentStatus.PAID, 250.0),
+        (now, OrderStatus.PENDING, PaymentStatus.PENDING, 100.0),
+    ]
+    created = []
+    for i, (created_at, status, payment_status, total) in enumerate(placed):
+        order = Order(
+            user_id=admin_user.id,
+            order_number=f'ORD-DASH-{i:04d}',
+            status=status,
+            payment_status=payment_status,
+            total_amount=total,
+            shipping_address={'city': 'Nairobi'},
+            billing_address={'city': 'Nairobi'},
+            payment_method='mpesa',
+            created_at=created_at
+        )
+        db.session.add(order)
+        db.session.flush()
+        db.session.add(OrderItem(order_id=order.id, product_id=product.id, quantity=int(total // 100),
+                                 price=100.0, total=total))
+        created.append(order)
+    db.session.commit()
+    return created
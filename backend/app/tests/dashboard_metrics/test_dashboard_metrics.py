@@ -0,0 +1,123 @@
+"""
+Tests for the dashboard metrics rollups and the admin dashboard endpoints built on them.
+"""
+from datetime import datetime, time, timedelta
+
+from sqlalchemy import func
+
+from app.configuration.extensions import db
+from app.models.models import (
+    DashboardMetric, DashboardMetricChange, Order, OrderItem, OrderStatus, PaymentStatus
+)
+from app.services.dashboard_metrics import DAY, HOUR, daily_totals, metric_sum, period_totals
+
+
+def _live_status_totals():
+    return {
+        status.value: [count, float(total)]
+        for status, count, total in db.session.query(
+            Order.status, func.count(Order.id), func.sum(Order.total_amount)
+        ).group_by(Order.status)
+    }
+
+
+class TestRollups:
+    def test_period_totals_match_live_aggregates(self, app, orders):
+        periods = period_totals()
+
+        assert periods['all']['orders'] == _live_status_totals()
+        assert metric_sum(periods['all'], 'users') == (1, 0.0)
+        assert metric_sum(periods['today'], 'orders') == (1, 100.0)
+        assert periods['all']['category_sales']['Phones'] == [4, 850.0]
+        # Closed days were rolled up; the current hour is read live
+        assert DashboardMetric.query.filter_by(granularity=DAY).count() > 0
+
+    def test_rollups_are_reused_between_reads(self, app, orders):
+        period_totals()
+        stored = DashboardMetric.query.count()
+
+        assert period_totals()['all']['orders'] == _live_status_totals()
+        assert DashboardMetric.query.count() == stored
+
+    def test_status_change_on_rolled_up_order_rebuilds_its_bucket(self, app, orders):
+        period_totals()
+        old_order = orders[1]
+        old_order.status = OrderStatus.CANCELLED
+        db.session.commit()
+
+        assert DashboardMetricChange.query.count() == 1
+        periods = period_totals()
+        assert periods['all']['orders'] == _live_status_totals()
+        assert periods['all']['orders'][OrderStatus.CANCELLED.value] == [2, 350.0]
+        assert DashboardMetricChange.query.count() == 0
+
+    def test_changes_in_current_hour_are_not_recorded(self, app, orders):
+        recorded = DashboardMetricChange.query.count()
+        orders[-1].status = OrderStatus.CONFIRMED
+        db.session.commit()
+
+        assert DashboardMetricChange.query.count() == recorded
+
+    def test_item_added_to_rolled_up_order_rebuilds_its_bucket(self, app, orders, product):
+        period_totals()
+        db.session.add(OrderItem(order_id=orders[1].id, product_id=product.id, quantity=1, price=100.0, total=100.0))
+        db.session.commit()
+
+        assert DashboardMetricChange.query.count() == 1
+        assert period_totals()['all']['category_sales']['Phones'] == [5, 950.0]
+
+    def test_hour_is_rolled_up_only_after_it_settles(self, app, admin_user):
+        noon = datetime.combine(datetime.utcnow().date(), time(12))
+        db.session.add(Order(user_id=admin_user.id, order_number='ORD-SETTLE', status=OrderStatus.PENDING,
+                             payment_status=PaymentStatus.PENDING, total_amount=70.0, payment_method='mpesa',
+                             shipping_address={}, billing_address={}, created_at=noon - timedelta(seconds=1)))
+        db.session.commit()
+        rolled_up = DashboardMetric.query.filter_by(granularity=HOUR, bucket_start=noon - timedelta(hours=1))
+
+        periods = period_totals(now=noon + timedelta(minutes=1))
+        assert metric_sum(periods['today'], 'orders') == (1, 70.0)
+        assert rolled_up.count() == 0
+
+        periods = period_totals(now=noon + timedelta(minutes=10))
+        assert metric_sum(periods['today'], 'orders') == (1, 70.0)
+        assert rolled_up.count() > 0
+
+    def test_daily_totals_split_by_day(self, app, orders):
+        today = datetime.utcnow().date()
+        days = daily_totals('orders', today - timedelta(days=5), today)
+
+        assert metric_sum({'orders': days[today]}, 'orders') == (1, 100.0)
+        assert metric_sum({'orders': days[today - timedelta(days=3)]}, 'orders') == (1, 200.0)
+
+
+class TestDashboardEndpoints:
+    def test_overview_reports_counts_and_sales(self, client, admin_headers, orders):
+        response = client.get('/api/admin/dashboard/', headers=admin_headers)
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['counts']['orders'] == 5
+        assert data['counts']['pending_orders'] == 2
+        assert data['counts']['cancelled_orders'] == 1
+        assert data['counts']['users'] == 1
+        assert data['sales']['today'] == 100.0
+        assert data['sales']['total_revenue'] == 850.0
+        assert data['sales']['pending_amount'] == 300.0
+        assert data['order_status']['pending'] == 2
+        assert data['sales_by_category'][0]['category'] == 'Phones'
+        assert data['recent_orders'][0]['items'] == [{'quantity': 1}]
+        assert data['recent_users'][0]['orders_count'] == 5
+        assert data['recent_users'][0]['total_spent'] == 1000.0
+        assert data['customer_segments'] == [
+            {'segment': 'Regular', 'count': 1, 'percentage': 100.0, 'revenue': 1000.0}
+        ]
+
+    def test_sales_chart_excludes_cancelled_orders(self, client, admin_headers, orders):
+        response = client.get('/api/admin/dashboard/sales-chart?days=5', headers=admin_headers)
+
+        assert response.status_code == 200
+        chart = {point['date']: point for point in response.get_json()['chart_data']}
+        today = datetime.utcnow().date()
+        assert chart[today.isoformat()] == {'date': today.isoformat(), 'sales': 100.0, 'orders': 1}
+        yesterday = chart[(today - timedelta(days=1)).isoformat()]
+        assert yesterday['orders'] in (0, 1)  # the shipped order may fall two days back near midnight
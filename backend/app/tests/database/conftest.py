@@ -0,0 +1,46 @@
+"""
+Pytest configuration and fixtures for the database pool tests.
+"""
+import pytest
+
+from app import create_app
+from app.configuration.config import TestingConfig
+from app.configuration.database import ANALYTICS, replica_key
+from app.configuration.extensions import db
+
+
+def _forget_binds(*keys):
+    """init_app leaves a metadata per bind on the shared db; later apps' create_all would need the bind."""
+    for key in keys:
+        db.metadatas.pop(key, None)
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """Testing app with a separate SQLite file standing in for the analytics bind."""
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_BINDS',
+                        {ANALYTICS: f"sqlite:///{tmp_path / 'analytics.db'}"})
+    app = create_app('testing')
+
+    with app.app_context():
+        db.create_all(bind_key=None)
+        yield app
+        db.session.remove()
+        db.drop_all(bind_key=None)
+    _forget_binds(ANALYTICS)
+
+
+@pytest.fixture
+def replica_app(tmp_path, monkeypatch):
+    """Testing app whose primary and replica are two SQLite files."""
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'primary.db'}")
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_BINDS',
+                        {replica_key(1): f"sqlite:///{tmp_path / 'replica.db'}"})
+    app = create_app('testing')
+
+    with app.app_context():
+        db.create_all(bind_key=None)
+        yield app
+        db.session.remove()
+        db.drop_all(bind_key=None)
+    _forget_binds(replica_key(1))
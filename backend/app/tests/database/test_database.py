@@ -0,0 +1,149 @@
+"""
+Tests for per-workload engine options, bind routing and pool metrics.
+"""
+from sqlalchemy import select, text
+
+from app.configuration.config import database_pools
+from app.configuration.database import (
+    ANALYTICS, REPLICA_OPTION, WORKLOAD_OPTION, ReplicaSet, engine_options, pool_stats, replica_blueprint,
+    replica_key, use_replica, use_workload, workload_blueprint
+)
+from app.configuration.extensions import db
+from app.models.models import Category
+
+
+class TestEngineOptions:
+    def test_postgres_gets_pool_and_statement_timeout(self):
+        options = engine_options('postgresql://db/mizizzi', pool_size=7, max_overflow=3,
+                                 statement_timeout_ms=5000, application_name='mizizzi-web')
+
+        assert options['pool_size'] == 7
+        assert options['max_overflow'] == 3
+        assert options['pool_pre_ping'] is True
+        assert options['connect_args']['options'] == '-c statement_timeout=5000'
+        assert options['connect_args']['application_name'] == 'mizizzi-web'
+
+    def test_sqlite_gets_no_pool_options(self):
+        assert engine_options('sqlite:///:memory:', pool_size=7) == {}
+
+    def test_environment_pools_are_separate(self, monkeypatch):
+        monkeypatch.setenv('DB_POOL_SIZE', '12')
+        monkeypatch.delenv('ANALYTICS_DATABASE_URL', raising=False)
+
+        oltp, binds = database_pools('postgresql://db/mizizzi', pool_size=5, max_overflow=5,
+                                     analytics_pool_size=2, analytics_max_overflow=1)
+
+        assert oltp['pool_size'] == 12
+        assert binds[ANALYTICS]['url'] == 'postgresql://db/mizizzi'
+        assert binds[ANALYTICS]['pool_size'] == 2
+        assert 'statement_timeout=120000' in binds[ANALYTICS]['connect_args']['options']
+
+    def test_replica_urls_become_numbered_binds(self, monkeypatch):
+        monkeypatch.setenv('REPLICA_DATABASE_URLS', 'postgresql://r1/mizizzi, postgresql://r2/mizizzi')
+
+        _, binds = database_pools('postgresql://db/mizizzi', pool_size=5, max_overflow=5,
+                                  analytics_pool_size=2, analytics_max_overflow=1)
+
+        assert binds[replica_key(1)]['url'] == 'postgresql://r1/mizizzi'
+        assert binds[replica_key(2)]['url'] == 'postgresql://r2/mizizzi'
+
+
+class TestWorkloadRouting:
+    def test_default_workload_uses_default_engine(self, app):
+        assert db.session.get_bind() is db.engines[None]
+
+    def test_use_workload_routes_to_analytics_engine(self, app):
+        with use_workload(ANALYTICS):
+            assert db.session.get_bind() is db.engines[ANALYTICS]
+        assert db.session.get_bind() is db.engines[None]
+
+    def test_execution_option_routes_single_statement(self, app):
+        statement = text('SELECT 1').execution_options(**{WORKLOAD_OPTION: ANALYTICS})
+
+        assert db.session.get_bind(clause=statement) is db.engines[ANALYTICS]
+
+    def test_workload_blueprint_routes_its_requests(self, app):
+        from flask import Blueprint, jsonify
+
+        reports = workload_blueprint(Blueprint('reports_test', __name__), ANALYTICS)
+
+        @reports.route('/bind')
+        def bind():
+            return jsonify(analytics=db.session.get_bind() is db.engines[ANALYTICS])
+
+        app.register_blueprint(reports, url_prefix='/test-reports')
+
+        response = app.test_client().get('/test-reports/bind')
+
+        assert response.get_json() == {'analytics': True}
+        assert db.session.get_bind() is db.engines[None]
+
+
+class TestReplicaRouting:
+    def test_marked_select_goes_to_replica(self, replica_app):
+        with use_replica():
+            assert db.session.get_bind(clause=select(Category)) is db.engines[replica_key(1)]
+
+    def test_unmarked_select_stays_on_primary(self, replica_app):
+        assert db.session.get_bind(clause=select(Category)) is db.engines[None]
+
+    def test_execution_option_marks_single_statement(self, replica_app):
+        statement = select(Category).execution_options(**{REPLICA_OPTION: True})
+
+        assert db.session.get_bind(clause=statement) is db.engines[replica_key(1)]
+
+    def test_select_for_update_stays_on_primary(self, replica_app):
+        with use_replica():
+            assert db.session.get_bind(clause=select(Category).with_for_update()) is db.engines[None]
+
+    def test_pending_changes_keep_reads_on_primary(self, replica_app):
+        db.session.add(Category(name='Phones', slug='phones'))
+
+        with use_replica():
+            assert db.session.get_bind(clause=select(Category)) is db.engines[None]
+
+    def test_reads_stay_on_primary_after_a_write(self, replica_app):
+        db.session.add(Category(name='Phones', slug='phones'))
+        db.session.commit()
+
+        with use_replica():
+            assert db.session.get_bind(clause=select(Category)) is db.engines[None]
+
+    def test_lagging_replica_falls_back_to_primary(self, replica_app, monkeypatch):
+        monkeypatch.setattr(ReplicaSet, 'lag', lambda self, key, engine, interval: 60.0)
+
+        with use_replica():
+            assert db.session.get_bind(clause=select(Category)) is db.engines[None]
+
+    def test_unreachable_replica_falls_back_to_primary(self, replica_app, monkeypatch):
+        monkeypatch.setattr(ReplicaSet, 'lag', lambda self, key, engine, interval: None)
+
+        with use_replica():
+            assert db.session.get_bind(clause=select(Category)) is db.engines[None]
+
+    def test_replica_blueprint_serves_reads_from_replica(self, replica_app):
+        from flask import Blueprint, jsonify
+
+        catalogue = replica_blueprint(Blueprint('catalogue_test', __name__))
+
+        @catalogue.route('/bind')
+        def bind():
+            return jsonify(replica=db.session.get_bind(clause=select(Category)) is db.engines[replica_key(1)])
+
+        replica_app.register_blueprint(catalogue, url_prefix='/test-catalogue')
+
+        response = replica_app.test_client().get('/test-catalogue/bind')
+
+        assert response.get_json() == {'replica': True}
+
+
+class TestPoolStats:
+    def test_reports_every_bind_and_counts_checkouts(self, app):
+        with use_workload(ANALYTICS):
+            db.session.execute(text('SELECT 1'))
+        db.session.commit()
+
+        stats = pool_stats(db)
+
+        assert set(stats) == {'default', ANALYTICS}
+        assert stats[ANALYTICS]['checkouts'] >= 1
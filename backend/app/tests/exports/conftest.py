@@ -0,0 +1,100 @@
+"""
+Pytest configuration and fixtures for streaming export tests.
+"""
+import pytest
+from flask_jwt_extended import create_access_token
+
+from app import create_app
+from app.configuration.extensions import db
+from app.models.models import (
+    Category, Newsletter, Order, OrderItem, OrderStatus, PaymentStatus, Product, User, UserRole
+)
+
+
+@pytest.fixture
+def app(tmp_path):
+    """Create application with eager jobs and a temporary exports directory."""
+    app = create_app('testing')
+    app.config['EXPORTS_DIR'] = str(tmp_path / 'exports')
+    app.config['EXPORTS_BATCH_SIZE'] = 2
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def admin_user(app):
+    admin = User(
+        name='Admin User',
+        email='admin@example.com',
+        role=UserRole.ADMIN,
+        phone='+254712345679',
+        is_active=True,
+        email_verified=True
+    )
+    admin.set_password('adminpass123')
+    db.session.add(admin)
+    db.session.commit()
+    return admin
+
+
+@pytest.fixture
+def admin_headers(admin_user):
+    token = create_access_token(identity=str(admin_user.id))
+    return {'Authorization': f'Bearer {token}'}
+
+
+@pytest.fixture
+def catalog(app):
+    parent = Category(name='Electronics', slug='electronics')
+    db.session.add(parent)
+    db.session.flush()
+    child = Category(name='Phones', slug='phones', parent_id=parent.id)
+    db.session.add(child)
+    db.session.flush()
+    product = Product(name='Phone', slug='phone', price=500.0, stock=10, category_id=child.id, sku='PH-1')
+    db.session.add(product)
+    db.session.commit()
+    return {'parent': parent, 'child': child, 'product': product}
+
+
+@pytest.fixture
+def orders(app, admin_user, catalog):
+    created = []
+    for i in range(5):
+        order = Order(
+            user_id=admin_user.id,
+            order_number=f'ORD-20261018-{i:04d}',
+            status=OrderStatus.PENDING if i % 2 else OrderStatus.DELIVERED,
+            payment_status=PaymentStatus.PENDING,
+            total_amount=100.0 * (i + 1),
+            shipping_address={'city': 'Nairobi'},
+            billing_address={'city': 'Nairobi'},
+            payment_method='mpesa',
+            notes='line one\nline two' if i == 0 else None
+        )
+        db.session.add(order)
+        db.session.flush()
+        for _ in range(i + 1):
+            db.session.add(OrderItem(order_id=order.id, product_id=catalog['product'].id, quantity=1,
+                                     price=100.0, total=100.0))
+        created.append(order)
+    db.session.commit()
+    return created
+
+
+@pytest.fixture
+def subscribers(app):
+    db.session.add_all([
+        Newsletter(email='b@example.com', name='B', is_subscribed=True),
+        Newsletter(email='a@example.com', name='A', is_subscribed=False)
+    ])
+    db.session.commit()
@@ -0,0 +1,120 @@
+"""
+Tests for the streaming export layer and the export endpoints built on it.
+"""
+import csv
+import gzip
+import io
+import json
+import os
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from app.services.exports import export_file_path, purge_expired_exports, read_manifest
+
+
+def _csv_rows(body):
+    return list(csv.reader(io.StringIO(body)))
+
+
+class TestOrderExport:
+    def test_streams_csv_with_joined_customer_and_item_counts(self, client, admin_headers, orders):
+        response = client.get('/api/admin/orders/export', headers=admin_headers)
+
+        assert response.status_code == 200
+        assert response.is_streamed
+        assert response.mimetype == 'text/csv'
+        assert 'orders_export_' in response.headers['Content-Disposition']
+        rows = _csv_rows(response.get_data(as_text=True))
+        header, data = rows[0], rows[1:]
+        assert header[:2] == ['Order ID', 'Order Number']
+        assert len(data) == 5
+        by_number = {row[1]: dict(zip(header, row)) for row in data}
+        assert by_number['ORD-20261018-0004']['Items Count'] == '5'
+        assert by_number['ORD-20261018-0004']['User Email'] == 'admin@example.com'
+        assert by_number['ORD-20261018-0000']['Notes'] == 'line one | line two'
+
+    def test_status_filter_and_gzipped_ndjson(self, client, admin_headers, orders):
+        response = client.get('/api/admin/orders/export?format=ndjson&gzip=true&status=delivered',
+                              headers=admin_headers)
+
+        assert response.status_code == 200
+        assert response.mimetype == 'application/gzip'
+        assert response.headers['Content-Disposition'].endswith('.ndjson.gz')
+        lines = gzip.decompress(response.get_data()).decode('utf-8').splitlines()
+        records = [json.loads(line) for line in lines]
+        assert len(records) == 3
+        assert {record['status'] for record in records} == {'delivered'}
+
+    def test_rejects_unknown_format(self, client, admin_headers, orders):
+        response = client.get('/api/admin/orders/export?format=xlsx', headers=admin_headers)
+        assert response.status_code == 400
+
+    def test_async_export_writes_file_served_by_status_endpoint(self, client, admin_headers, orders):
+        response = client.get('/api/admin/orders/export?async=true', headers=admin_headers)
+
+        assert response.status_code == 202
+        export = response.get_json()['export']
+        assert export['status'] == 'ready'  # jobs run eagerly under test
+        assert export['rows'] == 5
+        assert read_manifest(export['id'])['file'] == export['file']
+
+        status = client.get(f"/api/admin/exports/{export['id']}", headers=admin_headers)
+        assert status.status_code == 200
+        assert status.get_json()['export']['status'] == 'ready'
+
+        download = client.get(f"/api/admin/exports/{export['id']}?download=true", headers=admin_headers)
+        assert download.status_code == 200
+        assert len(_csv_rows(download.get_data(as_text=True))) == 6
+
+    def test_expired_export_is_gone_and_purged(self, app, client, admin_headers, orders):
+        export = client.get('/api/admin/orders/export?async=true', headers=admin_headers).get_json()['export']
+        path = export_file_path(read_manifest(export['id']))
+        expires_at = datetime.fromisoformat(export['expires_at'])
+
+        assert purge_expired_exports(now=expires_at - timedelta(minutes=1)) == 0
+        assert os.path.exists(path)
+
+        with patch('app.services.exports.datetime', wraps=datetime) as clock:
+            clock.now.return_value = expires_at
+            status = client.get(f"/api/admin/exports/{export['id']}", headers=admin_headers)
+        assert status.status_code == 410
+
+        assert purge_expired_exports(now=expires_at) == 1
+        assert not os.path.exists(path)
+        assert read_manifest(export['id']) is None
+
+    def test_unknown_export_id(self, client, admin_headers):
+        response = client.get('/api/admin/exports/../../etc/passwd', headers=admin_headers)
+        assert response.status_code == 404
+        response = client.get(f"/api/admin/exports/{'0' * 32}", headers=admin_headers)
+        assert response.status_code == 404
+
+
+class TestCategoryAndNewsletterExport:
+    def test_category_export_keeps_json_by_default(self, client, admin_headers, catalog):
+        response = client.get('/api/admin/categories/export', headers=admin_headers)
+
+        assert response.status_code == 200
+        body = response.get_json()
+        assert body['message'] == 'Exported 2 categories'
+        rows = {row[1]: row for row in _csv_rows(body['csv_data'])[1:]}
+        assert rows['Phones'][5] == 'Electronics'
+        assert rows['Phones'][7] == '1'
+
+    def test_category_export_streams_on_request(self, client, admin_headers, catalog):
+        response = client.get('/api/admin/categories/export?stream=true', headers=admin_headers)
+
+        assert response.status_code == 200
+        assert response.mimetype == 'text/csv'
+        assert len(_csv_rows(response.get_data(as_text=True))) == 3
+
+    def test_newsletter_export_filters_on_subscription(self, client, admin_headers, subscribers):
+        response = client.get('/api/admin/newsletters/export', headers=admin_headers)
+        body = response.get_json()
+        assert response.status_code == 200
+        assert [row[0] for row in _csv_rows(body['csv_data'])[1:]] == ['a@example.com', 'b@example.com']
+
+        response = client.get('/api/admin/newsletters/export?is_active=true&format=ndjson', headers=admin_headers)
+        records = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        assert records == [{'email': 'b@example.com', 'name': 'B', 'status': 'Active',
+                            'subscribed_on': records[0]['subscribed_on']}]
@@ -0,0 +1,84 @@
+"""
+Tests for the pooled outbound HTTP client.
+"""
+from unittest.mock import Mock, patch
+
+import pytest
+import requests
+from urllib3.exceptions import MaxRetryError, NewConnectionError
+
+from app.services.http_client import CircuitOpenError, HttpClient
+
+
+def _response(status_code):
+    response = Mock()
+    response.status_code = status_code
+    return response
+
+
+@pytest.fixture
+def client():
+    return HttpClient(profiles={'test': {'backoff': 0, 'max_retries': 2, 'failure_threshold': 3}})
+
+
+class TestHttpClient:
+    """Retry, breaker and pooling behaviour."""
+
+    def test_sessions_are_pooled_per_integration(self, client):
+        assert client.session('test') is client.session('test')
+        assert client.session('test') is not client.session('other')
+
+    def test_default_timeout_comes_from_profile(self, client):
+        with patch('requests.Session.get', return_value=_response(200)) as mock_get:
+            client.get('test', 'https://provider.example/ping')
+
+        assert mock_get.call_args[1]['timeout'] == (5, 30)
+
+    def test_idempotent_request_is_retried_on_retryable_status(self, client):
+        responses = [_response(503), _response(200)]
+        with patch('requests.Session.get', side_effect=responses) as mock_get:
+            response = client.get('test', 'https://provider.example/status')
+
+        assert response.status_code == 200
+        assert mock_get.call_count == 2
+        assert client.stats()['integrations']['test']['retries'] == 1
+
+    def test_post_is_not_retried_after_it_may_have_been_sent(self, client):
+        with patch('requests.Session.post', side_effect=requests.ReadTimeout('slow')) as mock_post:
+            with pytest.raises(requests.ReadTimeout):
+                client.post('test', 'https://provider.example/charge', json={})
+
+        assert mock_post.call_count == 1
+
+    def test_post_is_retried_when_connection_was_never_established(self, client):
+        refused = requests.ConnectionError(MaxRetryError(None, '/charge', NewConnectionError(None, 'refused')))
+        with patch('requests.Session.post', side_effect=[refused, _response(200)]) as mock_post:
+            response = client.post('test', 'https://provider.example/charge', json={})
+
+        assert response.status_code == 200
+        assert mock_post.call_count == 2
+
+    def test_breaker_opens_after_consecutive_failures(self, client):
+        with patch('requests.Session.get', side_effect=requests.ConnectionError('down')) as mock_get:
+            with pytest.raises(requests.ConnectionError):
+                client.get('test', 'https://down.example/a')
+            with pytest.raises(CircuitOpenError):
+                client.get('test', 'https://down.example/b')
+
+        assert mock_get.call_count == 3
+        assert client.stats()['breakers']['test:down.example']['state'] == 'open'
+        assert client.stats()['integrations']['test']['rejected'] == 1
+
+    def test_breaker_is_per_host(self, client):
+        with patch('requests.Session.get', side_effect=requests.ConnectionError('down')):
+            with pytest.raises(requests.ConnectionError):
+                client.get('test', 'https://down.example/a')
+
+        with patch('requests.Session.get', return_value=_response(200)):
+            assert client.get('test', 'https://up.example/a').status_code == 200
+
+    def test_sms_gets_its_own_short_timeouts(self):
+        with patch('requests.Session.post', return_value=_response(201)) as mock_post:
+            HttpClient().post('sms', 'https://sms.example/Messages.json', data={'Body': 'code'})
+
+        assert mock_post.call_args[1]['timeout'] == (3, 10)
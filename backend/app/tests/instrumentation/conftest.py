@@ -0,0 +1,35 @@
+"""
+Pytest configuration and fixtures for request instrumentation tests.
+"""
+import pytest
+from sqlalchemy import text
+
+from app import create_app
+from app.configuration.config import TestingConfig
+from app.configuration.extensions import db
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """Testing app with instrumentation on and a route that repeats one query."""
+    monkeypatch.setattr(TestingConfig, 'INSTRUMENTATION_ENABLED', True)
+    monkeypatch.setattr(TestingConfig, 'INSTRUMENTATION_N_PLUS_ONE_THRESHOLD', 5)
+    monkeypatch.setattr(TestingConfig, 'INSTRUMENTATION_PROFILE_DIR', str(tmp_path / 'profiles'))
+    app = create_app('testing')
+
+    @app.route('/test-instrumentation/repeat')
+    def repeat_query():
+        for _ in range(6):
+            db.session.execute(text('SELECT 1')).scalar()
+        return {'ok': True}
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
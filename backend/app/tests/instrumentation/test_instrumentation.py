@@ -0,0 +1,64 @@
+"""
+Tests for request metrics, SQL accounting, N+1 detection and sampled profiling.
+"""
+import logging
+import os
+
+
+def _sample(app, name, **labels):
+    return app.extensions['instrumentation'].registry.get_sample_value(name, labels)
+
+
+class TestRequestMetrics:
+    def test_metrics_expose_route_latency_and_statements(self, app, client):
+        client.get('/test-instrumentation/repeat')
+
+        response = client.get('/metrics')
+
+        assert response.status_code == 200
+        assert 'mizizzi_http_request_duration_seconds_count' in response.get_data(as_text=True)
+        assert _sample(app, 'mizizzi_http_request_duration_seconds_count',
+                       method='GET', endpoint='repeat_query', status='200') == 1.0
+        assert _sample(app, 'mizizzi_db_statements_per_request_sum', endpoint='repeat_query') == 6.0
+
+    def test_server_timing_header_reports_queries(self, client):
+        response = client.get('/test-instrumentation/repeat')
+
+        assert 'desc="6 queries"' in response.headers['Server-Timing']
+
+    def test_metrics_token_is_enforced(self, app, client):
+        app.extensions['instrumentation'].metrics_token = 'secret'
+
+        assert client.get('/metrics').status_code == 401
+        assert client.get('/metrics', headers={'Authorization': 'Bearer secret'}).status_code == 200
+
+
+class TestQueryPatterns:
+    def test_repeated_statement_is_flagged_once(self, app, client, caplog):
+        with caplog.at_level(logging.WARNING, logger='app.services.instrumentation'):
+            client.get('/test-instrumentation/repeat')
+            client.get('/test-instrumentation/repeat')
+
+        assert _sample(app, 'mizizzi_db_repeated_statements_total', endpoint='repeat_query') == 2.0
+        assert len([r for r in caplog.records if 'Likely N+1 in repeat_query' in r.getMessage()]) == 1
+
+    def test_slow_statements_are_counted(self, app, client):
+        app.extensions['instrumentation'].slow_query_seconds = 0
+
+        client.get('/test-instrumentation/repeat')
+
+        assert _sample(app, 'mizizzi_db_slow_statements_total', endpoint='repeat_query') == 6.0
+
+
+class TestProfiling:
+    def test_sampled_request_writes_profile(self, app, client):
+        instrumentation = app.extensions['instrumentation']
+        instrumentation.profile_rate = 1.0
+        instrumentation.profile_endpoints = {'repeat_query'}
+
+        client.get('/test-instrumentation/repeat')
+        client.get('/api/health-check')
+
+        files = os.listdir(instrumentation.profile_dir)
+        assert len(files) == 1
+        assert files[0].startswith('repeat_query-')
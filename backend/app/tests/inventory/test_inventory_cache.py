@@ -0,0 +1,92 @@
+"""
+Tests for the hot-SKU availability cache.
+"""
+import pytest
+
+from app.models.models import Inventory
+from app.configuration.extensions import db
+from app.services.inventory_cache import availability_cache, get_availability
+
+
+class TestAvailabilityCache:
+    """Write-through behaviour of the availability cache."""
+
+    def test_read_is_served_from_cache_after_first_load(self, app, sample_inventory):
+        with app.app_context():
+            product_id = sample_inventory[0].product_id
+            availability_cache.invalidate(product_id, None)
+
+            first = get_availability(product_id, None)
+            hits_before = availability_cache.hits
+            second = get_availability(product_id, None)
+
+            assert first is not None
+            assert second == first
+            assert availability_cache.hits == hits_before + 1
+
+    def test_committed_stock_change_is_written_through(self, app, sample_inventory):
+        with app.app_context():
+            inventory = Inventory.query.filter_by(
+                product_id=sample_inventory[0].product_id, variant_id=None
+            ).first()
+            get_availability(inventory.product_id, None)
+
+            assert inventory.reserve_stock(2)
+            db.session.commit()
+
+            cached = availability_cache.get(inventory.product_id, None)
+            assert cached['reserved_quantity'] == 2
+            assert cached['available_quantity'] == inventory.stock_level - 2
+
+    def test_rolled_back_change_does_not_reach_cache(self, app, sample_inventory):
+        with app.app_context():
+            inventory = Inventory.query.filter_by(
+                product_id=sample_inventory[0].product_id, variant_id=None
+            ).first()
+            original = get_availability(inventory.product_id, None)
+
+            inventory.increase_stock(50)
+            db.session.flush()
+            db.session.rollback()
+
+            assert get_availability(inventory.product_id, None)['stock_level'] == original['stock_level']
+
+    def test_change_events_are_published(self, app, sample_inventory):
+        events = []
+
+        def listener(product_id, variant_id, snapshot):
+            events.append((product_id, variant_id, snapshot['stock_level']))
+
+        availability_cache.subscribe(listener)
+        try:
+            with app.app_context():
+                inventory = Inventory.query.filter_by(
+                    product_id=sample_inventory[0].product_id, variant_id=None
+                ).first()
+                inventory.increase_stock(3)
+                db.session.commit()
+                expected = (inventory.product_id, None, inventory.stock_level)
+        finally:
+            availability_cache.unsubscribe(listener)
+
+        assert expected in events
+
+    def test_per_process_backend_disables_cache_in_multi_worker_setups(self, app, sample_inventory):
+        app.config.update({'CACHE_TYPE': 'SimpleCache', 'INVENTORY_CACHE_ALLOW_LOCAL': False})
+        availability_cache.configure(app)
+        try:
+            with app.app_context():
+                product_id = sample_inventory[0].product_id
+                get_availability(product_id, None)
+                hits_before = availability_cache.hits
+                assert get_availability(product_id, None) is not None
+                assert availability_cache.hits == hits_before
+        finally:
+            app.config['INVENTORY_CACHE_ALLOW_LOCAL'] = True
+            availability_cache.configure(app)
+
+        app.config['CACHE_TYPE'] = 'RedisCache'
+        app.config['INVENTORY_CACHE_ALLOW_LOCAL'] = False
+        availability_cache.configure(app)
+        assert availability_cache.enabled
+        app.config['INVENTORY_CACHE_ALLOW_LOCAL'] = True
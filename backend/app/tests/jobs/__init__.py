@@ -0,0 +1,3 @@
+"""
+Test package for background job functionality.
+"""
@@ -0,0 +1,43 @@
+"""
+Pytest configuration and fixtures for background job tests.
+"""
+import pytest
+
+from app import create_app
+from app.configuration.extensions import db
+from app.services.jobs import job
+
+
+@pytest.fixture
+def app():
+    """Create application with a queued (non-eager) database broker."""
+    app = create_app('testing')
+    app.config.update({
+        'JOBS_EAGER': False,
+        'JOBS_BROKER': 'database',
+        'JOBS_BACKOFF_SECONDS': 0
+    })
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def recorder():
+    """Register test handlers that record their calls."""
+    calls = []
+
+    @job('test.record')
+    def record(value):
+        calls.append(value)
+        return True
+
+    @job('test.flaky', max_attempts=2)
+    def flaky(value):
+        calls.append(value)
+        raise RuntimeError('provider unavailable')
+
+    return calls
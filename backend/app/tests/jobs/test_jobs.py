@@ -0,0 +1,61 @@
+"""
+Tests for the durable background job queue.
+"""
+from app.configuration.extensions import db
+from app.models.models import BackgroundJob
+from app.services.jobs import DEAD, PENDING, SUCCEEDED, JobWorker, enqueue, job_stats
+
+
+class TestJobQueue:
+    """Database broker, worker, retries and idempotency."""
+
+    def test_enqueued_job_runs_in_worker(self, app, recorder):
+        job_id = enqueue('test.record', {'value': 'hello'})
+
+        assert recorder == []
+        assert db.session.get(BackgroundJob, job_id).status == PENDING
+
+        assert JobWorker(app).run_once() == 1
+        assert recorder == ['hello']
+        assert db.session.get(BackgroundJob, job_id).status == SUCCEEDED
+
+    def test_idempotency_key_deduplicates(self, app, recorder):
+        first = enqueue('test.record', {'value': 1}, idempotency_key='order-confirmation:42')
+        second = enqueue('test.record', {'value': 1}, idempotency_key='order-confirmation:42')
+
+        assert first == second
+        assert BackgroundJob.query.count() == 1
+
+    def test_failing_job_is_retried_then_dead_lettered(self, app, recorder):
+        job_id = enqueue('test.flaky', {'value': 'x'})
+        worker = JobWorker(app)
+
+        worker.run_once()
+        record = db.session.get(BackgroundJob, job_id)
+        assert record.status == PENDING
+        assert record.attempts == 1
+        assert 'provider unavailable' in record.last_error
+
+        worker.run_once()
+        db.session.expire_all()
+        record = db.session.get(BackgroundJob, job_id)
+        assert record.status == DEAD
+        assert record.attempts == 2
+        assert job_stats()['dead'] == 1
+
+    def test_eager_mode_runs_inline(self, app, recorder):
+        app.config['JOBS_EAGER'] = True
+
+        assert enqueue('test.record', {'value': 'now'}) is None
+        assert recorder == ['now']
+        assert BackgroundJob.query.count() == 0
+
+    def test_job_joins_callers_transaction(self, app, recorder):
+        enqueue('test.record', {'value': 'discarded'})
+        db.session.rollback()
+
+        assert BackgroundJob.query.count() == 0
+
+        job_id = enqueue('test.record', {'value': 'kept'})
+        db.session.commit()
+        assert db.session.get(BackgroundJob, job_id).status == PENDING
@@ -530,6 +530,15 @@ def setup_database(app):
         db.drop_all()
 
 
+@pytest.fixture(autouse=True)
+def reset_oauth_tokens():
+    """Start every test without a cached provider token"""
+    from app.services.token_cache import reset_token_caches
+    reset_token_caches()
+    yield
+    reset_token_caches()
+
+
 # Error simulation fixtures
 @pytest.fixture
 def simulate_db_error():
@@ -70,7 +70,7 @@ class TestMpesaAccessToken:
         """Create a test client"""
         return MpesaClient()
 
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_get_access_token_success(self, mock_get, client):
         """Test successful access token retrieval"""
         mock_response = Mock()
@@ -93,7 +93,7 @@ class TestMpesaAccessToken:
         assert 'Authorization' in call_args[1]['headers']
         assert call_args[1]['headers']['Authorization'].startswith('Basic ')
 
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_get_access_token_cached(self, mock_get, client):
         """Test that cached token is returned when valid"""
         # Set a cached token that hasn't expired
@@ -106,7 +106,7 @@ class TestMpesaAccessToken:
         # Should not make a new request
         mock_get.assert_not_called()
 
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_get_access_token_expired_cache(self, mock_get, client):
         """Test that new token is fetched when cached token is expired"""
         # Set an expired cached token
@@ -126,7 +126,7 @@ class TestMpesaAccessToken:
         assert token == 'new_token'
         mock_get.assert_called_once()
 
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_get_access_token_failure(self, mock_get, client):
         """Test access token retrieval failure"""
         mock_response = Mock()
@@ -138,7 +138,7 @@ class TestMpesaAccessToken:
 
         assert token is None
 
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_get_access_token_exception(self, mock_get, client):
         """Test access token retrieval with exception"""
         mock_get.side_effect = Exception('Network error')
@@ -188,7 +188,7 @@ class TestMpesaStkPush:
         """Create a test client"""
         return MpesaClient()
 
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_stk_push_success(self, mock_post, client):
         """Test successful STK push"""
         # Mock access token
@@ -222,7 +222,7 @@ class TestMpesaStkPush:
         assert 'Authorization' in call_args[1]['headers']
         assert call_args[1]['headers']['Authorization'] == 'Bearer test_token'
 
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_stk_push_no_access_token(self, mock_post, client):
         """Test STK push when access token is unavailable"""
         with patch.object(client, 'get_access_token', return_value=None):
@@ -237,7 +237,7 @@ class TestMpesaStkPush:
             assert result['ResponseCode'] == '1'
             assert 'Failed to get access token' in result['errorMessage']
 
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_stk_push_api_failure(self, mock_post, client):
         """Test STK push API failure"""
         client._access_token = 'test_token'
@@ -259,7 +259,7 @@ class TestMpesaStkPush:
         assert result['ResponseCode'] == '1'
         assert 'STK push failed' in result['errorMessage']
 
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_stk_push_exception(self, mock_post, client):
         """Test STK push with exception"""
         client._access_token = 'test_token'
@@ -287,7 +287,7 @@ class TestMpesaStkQuery:
         """Create a test client"""
         return MpesaClient()
 
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_query_stk_status_success(self, mock_post, client):
         """Test successful STK status query"""
         client._access_token = 'test_token'
@@ -309,7 +309,7 @@ class TestMpesaStkQuery:
         assert result['ResponseCode'] == '0'
         assert result['CheckoutRequestID'] == 'ws_CO_123456789'
 
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_query_stk_status_no_access_token(self, mock_post, client):
         """Test STK query when access token is unavailable"""
         with patch.object(client, 'get_access_token', return_value=None):
@@ -318,7 +318,7 @@ class TestMpesaStkQuery:
             assert result['ResponseCode'] == '1'
             assert 'Failed to get access token' in result['errorMessage']
 
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_query_stk_status_failure(self, mock_post, client):
         """Test STK query failure"""
         client._access_token = 'test_token'
@@ -549,8 +549,8 @@ class TestMpesaIntegrationScenarios:
         """Create a test client"""
         return MpesaClient()
 
-    @patch('requests.get')
-    @patch('requests.post')
+    @patch('requests.Session.get')
+    @patch('requests.Session.post')
     def test_complete_payment_flow_success(self, mock_post, mock_get, client):
         """Test complete successful payment flow"""
         # Mock access token
@@ -634,7 +634,7 @@ class TestMpesaErrorHandling:
         """Create a test client"""
         return MpesaClient()
 
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_network_timeout_handling(self, mock_get, client):
         """Test handling of network timeouts"""
         import requests
@@ -643,7 +643,7 @@ class TestMpesaErrorHandling:
         token = client.get_access_token()
         assert token is None
 
-    @patch('requests.post')
+    @patch('requests.Session.post')
     def test_connection_error_handling(self, mock_post, client):
         """Test handling of connection errors"""
         import requests
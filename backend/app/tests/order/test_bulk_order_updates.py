@@ -0,0 +1,112 @@
+"""
+Tests for the set-based admin bulk order update.
+"""
+import json
+from unittest.mock import patch
+
+from flask_jwt_extended import create_access_token
+
+from app.models.models import db, Order, OrderStatus, Product
+
+
+def _headers(user):
+    return {
+        'Authorization': f'Bearer {create_access_token(identity=str(user.id))}',
+        'Content-Type': 'application/json'
+    }
+
+
+def _bulk(client, admin_user, payload):
+    response = client.post('/api/admin/orders/bulk-update', headers=_headers(admin_user), data=json.dumps(payload))
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def _set_stock(products, quantity):
+    for product in products:
+        product.stock_quantity = quantity
+    db.session.commit()
+
+
+class TestBulkOrderUpdate:
+    """Orders are validated in memory and updated with one statement per action."""
+
+    def test_status_update_moves_stock_and_rejects_invalid_transitions(self, client, admin_user,
+                                                                        sample_orders, sample_products):
+        _set_stock(sample_products[:2], 10)
+        pending, processing, _ = sample_orders
+
+        body = _bulk(client, admin_user, {
+            'order_ids': [pending.id, processing.id, 999999],
+            'action': 'update_status',
+            'status': 'processing'
+        })
+
+        assert body['updated_count'] == 1
+        assert body['results'][0]['order_id'] == pending.id
+        assert body['results'][0]['inventory_updated'] is True
+        assert any('Invalid status transition' in error for error in body['errors'])
+        assert 'Order 999999 not found' in body['errors']
+
+        db.session.expire_all()
+        assert db.session.get(Order, pending.id).status == OrderStatus.PROCESSING
+        # Order items are 1 x product 0 and 2 x product 1
+        assert db.session.get(Product, sample_products[0].id).stock_quantity == 9
+        assert db.session.get(Product, sample_products[1].id).stock_quantity == 8
+
+    def test_insufficient_stock_rejects_the_order(self, client, admin_user, sample_orders, sample_products):
+        _set_stock(sample_products[:2], 1)
+        pending = sample_orders[0]
+
+        body = _bulk(client, admin_user, {
+            'order_ids': [pending.id],
+            'action': 'update_status',
+            'status': 'processing'
+        })
+
+        assert body['updated_count'] == 0
+        assert body['errors'][0].startswith(f"Insufficient stock for order {pending.id}")
+        db.session.expire_all()
+        assert db.session.get(Order, pending.id).status == OrderStatus.PENDING
+        assert db.session.get(Product, sample_products[0].id).stock_quantity == 1
+
+    def test_bulk_cancel_restores_stock_and_appends_notes(self, client, admin_user, sample_orders, sample_products):
+        _set_stock(sample_products[:2], 5)
+        sample_orders[1].notes = 'Existing note'
+        db.session.commit()
+
+        body = _bulk(client, admin_user, {
+            'order_ids': [order.id for order in sample_orders],
+            'action': 'bulk_cancel',
+            'reason': 'Out of season'
+        })
+
+        assert body['updated_count'] == 3
+        db.session.expire_all()
+        cancelled = [db.session.get(Order, order.id) for order in sample_orders]
+        assert {order.status for order in cancelled} == {OrderStatus.CANCELLED}
+        assert cancelled[0].notes.endswith('(Bulk): Order cancelled. Reason: Out of season')
+        assert cancelled[1].notes.startswith('Existing note\n[')
+        # Only the two orders that were processing give their stock back
+        assert db.session.get(Product, sample_products[0].id).stock_quantity == 7
+        assert db.session.get(Product, sample_products[1].id).stock_quantity == 9
+
+    def test_webhooks_are_queued_as_one_batch(self, app, client, admin_user, sample_orders):
+        app.config['WEBHOOK_URL'] = 'https://hooks.example.com/orders'
+        try:
+            with patch('app.routes.order.admin_order_routes.enqueue') as enqueue:
+                body = _bulk(client, admin_user, {
+                    'order_ids': [order.id for order in sample_orders[1:]],
+                    'action': 'update_status',
+                    'status': 'shipped',
+                    'notify_customers': False
+                })
+        finally:
+            app.config.pop('WEBHOOK_URL')
+
+        assert body['updated_count'] == 2
+        assert enqueue.call_count == 1
+        name, payload = enqueue.call_args.args
+        assert name == 'webhook.order_event_batch'
+        assert [event['order_id'] for event in payload['events']] == [order.id for order in sample_orders[1:]]
+        assert payload['events'][0]['data'] == {'old_status': 'processing', 'new_status': 'shipped'}
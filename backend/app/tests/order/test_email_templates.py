@@ -0,0 +1,102 @@
+"""
+Tests for the precompiled order email templates.
+"""
+import pytest
+from sqlalchemy import event
+
+from app.models.models import db, Order, OrderStatus
+from app.services.email_templates import (
+    build_order_snapshot, get_environment, load_orders, precompile, render_order_email,
+    render_order_emails
+)
+
+
+class TestEmailTemplates:
+    """Rendering order emails from eager-loaded snapshots."""
+
+    def test_every_template_compiles(self, app):
+        names = precompile()
+
+        assert 'layout.html' in names
+        assert 'order/confirmation.html' in names
+        assert get_environment().auto_reload is False
+
+    def test_confirmation_lists_items_and_totals(self, sample_orders, sample_products):
+        order = load_orders([sample_orders[0].id])[0]
+        snapshot = build_order_snapshot(order)
+
+        subject, html = render_order_email('confirmation', snapshot)
+
+        assert subject == f"Order Confirmation #{order.order_number} - MIZIZZI"
+        assert html.startswith('<!DOCTYPE html PUBLIC')
+        assert sample_products[0].name in html
+        assert 'M-Pesa' in html
+        assert snapshot['to_email'] in html
+
+    @pytest.mark.parametrize('status, subject_prefix', [
+        (OrderStatus.PROCESSING, 'Order Processing'),
+        (OrderStatus.SHIPPED, 'Your Order Has Shipped!'),
+        (OrderStatus.DELIVERED, 'Order Delivered'),
+        (OrderStatus.CANCELLED, 'Order Cancelled'),
+        (OrderStatus.RETURNED, 'Return Processed'),
+        (OrderStatus.REFUNDED, 'Order Status Update: Order Refunded'),
+    ])
+    def test_status_email_follows_order_status(self, sample_orders, status, subject_prefix):
+        order = sample_orders[0]
+        order.status = status
+        db.session.commit()
+
+        subject, html = render_order_email('status', build_order_snapshot(load_orders([order.id])[0]))
+
+        assert subject.startswith(subject_prefix)
+        assert order.order_number in html
+
+    def test_customer_values_are_escaped(self, sample_orders):
+        snapshot = build_order_snapshot(load_orders([sample_orders[0].id])[0],
+                                        customer_name='<script>x</script>')
+
+        _, html = render_order_email('refund', snapshot)
+
+        assert '<script>x</script>' not in html
+        assert '&lt;script&gt;' in html
+
+    def test_batch_render_loads_each_chunk_once(self, app, sample_orders):
+        statements = []
+
+        def count(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith('SELECT'):
+                statements.append(statement)
+
+        order_ids = [order.id for order in sample_orders]
+        db.session.expire_all()
+        engine = db.engine
+        event.listen(engine, 'before_cursor_execute', count)
+        try:
+            one_chunk = list(render_order_emails(order_ids))
+            per_chunk = len(statements)
+            statements.clear()
+            two_chunks = list(render_order_emails(order_ids, chunk_size=len(order_ids) - 1))
+        finally:
+            event.remove(engine, 'before_cursor_execute', count)
+
+        assert [email['order_id'] for email in one_chunk] == order_ids
+        assert [email['order_id'] for email in two_chunks] == order_ids
+        assert len(statements) == 2 * per_chunk
+
+    def test_batch_job_sends_rendered_emails_and_queues_only_failures(self, app, sample_orders):
+        from unittest.mock import patch
+        from app.models.models import BackgroundJob
+        from app.routes.order.order_email_templates import send_order_status_batch_job
+
+        app.config['JOBS_EAGER'] = False
+        order_ids = [order.id for order in sample_orders]
+        results = [False] + [True] * (len(order_ids) - 1)
+
+        with patch('app.routes.order.order_email_templates.send_email', side_effect=results) as mock_send:
+            assert send_order_status_batch_job(order_ids) == len(order_ids) - 1
+        db.session.commit()
+
+        assert mock_send.call_count == len(order_ids)
+        jobs = BackgroundJob.query.filter_by(name='email.order_status_update').all()
+        assert [job.payload['order_id'] for job in jobs] == [order_ids[0]]
+        assert 'html_content' not in jobs[0].payload
@@ -0,0 +1,48 @@
+"""
+Tests for the order number service.
+"""
+from app.models.models import Order, OrderStatus, PaymentStatus
+from app.services.order_numbers import (
+    _local_counter, format_order_number, next_order_number, parse_order_number
+)
+
+
+class TestOrderNumbers:
+    """Format and uniqueness of generated order numbers."""
+
+    def test_format_is_nine_digits_starting_with_three(self):
+        for value in (0, 1, 2, 99999999):
+            number = format_order_number(value)
+            assert len(number) == 9
+            assert number.startswith('3')
+            assert number.isdigit()
+
+    def test_format_round_trips(self):
+        for value in (1, 2, 12345, 99999999):
+            assert parse_order_number(format_order_number(value)) == value
+        assert parse_order_number('ORD-12345678') is None
+
+    def test_consecutive_numbers_are_unique_and_not_sequential(self, db_session):
+        _local_counter.reset()
+        numbers = [next_order_number() for _ in range(1000)]
+
+        assert len(set(numbers)) == len(numbers)
+        assert int(numbers[1]) - int(numbers[0]) != 1
+
+    def test_existing_numbers_are_skipped(self, db_session, sample_user):
+        _local_counter.reset()
+        assert next_order_number() == format_order_number(1)
+
+        # A legacy order already holds the number the counter would hand out next
+        db_session.add(Order(
+            user_id=sample_user.id,
+            order_number=format_order_number(2),
+            status=OrderStatus.PENDING,
+            payment_status=PaymentStatus.PENDING,
+            total_amount=10.0,
+            shipping_address={},
+            billing_address={}
+        ))
+        db_session.commit()
+
+        assert next_order_number() == format_order_number(3)
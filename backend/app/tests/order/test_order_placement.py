@@ -0,0 +1,129 @@
+"""
+Tests for the set-based stock reservation used by order placement.
+"""
+import pytest
+from unittest.mock import patch
+from flask_jwt_extended import create_access_token
+
+from app.models.models import db, Inventory
+from app.routes.order.order_routes import (
+    InsufficientStockError, lock_order_lines, update_inventory_on_order
+)
+
+
+def _headers(user):
+    return {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+
+
+class TestOrderPlacement:
+    """Locking and bulk reservation helpers used by create_order."""
+
+    def test_lock_order_lines_returns_rows_by_key(self, sample_products, sample_inventory):
+        lines = [
+            {'product_id': sample_products[1].id, 'variant_id': None, 'quantity': 1},
+            {'product_id': sample_products[0].id, 'variant_id': None, 'quantity': 2},
+        ]
+
+        products_by_id, inventory_by_key = lock_order_lines(lines)
+
+        assert set(products_by_id) == {sample_products[0].id, sample_products[1].id}
+        assert set(inventory_by_key) == {(sample_products[0].id, None), (sample_products[1].id, None)}
+
+    def test_bulk_reservation_updates_every_line(self, sample_products, sample_inventory):
+        order_items = [
+            {'product_id': sample_products[0].id, 'variant_id': None, 'quantity': 3},
+            {'product_id': sample_products[1].id, 'variant_id': None, 'quantity': 4},
+            {'product_id': sample_products[0].id, 'variant_id': None, 'quantity': 2},
+        ]
+        _, inventory_by_key = lock_order_lines(order_items)
+
+        keys = update_inventory_on_order(order_items, inventory_by_key)
+        db.session.commit()
+
+        assert set(keys) == {(sample_products[0].id, None), (sample_products[1].id, None)}
+        first = Inventory.query.filter_by(product_id=sample_products[0].id).first()
+        second = Inventory.query.filter_by(product_id=sample_products[1].id).first()
+        assert first.reserved_quantity == 5
+        assert second.reserved_quantity == 4
+
+    def test_bulk_reservation_is_all_or_nothing(self, sample_products, sample_inventory):
+        order_items = [
+            {'product_id': sample_products[0].id, 'variant_id': None, 'quantity': 1},
+            {'product_id': sample_products[1].id, 'variant_id': None, 'quantity': 101},
+        ]
+        _, inventory_by_key = lock_order_lines(order_items)
+
+        with pytest.raises(InsufficientStockError):
+            update_inventory_on_order(order_items, inventory_by_key)
+        db.session.rollback()
+
+        first = Inventory.query.filter_by(product_id=sample_products[0].id).first()
+        assert first.reserved_quantity == 0
+
+    def test_bulk_reservation_refuses_non_positive_quantities(self, sample_products, sample_inventory):
+        order_items = [
+            {'product_id': sample_products[0].id, 'variant_id': None, 'quantity': 2},
+            {'product_id': sample_products[1].id, 'variant_id': None, 'quantity': -5},
+        ]
+        _, inventory_by_key = lock_order_lines(order_items)
+
+        with pytest.raises(InsufficientStockError):
+            update_inventory_on_order(order_items, inventory_by_key)
+        db.session.rollback()
+
+        second = Inventory.query.filter_by(product_id=sample_products[1].id).first()
+        assert second.reserved_quantity == 0
+
+    def test_lines_without_inventory_are_skipped(self, sample_products):
+        order_items = [{'product_id': sample_products[0].id, 'variant_id': None, 'quantity': 1}]
+        _, inventory_by_key = lock_order_lines(order_items)
+
+        assert update_inventory_on_order(order_items, inventory_by_key) == []
+
+    def test_create_order_accepts_string_ids_and_reserves_stock(self, client, sample_user, sample_products,
+                                                                 sample_inventory):
+        response = client.post('/api/orders', headers=_headers(sample_user), json={
+            'payment_method': 'cod',
+            'shipping_address': {
+                'first_name': 'Jane', 'last_name': 'Doe', 'address_line1': '1 Moi Avenue',
+                'city': 'Nairobi', 'phone': '254712345678'
+            },
+            'items': [{'product_id': str(sample_products[0].id), 'quantity': '2'}]
+        })
+
+        assert response.status_code == 201, response.get_json()
+        inventory = Inventory.query.filter_by(product_id=sample_products[0].id).first()
+        assert inventory.reserved_quantity == 2
+
+    def test_rejected_order_rolls_back(self, client, sample_user, sample_products, sample_inventory):
+        with patch.object(db.session, 'rollback', wraps=db.session.rollback) as spy:
+            response = client.post('/api/orders', headers=_headers(sample_user), json={
+                'payment_method': 'cod',
+                'shipping_address': {
+                    'first_name': 'Jane', 'last_name': 'Doe', 'address_line1': '1 Moi Avenue',
+                    'city': 'Nairobi', 'phone': '254712345678'
+                },
+                'items': [{'product_id': sample_products[0].id, 'quantity': 100000}]
+            })
+
+        assert response.status_code == 400
+        assert spy.called
+
+    @pytest.mark.parametrize('quantity', [0, -3, '-1'])
+    def test_create_order_rejects_non_positive_quantities(self, client, sample_user, sample_products,
+                                                          sample_inventory, quantity):
+        response = client.post('/api/orders', headers=_headers(sample_user), json={
+            'payment_method': 'cod',
+            'shipping_address': {
+                'first_name': 'Jane', 'last_name': 'Doe', 'address_line1': '1 Moi Avenue',
+                'city': 'Nairobi', 'phone': '254712345678'
+            },
+            'items': [
+                {'product_id': sample_products[0].id, 'quantity': 2},
+                {'product_id': sample_products[1].id, 'quantity': quantity},
+            ]
+        })
+
+        assert response.status_code == 400
+        assert 'item 1' in response.get_json()['error']
+        assert Inventory.query.filter_by(product_id=sample_products[1].id).first().reserved_quantity == 0
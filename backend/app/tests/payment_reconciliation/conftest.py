@@ -0,0 +1,111 @@
+"""
+Pytest configuration and fixtures for payment status reconciliation tests.
+"""
+from datetime import datetime, timedelta, UTC
+
+import pytest
+
+from app import create_app
+from app.configuration.extensions import db
+from app.models.models import (
+    MpesaTransaction, Order, OrderStatus, PaymentStatus, PesapalTransaction, User, UserRole
+)
+from app.services.token_cache import reset_token_caches
+
+
+@pytest.fixture
+def app():
+    """Create application with queued (non-eager) jobs."""
+    app = create_app('testing')
+    app.config['JOBS_EAGER'] = False
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture(autouse=True)
+def reset_tokens():
+    reset_token_caches()
+    yield
+    reset_token_caches()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def user(app):
+    user = User(
+        name='Test User',
+        email='test@example.com',
+        role=UserRole.USER,
+        phone='+254712345678',
+        is_active=True,
+        email_verified=True
+    )
+    user.set_password('password123')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+@pytest.fixture
+def order(app, user):
+    order = Order(
+        user_id=user.id,
+        order_number='ORD-20261018-0001',
+        status=OrderStatus.PENDING,
+        payment_status=PaymentStatus.PENDING,
+        total_amount=1000.0,
+        shipping_address={'city': 'Nairobi', 'country': 'Kenya'},
+        billing_address={'city': 'Nairobi', 'country': 'Kenya'},
+        payment_method='card'
+    )
+    db.session.add(order)
+    db.session.commit()
+    return order
+
+
+def _due():
+    return datetime.now(UTC).replace(tzinfo=None) - timedelta(seconds=1)
+
+
+@pytest.fixture
+def pesapal_transaction(app, user, order):
+    transaction = PesapalTransaction(
+        user_id=user.id,
+        order_id=order.id,
+        amount=1000,
+        currency='KES',
+        email=user.email,
+        merchant_reference='MIZIZZI_TEST_1',
+        pesapal_tracking_id='TRK-1',
+        status='pending',
+        expires_at=datetime.now(UTC) + timedelta(hours=1),
+        next_status_check_at=_due()
+    )
+    db.session.add(transaction)
+    db.session.commit()
+    return transaction
+
+
+@pytest.fixture
+def mpesa_transaction(app, user, order):
+    transaction = MpesaTransaction(
+        user_id=user.id,
+        order_id=str(order.id),
+        transaction_type='stk_push',
+        checkout_request_id='ws_CO_1',
+        amount=1000,
+        phone_number='254712345678',
+        status='pending',
+        next_status_check_at=_due()
+    )
+    db.session.add(transaction)
+    db.session.commit()
+    return transaction
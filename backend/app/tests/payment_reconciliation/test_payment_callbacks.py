@@ -0,0 +1,111 @@
+"""
+Tests for the payment callback inbox.
+"""
+from unittest.mock import patch
+
+from app.configuration.extensions import db
+from app.models.models import (
+    BackgroundJob, MpesaTransaction, Order, PaymentCallback, PaymentStatus, PesapalTransaction
+)
+from app.services.jobs import JobWorker
+from app.services.payment_callbacks import PROCESSED, process_payment_callback
+
+
+def _stk_callback(checkout_request_id, result_code=0):
+    return {'Body': {'stkCallback': {
+        'MerchantRequestID': 'MR-1',
+        'CheckoutRequestID': checkout_request_id,
+        'ResultCode': result_code,
+        'ResultDesc': 'The service request is processed successfully.',
+        'CallbackMetadata': {'Item': [
+            {'Name': 'Amount', 'Value': 1000},
+            {'Name': 'MpesaReceiptNumber', 'Value': 'QGH7X1Y2Z3'}
+        ]}
+    }}}
+
+
+class TestPaymentCallbackInbox:
+    """Callbacks are stored and acknowledged, then applied once by the worker."""
+
+    def test_mpesa_callback_is_acknowledged_then_applied(self, app, client, mpesa_transaction, order):
+        response = client.post('/api/mpesa/callback', json=_stk_callback('ws_CO_1'))
+
+        assert response.status_code == 200
+        assert response.get_json()['ResultCode'] == 0
+        # Nothing is applied inside the request
+        assert db.session.get(MpesaTransaction, mpesa_transaction.id).status == 'pending'
+        assert PaymentCallback.query.filter_by(provider='mpesa', reference='ws_CO_1').count() == 1
+
+        with patch('app.websocket.broadcast_to_user'):
+            JobWorker(app).run_once()
+
+        db.session.expire_all()
+        transaction = db.session.get(MpesaTransaction, mpesa_transaction.id)
+        assert transaction.status == 'completed'
+        assert transaction.mpesa_receipt_number == 'QGH7X1Y2Z3'
+        assert db.session.get(Order, order.id).payment_status == PaymentStatus.PAID
+        assert PaymentCallback.query.one().status == PROCESSED
+
+    def test_duplicate_deliveries_share_one_inbox_entry(self, app, client, mpesa_transaction):
+        client.post('/api/mpesa/callback', json=_stk_callback('ws_CO_1'))
+        client.post('/api/mpesa/callback', json=_stk_callback('ws_CO_1'))
+
+        callback = PaymentCallback.query.one()
+        assert callback.deliveries == 2
+        assert BackgroundJob.query.count() == 1
+
+    def test_processing_an_entry_twice_is_a_no_op(self, app, client, mpesa_transaction):
+        client.post('/api/mpesa/callback', json=_stk_callback('ws_CO_1', result_code=1032))
+        callback_id = PaymentCallback.query.one().id
+
+        with patch('app.websocket.broadcast_to_user') as broadcast:
+            process_payment_callback(callback_id)
+            process_payment_callback(callback_id)
+
+        assert broadcast.call_count == 1
+        assert db.session.get(MpesaTransaction, mpesa_transaction.id).status == 'cancelled'
+
+    def test_pesapal_ipn_is_applied_from_the_status_query(self, app, client, pesapal_transaction, order):
+        response = client.get('/api/pesapal/callback', query_string={
+            'OrderTrackingId': 'TRK-1',
+            'OrderMerchantReference': 'MIZIZZI_TEST_1',
+            'OrderNotificationType': 'IPNCHANGE'
+        })
+
+        assert response.status_code == 200
+        assert db.session.get(PesapalTransaction, pesapal_transaction.id).status == 'pending'
+
+        completed = {'status': 'success', 'data': {'status': 'success', 'payment_status': 'COMPLETED',
+                                                   'confirmation_code': 'CONF9'}}
+        with patch('app.services.payment_callbacks.query_pesapal_status', return_value=completed), \
+                patch('app.websocket.broadcast_to_user'):
+            JobWorker(app).run_once()
+
+        db.session.expire_all()
+        assert db.session.get(PesapalTransaction, pesapal_transaction.id).status == 'completed'
+        assert db.session.get(Order, order.id).payment_status == PaymentStatus.PAID
+
+    def test_pesapal_ipn_backfills_a_missing_tracking_id(self, app, client, pesapal_transaction, order):
+        pesapal_transaction.pesapal_tracking_id = None
+        db.session.commit()
+
+        response = client.get('/api/pesapal/callback', query_string={
+            'OrderTrackingId': 'TRK-NEW',
+            'OrderMerchantReference': 'MIZIZZI_TEST_1',
+            'OrderNotificationType': 'IPNCHANGE'
+        })
+
+        assert response.status_code == 200
+        db.session.expire_all()
+        assert db.session.get(PesapalTransaction, pesapal_transaction.id).pesapal_tracking_id == 'TRK-NEW'
+        assert PaymentCallback.query.one().reference == 'TRK-NEW'
+
+        completed = {'status': 'success', 'data': {'status': 'success', 'payment_status': 'COMPLETED',
+                                                   'confirmation_code': 'CONF9'}}
+        with patch('app.services.payment_callbacks.query_pesapal_status', return_value=completed) as query, \
+                patch('app.websocket.broadcast_to_user'):
+            JobWorker(app).run_once()
+
+        query.assert_called_once_with('TRK-NEW')
+        db.session.expire_all()
+        assert db.session.get(PesapalTransaction, pesapal_transaction.id).status == 'completed'
@@ -0,0 +1,112 @@
+"""
+Tests for the payment status reconciliation worker.
+"""
+from datetime import datetime, timedelta, UTC
+from unittest.mock import patch
+
+from flask_jwt_extended import create_access_token
+
+from app.configuration.extensions import db
+from app.models.models import (
+    BackgroundJob, MpesaTransaction, Order, OrderStatus, PaymentStatus, PesapalTransaction
+)
+from app.services.payment_reconciliation import PaymentReconciler
+
+PESAPAL_COMPLETED = {'status': 'success', 'data': {
+    'status': 'success', 'payment_status': 'COMPLETED', 'payment_method': 'Visa',
+    'confirmation_code': 'CONF123', 'payment_account': '****1234'
+}}
+PESAPAL_PENDING = {'status': 'success', 'data': {'status': 'success', 'payment_status': 'PENDING'}}
+
+
+def _headers(user):
+    return {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+
+
+class TestPaymentReconciler:
+    """Batch polling, write-once application and notification."""
+
+    def test_completed_card_payment_settles_order_and_notifies(self, app, pesapal_transaction, order):
+        with patch('app.services.payment_reconciliation.query_pesapal_status', return_value=PESAPAL_COMPLETED), \
+                patch('app.websocket.broadcast_to_user') as broadcast:
+            assert PaymentReconciler(app).run_once() == 1
+
+        transaction = db.session.get(PesapalTransaction, pesapal_transaction.id)
+        assert transaction.status == 'completed'
+        assert transaction.pesapal_receipt_number == 'CONF123'
+        assert transaction.last_four_digits == '1234'
+        assert transaction.next_status_check_at is None
+
+        settled = db.session.get(Order, order.id)
+        assert settled.payment_status == PaymentStatus.PAID
+        assert settled.status == OrderStatus.CONFIRMED
+
+        assert BackgroundJob.query.filter_by(idempotency_key=f"order-confirmation:{order.id}").count() == 1
+        broadcast.assert_called_once()
+        user_id, event, data = broadcast.call_args[0]
+        assert event == 'payment_status'
+        assert data['status'] == 'completed'
+
+    def test_pending_payment_is_rescheduled_with_backoff(self, app, pesapal_transaction):
+        reconciler = PaymentReconciler(app)
+        with patch('app.services.payment_reconciliation.query_pesapal_status', return_value=PESAPAL_PENDING):
+            assert reconciler.run_once() == 1
+            # Not due again until the backoff has elapsed
+            assert reconciler.run_once() == 0
+
+        transaction = db.session.get(PesapalTransaction, pesapal_transaction.id)
+        assert transaction.status == 'pending'
+        assert transaction.status_check_count == 1
+        assert transaction.next_status_check_at > datetime.now(UTC).replace(tzinfo=None)
+
+    def test_expired_card_payment_is_closed(self, app, pesapal_transaction):
+        pesapal_transaction.expires_at = datetime.now(UTC) - timedelta(minutes=1)
+        db.session.commit()
+
+        with patch('app.services.payment_reconciliation.query_pesapal_status', return_value=PESAPAL_PENDING):
+            PaymentReconciler(app).run_once()
+
+        assert db.session.get(PesapalTransaction, pesapal_transaction.id).status == 'expired'
+
+    def test_result_is_not_applied_over_a_callback(self, app, mpesa_transaction, order):
+        transaction_id = mpesa_transaction.id
+
+        def callback_wins(checkout_request_id):
+            # The provider callback settles the payment while the query is in flight
+            MpesaTransaction.query.filter_by(id=transaction_id).update({'status': 'cancelled'})
+            db.session.commit()
+            return {'ResponseCode': '0', 'ResultCode': '0', 'ResultDesc': 'Success'}
+
+        with patch('app.services.payment_reconciliation.query_mpesa_status', side_effect=callback_wins):
+            PaymentReconciler(app).run_once()
+
+        db.session.expire_all()
+        assert db.session.get(MpesaTransaction, transaction_id).status == 'cancelled'
+        assert db.session.get(Order, order.id).payment_status == PaymentStatus.PENDING
+
+    def test_cancelled_stk_push_is_recorded(self, app, mpesa_transaction):
+        response = {'ResponseCode': '0', 'ResultCode': '1032', 'ResultDesc': 'Request cancelled by user'}
+        with patch('app.services.payment_reconciliation.query_mpesa_status', return_value=response):
+            PaymentReconciler(app).run_once()
+
+        transaction = db.session.get(MpesaTransaction, mpesa_transaction.id)
+        assert transaction.status == 'cancelled'
+        assert transaction.result_code == '1032'
+
+
+class TestStatusEndpoints:
+    """Status endpoints read local state without calling the provider."""
+
+    def test_mpesa_status_does_not_query_provider(self, client, user, mpesa_transaction):
+        with patch('app.utils.mpesa_utils.MpesaClient.query_stk_status', side_effect=AssertionError):
+            response = client.get(f'/api/mpesa/status/{mpesa_transaction.id}', headers=_headers(user))
+
+        assert response.status_code == 200
+        assert response.get_json()['status'] == 'pending'
+
+    def test_card_status_does_not_query_provider(self, client, pesapal_transaction):
+        with patch('app.routes.payments.pesapal_routes.get_transaction_status', side_effect=AssertionError):
+            response = client.get(f'/api/pesapal/card/status/{pesapal_transaction.id}')
+
+        assert response.status_code == 200
+        assert response.get_json()['transaction_status'] == 'pending'
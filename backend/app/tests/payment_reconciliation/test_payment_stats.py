@@ -0,0 +1,88 @@
+"""
+Tests for SQL-aggregated payment statistics and daily rollups.
+"""
+from datetime import datetime, timedelta, UTC
+
+from flask_jwt_extended import create_access_token
+
+from app.configuration.extensions import db
+from app.models.models import MpesaTransaction, PaymentDailyStat, PesapalTransaction, User, UserRole
+from app.services.payment_stats import payment_stats
+
+
+def _now():
+    return datetime.now(UTC).replace(tzinfo=None)
+
+
+def _card(user, order, reference, status, amount, created_at, card_type=None):
+    transaction = PesapalTransaction(
+        user_id=user.id, order_id=order.id, amount=amount, currency='KES', email=user.email,
+        merchant_reference=reference, status=status, payment_method='Visa' if card_type else None,
+        card_type=card_type, created_at=created_at
+    )
+    db.session.add(transaction)
+    return transaction
+
+
+class TestPaymentStats:
+    """Aggregates combine closed-day rollups with live partial days."""
+
+    def test_totals_combine_rollups_and_live_days(self, app, user, order):
+        ten_days_ago = (_now() - timedelta(days=10)).replace(hour=9)
+        _card(user, order, 'R1', 'completed', 100, ten_days_ago, 'VISA')
+        _card(user, order, 'R2', 'failed', 50, ten_days_ago)
+        _card(user, order, 'R3', 'completed', 200, _now(), 'MASTERCARD')
+        db.session.commit()
+
+        stats = payment_stats('pesapal')
+
+        assert stats['total_transactions'] == 3
+        assert stats['by_status']['completed'] == {'count': 2, 'amount': 300.0}
+        assert stats['by_status']['failed'] == {'count': 1, 'amount': 50.0}
+        assert stats['card_types'] == {'VISA': 1, 'MASTERCARD': 1}
+        assert stats['payment_methods']['Visa'] == {'count': 2, 'total_amount': 300.0}
+
+        # Closed days were rolled up, including empty ones; today was not
+        rolled_days = {row.day for row in PaymentDailyStat.query.filter_by(provider='pesapal')}
+        assert ten_days_ago.date() in rolled_days
+        assert (ten_days_ago + timedelta(days=1)).date() in rolled_days
+        assert _now().date() not in rolled_days
+
+        rows = PaymentDailyStat.query.count()
+        assert payment_stats('pesapal') == stats
+        assert PaymentDailyStat.query.count() == rows
+
+    def test_partial_days_are_aggregated_live(self, app, user, order):
+        day = (_now() - timedelta(days=10)).replace(hour=0, minute=0, second=0, microsecond=0)
+        _card(user, order, 'R1', 'completed', 100, day + timedelta(hours=8))
+        _card(user, order, 'R2', 'completed', 70, day + timedelta(hours=14))
+        db.session.commit()
+
+        stats = payment_stats('pesapal', day + timedelta(hours=12), day + timedelta(days=3))
+
+        assert stats['total_transactions'] == 1
+        assert stats['by_status']['completed']['amount'] == 70.0
+        assert stats['daily'][day.date()]['completed'] == 1
+
+    def test_mpesa_admin_stats_endpoint(self, app, client, user):
+        admin = User(name='Admin', email='admin@example.com', role=UserRole.ADMIN, is_active=True,
+                     email_verified=True)
+        admin.set_password('admin123')
+        db.session.add(admin)
+        for i, (status, amount, age) in enumerate([('completed', 500, 40), ('completed', 300, 1), ('failed', 100, 1)]):
+            db.session.add(MpesaTransaction(
+                user_id=user.id, transaction_type='stk_push', checkout_request_id=f'ws_CO_{i}',
+                amount=amount, status=status, created_at=_now() - timedelta(days=age)
+            ))
+        db.session.commit()
+
+        token = create_access_token(identity=str(admin.id))
+        response = client.get('/api/mpesa/admin/stats?days=30', headers={'Authorization': f'Bearer {token}'})
+
+        assert response.status_code == 200, response.get_json()
+        body = response.get_json()
+        assert body['total_transactions'] == 3
+        assert body['recent_transactions'] == 2
+        assert body['total_amount'] == 800.0
+        assert body['recent_amount'] == 300.0
+        assert body['status_counts'] == {'completed': 2, 'failed': 1}
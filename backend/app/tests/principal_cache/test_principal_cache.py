@@ -0,0 +1,71 @@
+"""
+Tests for the request-scoped principal and the short-TTL principal cache.
+"""
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+
+from app.configuration.extensions import db
+from app.models.models import UserRole
+
+
+def _user_selects():
+    """Capture the by-primary-key user loads made while a test runs."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        if 'FROM users' in statement and 'WHERE users.id = ?' in statement:
+            statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    return statements, lambda: event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+
+class TestRequestPrincipal:
+    def test_admin_requests_load_the_user_at_most_once_then_use_the_cache(self, client, admin_token):
+        headers = {'Authorization': f'Bearer {admin_token}'}
+        statements, stop = _user_selects()
+        try:
+            assert client.get('/api/admin/dashboard/', headers=headers).status_code == 200
+            first = len(statements)
+            assert client.get('/api/admin/dashboard/', headers=headers).status_code == 200
+        finally:
+            stop()
+
+        assert first <= 1
+        assert len(statements) == first
+
+    def test_products_listing_checks_admin_once(self, client, admin_token):
+        headers = {'Authorization': f'Bearer {admin_token}'}
+        statements, stop = _user_selects()
+        try:
+            response = client.get('/api/products/?include_inactive=true', headers=headers)
+        finally:
+            stop()
+
+        assert response.status_code == 200
+        assert len(statements) <= 1
+
+    def test_demotion_takes_effect_on_next_request(self, client, admin_user, admin_token):
+        headers = {'Authorization': f'Bearer {admin_token}'}
+        assert client.get('/api/admin/dashboard/', headers=headers).status_code == 200
+
+        admin_user.role = UserRole.USER
+        db.session.commit()
+
+        assert client.get('/api/admin/dashboard/', headers=headers).status_code == 403
+
+    def test_deactivation_takes_effect_on_next_request(self, client, admin_user, admin_token):
+        headers = {'Authorization': f'Bearer {admin_token}'}
+        assert client.get('/api/admin/dashboard/', headers=headers).status_code == 200
+
+        admin_user.is_active = False
+        db.session.commit()
+
+        assert client.get('/api/admin/dashboard/', headers=headers).status_code == 401
+
+    def test_principal_is_not_shared_between_requests(self, client, admin_token, customer):
+        customer_token = create_access_token(identity=str(customer.id))
+
+        assert client.get('/api/admin/dashboard/', headers={'Authorization': f'Bearer {admin_token}'}).status_code == 200
+        assert client.get('/api/admin/dashboard/',
+                          headers={'Authorization': f'Bearer {customer_token}'}).status_code == 403
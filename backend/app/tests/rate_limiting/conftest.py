@@ -0,0 +1,44 @@
+"""
+Pytest configuration and fixtures for rate limiting tests.
+"""
+import pytest
+from flask import Blueprint, Flask, jsonify
+from flask_limiter import Limiter
+
+from app.configuration.rate_limiting import client_address, init_rate_limiting
+
+
+@pytest.fixture
+def limited_app():
+    """A bare app with its own limiter and blueprints named like the profiled ones."""
+    app = Flask(__name__)
+    app.config.update(
+        TESTING=True,
+        RATELIMIT_STORAGE_URI='memory://',
+        RATELIMIT_STRATEGY='moving-window',
+        RATE_LIMIT_PROFILES={'search': '3 per minute', 'auth': '2 per minute'},
+        RATE_LIMIT_LOCAL_BLOCK_SECONDS=10,
+    )
+    limiter = Limiter(key_func=client_address)
+    limiter.init_app(app)
+
+    search = Blueprint('user_search_routes', __name__)
+    search.add_url_rule('/search', 'search', lambda: jsonify(ok=True))
+    auth = Blueprint('validation_routes', __name__)
+    auth.add_url_rule('/login', 'login', lambda: jsonify(ok=True), methods=['POST', 'OPTIONS'])
+    auth.add_url_rule('/profile', 'profile', lambda: jsonify(ok=True))
+    app.register_blueprint(search)
+    app.register_blueprint(auth)
+
+    @app.errorhandler(429)
+    def ratelimit_handler(e):
+        return jsonify({"error": "Rate limit exceeded"}), 429
+
+    init_rate_limiting(app, limiter)
+    app.limiter = limiter
+    return app
+
+
+@pytest.fixture
+def client(limited_app):
+    return limited_app.test_client()
@@ -0,0 +1,58 @@
+"""
+Tests for rate-limit profiles, client keys and the local block list.
+"""
+import time
+
+from app.configuration.rate_limiting import LocalBlocks
+
+
+class TestProfiles:
+    """Blueprint profiles from RATE_LIMIT_PROFILES."""
+
+    def test_search_profile_limits_the_blueprint(self, client):
+        statuses = [client.get('/search').status_code for _ in range(4)]
+        assert statuses == [200, 200, 200, 429]
+
+    def test_auth_profile_only_covers_auth_endpoints(self, client):
+        assert [client.post('/login').status_code for _ in range(3)] == [200, 200, 429]
+        assert all(client.get('/profile').status_code == 200 for _ in range(5))
+
+    def test_preflight_is_never_limited(self, client):
+        for _ in range(5):
+            assert client.open('/login', method='OPTIONS').status_code == 200
+
+    def test_clients_behind_a_trusted_proxy_get_their_own_budget(self, limited_app, client):
+        limited_app.config['RATE_LIMIT_TRUSTED_PROXIES'] = 1
+        for _ in range(3):
+            assert client.get('/search', headers={'X-Forwarded-For': '10.0.0.1'}).status_code == 200
+        assert client.get('/search', headers={'X-Forwarded-For': '10.0.0.1'}).status_code == 429
+        assert client.get('/search', headers={'X-Forwarded-For': '10.0.0.2'}).status_code == 200
+
+
+class TestLocalBlocks:
+    """Refused clients are refused again without touching storage."""
+
+    def test_refused_client_is_blocked_locally(self, limited_app, client):
+        for _ in range(4):
+            client.get('/search')
+        blocks = limited_app.extensions['rate_limit_blocks']
+        assert blocks
+
+        # Only the local check sets Retry-After (limiter headers are off)
+        response = client.get('/search')
+        assert response.status_code == 429
+        assert int(response.headers['Retry-After']) >= 1
+
+    def test_blocks_expire(self):
+        blocks = LocalBlocks()
+        blocks.block(('1.2.3.4', 'search'), 0.05)
+        assert blocks.remaining(('1.2.3.4', 'search')) > 0
+        time.sleep(0.06)
+        assert blocks.remaining(('1.2.3.4', 'search')) == 0
+        assert not blocks
+
+    def test_block_list_is_bounded(self):
+        blocks = LocalBlocks(max_entries=2)
+        for address in ('a', 'b', 'c'):
+            blocks.block((address, 'search'), 60)
+        assert blocks.remaining(('c', 'search')) == 0
@@ -0,0 +1,37 @@
+"""
+Pytest configuration and fixtures for realtime fan-out and presence tests.
+"""
+import pytest
+
+from app import create_app
+from app.services.realtime import reset_presence
+
+
+class RecordingSocketIO:
+    """Stands in for a SocketIO server; records what would go on the message queue."""
+
+    def __init__(self):
+        self.emitted = []
+
+    def emit(self, event, data, room=None, namespace=None):
+        self.emitted.append((event, data, room))
+
+
+@pytest.fixture
+def app():
+    """Create application for testing."""
+    app = create_app('testing', enable_socketio=False)
+    with app.app_context():
+        yield app
+
+
+@pytest.fixture
+def socketio():
+    return RecordingSocketIO()
+
+
+@pytest.fixture(autouse=True)
+def clear_presence():
+    reset_presence()
+    yield
+    reset_presence()
@@ -0,0 +1,105 @@
+"""
+Tests for realtime fan-out, coalescing and shared presence.
+"""
+from app.services.realtime import (
+    ADMIN_ROOM,
+    LocalPresenceStore,
+    Realtime,
+    get_realtime,
+    realtime_message_queue,
+)
+
+
+class TestPresence:
+    """Presence shared by several servers."""
+
+    def test_stats_cover_every_worker(self, socketio):
+        presence = LocalPresenceStore()
+        first = Realtime(socketio, presence, background=False)
+        second = Realtime(socketio, presence, background=False)
+
+        first.connected('sid-1', 7, 'user')
+        second.connected('sid-2', 8, 'admin')
+        second.joined('sid-2', ADMIN_ROOM)
+
+        stats = first.stats()
+        assert stats['total_clients'] == 2
+        assert stats['clients_by_type']['admin'] == 1
+        assert stats['local_clients'] == 1
+        assert first.is_online(8)
+        assert presence.room_sids(ADMIN_ROOM) == ['sid-2']
+
+    def test_authenticating_keeps_rooms(self, socketio):
+        realtime = Realtime(socketio, LocalPresenceStore(), background=False)
+        realtime.connected('sid-1')
+        realtime.joined('sid-1', 'product_3')
+        realtime.connected('sid-1', 5, 'user')
+
+        info = realtime.client_info('sid-1')
+        assert info['user_id'] == '5'
+        assert info['rooms'] == {'product_3'}
+        assert realtime.stats()['clients_by_type'] == {'admin': 0, 'user': 1, 'guest': 0}
+
+    def test_disconnect_removes_socket(self, socketio):
+        realtime = Realtime(socketio, LocalPresenceStore(), background=False)
+        realtime.connected('sid-1', 5, 'user')
+        realtime.disconnected('sid-1')
+
+        assert not realtime.is_online(5)
+        assert realtime.stats()['total_clients'] == 0
+
+
+class TestCoalescing:
+    """High-frequency events are collapsed per room and key."""
+
+    def test_latest_value_per_key_wins(self, socketio):
+        realtime = Realtime(socketio, LocalPresenceStore(), coalesce_seconds=1, background=False)
+        for stock in (5, 4, 3):
+            realtime.emit_coalesced('stock_update', {'product_id': 1, 'stock': stock}, 'product_1', key=1)
+
+        assert socketio.emitted == []
+        assert realtime.flush() == 1
+        assert socketio.emitted == [('stock_update', {'product_id': 1, 'stock': 3}, 'product_1')]
+
+    def test_several_keys_go_out_as_one_batch(self, socketio):
+        realtime = Realtime(socketio, LocalPresenceStore(), coalesce_seconds=1, background=False)
+        for product_id in (1, 2, 3):
+            realtime.emit_coalesced('admin_stock_update', {'product_id': product_id}, ADMIN_ROOM, key=product_id)
+
+        realtime.flush()
+        assert len(socketio.emitted) == 1
+        event, data, room = socketio.emitted[0]
+        assert (event, room, data['count']) == ('admin_stock_update_batch', ADMIN_ROOM, 3)
+
+    def test_zero_interval_emits_immediately(self, socketio):
+        realtime = Realtime(socketio, LocalPresenceStore(), coalesce_seconds=0, background=False)
+        realtime.emit_coalesced('stock_update', {'stock': 1}, 'product_1', key=1)
+
+        assert socketio.emitted == [('stock_update', {'stock': 1}, 'product_1')]
+
+
+class TestRealtimeConfiguration:
+    """Selecting the message queue and the app's realtime layer."""
+
+    def test_message_queue_follows_backend(self):
+        assert realtime_message_queue({'REALTIME_BACKEND': 'local'}) is None
+        assert realtime_message_queue({'REALTIME_BACKEND': 'redis',
+                                       'REALTIME_REDIS_URL': 'redis://cache:6379/1'}) == 'redis://cache:6379/1'
+        assert realtime_message_queue({'REALTIME_BACKEND': 'local',
+                                       'SOCKETIO_MESSAGE_QUEUE': 'redis://mq:6379/0'}) == 'redis://mq:6379/0'
+
+    def test_app_uses_local_presence_without_socketio(self, app):
+        realtime = get_realtime()
+        assert realtime.presence.name == 'local'
+        assert realtime.emit('anything', {}) is False
+
+    def test_broadcasts_go_through_the_realtime_layer(self, app, socketio):
+        from app.websocket import broadcast_order_update
+
+        get_realtime().socketio = socketio
+        broadcast_order_update(10, 'shipped', 4)
+
+        assert [(event, room) for event, _, room in socketio.emitted] == [
+            ('order_status_changed', 'user_4'),
+            ('admin_order_update', ADMIN_ROOM),
+        ]
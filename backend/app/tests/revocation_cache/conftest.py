@@ -0,0 +1,46 @@
+"""
+Pytest configuration and fixtures for the JWT revocation cache tests.
+"""
+import pytest
+from flask_jwt_extended import create_access_token
+
+from app import create_app
+from app.configuration.extensions import db
+from app.models.models import User, UserRole
+
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def admin_user(app):
+    admin = User(
+        name='Admin User',
+        email='admin@example.com',
+        role=UserRole.ADMIN,
+        phone='+254712345679',
+        is_active=True,
+        email_verified=True
+    )
+    admin.set_password('adminpass123')
+    db.session.add(admin)
+    db.session.commit()
+    return admin
+
+
+@pytest.fixture
+def admin_token(admin_user):
+    return create_access_token(identity=str(admin_user.id))
@@ -0,0 +1,100 @@
+"""
+Tests for the per-worker JWT revocation cache.
+"""
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from flask_jwt_extended import decode_token
+from sqlalchemy import event
+
+from app.configuration.extensions import db
+from app.models.models import TokenBlacklist
+from app.routes.admin.admin_auth import blacklist_token, is_token_blacklisted
+from app.services.revocation_cache import get_revocation_cache
+
+
+def _count_queries():
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    return statements, lambda: event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+
+def _revoke_elsewhere(jti, user_id, expires_at):
+    """Insert a revocation the way another worker would, bypassing this worker's cache."""
+    db.session.add(TokenBlacklist(jti=jti, token_type='access', user_id=user_id, expires_at=expires_at))
+    db.session.commit()
+
+
+class TestRevocationCache:
+    def test_unrevoked_tokens_are_decided_without_a_query(self, app, admin_user):
+        assert is_token_blacklisted('never-revoked') is False
+
+        statements, stop = _count_queries()
+        try:
+            for i in range(20):
+                assert is_token_blacklisted(f'never-revoked-{i}') is False
+        finally:
+            stop()
+        assert statements == []
+
+    def test_local_revocation_is_visible_immediately(self, app, admin_user):
+        assert is_token_blacklisted('jti-1') is False
+
+        blacklist_token('jti-1', 'access', admin_user.id, datetime.utcnow() + timedelta(hours=1))
+
+        assert is_token_blacklisted('jti-1') is True
+
+    def test_revocations_from_other_workers_arrive_on_refresh(self, app, admin_user):
+        cache = get_revocation_cache()
+        assert is_token_blacklisted('jti-2') is False
+
+        _revoke_elsewhere('jti-2', admin_user.id, datetime.utcnow() + timedelta(hours=1))
+        cache.refresh(force=True)
+
+        assert is_token_blacklisted('jti-2') is True
+        assert len(cache) == 1
+
+    def test_expired_revocations_are_pruned(self, app, admin_user):
+        cache = get_revocation_cache()
+        cache.add('expired-jti', datetime.utcnow() - timedelta(minutes=1))
+        cache.add('live-jti', datetime.utcnow() + timedelta(minutes=1))
+        cache._pruned_at = 0.0
+
+        cache.refresh(force=True)
+
+        assert is_token_blacklisted('expired-jti') is False
+        assert is_token_blacklisted('live-jti') is True
+
+    def test_refresh_leaves_the_request_session_alone(self, app, admin_user):
+        cache = get_revocation_cache()
+        pending = TokenBlacklist(jti='pending-jti', token_type='access', user_id=admin_user.id,
+                                 expires_at=datetime.utcnow() + timedelta(hours=1))
+        db.session.add(pending)
+
+        cache.refresh(force=True)
+        with patch.object(cache, '_since', 'not a datetime'):
+            cache.refresh(force=True)  # fails building the query
+
+        assert pending in db.session.new
+
+    def test_falls_back_to_database_when_disabled(self, app, admin_user):
+        app.extensions.pop('revocation_cache')
+        _revoke_elsewhere('jti-3', admin_user.id, datetime.utcnow() + timedelta(hours=1))
+
+        assert is_token_blacklisted('jti-3') is True
+        assert is_token_blacklisted('jti-4') is False
+
+
+class TestRevokedTokensAreRejected:
+    def test_revoked_token_is_rejected_by_protected_routes(self, app, client, admin_user, admin_token):
+        headers = {'Authorization': f'Bearer {admin_token}'}
+        assert client.get('/api/admin/dashboard/', headers=headers).status_code == 200
+
+        claims = decode_token(admin_token)
+        blacklist_token(claims['jti'], 'access', admin_user.id, datetime.utcfromtimestamp(claims['exp']))
+
+        assert client.get('/api/admin/dashboard/', headers=headers).status_code == 401
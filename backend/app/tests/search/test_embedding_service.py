@@ -63,6 +63,7 @@ class TestEmbeddingService:
 
         with patch.object(EmbeddingService, '_load_or_create_index'):
             service = EmbeddingService()
+            assert service.ensure_loaded()
 
             assert service.is_available()
             assert service.model == mock_model
@@ -484,6 +485,7 @@ class TestEmbeddingServiceFileOperations:
 
         with patch('os.path.exists', return_value=False):
             service = EmbeddingService()
+            service.ensure_loaded()
             service.available = True
             service.embedding_dim = 384
 
@@ -626,6 +628,7 @@ class TestEmbeddingServiceIntegration:
         # Create service with mocked dependencies
         with patch('os.path.exists', return_value=False):
             service = EmbeddingService()
+            service.ensure_loaded()
             service.available = True
             service.embedding_dim = 384
 
@@ -0,0 +1,100 @@
+"""
+Tests for startup phase timing, background warm-up and import-time profiling.
+"""
+import click
+
+from app import create_app
+from app.configuration.config import TestingConfig
+from app.services.startup import (
+    FAILED, PENDING, READY, Startup, get_startup, parse_importtime, serves_requests
+)
+
+
+class TestStartup:
+    def test_marks_record_phases(self):
+        startup = Startup()
+        startup.mark('extensions')
+        startup.mark('blueprints')
+
+        assert set(startup.phases) == {'extensions', 'blueprints'}
+        assert startup.complete() >= 0
+
+    def test_warm_runs_loader_once(self, app):
+        calls = []
+        startup = Startup()
+        startup.register('model', lambda app: calls.append(1))
+
+        startup.warm(app, 'model', wait=True)
+        startup.warm(app, 'model', wait=True)
+
+        assert calls == [1]
+        assert startup.state('model') == READY
+
+    def test_failed_loader_is_reported(self, app):
+        def boom(app):
+            raise RuntimeError('no model')
+
+        startup = Startup()
+        startup.register('model', boom)
+        startup.register('index', lambda app: False)
+
+        startup.warm(app, wait=True)
+
+        report = startup.report()['subsystems']
+        assert report['model']['state'] == FAILED
+        assert report['model']['error'] == 'no model'
+        assert report['index']['state'] == FAILED
+
+
+class TestCreateApp:
+    def test_search_is_registered_but_not_warmed(self, app):
+        startup = get_startup(app)
+
+        assert startup.state('search') == PENDING
+        assert startup.completed_seconds is not None
+        assert 'blueprints' in startup.phases
+
+    def test_embedding_model_is_not_loaded_at_startup(self, app):
+        assert getattr(app.embedding_service, 'model', None) is None
+
+    def test_health_check_reports_startup(self, client):
+        response = client.get('/api/health-check')
+
+        startup = response.get_json()['startup']
+        assert startup['subsystems']['search']['state'] == PENDING
+        assert 'critical_path_seconds' in startup
+
+
+class TestWarmupMode:
+    """Only processes that serve requests warm up."""
+
+    def test_serves_requests_outside_the_cli(self):
+        assert serves_requests()
+
+    def test_flask_run_serves_requests(self):
+        with click.Context(click.Command('run'), info_name='run'):
+            assert serves_requests()
+
+    def test_other_flask_commands_do_not_warm(self, monkeypatch):
+        monkeypatch.setattr(TestingConfig, 'STARTUP_WARMUP', 'background')
+
+        with click.Context(click.Group('flask'), info_name='flask'):
+            app = create_app('testing')
+
+        assert app.config['STARTUP_WARMUP'] == 'off'
+        assert get_startup(app).state('search') == PENDING
+
+
+class TestImportProfile:
+    def test_parse_importtime_sorts_by_cumulative(self):
+        stderr = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        150 |   json.decoder\n"
+            "import time:      3000 |     900000 | torch\n"
+            "import time:        40 |        400 | json\n"
+            "unrelated line\n"
+        )
+
+        rows = parse_importtime(stderr, top=2)
+
+        assert rows == [(900000, 3000, 'torch'), (400, 40, 'json')]
@@ -0,0 +1,28 @@
+"""
+Pytest configuration and fixtures for shared OAuth token cache tests.
+"""
+import pytest
+
+from app import create_app
+from app.configuration.extensions import db
+from app.services.token_cache import reset_token_caches
+
+
+@pytest.fixture
+def app():
+    """Create application with the database token store."""
+    app = create_app('testing')
+    app.config['OAUTH_TOKEN_STORE'] = 'database'
+
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture(autouse=True)
+def reset_tokens():
+    reset_token_caches()
+    yield
+    reset_token_caches()
@@ -0,0 +1,105 @@
+"""
+Tests for the shared OAuth token cache.
+"""
+import threading
+import time
+
+from app.services.token_cache import (
+    DatabaseTokenStore,
+    LocalTokenStore,
+    SharedTokenCache,
+    get_token_cache,
+    init_token_cache,
+)
+
+
+class TestSharedTokenCache:
+    """Single-flight refresh, refresh-ahead and the shared stores."""
+
+    def test_concurrent_callers_share_one_fetch(self):
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            time.sleep(0.2)
+            return 'token-1', 3600
+
+        cache = SharedTokenCache('test:concurrent', fetch)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get_token())) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == ['token-1'] * 8
+        assert len(calls) == 1
+
+    def test_second_worker_reads_token_from_store(self):
+        fetch_calls = []
+
+        def fetch():
+            fetch_calls.append(1)
+            return 'shared-token', 3600
+
+        first = SharedTokenCache('test:workers', fetch)
+        second = SharedTokenCache('test:workers', fetch)
+
+        assert first.get_token() == 'shared-token'
+        assert second.get_token() == 'shared-token'
+        assert len(fetch_calls) == 1
+
+    def test_ageing_token_is_served_while_refreshing_in_background(self):
+        tokens = iter([('old-token', 100), ('new-token', 3600)])
+        cache = SharedTokenCache('test:ageing', lambda: next(tokens), refresh_margin=120)
+
+        assert cache.get_token() == 'old-token'
+        # Inside the refresh margin but still valid: no waiting on the provider
+        assert cache.get_token() == 'old-token'
+        cache._background.join(timeout=5)
+        assert cache.get_token() == 'new-token'
+
+    def test_force_refresh_replaces_rejected_token(self):
+        tokens = iter([('rejected', 3600), ('replacement', 3600)])
+        cache = SharedTokenCache('test:force', lambda: next(tokens))
+
+        assert cache.get_token() == 'rejected'
+        assert cache.get_token(force_refresh=True) == 'replacement'
+
+    def test_failed_fetch_returns_none(self):
+        cache = SharedTokenCache('test:failed', lambda: None)
+
+        assert cache.get_token() is None
+        assert cache.get_token() is None
+        assert cache.fetches == 2
+
+    def test_local_lease_is_exclusive(self):
+        store = LocalTokenStore()
+
+        assert store.acquire('name', 'worker-a', 30)
+        assert not store.acquire('name', 'worker-b', 30)
+        store.release('name', 'worker-a')
+        assert store.acquire('name', 'worker-b', 30)
+
+    def test_database_store_round_trip_and_lease(self, app):
+        store = init_token_cache(app)
+        assert isinstance(store, DatabaseTokenStore)
+
+        expires_at = time.time() + 600
+        store.write('test:db', 'db-token', expires_at)
+        record = store.read('test:db')
+        assert record['token'] == 'db-token'
+        assert abs(record['expires_at'] - expires_at) < 1
+
+        assert store.acquire('test:db', 'worker-a', 30)
+        assert not store.acquire('test:db', 'worker-b', 30)
+        store.release('test:db', 'worker-a')
+        assert store.acquire('test:db', 'worker-b', 30)
+
+    def test_registry_returns_one_cache_per_name(self, app):
+        init_token_cache(app)
+        first = get_token_cache('test:registry', lambda: ('a', 3600))
+        second = get_token_cache('test:registry', lambda: ('b', 3600))
+
+        assert first is second
+        assert second.get_token() == 'b'
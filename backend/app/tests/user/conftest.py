@@ -288,7 +288,7 @@ def mock_google_oauth():
 @pytest.fixture
 def mock_brevo_api():
     """Mock Brevo API calls."""
-    with patch('requests.post') as mock_post:
+    with patch('app.services.http_client.http_client.post') as mock_post:
         mock_response = Mock()
         mock_response.status_code = 201
         mock_response.json.return_value = {'messageId': 'test-123'}
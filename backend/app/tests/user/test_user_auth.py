@@ -212,7 +212,7 @@ class TestUserAuth:
       }
 
       # Mock Brevo API to return failure
-      with patch('requests.post') as mock_post:
+      with patch('app.services.http_client.http_client.post') as mock_post:
           mock_response = Mock()
           mock_response.status_code = 400
           mock_response.json.return_value = {'error': 'Email send failed'}
@@ -702,7 +702,7 @@ class TestUserAuth:
       })
 
       # Mock Brevo API to return failure
-      with patch('requests.post') as mock_post:
+      with patch('app.services.http_client.http_client.post') as mock_post:
           mock_response = Mock()
           mock_response.status_code = 400
           mock_response.json.return_value = {'error': 'Email send failed'}
@@ -4,7 +4,7 @@ Authentication utilities for the Mizizzi E-commerce Platform
 
 import logging
 from functools import wraps
-from flask import jsonify
+from flask import g, jsonify
 from flask_jwt_extended import get_jwt_identity
 
 # Import models
@@ -16,25 +16,95 @@ except ImportError:
     except ImportError:
         from models.models import User, UserRole
 
+from app.services.principal_cache import principal_cache
+
 logger = logging.getLogger(__name__)
 
-def get_current_user():
-    """Get the current authenticated user"""
+class Principal:
+    """Who the authenticated caller is: user id, role and whether the account is active."""
+
+    __slots__ = ('id', 'role', 'is_active')
+
+    def __init__(self, id, role, is_active):
+        self.id = id
+        self.role = role
+        self.is_active = is_active
+
+    @property
+    def is_admin(self):
+        return self.role == UserRole.ADMIN
+
+    @classmethod
+    def from_user(cls, user):
+        return cls(user.id, user.role, bool(user.is_active))
+
+    @classmethod
+    def from_dict(cls, data):
+        role = data.get('role')
+        return cls(data['id'], UserRole(role) if role else None, data.get('is_active', False))
+
+    def to_dict(self):
+        return {'id': self.id, 'role': self.role.value if self.role else None, 'is_active': self.is_active}
+
+def current_user_id():
+    """The user id of the verified JWT identity, or None."""
     try:
         identity = get_jwt_identity()
-        if not identity:
-            return None
+    except RuntimeError:
+        # No JWT was verified for this request
+        return None
+    if not identity:
+        return None
 
-        # Handle both dictionary and integer formats
-        if isinstance(identity, dict):
-            user_id = identity.get('user_id')
-        else:
-            user_id = identity
+    # Handle both dictionary and integer formats
+    if isinstance(identity, dict):
+        identity = identity.get('user_id')
+    try:
+        return int(identity)
+    except (TypeError, ValueError):
+        return None
 
-        if not user_id:
-            return None
+def reset_request_auth():
+    """Forget the principal and user resolved for the previous request."""
+    g.pop('_auth_principal', None)
+    g.pop('_auth_user', None)
+
+def current_user():
+    """The authenticated User, loaded at most once per request."""
+    if '_auth_user' not in g:
+        from app.configuration.extensions import db
+        user_id = current_user_id()
+        g._auth_user = db.session.get(User, user_id) if user_id else None
+    return g._auth_user
+
+def current_principal():
+    """
+    The authenticated Principal (or None), resolved once per request.
+
+    Comes from the short-TTL principal cache when possible, so most requests
+    are authorized without loading the User row.
+    """
+    if '_auth_principal' in g:
+        return g._auth_principal
+
+    principal = None
+    user_id = current_user_id()
+    if user_id:
+        cached = principal_cache.get(user_id)
+        if cached:
+            principal = Principal.from_dict(cached)
+        else:
+            user = current_user()
+            if user:
+                principal = Principal.from_user(user)
+                principal_cache.set(user_id, principal.to_dict())
+    g._auth_principal = principal
+    return principal
 
-        return User.query.get(user_id)
+def get_current_user():
+    """Get the current authenticated user"""
+    try:
+        return current_user()
     except Exception as e:
         logger.error(f"Error getting current user: {str(e)}")
         return None
@@ -44,24 +114,14 @@ def admin_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
         try:
-            identity = get_jwt_identity()
-            if not identity:
-                return jsonify({"error": "Authentication required"}), 401
-
-            # Handle both dictionary and integer formats
-            if isinstance(identity, dict):
-                user_id = identity.get('user_id')
-            else:
-                user_id = identity
-
-            if not user_id:
+            if not current_user_id():
                 return jsonify({"error": "Authentication required"}), 401
 
-            user = User.query.get(user_id)
-            if not user:
+            principal = current_principal()
+            if not principal:
                 return jsonify({"error": "User not found"}), 404
 
-            if user.role != UserRole.ADMIN:
+            if not principal.is_admin:
                 return jsonify({"error": "Admin access required"}), 403
 
             return f(*args, **kwargs)
@@ -76,24 +136,14 @@ def moderator_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
         try:
-            identity = get_jwt_identity()
-            if not identity:
-                return jsonify({"error": "Authentication required"}), 401
-
-            # Handle both dictionary and integer formats
-            if isinstance(identity, dict):
-                user_id = identity.get('user_id')
-            else:
-                user_id = identity
-
-            if not user_id:
+            if not current_user_id():
                 return jsonify({"error": "Authentication required"}), 401
 
-            user = User.query.get(user_id)
-            if not user:
+            principal = current_principal()
+            if not principal:
                 return jsonify({"error": "User not found"}), 404
 
-            if user.role not in [UserRole.ADMIN, UserRole.MODERATOR]:
+            if principal.role not in [UserRole.ADMIN, UserRole.MODERATOR]:
                 return jsonify({"error": "Moderator access required"}), 403
 
             return f(*args, **kwargs)
@@ -108,24 +158,14 @@ def user_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
         try:
-            identity = get_jwt_identity()
-            if not identity:
-                return jsonify({"error": "Authentication required"}), 401
-
-            # Handle both dictionary and integer formats
-            if isinstance(identity, dict):
-                user_id = identity.get('user_id')
-            else:
-                user_id = identity
-
-            if not user_id:
+            if not current_user_id():
                 return jsonify({"error": "Authentication required"}), 401
 
-            user = User.query.get(user_id)
-            if not user:
+            principal = current_principal()
+            if not principal:
                 return jsonify({"error": "User not found"}), 404
 
-            if not user.is_active:
+            if not principal.is_active:
                 return jsonify({"error": "Account is inactive"}), 403
 
             return f(*args, **kwargs)
@@ -5,11 +5,13 @@ M-PESA utility functions and client for Mizizzi E-commerce Platform
 import json
 import base64
 import logging
-import requests
 from datetime import datetime, timezone, timedelta
 from typing import Dict, Any, Optional
 import re
 
+from app.services.http_client import http_client
+from app.services.token_cache import get_token_cache, token_name
+
 logger = logging.getLogger(__name__)
 
 class MpesaClient:
@@ -66,31 +68,47 @@ class MpesaClient:
                 datetime.now(timezone.utc) < self._token_expires_at):
                 return self._access_token
 
-            # Create authorization header
-            credentials = f"{self.consumer_key}:{self.consumer_secret}"
-            encoded_credentials = base64.b64encode(credentials.encode()).decode()
+            # Tokens are shared by every worker using the same credentials
+            cache = get_token_cache(token_name('mpesa', self.base_url, self.consumer_key), self._fetch_access_token)
+            token = cache.get_token()
+            record = cache.get_record()
+            if token and record:
+                self._access_token = token
+                self._token_expires_at = datetime.fromtimestamp(record['expires_at'], timezone.utc) - timedelta(
+                    seconds=cache.refresh_margin)
+            return token
 
-            headers = {
-                'Authorization': f'Basic {encoded_credentials}',
-                'Content-Type': 'application/json'
-            }
+        except Exception as e:
+            logger.error(f"Error getting M-PESA access token: {str(e)}")
+            return None
 
-            response = requests.get(self.auth_url, headers=headers, timeout=30)
+    def _fetch_access_token(self):
+        """Request a new token from Daraja: (token, seconds until expiry)"""
+        # Create authorization header
+        credentials = f"{self.consumer_key}:{self.consumer_secret}"
+        encoded_credentials = base64.b64encode(credentials.encode()).decode()
 
-            if response.status_code == 200:
-                data = response.json()
-                self._access_token = data.get('access_token')
-                # Cache token for 55 minutes (tokens expire in 1 hour)
-                self._token_expires_at = datetime.now(timezone.utc) + timedelta(minutes=55)
-                logger.info("M-PESA access token obtained successfully")
-                return self._access_token
-            else:
-                logger.error(f"Failed to get M-PESA access token: {response.status_code} - {response.text}")
-                return None
+        headers = {
+            'Authorization': f'Basic {encoded_credentials}',
+            'Content-Type': 'application/json'
+        }
 
-        except Exception as e:
-            logger.error(f"Error getting M-PESA access token: {str(e)}")
+        response = http_client.get('mpesa', self.auth_url, headers=headers)
+
+        if response.status_code != 200:
+            logger.error(f"Failed to get M-PESA access token: {response.status_code} - {response.text}")
+            return None
+
+        data = response.json()
+        token = data.get('access_token')
+        if not token:
             return None
+        try:
+            expires_in = int(data.get('expires_in', 3599))
+        except (ValueError, TypeError):
+            expires_in = 3599
+        logger.info("M-PESA access token obtained successfully")
+        return token, expires_in
 
     def generate_password(self) -> tuple[str, str]:
         """Generate password for STK push"""
@@ -141,7 +159,7 @@ class MpesaClient:
             }
 
             logger.info(f"Initiating STK push for {phone_number}, amount: {amount}")
-            response = requests.post(self.stk_push_url, json=payload, headers=headers, timeout=30)
+            response = http_client.post('mpesa', self.stk_push_url, json=payload, headers=headers)
 
             if response.status_code == 200:
                 data = response.json()
@@ -186,7 +204,8 @@ class MpesaClient:
                 "CheckoutRequestID": checkout_request_id
             }
 
-            response = requests.post(self.stk_query_url, json=payload, headers=headers, timeout=30)
+            response = http_client.post('mpesa', self.stk_query_url, json=payload, headers=headers,
+                                        idempotent=True)
 
             if response.status_code == 200:
                 data = response.json()
@@ -7,11 +7,13 @@ import os
 import json
 import logging
 import requests
-import time
 from datetime import datetime, timezone, timedelta
-from typing import Dict, Optional, Any
+from typing import Dict, Optional, Any, Tuple
 import threading
 
+from app.services.http_client import http_client
+from app.services.token_cache import get_token_cache, token_name
+
 # Setup logging
 logger = logging.getLogger(__name__)
 
@@ -42,125 +44,97 @@ class PesapalAuthManager:
         self._token_cache = {}
         self._cache_lock = threading.Lock()
 
-        # Request settings
-        self.max_retries = 3
-        self.retry_delay = 1.0
-        self.request_timeout = 30
+        # Timeouts and transport retries come from the shared HTTP client's 'pesapal' profile
 
         logger.info(f"PesapalAuthManager initialized for {self.environment}")
         logger.info(f"Auth URL: {self.auth_url}")
 
     def get_access_token(self) -> Optional[str]:
         """
-        Get access token with caching and retry logic
+        Get access token from the cache shared by all workers
 
         Returns:
             Access token string or None if failed
         """
         with self._cache_lock:
-            # Check if we have a valid cached token
-            cached_token = self._get_cached_token()
-            if cached_token:
-                logger.info("Using cached access token")
-                return cached_token
+            cache = self._shared_token_cache()
+            token = cache.get_token()
+            self._sync_token_cache(cache)
+            return token
 
-            # Request new token
-            return self._request_new_token()
+    def _shared_token_cache(self):
+        """Shared cache for these credentials; refreshes start a minute before expiry"""
+        name = token_name('pesapal', self.environment, self.consumer_key)
+        return get_token_cache(name, self._request_new_token, refresh_margin=60)
 
-    def _get_cached_token(self) -> Optional[str]:
-        """Get cached token if still valid"""
-        if not self._token_cache:
-            return None
+    def _sync_token_cache(self, cache):
+        """Mirror the shared token into the instance cache used by get_token_info"""
+        record = cache.get_record()
+        if record and self._token_cache.get('token') != record['token']:
+            self._token_cache = {
+                'token': record['token'],
+                'expires_at': datetime.fromtimestamp(record['expires_at'], timezone.utc),
+                'obtained_at': datetime.now(timezone.utc)
+            }
 
-        token_data = self._token_cache
-        expires_at = token_data.get('expires_at')
+    def _request_new_token(self) -> Optional[Tuple[str, int]]:
+        """Request new access token from Pesapal: (token, seconds until expiry)"""
+        try:
+            logger.info("Requesting Pesapal access token")
 
-        if not expires_at:
-            return None
+            # Prepare request
+            headers = {
+                'Accept': 'application/json',
+                'Content-Type': 'application/json'
+            }
 
-        # Check if token is still valid (with 30 second buffer)
-        current_time = datetime.now(timezone.utc)
-        if isinstance(expires_at, str):
-            expires_at = datetime.fromisoformat(expires_at.replace('Z', '+00:00'))
+            payload = {
+                'consumer_key': self.consumer_key,
+                'consumer_secret': self.consumer_secret
+            }
 
-        if current_time < (expires_at - timedelta(seconds=30)):
-            return token_data.get('token')
+            # Requesting a token has no side effects, so the shared client may
+            # retry it on transient failures using the pesapal profile's budget
+            response = http_client.post(
+                'pesapal',
+                self.auth_url,
+                headers=headers,
+                json=payload,
+                idempotent=True
+            )
 
-        # Token expired, clear cache
-        self._token_cache = {}
-        return None
+            logger.info(f"Pesapal auth response: {response.status_code}")
+
+            if response.status_code != 200:
+                logger.error(f"Auth request failed: {response.status_code} - {response.text}")
+                return None
 
-    def _request_new_token(self) -> Optional[str]:
-        """Request new access token from Pesapal"""
-        for attempt in range(1, self.max_retries + 1):
             try:
-                logger.info(f"Requesting Pesapal access token (attempt {attempt}/{self.max_retries})")
+                response_data = response.json()
+            except json.JSONDecodeError as e:
+                logger.error(f"Invalid JSON response: {e}")
+                logger.error(f"Response text: {response.text}")
+                return None
 
-                # Prepare request
-                headers = {
-                    'Accept': 'application/json',
-                    'Content-Type': 'application/json'
-                }
+            # Extract token from response
+            result = self._extract_token_from_response(response_data)
+            if result:
+                return result
 
-                payload = {
-                    'consumer_key': self.consumer_key,
-                    'consumer_secret': self.consumer_secret
-                }
+            logger.error("No token found in response")
+            logger.error(f"Response keys: {list(response_data.keys())}")
+
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Auth request exception: {e}")
 
-                # Make request
-                response = requests.post(
-                    self.auth_url,
-                    headers=headers,
-                    json=payload,
-                    timeout=self.request_timeout
-                )
-
-                logger.info(f"Pesapal auth response: {response.status_code}")
-                logger.info(f"Response headers: {dict(response.headers)}")
-                logger.info(f"Response text: {response.text}")
-
-                if response.status_code == 200:
-                    try:
-                        response_data = response.json()
-                        logger.info(f"Extracting token from response: {response_data}")
-
-                        # Extract token from response
-                        token = self._extract_token_from_response(response_data)
-                        if token:
-                            return token
-                        else:
-                            logger.error("No token found in response")
-                            logger.error(f"Response keys: {list(response_data.keys())}")
-
-                    except json.JSONDecodeError as e:
-                        logger.error(f"Invalid JSON response: {e}")
-                        logger.error(f"Response text: {response.text}")
-
-                else:
-                    logger.error(f"Auth request failed: {response.status_code} - {response.text}")
-
-                # Retry logic
-                if attempt < self.max_retries:
-                    delay = self.retry_delay * attempt
-                    logger.info(f"Retrying in {delay} seconds...")
-                    time.sleep(delay)
-
-            except requests.exceptions.RequestException as e:
-                logger.error(f"Auth request exception: {e}")
-                if attempt < self.max_retries:
-                    delay = self.retry_delay * attempt
-                    logger.info(f"Retrying in {delay} seconds...")
-                    time.sleep(delay)
-
-            except Exception as e:
-                logger.error(f"Unexpected error during auth: {e}")
-                break
-
-        logger.error("Failed to obtain access token after all retries")
+        except Exception as e:
+            logger.error(f"Unexpected error during auth: {e}")
+
+        logger.error("Failed to obtain access token")
         return None
 
-    def _extract_token_from_response(self, response_data: Dict[str, Any]) -> Optional[str]:
-        """Extract token from Pesapal response"""
+    def _extract_token_from_response(self, response_data: Dict[str, Any]) -> Optional[Tuple[str, int]]:
+        """Extract token and seconds until expiry from Pesapal response"""
         try:
             # Check for error first
             if response_data.get('error'):
@@ -207,17 +181,10 @@ class PesapalAuthManager:
                 seconds_until_expiry = 300
                 logger.warning("No expiry date provided, defaulting to 5 minutes")
 
-            # Cache the token
-            self._token_cache = {
-                'token': token,
-                'expires_at': expires_at,
-                'obtained_at': datetime.now(timezone.utc)
-            }
-
             logger.info("Successfully obtained Pesapal access token")
             logger.info(f"Token expires at: {expires_at}")
 
-            return token
+            return token, seconds_until_expiry
 
         except Exception as e:
             logger.error(f"Error extracting token: {e}")
@@ -254,6 +221,7 @@ class PesapalAuthManager:
         """Clear the token cache"""
         with self._cache_lock:
             self._token_cache = {}
+            self._shared_token_cache().invalidate()
             logger.info("Token cache cleared")
 
     def test_authentication(self) -> Dict[str, Any]:
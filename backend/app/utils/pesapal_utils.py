@@ -20,6 +20,7 @@ import time
 # Import the new auth module
 from .pesapal_auth import PesapalAuthManager, get_auth_manager
 from ..config.pesapal_config import get_pesapal_config
+from app.services.http_client import http_client
 
 # Setup logging
 logger = logging.getLogger(__name__)
@@ -97,8 +98,8 @@ class PesapalClient:
         self.config = config or PesapalConfig()
         self.auth_manager = PesapalAuthManager(self.config)
 
-        # Request session
-        self.session = requests.Session()
+        # Pooled keep-alive session shared by every Pesapal client in the process
+        self.session = http_client.session('pesapal')
         self.session.headers.update({
             'Content-Type': 'application/json',
             'Accept': 'application/json'
@@ -133,10 +134,10 @@ class PesapalClient:
 
             logger.info("Fetching existing IPN list from Pesapal")
 
-            response = self.session.get(
+            response = http_client.get(
+                'pesapal',
                 self.config.list_ipn_url,
-                headers=headers,
-                timeout=30
+                headers=headers
             )
 
             logger.info(f"IPN list response: {response.status_code}")
@@ -238,11 +239,11 @@ class PesapalClient:
             logger.info(f"Registering new IPN URL: {ipn_url}")
             logger.info(f"IPN registration data: {json.dumps(ipn_data, indent=2)}")
 
-            response = self.session.post(
+            response = http_client.post(
+                'pesapal',
                 self.config.register_ipn_url,
                 json=ipn_data,
-                headers=headers,
-                timeout=30
+                headers=headers
             )
 
             logger.info(f"IPN registration response: {response.status_code}")
@@ -323,11 +324,11 @@ class PesapalClient:
             logger.info(f"Submitting order to Pesapal: {order_data.get('id', 'Unknown')}")
             logger.info(f"Order data: {json.dumps(order_data, indent=2)}")
 
-            response = self.session.post(
+            response = http_client.post(
+                'pesapal',
                 self.config.submit_order_url,
                 json=order_data,
-                headers=headers,
-                timeout=30
+                headers=headers
             )
 
             logger.info(f"Order submission response status: {response.status_code}")
@@ -424,11 +425,11 @@ class PesapalClient:
 
             logger.info(f"Querying transaction status for: {order_tracking_id}")
 
-            response = self.session.get(
+            response = http_client.get(
+                'pesapal',
                 self.config.transaction_status_url,
                 params=params,
-                headers=headers,
-                timeout=30
+                headers=headers
             )
 
             logger.info(f"Transaction status response: {response.status_code}")
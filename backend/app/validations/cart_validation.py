@@ -16,6 +16,7 @@ from ..models.models import (
     Inventory, ShippingMethod, PaymentMethod, Address,
     CouponType, db
 )
+from ..services.inventory_cache import get_availability
 
 # Set up logger
 logger = logging.getLogger(__name__)
@@ -193,11 +194,8 @@ class CartValidator:
         cart_items = CartItem.query.filter_by(cart_id=self.cart.id).all()
 
         for item in cart_items:
-            # Get inventory record
-            inventory = Inventory.query.filter_by(
-                product_id=item.product_id,
-                variant_id=item.variant_id
-            ).first()
+            # Get inventory availability (served from the hot-SKU cache)
+            inventory = get_availability(item.product_id, item.variant_id)
 
             if not inventory:
                 # Fall back to product stock
@@ -234,7 +232,7 @@ class CartValidator:
                     })
             else:
                 # Check inventory stock
-                if inventory.stock_level <= 0:
+                if inventory['stock_level'] <= 0:
                     product = db.session.get(Product, item.product_id)
                     product_name = product.name if product else f"Product ID {item.product_id}"
                     self.errors.append({
@@ -243,15 +241,15 @@ class CartValidator:
                         "item_id": item.id,
                         "product_id": item.product_id
                     })
-                elif item.quantity > inventory.stock_level:
+                elif item.quantity > inventory['stock_level']:
                     product = db.session.get(Product, item.product_id)
                     product_name = product.name if product else f"Product ID {item.product_id}"
                     self.errors.append({
-                        "message": f"Requested quantity ({item.quantity}) exceeds available stock ({inventory.stock_level}) for product '{product_name}'",
+                        "message": f"Requested quantity ({item.quantity}) exceeds available stock ({inventory['stock_level']}) for product '{product_name}'",
                         "code": "insufficient_stock",
                         "item_id": item.id,
                         "product_id": item.product_id,
-                        "available_stock": inventory.stock_level,
+                        "available_stock": inventory['stock_level'],
                         "requested_quantity": item.quantity
                     })
 
@@ -411,11 +409,8 @@ def validate_cart_item_stock(product_id: int, variant_id: Optional[int], quantit
         Tuple of (is_valid, available_stock, error_message)
     """
     try:
-        # Get inventory record
-        inventory = Inventory.query.filter_by(
-            product_id=product_id,
-            variant_id=variant_id
-        ).first()
+        # Get inventory availability (served from the hot-SKU cache)
+        inventory = get_availability(product_id, variant_id)
 
         if not inventory:
             # Fall back to product stock
@@ -433,17 +428,17 @@ def validate_cart_item_stock(product_id: int, variant_id: Optional[int], quantit
             return True, stock_level, ""
 
         # Check inventory stock
-        if inventory.stock_level <= 0:
+        if inventory['stock_level'] <= 0:
             product = db.session.get(Product, product_id)
             product_name = product.name if product else f"Product ID {product_id}"
             return False, 0, f"Product '{product_name}' is out of stock"
 
-        if quantity > inventory.stock_level:
+        if quantity > inventory['stock_level']:
             product = db.session.get(Product, product_id)
             product_name = product.name if product else f"Product ID {product_id}"
-            return False, inventory.stock_level, f"Requested quantity ({quantity}) exceeds available stock ({inventory.stock_level})"
+            return False, inventory['stock_level'], f"Requested quantity ({quantity}) exceeds available stock ({inventory['stock_level']})"
 
-        return True, inventory.stock_level, ""
+        return True, inventory['stock_level'], ""
 
     except Exception as e:
         logger.error(f"Error validating cart item stock: {str(e)}")
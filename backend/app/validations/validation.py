@@ -13,6 +13,7 @@ from .validators import (
 from app.models.models import User, UserRole, OrderStatus
 from datetime import datetime
 from app.configuration.extensions import db
+from app.utils.auth_utils import current_principal
 
 def validate_request(validator_class, context=None):
     """
@@ -84,40 +85,39 @@ def admin_required(f):
                     "code": "INVALID_USER_ID"
                 }), 401
 
-            user = db.session.get(User, user_id)
+            # Role and status come from the request principal, usually without loading the user
+            principal = current_principal()
 
-            if not user:
+            if not principal:
                 current_app.logger.warning(f"Admin access attempt with non-existent user ID: {user_id}")
                 return jsonify({
                     "error": "User not found",
                     "code": "USER_NOT_FOUND"
                 }), 401
 
-            current_app.logger.info(f"User {user_id} role: {user.role}, active: {user.is_active}")
-
-            if not user.role:
+            if not principal.role:
                 current_app.logger.warning(f"User {user_id} has no role defined")
                 return jsonify({
                     "error": "User role not defined",
                     "code": "ROLE_NOT_DEFINED"
                 }), 403
 
-            if user.role != UserRole.ADMIN:
-                current_app.logger.warning(f"Non-admin user {user_id} attempted admin access. Role: {user.role}")
+            if not principal.is_admin:
+                current_app.logger.warning(f"Non-admin user {user_id} attempted admin access. Role: {principal.role}")
                 return jsonify({
                     "error": "Admin access required",
                     "code": "ADMIN_REQUIRED"
                 }), 403
 
-            if not user.is_active:
+            if not principal.is_active:
                 current_app.logger.warning(f"Inactive admin user {user_id} attempted access")
                 return jsonify({
                     "error": "Account is deactivated",
                     "code": "ACCOUNT_DEACTIVATED"
                 }), 403
 
-            g.current_user = user
-            current_app.logger.info(f"Admin access granted to user {user_id} ({user.email})")
+            g.current_principal = principal
+            current_app.logger.info(f"Admin access granted to user {user_id}")
 
             return f(*args, **kwargs)
 
@@ -10,14 +10,15 @@ from flask import request
 from flask_jwt_extended import decode_token
 from functools import wraps
 
+from .services.realtime import ADMIN_ROOM, get_realtime, product_room, realtime_message_queue, user_room
+
 socketio = SocketIO()
 
 # Set up logger
 logger = logging.getLogger(__name__)
 
-# Connected clients tracking
-connected_clients = {}
-connected_admins = set()
+# Connected users and admins are tracked in the shared presence store
+# (services/realtime.py), so every worker sees the same picture.
 
 def get_socketio():
     """
@@ -34,7 +35,7 @@ def init_socketio(app):
     socketio.init_app(app,
                      cors_allowed_origins=app.config.get('CORS_ORIGINS', '*'),
                      async_mode='eventlet',
-                     message_queue=app.config.get('SOCKETIO_MESSAGE_QUEUE', None))
+                     message_queue=realtime_message_queue(app.config))
     return socketio
 
 def authenticated_only(f):
@@ -60,23 +61,13 @@ def authenticated_only(f):
 def on_connect():
     """Handle client connection."""
     logger.info(f"Client connected: {request.sid}")
+    get_realtime().connected(request.sid)
 
 @socketio.on('disconnect')
 def on_disconnect():
     """Handle client disconnection."""
     logger.info(f"Client disconnected: {request.sid}")
-
-    # Remove from connected clients if applicable
-    for user_id, sid in list(connected_clients.items()):
-        if sid == request.sid:
-            del connected_clients[user_id]
-            logger.info(f"User {user_id} disconnected")
-            break
-
-    # Remove from connected admins if applicable
-    if request.sid in connected_admins:
-        connected_admins.remove(request.sid)
-        logger.info("Admin disconnected")
+    get_realtime().disconnected(request.sid)
 
 @socketio.on('auth')
 def handle_auth(data):
@@ -90,18 +81,22 @@ def handle_auth(data):
     try:
         token_data = decode_token(jwt)
         user_id = token_data['sub']
+        # Only tokens issued to admins may join the admin room
+        is_admin = bool(is_admin) and token_data.get('role') == 'admin'
 
         # Register client
-        connected_clients[user_id] = request.sid
+        realtime = get_realtime()
+        realtime.connected(request.sid, user_id, 'admin' if is_admin else 'user')
         logger.info(f"User {user_id} authenticated")
 
         # Join user's room for private messages
-        join_room(f"user_{user_id}")
+        join_room(user_room(user_id))
+        realtime.joined(request.sid, user_room(user_id))
 
         # Register as admin if applicable
         if is_admin:
-            connected_admins.add(request.sid)
-            join_room("admin")
+            join_room(ADMIN_ROOM)
+            realtime.joined(request.sid, ADMIN_ROOM)
             logger.info(f"Admin {user_id} authenticated")
 
         # Send acknowledgment
@@ -111,6 +106,27 @@ def handle_auth(data):
         logger.error(f"Authentication error: {str(e)}")
         emit('auth_error', {'error': 'Invalid token'})
 
+@socketio.on('join_room')
+def handle_join_room(data):
+    """Subscribe to a product's stock and detail updates."""
+    room = (data or {}).get('room')
+    if not room or not room.startswith('product_'):
+        emit('error', {'message': 'Only product rooms can be joined'})
+        return
+    join_room(room)
+    get_realtime().joined(request.sid, room)
+    emit('room_joined', {'room': room})
+
+@socketio.on('leave_room')
+def handle_leave_room(data):
+    """Unsubscribe from a product room."""
+    room = (data or {}).get('room')
+    if not room:
+        return
+    leave_room(room)
+    get_realtime().left(request.sid, room)
+    emit('room_left', {'room': room})
+
 def broadcast_to_user(user_id, event, data):
     """
     Broadcast a message to a specific user.
@@ -120,18 +136,8 @@ def broadcast_to_user(user_id, event, data):
         event: The event name
         data: The data to send
     """
-    try:
-        if not hasattr(current_app, 'socketio') or current_app.socketio is None:
-            logger.warning("SocketIO not initialized, skipping broadcast")
-            return
-
-        # Get the user's room
-        room = f"user_{user_id}"
-
-        current_app.socketio.emit(event, data, room=room, namespace='/user')
+    if get_realtime().emit(event, data, room=user_room(user_id)):
         logger.debug(f"Broadcast to user {user_id}: {event}")
-    except Exception as e:
-        logger.error(f"Error broadcasting to user {user_id}: {str(e)}")
 
 def broadcast_to_admins(event, data):
     """
@@ -141,15 +147,8 @@ def broadcast_to_admins(event, data):
         event: The event name
         data: The data to send
     """
-    try:
-        if not hasattr(current_app, 'socketio') or current_app.socketio is None:
-            logger.warning("SocketIO not initialized, skipping broadcast")
-            return
-
-        current_app.socketio.emit(event, data, room="admin", namespace='/admin')
+    if get_realtime().emit(event, data, room=ADMIN_ROOM):
         logger.debug(f"Broadcast to admins: {event}")
-    except Exception as e:
-        logger.error(f"Error broadcasting to admins: {str(e)}")
 
 def broadcast_to_all(event, data):
     """
@@ -159,15 +158,37 @@ def broadcast_to_all(event, data):
         event: The event name
         data: The data to send
     """
-    try:
-        if not hasattr(current_app, 'socketio') or current_app.socketio is None:
-            logger.warning("SocketIO not initialized, skipping broadcast")
-            return
-
-        current_app.socketio.emit(event, data)
+    if get_realtime().emit(event, data):
         logger.debug(f"Broadcast to all: {event}")
-    except Exception as e:
-        logger.error(f"Error broadcasting to all: {str(e)}")
+
+def broadcast_product_update(product_id, product_data):
+    """Broadcast changed product details to everyone watching the product and to admins."""
+    realtime = get_realtime()
+    payload = {'product_id': product_id, 'product': product_data}
+    realtime.emit('product_update', payload, room=product_room(product_id))
+    realtime.emit('product_update', payload, room=ADMIN_ROOM)
+
+def broadcast_order_update(order_id, status, user_id):
+    """Broadcast an order status change to its customer and to admins."""
+    payload = {'order_id': order_id, 'status': status}
+    broadcast_to_user(user_id, 'order_status_changed', payload)
+    broadcast_to_admins('admin_order_update', dict(payload, user_id=user_id))
+
+def broadcast_stock_update(product_id, variant_id, data):
+    """
+    Broadcast a stock change, coalesced with other changes to the same SKU.
+
+    Stock can change many times a second during a sale; watchers only need the
+    latest value, so updates are batched per room (see services/realtime.py).
+    """
+    key = (product_id, variant_id)
+    realtime = get_realtime()
+    realtime.emit_coalesced('stock_update', data, room=product_room(product_id), key=key)
+    realtime.emit_coalesced('admin_stock_update', data, room=ADMIN_ROOM, key=key)
+
+def get_presence_stats():
+    """Connected clients across every worker, from the shared presence store."""
+    return get_realtime().stats()
 
 def check_namespace(request):
     """
@@ -8,8 +8,8 @@ from flask import request
 from flask_jwt_extended import decode_token, get_jwt_identity
 import json
 from datetime import datetime
-import threading
-from collections import defaultdict
+
+from .services.realtime import get_realtime
 
 # Set up logger
 logger = logging.getLogger(__name__)
@@ -17,66 +17,33 @@ logger = logging.getLogger(__name__)
 # Initialize SocketIO instance
 socketio = SocketIO(cors_allowed_origins="*", async_mode='threading')
 
-# Thread-safe client management
+# Client management backed by the shared presence store, so rooms and stats
+# cover every worker rather than this process only
 class ClientManager:
-    def __init__(self):
-        self._clients = {}
-        self._rooms = defaultdict(set)
-        self._lock = threading.Lock()
-
     def add_client(self, sid, user_id=None, user_type='guest'):
-        with self._lock:
-            self._clients[sid] = {
-                'user_id': user_id,
-                'user_type': user_type,
-                'connected_at': datetime.utcnow(),
-                'rooms': set()
-            }
-            logger.info(f"Client {sid} connected as {user_type} (user_id: {user_id})")
+        get_realtime().connected(sid, user_id, user_type)
+        logger.info(f"Client {sid} connected as {user_type} (user_id: {user_id})")
 
     def remove_client(self, sid):
-        with self._lock:
-            if sid in self._clients:
-                client_info = self._clients[sid]
-                # Remove from all rooms
-                for room in client_info['rooms']:
-                    self._rooms[room].discard(sid)
-                del self._clients[sid]
-                logger.info(f"Client {sid} disconnected")
+        get_realtime().disconnected(sid)
+        logger.info(f"Client {sid} disconnected")
 
     def join_room(self, sid, room):
-        with self._lock:
-            if sid in self._clients:
-                self._clients[sid]['rooms'].add(room)
-                self._rooms[room].add(sid)
-                logger.info(f"Client {sid} joined room {room}")
+        get_realtime().joined(sid, room)
+        logger.info(f"Client {sid} joined room {room}")
 
     def leave_room(self, sid, room):
-        with self._lock:
-            if sid in self._clients:
-                self._clients[sid]['rooms'].discard(room)
-                self._rooms[room].discard(sid)
-                logger.info(f"Client {sid} left room {room}")
+        get_realtime().left(sid, room)
+        logger.info(f"Client {sid} left room {room}")
 
     def get_client_info(self, sid):
-        with self._lock:
-            return self._clients.get(sid)
+        return get_realtime().client_info(sid)
 
     def get_room_clients(self, room):
-        with self._lock:
-            return list(self._rooms[room])
+        return get_realtime().presence.room_sids(room)
 
     def get_stats(self):
-        with self._lock:
-            return {
-                'total_clients': len(self._clients),
-                'total_rooms': len(self._rooms),
-                'clients_by_type': {
-                    'admin': len([c for c in self._clients.values() if c['user_type'] == 'admin']),
-                    'user': len([c for c in self._clients.values() if c['user_type'] == 'user']),
-                    'guest': len([c for c in self._clients.values() if c['user_type'] == 'guest'])
-                }
-            }
+        return get_realtime().stats()
 
 # Global client manager instance
 client_manager = ClientManager()
@@ -281,21 +248,16 @@ def handle_product_stock_updated(data):
         if product_id is None or new_stock is None:
             return
 
-        # Emit to all clients in product room
-        socketio.emit('stock_update', {
-            'type': 'stock_updated',
-            'product_id': product_id,
-            'stock': new_stock,
-            'timestamp': datetime.utcnow().isoformat()
-        }, room=f"product_{product_id}")
-
-        # Emit to admin room
-        socketio.emit('admin_stock_update', {
+        payload = {
             'type': 'stock_updated',
             'product_id': product_id,
             'stock': new_stock,
             'timestamp': datetime.utcnow().isoformat()
-        }, room='admin_inventory')
+        }
+        # Coalesced: bursts of updates to one product go out as the latest value
+        realtime = get_realtime()
+        realtime.emit_coalesced('stock_update', payload, room=f"product_{product_id}", key=product_id)
+        realtime.emit_coalesced('admin_stock_update', payload, room='admin_inventory', key=product_id)
 
     except Exception as e:
         logger.error(f"Error handling product stock update: {str(e)}")
@@ -327,21 +289,21 @@ def handle_new_order(data):
 def emit_to_user(user_id, event, data):
     """Emit event to specific user"""
     try:
-        socketio.emit(event, data, room=f"user_{user_id}")
+        get_realtime().emit(event, data, room=f"user_{user_id}")
     except Exception as e:
         logger.error(f"Error emitting to user {user_id}: {str(e)}")
 
 def emit_to_admin(event, data):
     """Emit event to all admin users"""
     try:
-        socketio.emit(event, data, room='admin_general')
+        get_realtime().emit(event, data, room='admin_general')
     except Exception as e:
         logger.error(f"Error emitting to admin: {str(e)}")
 
 def emit_to_room(room, event, data):
     """Emit event to specific room"""
     try:
-        socketio.emit(event, data, room=room)
+        get_realtime().emit(event, data, room=room)
     except Exception as e:
         logger.error(f"Error emitting to room {room}: {str(e)}")
 
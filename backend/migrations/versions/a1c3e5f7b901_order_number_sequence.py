@@ -0,0 +1,28 @@
+"""order number sequence
+
+Revision ID: a1c3e5f7b901
+Revises: 6078b820d67e
+Create Date: 2026-10-18 09:12:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a1c3e5f7b901'
+down_revision = '6078b820d67e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.supports_sequences:
+        op.execute(sa.schema.CreateSequence(sa.Sequence('order_number_seq'), if_not_exists=True))
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.supports_sequences:
+        op.execute(sa.schema.DropSequence(sa.Sequence('order_number_seq'), if_exists=True))
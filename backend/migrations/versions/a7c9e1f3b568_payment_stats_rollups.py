@@ -0,0 +1,52 @@
+"""payment statistics indexes and daily rollups
+
+Revision ID: a7c9e1f3b568
+Revises: f6b8d0e2a457
+Create Date: 2026-10-18 17:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7c9e1f3b568'
+down_revision = 'f6b8d0e2a457'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('mpesa_transactions', schema=None) as batch_op:
+        batch_op.create_index('idx_mpesa_status_created_at', ['status', 'created_at'], unique=False)
+
+    with op.batch_alter_table('pesapal_transactions', schema=None) as batch_op:
+        batch_op.create_index('idx_pesapal_status_created_at', ['status', 'created_at'], unique=False)
+
+    op.create_table('payment_daily_stats',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('provider', sa.String(length=20), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('payment_method', sa.String(length=50), nullable=False),
+    sa.Column('card_type', sa.String(length=50), nullable=False),
+    sa.Column('currency', sa.String(length=3), nullable=False),
+    sa.Column('transaction_count', sa.Integer(), nullable=False),
+    sa.Column('total_amount', sa.Numeric(precision=14, scale=2), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('provider', 'day', 'status', 'payment_method', 'card_type', 'currency',
+                        name='uq_payment_daily_stats_dimensions')
+    )
+    with op.batch_alter_table('payment_daily_stats', schema=None) as batch_op:
+        batch_op.create_index('idx_payment_daily_stats_provider_day', ['provider', 'day'], unique=False)
+
+
+def downgrade():
+    op.drop_table('payment_daily_stats')
+
+    with op.batch_alter_table('pesapal_transactions', schema=None) as batch_op:
+        batch_op.drop_index('idx_pesapal_status_created_at')
+
+    with op.batch_alter_table('mpesa_transactions', schema=None) as batch_op:
+        batch_op.drop_index('idx_mpesa_status_created_at')
@@ -0,0 +1,49 @@
+"""unique cart item per product/variant
+
+Revision ID: b2d4f6a8c013
+Revises: a1c3e5f7b901
+Create Date: 2026-10-18 10:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b2d4f6a8c013'
+down_revision = 'a1c3e5f7b901'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Fold any duplicate lines into the oldest row before the index can be built
+    op.execute("""
+        UPDATE cart_items SET quantity = (
+            SELECT SUM(d.quantity) FROM cart_items d
+            WHERE d.cart_id = cart_items.cart_id
+              AND d.product_id = cart_items.product_id
+              AND COALESCE(d.variant_id, 0) = COALESCE(cart_items.variant_id, 0)
+        )
+        WHERE id IN (
+            SELECT MIN(id) FROM cart_items
+            GROUP BY cart_id, product_id, COALESCE(variant_id, 0)
+            HAVING COUNT(*) > 1
+        )
+    """)
+    op.execute("""
+        DELETE FROM cart_items WHERE id NOT IN (
+            SELECT MIN(id) FROM cart_items
+            GROUP BY cart_id, product_id, COALESCE(variant_id, 0)
+        )
+    """)
+    op.create_index(
+        'uq_cart_items_cart_product_variant',
+        'cart_items',
+        ['cart_id', 'product_id', sa.text('COALESCE(variant_id, 0)')],
+        unique=True
+    )
+
+
+def downgrade():
+    op.drop_index('uq_cart_items_cart_product_variant', table_name='cart_items')
@@ -0,0 +1,60 @@
+"""dashboard metrics rollups and created_at indexes
+
+Revision ID: b8d0f2a4c679
+Revises: a7c9e1f3b568
+Create Date: 2026-10-18 18:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b8d0f2a4c679'
+down_revision = 'a7c9e1f3b568'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_orders_created_at'), ['created_at'], unique=False)
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_users_created_at'), ['created_at'], unique=False)
+        batch_op.create_index(batch_op.f('ix_users_last_login'), ['last_login'], unique=False)
+
+    op.create_table('dashboard_metrics',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('granularity', sa.String(length=10), nullable=False),
+    sa.Column('bucket_start', sa.DateTime(), nullable=False),
+    sa.Column('metric', sa.String(length=30), nullable=False),
+    sa.Column('dimension', sa.String(length=100), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('amount', sa.Numeric(precision=14, scale=2), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('granularity', 'bucket_start', 'metric', 'dimension',
+                        name='uq_dashboard_metrics_bucket_metric')
+    )
+    with op.batch_alter_table('dashboard_metrics', schema=None) as batch_op:
+        batch_op.create_index('idx_dashboard_metrics_granularity_bucket', ['granularity', 'bucket_start'], unique=False)
+
+    op.create_table('dashboard_metric_changes',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('bucket_start', sa.DateTime(), nullable=False),
+    sa.Column('recorded_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('dashboard_metric_changes')
+    op.drop_table('dashboard_metrics')
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_users_last_login'))
+        batch_op.drop_index(batch_op.f('ix_users_created_at'))
+
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_orders_created_at'))
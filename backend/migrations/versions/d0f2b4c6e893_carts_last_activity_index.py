@@ -0,0 +1,26 @@
+"""index carts.last_activity for guest cart purges
+
+Revision ID: d0f2b4c6e893
+Revises: c9e1a3b5d782
+Create Date: 2026-10-18 20:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd0f2b4c6e893'
+down_revision = 'c9e1a3b5d782'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('carts', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_carts_last_activity'), ['last_activity'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('carts', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_carts_last_activity'))
@@ -0,0 +1,29 @@
+"""index admin_activity_logs (admin_id, created_at); allow events without an admin
+
+Revision ID: e1b3d5f7a924
+Revises: d0f2b4c6e893
+Create Date: 2026-10-18 23:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e1b3d5f7a924'
+down_revision = 'd0f2b4c6e893'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('admin_activity_logs', schema=None) as batch_op:
+        batch_op.alter_column('admin_id', existing_type=sa.Integer(), nullable=True)
+        batch_op.create_index('ix_admin_activity_logs_admin_id_created_at', ['admin_id', 'created_at'], unique=False)
+
+
+def downgrade():
+    op.execute('DELETE FROM admin_activity_logs WHERE admin_id IS NULL')
+    with op.batch_alter_table('admin_activity_logs', schema=None) as batch_op:
+        batch_op.drop_index('ix_admin_activity_logs_admin_id_created_at')
+        batch_op.alter_column('admin_id', existing_type=sa.Integer(), nullable=False)
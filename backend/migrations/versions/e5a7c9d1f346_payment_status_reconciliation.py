@@ -0,0 +1,46 @@
+"""payment status reconciliation columns
+
+Revision ID: e5a7c9d1f346
+Revises: d4f6b8c0e235
+Create Date: 2026-10-18 15:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5a7c9d1f346'
+down_revision = 'd4f6b8c0e235'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('mpesa_transactions', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('last_status_check', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('next_status_check_at', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('status_check_count', sa.Integer(), nullable=True))
+        batch_op.create_index('idx_mpesa_status_next_check', ['status', 'next_status_check_at'], unique=False)
+
+    with op.batch_alter_table('pesapal_transactions', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('next_status_check_at', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('status_check_count', sa.Integer(), nullable=True))
+        batch_op.create_index('idx_pesapal_status_next_check', ['status', 'next_status_check_at'], unique=False)
+
+    # Transactions already waiting on the provider get picked up on the first sweep
+    op.execute("UPDATE mpesa_transactions SET next_status_check_at = CURRENT_TIMESTAMP WHERE status = 'pending'")
+    op.execute("UPDATE pesapal_transactions SET next_status_check_at = CURRENT_TIMESTAMP WHERE status = 'pending'")
+
+
+def downgrade():
+    with op.batch_alter_table('pesapal_transactions', schema=None) as batch_op:
+        batch_op.drop_index('idx_pesapal_status_next_check')
+        batch_op.drop_column('status_check_count')
+        batch_op.drop_column('next_status_check_at')
+
+    with op.batch_alter_table('mpesa_transactions', schema=None) as batch_op:
+        batch_op.drop_index('idx_mpesa_status_next_check')
+        batch_op.drop_column('status_check_count')
+        batch_op.drop_column('next_status_check_at')
+        batch_op.drop_column('last_status_check')
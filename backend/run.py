@@ -145,7 +145,7 @@ def populate_search_index(app):
             # Get embedding service
             embedding_service = get_embedding_service()
             
-            if not embedding_service or not embedding_service.is_available():
+            if not embedding_service or not embedding_service.ensure_loaded():
                 print_colored("⚠️  Embedding service not available", Fore.YELLOW)
                 return False
             
@@ -484,16 +484,20 @@ def main():
             print_colored("   3. Check if all environment variables are set", Fore.CYAN)
         sys.exit(1)
     
-    # Initialize search system (only in main process)
+    # The search model and index warm up in the background (STARTUP_WARMUP);
+    # populating the index synchronously here is only done when that is off
     if is_main_process():
         print_colored("-" * 80, Fore.CYAN)
-        search_success = populate_search_index(app)
-        
-        if search_success:
-            print_colored("✅ Search system initialized successfully", Fore.GREEN, Style.BRIGHT)
+        if app.config.get('STARTUP_WARMUP') == 'off':
+            search_success = populate_search_index(app)
+            
+            if search_success:
+                print_colored("✅ Search system initialized successfully", Fore.GREEN, Style.BRIGHT)
+            else:
+                print_colored("⚠️  Search system initialization skipped or failed", Fore.YELLOW)
+                print_colored("   The application will still work without search functionality", Fore.CYAN)
         else:
-            print_colored("⚠️  Search system initialization skipped or failed", Fore.YELLOW)
-            print_colored("   The application will still work without search functionality", Fore.CYAN)
+            print_colored("🔍 Search system warming in the background (see 'startup' in /api/health-check)", Fore.CYAN)
     
     # Print blueprint and endpoint information (only in main process)
     if is_main_process():